@@ -18,7 +18,7 @@ python manage.py check --deploy
 
 # Start worker processes using tmux
 echo "Starting Hub worker processes..."
-tmux new-session -d -s hub-worker "python manage.py run_task_worker --sleep-seconds 30"
+tmux new-session -d -s hub-worker "python manage.py run_task_worker --sleep-seconds 30 --batch-size 20 --concurrency 4 --metrics-port 9101"
 
 # Start the server using gunicorn
 export PATH="$HOME/.local/bin:$PATH"
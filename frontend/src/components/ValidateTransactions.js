@@ -1,5 +1,5 @@
 import { createForm, required } from "@modular-forms/solid";
-import { createSignal } from "solid-js";
+import { createSignal, For, Show } from "solid-js";
 
 import { getCookie } from "../utils";
 import FileInput from "./FileInput";
@@ -20,6 +20,33 @@ const TransactionStats = props => {
       <li>
         Transactions validated: <strong>{props.data.validated}</strong>
       </li>
+      <Show when={props.data.amount_mismatches?.length > 0}>
+        <li>
+          Amounts that don't match the bank statement:
+          <ul class="ml-4 list-disc">
+            <For each={props.data.amount_mismatches}>
+              {mismatch => (
+                <li>
+                  {mismatch.transaction_id}: paid ₹{mismatch.amount / 100},
+                  credited ₹{mismatch.credited / 100} (line {mismatch.line})
+                </li>
+              )}
+            </For>
+          </ul>
+        </li>
+      </Show>
+      <Show when={props.data.duplicates?.length > 0}>
+        <li>
+          References credited more than once (not validated):{" "}
+          <strong>{props.data.duplicates.join(", ")}</strong>
+        </li>
+      </Show>
+      <Show when={props.data.unknown_references?.length > 0}>
+        <li>
+          References with no matching transaction:{" "}
+          <strong>{props.data.unknown_references.join(", ")}</strong>
+        </li>
+      </Show>
     </ul>
   );
 };
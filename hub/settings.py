@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -94,6 +95,31 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+#
+# The public tournament endpoints are served from the `tournament` cache (see
+# server/tournament/cache.py). It is file based so that every gunicorn worker
+# sees the same versions, without needing a cache server. The files live outside
+# the checkout, in TOURNAMENT_CACHE_DIR or else the system temp directory.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "tournament": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "TOURNAMENT_CACHE_DIR", str(Path(tempfile.gettempdir()) / "hub-tournament-cache")
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+
+# Longest a cached tournament response is served, in case a write skipped invalidation
+TOURNAMENT_CACHE_TIMEOUT = 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -150,6 +176,10 @@ LOGGING = {
         "handlers": ["console"],
         "level": "WARNING",
     },
+    "loggers": {
+        # Latency and token usage of each chat turn
+        "server.chat.llm": {"level": "INFO"},
+    },
 }
 
 
@@ -206,6 +236,13 @@ PASSKEY_SECRET_API_KEY = os.environ.get("PASSKEY_SECRET_API_KEY", "")
 # Prometheus Settings
 PROMETHEUS_METRIC_NAMESPACE = "hub"
 
+# Task queue worker. Enqueueing a task pings this socket so an idle worker picks
+# it up right away instead of at the end of its sleep. It lives with the other
+# runtime files, not in the checkout.
+TASK_WORKER_WAKEUP_SOCKET = os.environ.get(
+    "TASK_WORKER_WAKEUP_SOCKET", str(Path(tempfile.gettempdir()) / "hub-task-worker.sock")
+)
+
 # OCR API Keys
 OCR_API_KEY = os.environ.get("OCR_API_KEY", "")
 
@@ -226,6 +263,15 @@ OPENCODE_GO_DEFAULT_MODEL = os.environ.get("OPENCODE_GO_DEFAULT_MODEL", "")
 OPENCODE_GO_TEMPERATURE = float(os.environ.get("OPENCODE_GO_TEMPERATURE", "0.2"))
 # Reasoning models need headroom; tool calls + reasoning can exceed 4k.
 OPENCODE_GO_MAX_TOKENS = int(os.environ.get("OPENCODE_GO_MAX_TOKENS", "8192"))
+# One pooled HTTP client per process talks to the gateway (see
+# tournament_agent/clients/transport.py). HTTP/2 needs the `h2` package and is
+# skipped, with a warning, when it is missing.
+OPENCODE_GO_HTTP2 = bool(int(os.environ.get("OPENCODE_GO_HTTP2", "0")))
+OPENCODE_GO_MAX_CONNECTIONS = int(os.environ.get("OPENCODE_GO_MAX_CONNECTIONS", "20"))
+OPENCODE_GO_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.environ.get("OPENCODE_GO_MAX_KEEPALIVE_CONNECTIONS", "10")
+)
+OPENCODE_GO_KEEPALIVE_EXPIRY = float(os.environ.get("OPENCODE_GO_KEEPALIVE_EXPIRY", "60"))
 
 # Tournament agent guardrails. The kill switch is deliberately an env var: turning
 # the agent off during a live event should not need a deploy.
@@ -238,6 +284,9 @@ TOURNAMENT_AGENT_MAX_SESSION_TOKENS = int(
 TOURNAMENT_AGENT_MAX_DAILY_TOKENS = int(
     os.environ.get("TOURNAMENT_AGENT_MAX_DAILY_TOKENS", "2000000")
 )
+# Read tools the model calls together in one round run on this many threads,
+# each with its own database connection. 1 runs them one after another.
+TOURNAMENT_AGENT_TOOL_WORKERS = int(os.environ.get("TOURNAMENT_AGENT_TOOL_WORKERS", "4"))
 
 # Cloudinary settings
 CLOUDINARY_CLOUD_NAME = os.environ.get("CLOUDINARY_CLOUD_NAME", "india-ultimate")
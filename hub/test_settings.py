@@ -6,3 +6,7 @@ DATABASES["default"]["TEST"] = {"NAME": db_name}  # noqa: F405
 
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = str(BASE_DIR / "tmp")  # noqa: F405
+
+# Tests share object ids across rolled back transactions, so cached tournament
+# responses would leak between them. Tests of the cache override this.
+CACHES["tournament"] = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}  # noqa: F405
@@ -1,15 +1,15 @@
-import csv
 from typing import Any
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.db.models import CharField, Q, QuerySet, Sum, Value
 from django.db.models.functions import Concat
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 from django.template.response import TemplateResponse
 from django.utils.html import format_html
 
 from server.announcements.models import Announcement
+from server.core import search
 from server.core.models import (
     Accreditation,
     Guardianship,
@@ -27,6 +27,7 @@ from server.election.models import (
     VoterVerification,
 )
 from server.forms.models import Form, FormResponse
+from server.lib.exports import model_rows, stream_csv
 from server.membership.models import Membership
 from server.season.models import Season
 from server.series.models import Series, SeriesRegistration, SeriesRosterInvitation
@@ -53,24 +54,14 @@ from server.transaction.models import ManualTransaction, PhonePeTransaction, Raz
 
 @admin.action(description="Export Selected")
 def export_as_csv(
-    self: admin.ModelAdmin[
-        Membership | RazorpayTransaction | PhonePeTransaction | ManualTransaction
-    ],
-    request: HttpRequest,
-    queryset: QuerySet[Membership | RazorpayTransaction | PhonePeTransaction | ManualTransaction],
-) -> HttpResponse:
-    meta = self.model._meta
-    field_names = [field.name for field in meta.fields]
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = f"attachment; filename={meta}.csv"
-    writer = csv.writer(response)
-
-    writer.writerow(field_names)
-    for obj in queryset:
-        writer.writerow([getattr(obj, field) for field in field_names])
-
-    return response
+    self: admin.ModelAdmin[Any], request: HttpRequest, queryset: QuerySet[Any]
+) -> StreamingHttpResponse:
+    # A ModelAdmin's list_select_related covers what its rows' __str__ methods read
+    related = self.list_select_related
+    select_related = related if isinstance(related, list | tuple) else ()
+    return stream_csv(
+        f"{self.model._meta}.csv", model_rows(queryset, select_related=select_related), request
+    )
 
 
 @admin.action(description="Set sponsored to False")
@@ -108,17 +99,8 @@ class PlayerAdmin(admin.ModelAdmin[Player]):
         queryset: QuerySet[Player],
         search_term: str,
     ) -> tuple[QuerySet[Player], bool]:
-        # Add annotation for full name search
-        queryset = queryset.annotate(
-            full_name=Concat(
-                "user__first_name", Value(" "), "user__last_name", output_field=CharField()
-            )
-        )
-        # Add full name to search
         if search_term:
-            queryset = queryset.filter(
-                Q(full_name__icontains=search_term) | Q(user__email__icontains=search_term)
-            )
+            queryset = search.search_players(search_term, queryset)
         return (
             queryset.annotate(
                 display_label=Concat(
@@ -183,9 +165,7 @@ class TeamAdmin(admin.ModelAdmin[Team]):
         search_term: str,
     ) -> tuple[QuerySet[Team], bool]:
         if search_term:
-            queryset = queryset.filter(
-                Q(name__icontains=search_term) | Q(slug__icontains=search_term)
-            )
+            queryset = search.search_teams(search_term, queryset)
         return (
             queryset.annotate(
                 display_label=Concat(
@@ -394,6 +374,7 @@ class MembershipAdmin(admin.ModelAdmin[Membership]):
         "get_sponsored",
     ]
     list_filter = ["is_active", "player__sponsored"]
+    list_select_related = ["player__user"]
     actions = [export_as_csv]
 
     @admin.display(description="Player Name", ordering="player__user__first_name")
@@ -789,6 +770,7 @@ class AnnouncementAdmin(admin.ModelAdmin[Announcement]):
                 send_announcement_to_email,
                 send_announcement_to_members,
             )
+            from server.task.helpers import count_queued_emails
 
             announcement = Announcement.objects.get(pk=object_id)
 
@@ -797,14 +779,14 @@ class AnnouncementAdmin(admin.ModelAdmin[Announcement]):
                     tasks = send_announcement_to_all_users(announcement)
                     self.message_user(
                         request,
-                        f"Queued {len(tasks)} announcement emails to all users",
+                        f"Queued {count_queued_emails(tasks)} announcement emails to all users",
                         level="success",
                     )
                 elif "send_to_members" in request.POST:
                     tasks = send_announcement_to_members(announcement)
                     self.message_user(
                         request,
-                        f"Queued {len(tasks)} announcement emails to active members",
+                        f"Queued {count_queued_emails(tasks)} announcement emails to active members",
                         level="success",
                     )
                 elif "send_to_email" in request.POST:
@@ -822,12 +804,24 @@ class AnnouncementAdmin(admin.ModelAdmin[Announcement]):
         return super().change_view(request, object_id, form_url, extra_context)
 
 
+@admin.action(description="Requeue selected failed tasks")
+def requeue_tasks(
+    self: admin.ModelAdmin[Task],
+    request: HttpRequest,
+    queryset: QuerySet[Task],
+) -> None:
+    """Move the selected tasks out of the dead-letter queue, to be run again"""
+    requeued_count = TaskManager.requeue(queryset)
+    self.message_user(request, f"Requeued {requeued_count} failed task(s).")
+
+
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin[Task]):
     list_display = [
         "id",
         "type",
         "get_status",
+        "attempts",
         "created_at",
         "started_at",
         "completed_at",
@@ -842,10 +836,13 @@ class TaskAdmin(admin.ModelAdmin[Task]):
         "started_at",
         "completed_at",
         "failed_at",
+        "attempts",
+        "run_after",
         "result",
         "error",
     ]
     change_list_template = "admin/task_changelist.html"
+    actions = [requeue_tasks]
 
     @admin.display(description="Status")
     def get_status(self, obj: Task) -> str:
@@ -856,6 +853,8 @@ class TaskAdmin(admin.ModelAdmin[Task]):
             return format_html('<span style="color: green;">Completed</span>')
         elif obj.started_at:
             return format_html('<span style="color: orange;">Running</span>')
+        elif obj.attempts:
+            return format_html('<span style="color: purple;">Retrying</span>')
         else:
             return format_html('<span style="color: blue;">Pending</span>')
 
@@ -1,3 +1,4 @@
+import csv
 import re
 import tempfile
 from io import StringIO
@@ -7,13 +8,20 @@ from django.contrib import messages
 from django.core.management import call_command
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect, render
+from django.urls import reverse
+from django.utils.html import format_html
 
 from server.core.models import Team
+from server.lib.imports import read_rows
 from server.series.models import Series
+from server.task.helpers import queue_csv_import
 from server.tournament.models import Event
 
 OUTPUT_MAX_LENGTH = 2000
 
+# Imports run on the task queue, so a big file does not hold up the request
+IMPORT_ACTIONS = ("import_players", "add_to_series_roster", "add_to_event_roster")
+
 # Strip ANSI escape sequences (e.g. [31;1m) from command output for browser display
 ANSI_ESCAPE_RE = re.compile(r"\x1b\[[0-9;]*m")
 
@@ -27,12 +35,7 @@ def csv_imports_view(request: HttpRequest) -> HttpResponse:
         action = request.POST.get("action")
         csv_file = request.FILES.get("csv_file")
 
-        if not action or action not in (
-            "import_players",
-            "activate_memberships",
-            "add_to_series_roster",
-            "add_to_event_roster",
-        ):
+        if not action or action not in (*IMPORT_ACTIONS, "activate_memberships"):
             messages.error(request, "Invalid action.")
             return redirect("admin:csv_imports")
 
@@ -58,6 +61,37 @@ def csv_imports_view(request: HttpRequest) -> HttpResponse:
                 messages.error(request, "Event ID and Team ID are required.")
                 return redirect("admin:csv_imports")
 
+        if action in IMPORT_ACTIONS:
+            try:
+                rows = read_rows(csv_file.read().decode("utf-8-sig"))
+            except (UnicodeDecodeError, csv.Error) as e:
+                messages.error(request, f"Could not read the CSV: {e}")
+                return redirect("admin:csv_imports")
+
+            if action == "import_players":
+                options = {
+                    "date_format": request.POST.get("date_format") or "%Y-%m-%d",
+                    "guardian_email_optional": request.POST.get("guardian_email_optional") == "on",
+                }
+            else:
+                options = {
+                    key: request.POST.get(key) for key in ("series_id", "event_id", "team_id")
+                }
+            dry_run = request.POST.get("dry_run") == "on"
+            task = queue_csv_import(action, rows, options, dry_run=dry_run)
+            messages.success(
+                request,
+                format_html(
+                    '{} of {} rows queued as <a href="{}">task {}</a>. '
+                    "Its progress and report are on the task's page.",
+                    "Dry run" if dry_run else "Import",
+                    len(rows),
+                    reverse("admin:server_task_change", args=[task.id]),
+                    task.id,
+                ),
+            )
+            return redirect("admin:csv_imports")
+
         out = StringIO()
         err = StringIO()
         tmp_path = None
@@ -68,37 +102,7 @@ def csv_imports_view(request: HttpRequest) -> HttpResponse:
                 for chunk in csv_file.chunks():
                     tmp.write(chunk)
 
-            if action == "import_players":
-                date_format = request.POST.get("date_format") or "%Y-%m-%d"
-                guardian_email_optional = request.POST.get("guardian_email_optional") == "on"
-                call_command(
-                    "import_players",
-                    tmp_path,
-                    date_format=date_format,
-                    guardian_email_optional=guardian_email_optional,
-                    stdout=out,
-                    stderr=err,
-                )
-            elif action == "activate_memberships":
-                call_command("activate_memberships", tmp_path, stdout=out, stderr=err)
-            elif action == "add_to_series_roster":
-                call_command(
-                    "add_to_series_roster",
-                    tmp_path,
-                    series_id=request.POST.get("series_id"),
-                    team_id=request.POST.get("team_id"),
-                    stdout=out,
-                    stderr=err,
-                )
-            elif action == "add_to_event_roster":
-                call_command(
-                    "add_to_event_roster",
-                    tmp_path,
-                    event_id=request.POST.get("event_id"),
-                    team_id=request.POST.get("team_id"),
-                    stdout=out,
-                    stderr=err,
-                )
+            call_command("activate_memberships", tmp_path, stdout=out, stderr=err)
 
             err_content = _strip_ansi(err.getvalue())
             if err_content:
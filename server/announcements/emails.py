@@ -11,7 +11,7 @@ from django.template.loader import render_to_string
 from server.announcements.models import Announcement
 from server.core.models import User
 from server.membership.models import Membership
-from server.task.helpers import queue_emails
+from server.task.helpers import queue_bulk_emails
 from server.task.models import Task
 
 CONTENT_PREVIEW_LENGTH = 300
@@ -103,19 +103,18 @@ def _queue_announcement_emails(announcement: Announcement, recipients: list[str]
 
     content_preview = f"<p>{escape(plain_text_preview)}</p>"
 
-    messages: list[EmailMultiAlternatives] = []
-    for recipient_email in unique_recipients:
-        html_content = render_to_string(
-            "emails/announcement_notification.html",
-            {
-                "announcement": announcement,
-                "content_preview": content_preview,
-                "site_url": site_url,
-                "announcement_url": announcement_url,
-            },
-        )
-
-        plain_content = f"""
+    # Every recipient gets the same email, so render it once
+    html_content = render_to_string(
+        "emails/announcement_notification.html",
+        {
+            "announcement": announcement,
+            "content_preview": content_preview,
+            "site_url": site_url,
+            "announcement_url": announcement_url,
+        },
+    )
+
+    plain_content = f"""
 New Announcement: {announcement.title}
 
 Category: {announcement.get_type_display()}
@@ -129,6 +128,8 @@ Posted by: {announcement.author.get_full_name()}
 India Ultimate Hub
 """
 
+    messages: list[EmailMultiAlternatives] = []
+    for recipient_email in unique_recipients:
         msg = EmailMultiAlternatives(
             subject=f"📢 {announcement.title}",
             body=plain_content,
@@ -138,4 +139,4 @@ India Ultimate Hub
         msg.attach_alternative(html_content, "text/html")
         messages.append(msg)
 
-    return queue_emails(messages)
+    return queue_bulk_emails(messages)
@@ -18,7 +18,7 @@ from django.core import mail
 from django.core.exceptions import ValidationError
 from django.core.files.storage import default_storage
 from django.db import transaction
-from django.db.models import Count, F, Q, QuerySet, Value
+from django.db.models import Avg, Count, F, OuterRef, Q, QuerySet, Subquery, Value
 from django.db.models.functions import Concat
 from django.db.utils import IntegrityError
 from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
@@ -34,6 +34,7 @@ from ninja.security import django_auth
 
 from server.announcements.api import router as announcements_router
 from server.chat.api import router as chat_router
+from server.core import search
 from server.core.models import (
     Accreditation,
     CollegeId,
@@ -99,6 +100,8 @@ from server.servicerequests.api import router as servicerequests_router
 from server.task.api import router as task_router
 from server.ticket.api import ticket_api
 from server.top_score_utils import TopScoreClient
+from server.tournament.cache import cached_tournament_response, get_tournament_id
+from server.tournament.leaderboard import get_leaderboard
 from server.tournament.match_stats_min import (
     handle_all_events,
     handle_full_time,
@@ -111,9 +114,9 @@ from server.tournament.models import (
     CrossPool,
     Event,
     Match,
-    MatchEvent,
     MatchScore,
     MatchStats,
+    PlayerRating,
     Pool,
     PositionPool,
     Registration,
@@ -122,6 +125,7 @@ from server.tournament.models import (
     TournamentField,
     UCRegistration,
 )
+from server.tournament.ratings import roster_points
 from server.tournament.schema import (
     AddOrRemoveTeamRegistrationSchema,
     AddToRosterSchema,
@@ -157,6 +161,8 @@ from server.tournament.schema import (
     TournamentSchema,
     TournamentUpdateSeedingSchema,
     UCRegistrationSchema,
+    with_match_related,
+    with_tournament_related,
 )
 from server.tournament.utils import (
     as_match_time,
@@ -291,12 +297,7 @@ def me_membership(
 
 @api.get("/users/search", response={200: list[UserMinSchema]})
 def search_users(request: AuthenticatedHttpRequest, text: str = "") -> QuerySet[User]:
-    text = text.strip().lower()
-    return (
-        User.objects.annotate(full_name=Concat("first_name", Value(" "), "last_name"))
-        .filter(Q(full_name__icontains=text) | Q(username__icontains=text))
-        .order_by("full_name")
-    )
+    return search.search_users(text)
 
 
 # Players ##########
@@ -317,12 +318,7 @@ def list_players(
 @api.get("/players/search", response={200: list[PlayerTinySchema]})
 @paginate(PageNumberPagination, page_size=5)
 def search_players(request: AuthenticatedHttpRequest, text: str = "") -> QuerySet[Player]:
-    text = text.strip().lower()
-    return (
-        Player.objects.annotate(full_name=Concat("user__first_name", Value(" "), "user__last_name"))
-        .filter(Q(full_name__icontains=text) | Q(user__username__icontains=text))
-        .order_by("full_name")
-    )
+    return search.search_players(text)
 
 
 @api.get("/players/{player_id}", response={200: PlayerSchema, 400: Response, 404: Response})
@@ -348,14 +344,22 @@ def recommend_players(
         return 400, {"message": "Team does not exist"}
 
     # Get players who have registered with this team before
-    # Count their registrations and order by most frequent players first
+    # Count their registrations and order by most frequent players first,
+    # then by their mean points across events
+    rating = (
+        PlayerRating.objects.filter(player=OuterRef("pk"))
+        .values("player")
+        .annotate(mean=Avg("points"))
+        .values("mean")
+    )
     return (
         Player.objects.filter(registration__team=team)
         .annotate(
             registration_count=Count("registration"),
+            rating=Subquery(rating),
             full_name=Concat("user__first_name", Value(" "), "user__last_name"),
         )
-        .order_by("-registration_count", "full_name")
+        .order_by("-registration_count", F("rating").desc(nulls_last=True), "full_name")
         .distinct()
     )
 
@@ -369,7 +373,7 @@ def list_teams(request: AuthenticatedHttpRequest) -> QuerySet[Team]:
 @api.get("/teams/search", auth=None, response={200: list[TeamSchema]})
 @paginate(PageNumberPagination, page_size=10)
 def search_teams(request: AuthenticatedHttpRequest, text: str = "") -> QuerySet[Team]:
-    return Team.objects.filter(name__icontains=text.lower()).order_by("name")
+    return search.search_teams(text)
 
 
 @api.get("/team/{team_slug}", auth=None, response={200: TeamSchema, 400: Response})
@@ -1205,26 +1209,25 @@ def upai_person(
 @api.get("/tournaments", auth=None, response={200: list[TournamentMinSchema]})
 def get_all_tournaments(request: AuthenticatedHttpRequest) -> tuple[int, QuerySet[Tournament]]:
     """Get tournaments, most recently started tournament first"""
-    return 200, Tournament.objects.all().order_by("-event__start_date")
+    return 200, Tournament.objects.select_related("event__series").order_by("-event__start_date")
 
 
 @api.get("/tournament", auth=None, response={200: TournamentSchema, 400: Response})
 def get_tournament(
     request: AuthenticatedHttpRequest, id: int | None = None, slug: str | None = None
-) -> tuple[int, Tournament | message_response]:
+) -> HttpResponse | tuple[int, message_response]:
     if id is None and slug is None:
         return 400, {"message": "Need either tournament id or slug"}
     try:
-        if id is not None:
-            tournament = Tournament.objects.get(id=id)
-        else:
-            event = Event.objects.get(slug=slug)
-            tournament = Tournament.objects.get(event=event)
-    except (Tournament.DoesNotExist, Event.DoesNotExist):
+        return cached_tournament_response(
+            get_tournament_id(id, slug),
+            "tournament",
+            lambda tournament: TournamentSchema.from_orm(tournament).dict(),
+            with_tournament_related(Tournament.objects.all()),
+        )
+    except Tournament.DoesNotExist:
         return 400, {"message": "Tournament does not exist"}
 
-    return 200, tournament
-
 
 # Tournaments - Roster ##########
 
@@ -1483,37 +1486,7 @@ def get_tournament_team_roster_points(
     except (Event.DoesNotExist, Team.DoesNotExist):
         return 400, {"message": "Tournament/Team does not exist"}
 
-    roster_regs = Registration.objects.filter(event=event, team=team)
-
-    total_points = 0.0
-    total_points_count = 0
-
-    for roster_reg in roster_regs:
-        player_regs = Registration.objects.filter(
-            player=roster_reg.player, event__end_date__lt=event.start_date
-        )
-
-        player_points = 0.0
-        player_points_count = 0
-
-        for player_reg in player_regs:
-            if player_reg.points is not None:
-                player_points += player_reg.points
-                player_points_count += 1
-
-        if player_points_count > 0:
-            player_points = player_points / player_points_count
-
-        if player_points > 0:
-            total_points += player_points
-            total_points_count += 1
-
-    avg_points = 0.0
-
-    if total_points_count > 0:
-        avg_points = round(total_points / total_points_count, 1)
-
-    return 200, {"points": avg_points}
+    return 200, {"points": roster_points(event, team.id)}
 
 
 ######## Fields
@@ -1662,16 +1635,22 @@ def delete_field(request: AuthenticatedHttpRequest, field_id: int) -> tuple[int,
 )
 def get_tournament_matches_by_slug(
     request: AuthenticatedHttpRequest, slug: str
-) -> tuple[int, QuerySet[Match] | message_response]:
-    try:
-        event = Event.objects.get(slug=slug)
-        tournament = Tournament.objects.get(event=event)
+) -> HttpResponse | tuple[int, message_response]:
+    try:
+        return cached_tournament_response(
+            get_tournament_id(slug=slug),
+            "matches",
+            lambda tournament: [
+                MatchSchema.from_orm(match).dict()
+                for match in with_match_related(
+                    Match.objects.filter(tournament=tournament).order_by("time")
+                )
+            ],
+        )
     except Tournament.DoesNotExist:
+        if not Event.objects.filter(slug=slug).exists():
+            return 400, {"message": "Event does not exist"}
         return 400, {"message": "Tournament does not exist"}
-    except Event.DoesNotExist:
-        return 400, {"message": "Event does not exist"}
-
-    return 200, Match.objects.filter(tournament=tournament).order_by("time")
 
 
 @api.get(
@@ -1693,9 +1672,11 @@ def get_tournament_team_matches(
     except Team.DoesNotExist:
         return 400, {"message": "Team does not exist"}
 
-    tournament_team_matches = Match.objects.filter(
-        Q(team_1=team) | Q(team_2=team), tournament=tournament
-    ).order_by("time")
+    tournament_team_matches = with_match_related(
+        Match.objects.filter(Q(team_1=team) | Q(team_2=team), tournament=tournament).order_by(
+            "time"
+        )
+    )
 
     return 200, tournament_team_matches
 
@@ -2081,20 +2062,21 @@ def create_pool(
 @api.get("/tournament/pools", auth=None, response={200: list[PoolSchema], 400: Response})
 def get_pools(
     request: AuthenticatedHttpRequest, id: int = 0, slug: str = ""
-) -> tuple[int, QuerySet[Pool]] | tuple[int, message_response]:
+) -> HttpResponse | tuple[int, message_response]:
     if id == 0 and slug == "":
         return 400, {"message": "Need either tournament id or slug"}
     try:
-        if id != 0:
-            tournament = Tournament.objects.get(id=id)
-        else:
-            event = Event.objects.get(slug=slug)
-            tournament = Tournament.objects.get(event=event)
+        return cached_tournament_response(
+            get_tournament_id(id, slug),
+            "pools",
+            lambda tournament: [
+                PoolSchema.from_orm(pool).dict()
+                for pool in Pool.objects.filter(tournament=tournament).order_by("name")
+            ],
+        )
     except Tournament.DoesNotExist:
         return 400, {"message": "Tournament does not exist"}
 
-    return 200, Pool.objects.filter(tournament=tournament).order_by("name")
-
 
 @api.post(
     "/tournament/swiss-round/{tournament_id}",
@@ -2133,20 +2115,23 @@ def create_swiss_round(
 )
 def get_swiss_rounds(
     request: AuthenticatedHttpRequest, id: int | None = None, slug: str | None = None
-) -> tuple[int, QuerySet[SwissRound]] | tuple[int, message_response]:
+) -> HttpResponse | tuple[int, message_response]:
     if id is None and slug is None:
         return 400, {"message": "Need either tournament id or slug"}
     try:
-        if id is not None:
-            tournament = Tournament.objects.get(id=id)
-        else:
-            event = Event.objects.get(slug=slug)
-            tournament = Tournament.objects.get(event=event)
+        return cached_tournament_response(
+            get_tournament_id(id, slug),
+            "swiss-rounds",
+            lambda tournament: [
+                SwissRoundSchema.from_orm(swiss_round).dict()
+                for swiss_round in SwissRound.objects.filter(tournament=tournament).order_by(
+                    "sequence_number"
+                )
+            ],
+        )
     except Tournament.DoesNotExist:
         return 400, {"message": "Tournament does not exist"}
 
-    return 200, SwissRound.objects.filter(tournament=tournament).order_by("sequence_number")
-
 
 @api.post(
     "/tournament/swiss-round/{swiss_round_id}/rerun",
@@ -2194,23 +2179,22 @@ def create_cross_pool(
 @api.get("/tournament/cross-pool", auth=None, response={200: CrossPoolSchema, 400: Response})
 def get_cross_pool(
     request: AuthenticatedHttpRequest, id: int | None = None, slug: str | None = None
-) -> tuple[int, CrossPool] | tuple[int, message_response]:
+) -> HttpResponse | tuple[int, message_response]:
     if id is None and slug is None:
         return 400, {"message": "Need either tournament id or slug"}
     try:
-        if id is not None:
-            tournament = Tournament.objects.get(id=id)
-        else:
-            event = Event.objects.get(slug=slug)
-            tournament = Tournament.objects.get(event=event)
-        cross_pool = CrossPool.objects.get(tournament=tournament)
+        return cached_tournament_response(
+            get_tournament_id(id, slug),
+            "cross-pool",
+            lambda tournament: CrossPoolSchema.from_orm(
+                CrossPool.objects.get(tournament=tournament)
+            ).dict(),
+        )
     except Tournament.DoesNotExist:
         return 400, {"message": "Tournament does not exist"}
     except CrossPool.DoesNotExist:
         return 400, {"message": "Cross Pool does not exist"}
 
-    return 200, cross_pool
-
 
 @api.post(
     "/tournament/bracket/{tournament_id}",
@@ -2243,20 +2227,21 @@ def create_bracket(
 @api.get("/tournament/brackets", auth=None, response={200: list[BracketSchema], 400: Response})
 def get_brackets(
     request: AuthenticatedHttpRequest, id: int | None = None, slug: str | None = None
-) -> tuple[int, QuerySet[Bracket]] | tuple[int, message_response]:
+) -> HttpResponse | tuple[int, message_response]:
     if id is None and slug is None:
         return 400, {"message": "Need either tournament id or slug"}
     try:
-        if id is not None:
-            tournament = Tournament.objects.get(id=id)
-        else:
-            event = Event.objects.get(slug=slug)
-            tournament = Tournament.objects.get(event=event)
-    except (Tournament.DoesNotExist, Event.DoesNotExist):
+        return cached_tournament_response(
+            get_tournament_id(id, slug),
+            "brackets",
+            lambda tournament: [
+                BracketSchema.from_orm(bracket).dict()
+                for bracket in Bracket.objects.filter(tournament=tournament)
+            ],
+        )
+    except Tournament.DoesNotExist:
         return 400, {"message": "Tournament does not exist"}
 
-    return 200, Bracket.objects.filter(tournament=tournament)
-
 
 @api.post(
     "/tournament/position-pool/{tournament_id}",
@@ -2403,7 +2388,7 @@ def get_matches(
     except Tournament.DoesNotExist:
         return 400, {"message": "Tournament does not exist"}
 
-    return 200, Match.objects.filter(tournament=tournament).order_by("time")
+    return 200, with_match_related(Match.objects.filter(tournament=tournament).order_by("time"))
 
 
 @api.post(
@@ -2476,7 +2461,7 @@ def update_rules(
 @api.get("/match/{match_id}", auth=None, response={200: MatchSchema, 400: Response})
 def get_match(request: HttpRequest, match_id: int) -> tuple[int, Match | message_response]:
     try:
-        match = Match.objects.get(id=match_id)
+        match = with_match_related(Match.objects.all()).get(id=match_id)
     except Match.DoesNotExist:
         return 400, {"message": "Match does not exist"}
 
@@ -2845,78 +2830,7 @@ def get_tournament_leaderboard(
     except Event.DoesNotExist:
         return 400, {"message": "Event does not exist"}
 
-    match_stats = MatchStats.objects.filter(tournament=tournament).values_list("id", flat=True)
-
-    scores = (
-        MatchEvent.objects.filter(stats_id__in=match_stats, type=MatchEvent.EventType.SCORE)
-        .annotate(
-            player_id=F("scored_by_id"),
-            first_name=F("scored_by__user__first_name"),
-            last_name=F("scored_by__user__last_name"),
-            team_name=F("team__name"),
-            gender=F("scored_by__gender"),
-        )
-        .values("player_id", "first_name", "last_name", "team_name", "gender")
-        .annotate(num_scores=Count("player_id"))
-        .order_by("-num_scores")
-    )
-
-    assists = (
-        MatchEvent.objects.filter(stats_id__in=match_stats, type=MatchEvent.EventType.SCORE)
-        .annotate(
-            player_id=F("assisted_by_id"),
-            first_name=F("assisted_by__user__first_name"),
-            last_name=F("assisted_by__user__last_name"),
-            team_name=F("team__name"),
-            gender=F("assisted_by__gender"),
-        )
-        .values("player_id", "first_name", "last_name", "team_name", "gender")
-        .annotate(num_assists=Count("player_id"))
-        .order_by("-num_assists")
-    )
-
-    blocks = (
-        MatchEvent.objects.filter(stats_id__in=match_stats, type=MatchEvent.EventType.BLOCK)
-        .annotate(
-            player_id=F("block_by_id"),
-            first_name=F("block_by__user__first_name"),
-            last_name=F("block_by__user__last_name"),
-            team_name=F("team__name"),
-            gender=F("block_by__gender"),
-        )
-        .values("player_id", "first_name", "last_name", "team_name", "gender")
-        .annotate(num_blocks=Count("player_id"))
-        .order_by("-num_blocks")
-    )
-
-    players_map = {}
-
-    for score in scores:
-        players_map[score["player_id"]] = score
-
-    for assist in assists:
-        player = players_map.setdefault(assist["player_id"], assist)
-        player["num_assists"] = assist["num_assists"]
-
-    for block in blocks:
-        player = players_map.setdefault(block["player_id"], block)
-        player["num_blocks"] = block["num_blocks"]
-
-    players = list(players_map.values())
-
-    for player in players:
-        player["num_total"] = (
-            player.get("num_scores", 0) + player.get("num_assists", 0) + player.get("num_blocks", 0)
-        )
-
-    players = sorted(players, key=lambda p: p["num_total"], reverse=True)
-
-    return 200, {
-        "scores": list(scores),
-        "assists": list(assists),
-        "blocks": list(blocks),
-        "total": players,
-    }
+    return 200, get_leaderboard(tournament)
 
 
 # Contact Form ##########
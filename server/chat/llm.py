@@ -1,4 +1,6 @@
 import json
+import logging
+import time
 from collections.abc import Iterable
 from typing import Any, TypedDict, TypeVar, cast
 
@@ -37,6 +39,96 @@ from .models import ChatMessage, ChatMessageType, ChatSession
 
 T = TypeVar("T")
 
+logger = logging.getLogger(__name__)
+
+# A rough count, good enough for keeping the prompt bounded without a tokenizer
+CHARS_PER_TOKEN = 4
+# Stored messages replayed to the model each turn, newest first, up to this many tokens.
+# The newest message is always sent, however long it is.
+HISTORY_TOKEN_BUDGET = 3_000
+# Messages that fall out of the window are kept as one line each in a rolling summary,
+# which drops its oldest lines once it is longer than this
+SUMMARY_LINE_CHARS = 240
+SUMMARY_MAX_CHARS = 3_000
+# Hard cap on one tool result as sent to the model
+TOOL_RESULT_MAX_CHARS = 12_000
+# Rows per page for the tools that list an unbounded table
+TOOL_PAGE_SIZE = 25
+
+ConversationMessage = (
+    ChatCompletionSystemMessageParam
+    | ChatCompletionUserMessageParam
+    | ChatCompletionAssistantMessageParam
+    | ChatCompletionToolMessageParam
+    | ChatCompletionFunctionMessageParam
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _summary_line(msg: ChatMessage) -> str:
+    text = " ".join(msg.message.split())
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[: SUMMARY_LINE_CHARS - 1].rstrip() + "…"
+    return f"{msg.get_type_display()}: {text}"
+
+
+def roll_summary(summary: str, messages: list[ChatMessage]) -> str:
+    """The summary with a line for each message, keeping only the newest lines that fit."""
+    lines = [line for line in summary.splitlines() if line]
+    lines.extend(_summary_line(msg) for msg in messages)
+    total = sum(len(line) + 1 for line in lines)
+    while len(lines) > 1 and total > SUMMARY_MAX_CHARS:
+        total -= len(lines.pop(0)) + 1
+    return "\n".join(lines)
+
+
+def compact_tool_result(response: dict[str, Any]) -> str:
+    """The tool result as JSON, never longer than TOOL_RESULT_MAX_CHARS.
+
+    A result that is too long loses rows from the end of its longest list, with a
+    note saying how many were left out. One that still does not fit is sent as a
+    truncated preview.
+    """
+    content = json.dumps(response, default=str)
+    if len(content) <= TOOL_RESULT_MAX_CHARS:
+        return content
+
+    lists = [key for key, value in response.items() if isinstance(value, list)]
+    if lists:
+        key = max(lists, key=lambda k: len(json.dumps(response[k], default=str)))
+        rows = response[key]
+        budget = TOOL_RESULT_MAX_CHARS - len(json.dumps({**response, key: []}, default=str))
+        kept: list[Any] = []
+        # Room for the note added below
+        used = 200
+        for row in rows:
+            used += len(json.dumps(row, default=str)) + 2
+            if used > budget:
+                break
+            kept.append(row)
+        content = json.dumps(
+            {
+                **response,
+                key: kept,
+                "truncated": f"Showing {len(kept)} of {len(rows)} {key}. "
+                "Ask for the next page or a narrower filter for the rest.",
+            },
+            default=str,
+        )
+        if len(content) <= TOOL_RESULT_MAX_CHARS:
+            return content
+
+    return json.dumps(
+        {"truncated": True, "preview": content[: TOOL_RESULT_MAX_CHARS - 100]}, default=str
+    )
+
+
+def _page(key: str, rows: list[dict[str, Any]], offset: int, has_more: bool) -> dict[str, Any]:
+    return {key: rows, "next_offset": offset + len(rows) if has_more else None}
+
 
 class ChatMessageDict(TypedDict):
     role: str
@@ -487,8 +579,18 @@ Available Tools:
                 "type": "function",
                 "function": {
                     "name": "get_all_tournaments",
-                    "description": "Get information about all tournaments",
-                    "parameters": {"type": "object", "properties": {}, "required": []},
+                    "description": "Get information about all tournaments, newest first, "
+                    "one page at a time",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "offset": {
+                                "type": "integer",
+                                "description": "How many results to skip, to get the next page",
+                            },
+                        },
+                        "required": [],
+                    },
                 },
             },
             {
@@ -708,7 +810,7 @@ Available Tools:
                 "type": "function",
                 "function": {
                     "name": "get_match_events",
-                    "description": "Get match events filtered by team, type, players, or specific player actions",
+                    "description": "Get match events filtered by team, type, players, or specific player actions, newest first, one page at a time",
                     "parameters": {
                         "type": "object",
                         "properties": {
@@ -744,6 +846,10 @@ Available Tools:
                                 "type": "integer",
                                 "description": "The ID of the player who got the block/D",
                             },
+                            "offset": {
+                                "type": "integer",
+                                "description": "How many results to skip, to get the next page",
+                            },
                         },
                         "required": [],
                     },
@@ -765,29 +871,16 @@ Available Tools:
         # Save user message
         ChatMessage.objects.create(session=session, message=message, type=ChatMessageType.USER)
 
-        # Get conversation history
-        conversation_history: list[
-            ChatCompletionSystemMessageParam
-            | ChatCompletionUserMessageParam
-            | ChatCompletionAssistantMessageParam
-            | ChatCompletionToolMessageParam
-            | ChatCompletionFunctionMessageParam
-        ] = [
-            cast(
-                ChatCompletionSystemMessageParam, {"role": "system", "content": self.system_prompt}
-            )
-        ]
+        conversation_history = self.get_conversation_history(session)
+        started = time.monotonic()
+        tokens_in = tokens_out = rounds = 0
 
-        # Add user messages
-        conversation_history.extend(
-            [
-                cast(
-                    ChatCompletionUserMessageParam,
-                    {"role": msg.get_type_display().lower(), "content": msg.message},
-                )
-                for msg in session.messages.all()
-            ]
-        )
+        def count_usage(completion: Any) -> None:
+            nonlocal tokens_in, tokens_out, rounds
+            rounds += 1
+            usage = getattr(completion, "usage", None)
+            tokens_in += getattr(usage, "prompt_tokens", 0) or 0
+            tokens_out += getattr(usage, "completion_tokens", 0) or 0
 
         try:
             # Get response from Groq using configured model
@@ -801,6 +894,7 @@ Available Tools:
                 tool_choice="required",
                 stream=False,
             )
+            count_usage(response)
 
             response_message = response.choices[0].message
             tool_calls = response_message.tool_calls
@@ -830,7 +924,7 @@ Available Tools:
 
                 for tool_call in tool_calls:
                     function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
+                    function_args = json.loads(tool_call.function.arguments or "{}")
 
                     # Execute the appropriate function
                     function_response: dict[str, Any] = {}
@@ -867,7 +961,7 @@ Available Tools:
                             "registrations": self.get_series_registrations(**function_args)
                         }
                     elif function_name == "get_all_tournaments":
-                        function_response = {"tournaments": self.get_all_tournaments()}
+                        function_response = self.get_all_tournaments(**function_args)
                     elif function_name == "get_tournament_details":
                         result = self.get_tournament_details(**function_args)
                         function_response = result if result is not None else {}
@@ -896,7 +990,7 @@ Available Tools:
                     elif function_name == "get_match_stats":
                         function_response = {"stats": self.get_match_stats(**function_args)}
                     elif function_name == "get_match_events":
-                        function_response = {"events": self.get_match_events(**function_args)}
+                        function_response = self.get_match_events(**function_args)
                     elif function_name == "get_current_user":
                         function_response = {"user": self.get_current_user()}
 
@@ -906,7 +1000,7 @@ Available Tools:
                             ChatCompletionToolMessageParam,
                             {
                                 "role": "tool",
-                                "content": json.dumps(function_response),
+                                "content": compact_tool_result(function_response),
                                 "tool_call_id": tool_call.id,
                             },
                         )
@@ -921,6 +1015,7 @@ Available Tools:
                     top_p=self.top_p,
                     stream=False,
                 )
+                count_usage(final_response)
                 assistant_message = final_response.choices[0].message.content or ""
             else:
                 assistant_message = response_message.content or ""
@@ -932,6 +1027,14 @@ Available Tools:
                 type=ChatMessageType.ASSISTANT,
                 timestamp=timezone.now(),
             )
+            logger.info(
+                "chat turn session=%s rounds=%d tokens_in=%d tokens_out=%d latency_ms=%d",
+                session.id,
+                rounds,
+                tokens_in,
+                tokens_out,
+                (time.monotonic() - started) * 1000,
+            )
 
             return assistant_message
 
@@ -945,6 +1048,55 @@ Available Tools:
             )
             return error_message
 
+    def get_conversation_history(self, session: ChatSession) -> list[ConversationMessage]:
+        """The system prompt, a summary of older messages and the newest ones that fit.
+
+        Messages are replayed newest first until HISTORY_TOKEN_BUDGET is spent. The
+        ones before that are folded into the session's rolling summary, once, so a
+        turn only reads the messages that came after the last one folded.
+        """
+        messages = list(
+            session.messages.filter(id__gt=session.summary_through).order_by("timestamp", "id")
+        )
+        kept = 0
+        spent = 0
+        for msg in reversed(messages):
+            spent += estimate_tokens(msg.message)
+            if kept and spent > HISTORY_TOKEN_BUDGET:
+                break
+            kept += 1
+
+        folded, recent = messages[: len(messages) - kept], messages[len(messages) - kept :]
+        if folded:
+            session.summary = roll_summary(session.summary, folded)
+            session.summary_through = folded[-1].id
+            session.save(update_fields=["summary", "summary_through"])
+
+        history: list[ConversationMessage] = [
+            cast(
+                ChatCompletionSystemMessageParam, {"role": "system", "content": self.system_prompt}
+            )
+        ]
+        if session.summary:
+            history.append(
+                cast(
+                    ChatCompletionSystemMessageParam,
+                    {
+                        "role": "system",
+                        "content": "Summary of the earlier conversation, oldest first:\n"
+                        + session.summary,
+                    },
+                )
+            )
+        history.extend(
+            cast(
+                ChatCompletionUserMessageParam,
+                {"role": msg.get_type_display().lower(), "content": msg.message},
+            )
+            for msg in recent
+        )
+        return history
+
     def get_session_history(self, user: User) -> dict[str, Any]:
         """Get the chat history for a user's current session."""
         session = self.get_or_create_session(user)
@@ -1207,12 +1359,15 @@ Available Tools:
             for reg in registrations
         ]
 
-    def get_all_tournaments(self) -> list[dict[str, Any]]:
-        """Get information about all tournaments."""
+    def get_all_tournaments(self, offset: int = 0) -> dict[str, Any]:
+        """Get one page of information about all tournaments, newest first."""
         tournaments = (
-            Tournament.objects.all().select_related("event").order_by("-event__start_date")
+            Tournament.objects.all()
+            .select_related("event", "event__series")
+            .order_by("-event__start_date", "-id")
         )
-        return [
+        page = list(tournaments[offset : offset + TOOL_PAGE_SIZE + 1])
+        rows = [
             {
                 "id": tournament.id,
                 "event_id": tournament.event.id,
@@ -1241,8 +1396,9 @@ Available Tools:
                 <= timezone.now().date()
                 <= tournament.event.end_date,
             }
-            for tournament in tournaments
+            for tournament in page[:TOOL_PAGE_SIZE]
         ]
+        return _page("tournaments", rows, offset, has_more=len(page) > TOOL_PAGE_SIZE)
 
     def get_tournament_details(self, tournament_id: int) -> dict[str, Any] | None:
         """Get detailed information about a specific tournament."""
@@ -1694,8 +1850,12 @@ Available Tools:
         drop_by_id: int | None = None,
         throwaway_by_id: int | None = None,
         block_by_id: int | None = None,
-    ) -> list[dict[str, Any]]:
-        """Get match events filtered by team, type, players, or specific player actions."""
+        offset: int = 0,
+    ) -> dict[str, Any]:
+        """Get one page of match events filtered by team, type, players, or player actions.
+
+        Newest first.
+        """
         events = (
             MatchEvent.objects.select_related(
                 "stats",
@@ -1729,7 +1889,8 @@ Available Tools:
         if block_by_id:
             events = events.filter(block_by_id=block_by_id)
 
-        return [
+        page = list(events.order_by("-time", "-id")[offset : offset + TOOL_PAGE_SIZE + 1])
+        rows = [
             {
                 "id": event.id,
                 "match": {
@@ -1774,8 +1935,9 @@ Available Tools:
                 if event.block_by
                 else None,
             }
-            for event in events
+            for event in page[:TOOL_PAGE_SIZE]
         ]
+        return _page("events", rows, offset, has_more=len(page) > TOOL_PAGE_SIZE)
 
     def get_current_user(self) -> dict[str, Any]:
         """Get details of the currently logged in user."""
@@ -7,6 +7,10 @@ class ChatSession(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # One line per message that has aged out of the history sent to the model,
+    # and the id of the last message folded into it
+    summary = models.TextField(blank=True, default="")
+    summary_through = models.PositiveBigIntegerField(default=0)
 
     def __str__(self) -> str:
         return f"Session {self.id}"
@@ -5,7 +5,7 @@ from typing import Any
 from dateutil.relativedelta import relativedelta
 from django.contrib.auth.models import AbstractUser
 from django.db import models
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils.crypto import get_random_string
 from django.utils.timezone import now
@@ -279,3 +279,47 @@ def update_accreditation_validity(
     instance.full_clean()  # Ensure instance.date is a datetime.date object
     instance.is_valid = instance.date > (now() - relativedelta(months=18)).date()
     return
+
+
+# The fields `server.core.search` indexes. A save limited to other fields (every
+# login saves `last_login`) leaves the index as it was.
+USER_SEARCH_FIELDS = frozenset({"first_name", "last_name", "username", "email"})
+PLAYER_SEARCH_FIELDS = frozenset({"user", "city"})
+TEAM_SEARCH_FIELDS = frozenset({"name", "slug", "city"})
+
+
+def _touches(kwargs: dict[str, Any], fields: frozenset[str]) -> bool:
+    update_fields = kwargs.get("update_fields")
+    return update_fields is None or bool(set(update_fields) & fields)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def update_search_index_on_user_change(sender: Any, instance: User, **kwargs: Any) -> None:
+    from server.core.search import index_players, index_users
+
+    if not _touches(kwargs, USER_SEARCH_FIELDS):
+        return
+    index_users([instance.id])
+    # A player is indexed under their user's name. Deleting the user deletes the
+    # player too, which has its own receiver.
+    if kwargs.get("signal") is post_save:
+        index_players(list(Player.objects.filter(user_id=instance.id).values_list("id", flat=True)))
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+def update_search_index_on_player_change(sender: Any, instance: Player, **kwargs: Any) -> None:
+    from server.core.search import index_players
+
+    if _touches(kwargs, PLAYER_SEARCH_FIELDS):
+        index_players([instance.id])
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+def update_search_index_on_team_change(sender: Any, instance: Team, **kwargs: Any) -> None:
+    from server.core.search import index_teams
+
+    if _touches(kwargs, TEAM_SEARCH_FIELDS):
+        index_teams([instance.id])
@@ -0,0 +1,272 @@
+"""Indexed name search for players, users and teams.
+
+The roster autocomplete searches on every keystroke, and `icontains` over a
+concatenated full name reads and rebuilds every row of the table to answer it.
+On SQLite these searches go to FTS5 tables with the trigram tokenizer instead,
+one per model, keyed by the row's id:
+
+    server_search_player (name, email, place)
+    server_search_user   (name, email)
+    server_search_team   (name, slug, place)
+
+Everything indexed is normalised first (case folded, accents stripped, spaces
+collapsed), and queries are normalised the same way. A query is matched as any
+of its trigrams, so a typo still finds the row it was meant for. Candidates are
+ranked by having the query as a whole word, then starting a word with it, then
+containing it anywhere, then how many of its trigrams they contain, then FTS5's
+bm25. Only the best `MAX_CANDIDATES` are ever ranked, however many rows share a
+trigram with the query.
+
+The receivers in `server.core.models` keep the tables in sync on saves and
+deletes. `bulk_create`, `QuerySet.update` and raw SQL skip them, so code that
+writes names that way has to call `index_players` and friends itself. When in
+doubt, `manage.py rebuild_search_index` rebuilds all three tables.
+
+Migration 0152 creates the tables. Anywhere without them (another database, or
+a SQLite without FTS5) falls back to the `icontains` queries these replaced, on
+the text as typed, so a database that compares accents itself still does.
+"""
+
+import unicodedata
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from django.db import connection
+from django.db.models import Case, CharField, IntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import Concat
+
+from server.core.models import Player, Team, User
+
+# Table and column names are only ever interpolated from here, never from input
+TABLES = {
+    "player": ("server_search_player", ("name", "email", "place")),
+    "user": ("server_search_user", ("name", "email")),
+    "team": ("server_search_team", ("name", "slug", "place")),
+}
+# Column weights for bm25: a hit in the name counts for more than one in an email
+WEIGHTS = {"player": (10.0, 4.0, 1.0), "user": (10.0, 4.0), "team": (10.0, 2.0, 1.0)}
+
+TRIGRAM = 3
+# Rows ranked per query, and the share of the query's trigrams a row must contain
+MAX_CANDIDATES = 200
+MIN_TRIGRAM_SHARE = 0.5
+BATCH_SIZE = 1000
+
+# Whether the tables exist, per database file
+_available: dict[str, bool] = {}
+
+
+def normalize(text: str | None) -> str:
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def trigrams(text: str) -> set[str]:
+    return {word[i : i + TRIGRAM] for word in text.split() for i in range(len(word) - TRIGRAM + 1)}
+
+
+def is_available() -> bool:
+    if connection.vendor != "sqlite":
+        return False
+    name = str(connection.settings_dict["NAME"])
+    if name not in _available:
+        table = TABLES["player"][0]
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [table])
+            _available[name] = cursor.fetchone() is not None
+    return _available[name]
+
+
+def _write(kind: str, rows: Iterable[tuple[Any, ...]], delete_ids: Sequence[int] = ()) -> None:
+    table, columns = TABLES[kind]
+    placeholders = ", ".join(["%s"] * (len(columns) + 1))
+    with connection.cursor() as cursor:
+        for i in range(0, len(delete_ids), BATCH_SIZE):
+            batch = delete_ids[i : i + BATCH_SIZE]
+            cursor.execute(
+                f"DELETE FROM {table} WHERE rowid IN ({', '.join(['%s'] * len(batch))})",  # noqa: S608
+                list(batch),
+            )
+        cursor.executemany(
+            f"INSERT INTO {table} (rowid, {', '.join(columns)}) VALUES ({placeholders})",  # noqa: S608
+            [(row[0], *(normalize(value) for value in row[1:])) for row in rows],
+        )
+
+
+def _player_rows(players: QuerySet[Any]) -> Iterable[tuple[Any, ...]]:
+    for pk, first, last, username, email, city in players.values_list(
+        "id",
+        "user__first_name",
+        "user__last_name",
+        "user__username",
+        "user__email",
+        "city",
+    ).iterator(chunk_size=BATCH_SIZE):
+        yield pk, f"{first} {last}", f"{username} {email}", city
+
+
+def _user_rows(users: QuerySet[Any]) -> Iterable[tuple[Any, ...]]:
+    for pk, first, last, username, email in users.values_list(
+        "id", "first_name", "last_name", "username", "email"
+    ).iterator(chunk_size=BATCH_SIZE):
+        yield pk, f"{first} {last}", f"{username} {email}"
+
+
+def _team_rows(teams: QuerySet[Any]) -> Iterable[tuple[Any, ...]]:
+    yield from teams.values_list("id", "name", "slug", "city").iterator(chunk_size=BATCH_SIZE)
+
+
+def index_players(ids: Sequence[int]) -> None:
+    """(Re)index these players, dropping any that no longer exist."""
+    if ids and is_available():
+        _write("player", _player_rows(Player.objects.filter(id__in=ids)), ids)
+
+
+def index_users(ids: Sequence[int]) -> None:
+    if ids and is_available():
+        _write("user", _user_rows(User.objects.filter(id__in=ids)), ids)
+
+
+def index_teams(ids: Sequence[int]) -> None:
+    if ids and is_available():
+        _write("team", _team_rows(Team.objects.filter(id__in=ids)), ids)
+
+
+def rebuild_index(
+    users: QuerySet[Any] | None = None,
+    players: QuerySet[Any] | None = None,
+    teams: QuerySet[Any] | None = None,
+) -> dict[str, int]:
+    """Empty and refill every table, returning how many rows each now has.
+
+    Takes the querysets to index so a migration can pass its historical models.
+    """
+    querysets = {
+        "player": (players if players is not None else Player.objects.all(), _player_rows),
+        "user": (users if users is not None else User.objects.all(), _user_rows),
+        "team": (teams if teams is not None else Team.objects.all(), _team_rows),
+    }
+    counts = {}
+    for kind, (queryset, rows) in querysets.items():
+        table = TABLES[kind][0]
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table}")  # noqa: S608
+        _write(kind, rows(queryset))
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {table}")  # noqa: S608
+            counts[kind] = int(cursor.fetchone()[0])
+    return counts
+
+
+def _ranked_ids(kind: str, text: str) -> list[int]:
+    """Ids of the rows matching the normalised query, best first."""
+    table, columns = TABLES[kind]
+    grams = trigrams(text)
+    with connection.cursor() as cursor:
+        if grams:
+            match = " OR ".join('"' + gram.replace('"', '""') + '"' for gram in sorted(grams))
+            weights = ", ".join(str(w) for w in WEIGHTS[kind])
+            cursor.execute(
+                f"SELECT rowid, {', '.join(columns)} FROM {table} WHERE {table} MATCH %s "  # noqa: S608
+                f"ORDER BY bm25({table}, {weights}) LIMIT %s",
+                [match, MAX_CANDIDATES],
+            )
+        else:
+            # Too short to have a trigram: values with a word starting with it
+            prefix = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            where = " OR ".join(
+                f"{column} LIKE %s ESCAPE '\\' OR {column} LIKE %s ESCAPE '\\'"
+                for column in columns
+            )
+            cursor.execute(
+                f"SELECT rowid, {', '.join(columns)} FROM {table} WHERE {where} LIMIT %s",  # noqa: S608
+                [prefix, "% " + prefix] * len(columns) + [MAX_CANDIDATES],
+            )
+        rows = cursor.fetchall()
+
+    def score(position: int, row: tuple[Any, ...]) -> tuple[int, float, int]:
+        values = [value or "" for value in row[1:]]
+        words = " ".join(values).split()
+        if text in words or text in values:
+            closeness = 3
+        elif any(value.startswith(text) for value in values + words):
+            closeness = 2
+        elif any(text in value for value in values):
+            closeness = 1
+        else:
+            closeness = 0
+        share = len(grams & trigrams(" ".join(values))) / len(grams) if grams else 1.0
+        return closeness, share, -position
+
+    scored = [(score(position, row), int(row[0])) for position, row in enumerate(rows)]
+    ranked = sorted(
+        (item for item in scored if item[0][0] or item[0][1] >= MIN_TRIGRAM_SHARE), reverse=True
+    )
+    return [pk for _score, pk in ranked]
+
+
+def _ranked(queryset: QuerySet[Any], kind: str, query: str) -> QuerySet[Any]:
+    ids = _ranked_ids(kind, query)
+    if not ids:
+        return queryset.none()
+    return queryset.filter(id__in=ids).order_by(_in_order(ids))
+
+
+def _in_order(ids: list[int]) -> Case:
+    return Case(
+        *(When(id=pk, then=Value(position)) for position, pk in enumerate(ids)),
+        output_field=IntegerField(),
+    )
+
+
+def search_players(text: str, queryset: QuerySet[Player] | None = None) -> QuerySet[Player]:
+    """Players whose name, email or city match, best match first."""
+    if queryset is None:
+        queryset = Player.objects.all()
+    query = normalize(text)
+    if query and is_available():
+        return _ranked(queryset, "player", query)
+
+    # Other databases compare accents themselves, so they get the text as typed
+    query = " ".join(text.split())
+
+    queryset = queryset.annotate(
+        full_name=Concat(
+            "user__first_name", Value(" "), "user__last_name", output_field=CharField()
+        )
+    )
+    return queryset.filter(
+        Q(full_name__icontains=query)
+        | Q(user__username__icontains=query)
+        | Q(user__email__icontains=query)
+    ).order_by("full_name")
+
+
+def search_users(text: str, queryset: QuerySet[User] | None = None) -> QuerySet[User]:
+    """Users whose name, username or email match, best match first."""
+    if queryset is None:
+        queryset = User.objects.all()
+    query = normalize(text)
+    if query and is_available():
+        return _ranked(queryset, "user", query)
+
+    query = " ".join(text.split())
+    queryset = queryset.annotate(
+        full_name=Concat("first_name", Value(" "), "last_name", output_field=CharField())
+    )
+    return queryset.filter(Q(full_name__icontains=query) | Q(username__icontains=query)).order_by(
+        "full_name"
+    )
+
+
+def search_teams(text: str, queryset: QuerySet[Team] | None = None) -> QuerySet[Team]:
+    """Teams whose name, slug or city match, best match first."""
+    if queryset is None:
+        queryset = Team.objects.all()
+    query = normalize(text)
+    if query and is_available():
+        return _ranked(queryset, "team", query)
+
+    query = " ".join(text.split())
+    return queryset.filter(Q(name__icontains=query) | Q(slug__icontains=query)).order_by("name")
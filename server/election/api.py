@@ -11,7 +11,7 @@ from ninja import File, Router
 from ninja.files import UploadedFile
 
 from server.core.models import Guardianship, Player, User
-from server.task.helpers import queue_emails
+from server.task.helpers import count_queued_recipients, queue_bulk_emails
 
 from .models import (
     Candidate,
@@ -682,10 +682,11 @@ Please do not reply directly to this email.
             failed_emails.append(f"{eligible_voter.user.email}: {e!s}")
             continue
 
-    # Queue the email sending tasks for background processing (one task per email)
+    # Queue the emails for background sending, in batches that share an SMTP connection
     try:
-        tasks = queue_emails(email_messages)
-        print(f"Queued {len(tasks)} email tasks for election {election_id}")
+        tasks = queue_bulk_emails(email_messages)
+        recipient_count = count_queued_recipients(tasks)
+        print(f"Queued emails to {recipient_count} recipients for election {election_id}")
     except Exception as e:
         return 500, {"message": f"Failed to queue emails for sending: {e!s}"}
 
@@ -695,7 +696,7 @@ Please do not reply directly to this email.
     deduplicated_count = original_count - unique_count
 
     response_message = (
-        f"Email notifications queued for sending to {len(email_messages)} eligible voters"
+        f"Email notifications queued for sending to {recipient_count} eligible voters"
     )
 
     if deduplicated_count > 0:
@@ -1,6 +1,21 @@
+"""Ranked-choice tabulation (IRV and STV) for elections.
+
+Every round re-counts each ballot for its highest-ranked candidate still in the
+race. Doing that against the database cost a query per ballot per round, so an
+election's ballots are read once into a `BallotMatrix` and all rounds are
+counted in memory. The rounds are then written to `ElectionResult` together.
+"""
+
+from __future__ import annotations
+
+from array import array
 from collections import defaultdict
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
+from itertools import groupby
+from operator import itemgetter
 
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 
 from server.election.models import Candidate, Election, ElectionResult, RankedVote, RankedVoteChoice
@@ -15,19 +30,68 @@ class RoundResult:
     candidates: list[Candidate]  # all candidates in this round
 
 
+class BallotMatrix:
+    """Every ballot of an election as rows of candidate ids, in rank order.
+
+    The rows are packed end to end in one array, with `_ends[i]` marking where
+    ballot i stops. `_cursors[i]` points at the choice ballot i last counted for.
+    Candidates only ever leave the race between rounds, so a later tally resumes
+    each ballot from its cursor instead of re-reading it from the top.
+    """
+
+    def __init__(self, ballots: Iterable[Sequence[int]]) -> None:
+        self._choices = array("q")
+        self._ends = array("q")
+        for ballot in ballots:
+            self._choices.extend(ballot)
+            self._ends.append(len(self._choices))
+        self._starts = array("q", [0]) + self._ends[:-1] if self._ends else array("q")
+        self._cursors = array("q", self._starts)
+        self._active: set[int] | None = None
+
+    @classmethod
+    def load(cls, election_id: int) -> BallotMatrix:
+        """Read every ranked choice of the election in one query."""
+        rows = (
+            RankedVoteChoice.objects.filter(vote__election_id=election_id)
+            .order_by("vote_id", "rank")
+            .values_list("vote_id", "candidate_id")
+        )
+        return cls(
+            [candidate_id for _, candidate_id in choices]
+            for _, choices in groupby(rows.iterator(), key=itemgetter(0))
+        )
+
+    def tally(self, active_candidate_ids: set[int] | None = None) -> dict[int, int]:
+        """Count each ballot for its highest-ranked candidate in `active_candidate_ids`"""
+        votes: dict[int, int] = defaultdict(int)
+        if active_candidate_ids is None:
+            for start, end in zip(self._starts, self._ends, strict=True):
+                if start < end:
+                    votes[self._choices[start]] += 1
+            return votes
+
+        if self._active is None or not active_candidate_ids <= self._active:
+            # Someone came back into the race; every ballot has to be re-read
+            self._cursors = array("q", self._starts)
+        self._active = set(active_candidate_ids)
+
+        choices, cursors = self._choices, self._cursors
+        for i, end in enumerate(self._ends):
+            cursor = cursors[i]
+            while cursor < end and choices[cursor] not in active_candidate_ids:
+                cursor += 1
+            cursors[i] = cursor
+            if cursor < end:
+                votes[choices[cursor]] += 1
+        return votes
+
+
 def get_first_choice_votes(
     election_id: int, active_candidate_ids: set[int] | None = None
 ) -> dict[int, int]:
     """Get first choice votes for each candidate (optionally only for active candidates)"""
-    votes: dict[int, int] = defaultdict(int)
-    for vote in RankedVote.objects.filter(election_id=election_id):
-        # Find the first ranked choice that is still active
-        choices = RankedVoteChoice.objects.filter(vote=vote).order_by("rank")
-        for choice in choices:
-            if active_candidate_ids is None or choice.candidate_id in active_candidate_ids:
-                votes[choice.candidate_id] += 1
-                break
-    return votes
+    return BallotMatrix.load(election_id).tally(active_candidate_ids)
 
 
 def get_quota(total_votes: int, num_winners: int) -> int:
@@ -35,26 +99,33 @@ def get_quota(total_votes: int, num_winners: int) -> int:
     return (total_votes // (num_winners + 1)) + 1
 
 
+@transaction.atomic
 def save_round_results(
-    election_id: int, round_num: int, round_result: RoundResult, round_winners: list[Candidate]
+    election_id: int, results: list[RoundResult], round_winners_per_round: list[list[Candidate]]
 ) -> None:
-    """Save the results of a voting round"""
-    ElectionResult.objects.filter(election_id=election_id, round_number=round_num).delete()
-    for candidate in round_result.candidates:
-        status = (
-            "winner"
-            if candidate in round_winners
-            else "eliminated"
-            if candidate in round_result.eliminated
-            else "active"
-        )
-        ElectionResult.objects.create(
-            election_id=election_id,
-            candidate=candidate,
-            round_number=round_num,
-            votes=round_result.votes.get(candidate.id, 0),
-            status=status,
-        )
+    """Replace the election's saved rounds with `results`"""
+    rows = []
+    for i, round_result in enumerate(results):
+        round_winners = round_winners_per_round[i] if i < len(round_winners_per_round) else []
+        for candidate in round_result.candidates:
+            status = (
+                "winner"
+                if candidate in round_winners
+                else "eliminated"
+                if candidate in round_result.eliminated
+                else "active"
+            )
+            rows.append(
+                ElectionResult(
+                    election_id=election_id,
+                    candidate=candidate,
+                    round_number=i + 1,
+                    votes=round_result.votes.get(candidate.id, 0),
+                    status=status,
+                )
+            )
+    ElectionResult.objects.filter(election_id=election_id).delete()
+    ElectionResult.objects.bulk_create(rows)
 
 
 def instant_runoff_voting(election_id: int) -> list[RoundResult]:
@@ -67,7 +138,8 @@ def instant_runoff_voting(election_id: int) -> list[RoundResult]:
     active_candidates = set(candidates)
     active_candidate_ids = {c.id for c in active_candidates}
     eliminated_ids: set[int] = set()
-    current_votes = get_first_choice_votes(election_id, active_candidate_ids)
+    ballots = BallotMatrix.load(election_id)
+    current_votes = ballots.tally(active_candidate_ids)
     results.append(
         RoundResult(votes=current_votes.copy(), eliminated=[], candidates=list(active_candidates))
     )
@@ -97,7 +169,7 @@ def instant_runoff_voting(election_id: int) -> list[RoundResult]:
             eliminated_ids.add(candidate.id)
             results[-1].eliminated.append(candidate)
         if active_candidates:
-            current_votes = get_first_choice_votes(election_id, {c.id for c in active_candidates})
+            current_votes = ballots.tally({c.id for c in active_candidates})
             results.append(
                 RoundResult(
                     votes=current_votes.copy(), eliminated=[], candidates=list(active_candidates)
@@ -105,10 +177,7 @@ def instant_runoff_voting(election_id: int) -> list[RoundResult]:
             )
         round_winners_per_round.append([])
         round_num += 1
-    # Save results for each round
-    for i, round_result in enumerate(results):
-        round_winners = round_winners_per_round[i] if i < len(round_winners_per_round) else []
-        save_round_results(election_id, i + 1, round_result, round_winners)
+    save_round_results(election_id, results, round_winners_per_round)
     print(f"[IRV] Final results: {[(r.votes, [c.id for c in r.eliminated]) for r in results]}")
     return results
 
@@ -136,7 +205,8 @@ def single_transferable_vote(election_id: int, num_seats: int | None = None) ->
     active_candidates = set(candidates)
     active_candidate_ids = {c.id for c in active_candidates}
     eliminated_ids: set[int] = set()
-    current_votes = get_first_choice_votes(election_id, active_candidate_ids)
+    ballots = BallotMatrix.load(election_id)
+    current_votes = ballots.tally(active_candidate_ids)
     total_votes = sum(current_votes.values())
     winners: list[Candidate] = []
     results.append(
@@ -163,9 +233,7 @@ def single_transferable_vote(election_id: int, num_seats: int | None = None) ->
                 active_candidates.remove(winner)
             round_winners_per_round.append(round_winners)
             if len(winners) < num_seats and active_candidates:
-                current_votes = get_first_choice_votes(
-                    election_id, {c.id for c in active_candidates}
-                )
+                current_votes = ballots.tally({c.id for c in active_candidates})
                 results.append(
                     RoundResult(
                         votes=current_votes.copy(),
@@ -186,15 +254,13 @@ def single_transferable_vote(election_id: int, num_seats: int | None = None) ->
             results[-1].eliminated.append(candidate)
         round_winners_per_round.append([])
         if active_candidates:
-            current_votes = get_first_choice_votes(election_id, {c.id for c in active_candidates})
+            current_votes = ballots.tally({c.id for c in active_candidates})
             results.append(
                 RoundResult(
                     votes=current_votes.copy(), eliminated=[], candidates=list(active_candidates)
                 )
             )
         round_num += 1
-    for i, round_result in enumerate(results):
-        round_winners = round_winners_per_round[i] if i < len(round_winners_per_round) else []
-        save_round_results(election_id, i + 1, round_result, round_winners)
+    save_round_results(election_id, results, round_winners_per_round)
     print(f"[STV] Final results: {[(r.votes, [c.id for c in r.eliminated]) for r in results]}")
     return results
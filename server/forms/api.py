@@ -1,9 +1,10 @@
 from typing import Any
 
 from django.db.models import QuerySet
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from ninja import Router
 
+from server.lib.exports import stream_csv
 from server.schema import Response
 from server.transaction.models import AuthenticatedHttpRequest
 from server.types import message_response
@@ -20,8 +21,8 @@ from .schema import (
     MyFormResponseSchema,
 )
 from .utils import (
-    build_responses_csv,
     create_form_payment_order,
+    responses_csv_rows,
     send_form_submission_email,
     validate_answers,
 )
@@ -151,7 +152,7 @@ def list_responses(
 )
 def export_responses_csv(
     request: AuthenticatedHttpRequest, slug: str
-) -> HttpResponse | tuple[int, message_response]:
+) -> StreamingHttpResponse | tuple[int, message_response]:
     if not request.user.is_staff:
         return 401, {"message": "Only Admins can download responses"}
 
@@ -161,10 +162,7 @@ def export_responses_csv(
         return 404, {"message": "Form does not exist"}
 
     responses = form.responses.filter(is_paid=True).select_related("user").order_by("-submitted_at")
-    csv_content = build_responses_csv(form, responses)
-    response = HttpResponse(csv_content, content_type="text/csv")
-    response["Content-Disposition"] = f'attachment; filename="{form.slug}-responses.csv"'
-    return response
+    return stream_csv(f"{form.slug}-responses.csv", responses_csv_rows(form, responses), request)
 
 
 @router.get("/{slug}/my-responses", response={200: list[MyFormResponseSchema], 404: Response})
@@ -1,12 +1,12 @@
-import csv
-import io
 import time
+from collections.abc import Iterator
 from typing import Any
 
 from django.conf import settings
 from django.core import mail
 from django.db.models import QuerySet
 
+from server.lib.exports import CHUNK_SIZE
 from server.transaction.client import razorpay
 from server.transaction.models import AuthenticatedHttpRequest, RazorpayTransaction
 
@@ -21,18 +21,15 @@ def format_answer_for_csv(value: Any) -> str:
     return str(value)
 
 
-def build_responses_csv(form: Form, responses: QuerySet[FormResponse] | list[FormResponse]) -> str:
-    """Build a CSV string of form responses for staff download."""
+def responses_csv_rows(form: Form, responses: QuerySet[FormResponse]) -> Iterator[list[str]]:
+    """A header row, then one row per form response, for staff download."""
     field_defs = form.fields or []
-    headers = ["Name", "Email", "Phone", "Submitted"] + [
+    yield ["Name", "Email", "Phone", "Submitted"] + [
         str(f.get("label") or f.get("key") or "") for f in field_defs
     ]
     field_keys = [str(f.get("key") or "") for f in field_defs]
 
-    buffer = io.StringIO()
-    writer = csv.writer(buffer)
-    writer.writerow(headers)
-    for response in responses:
+    for response in responses.select_related("user").iterator(chunk_size=CHUNK_SIZE):
         answers = response.answers or {}
         row = [
             response.user.get_full_name(),
@@ -41,8 +38,7 @@ def build_responses_csv(form: Form, responses: QuerySet[FormResponse] | list[For
             response.submitted_at.isoformat(sep=" ", timespec="seconds"),
         ]
         row.extend(format_answer_for_csv(answers.get(key)) for key in field_keys)
-        writer.writerow(row)
-    return buffer.getvalue()
+        yield row
 
 
 def validate_answers(form: Form, answers: dict[str, Any]) -> str | None:
@@ -0,0 +1,747 @@
+"""Bulk CSV imports: players, and series and event rosters.
+
+An import reads the whole file before it writes anything. Every row is parsed
+and checked, and the users and players the file names are looked up by email
+for all rows at once. Only then is anything written, in one transaction. A file
+with any bad row writes nothing at all. Its report lists every bad row by line,
+so the file can be fixed and uploaded again. A dry run stops at the report, with
+the changes the import would make.
+
+Users and players are written with `bulk_create` and `bulk_update`, which skip
+model signals, so the search index is updated here. Accreditations and
+vaccinations are still saved one at a time. Their certificates are files that
+only the `import_players` command can attach, and few rows have them.
+
+A roster import adds its players one by one inside the transaction, because the
+checks on each registration count the registrations before it.
+
+The admin's CSV import page runs these on the task queue, see
+`server.task.import_tasks`.
+"""
+
+import csv
+import io
+from collections import Counter
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.text import slugify
+
+from server.core import search
+from server.core.models import (
+    Accreditation,
+    Guardianship,
+    Player,
+    StatesUTs,
+    Team,
+    UCPerson,
+    User,
+    Vaccination,
+)
+from server.membership.models import Membership
+from server.series.models import Series
+from server.series.utils import register_player
+from server.tournament.models import Event, Registration, Tournament
+from server.tournament.utils import can_register_player_to_series_event
+
+GENDERS = {t.label: t for t in Player.GenderTypes}
+STATE_UT = {t.label: t for t in StatesUTs}
+OCCUPATIONS = {t.label: t for t in Player.OccupationTypes}
+RELATIONS = {t.label: str(t) for t in Guardianship.Relation}
+ACCREDITATIONS = {t.label: str(t) for t in Accreditation.AccreditationLevel}
+VACCINATIONS = {t.label: str(t) for t in Vaccination.VaccinationName}
+DATE_FORMAT = "%Y-%m-%d"
+
+PLAYER_COLUMNS = (
+    "first_name",
+    "last_name",
+    "email",
+    "phone",
+    "date_of_birth",
+    "gender",
+    "other_gender",
+    "city",
+    "state_ut",
+    "not_in_india",
+    "occupation",
+    "educational_institution",
+    "guardian.first_name",
+    "guardian.last_name",
+    "guardian.email",
+    "guardian.phone",
+    "guardian.relation",
+)
+
+# Rows per query for lookups and bulk writes, and rows checked between progress reports
+BATCH_SIZE = 500
+# Changes kept in a report's dict, which is stored as a task's result
+MAX_REPORTED_CHANGES = 1000
+
+Progress = Callable[[str, int, int], None]
+
+
+class RowError(Exception):
+    pass
+
+
+@dataclass
+class ImportReport:
+    """What an import changed, or would change on a dry run, and the rows that stopped it"""
+
+    rows: int = 0
+    dry_run: bool = False
+    created: Counter[str] = field(default_factory=Counter)
+    updated: Counter[str] = field(default_factory=Counter)
+    changes: list[str] = field(default_factory=list)
+    notes: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    def error(self, message: str, line: int | None = None, email: str = "") -> None:
+        where = f"Line {line}" if line else ""
+        if email:
+            where = f"{where} ({email})" if where else email
+        self.errors.append(f"{where}: {message}" if where else message)
+
+    @property
+    def summary(self) -> str:
+        if self.errors:
+            return f"Nothing imported from {self.rows} rows: {len(self.errors)} errors"
+
+        def counts(counter: Counter[str]) -> str:
+            return ", ".join(f"{n} {kind}" for kind, n in counter.items() if n) or "nothing"
+
+        verb = ("would create", "would update") if self.dry_run else ("created", "updated")
+        return (
+            f"{'Dry run: ' if self.dry_run else ''}{self.rows} rows, {verb[0]} "
+            f"{counts(self.created)}; {verb[1]} {counts(self.updated)}"
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        changes = self.changes[:MAX_REPORTED_CHANGES]
+        if len(self.changes) > MAX_REPORTED_CHANGES:
+            changes.append(f"... and {len(self.changes) - MAX_REPORTED_CHANGES} more")
+        return {
+            "summary": self.summary,
+            "rows": self.rows,
+            "dry_run": self.dry_run,
+            "created": dict(self.created),
+            "updated": dict(self.updated),
+            "changes": changes,
+            "notes": self.notes,
+            "errors": self.errors,
+        }
+
+
+def write_report(command: BaseCommand, report: ImportReport, seconds: float) -> None:
+    """Print a report from a management command"""
+    for line in [*report.changes, *report.notes]:
+        command.stdout.write(line)
+    for error in report.errors:
+        command.stderr.write(command.style.ERROR(error))
+    summary = f"{report.summary} in {seconds:.2f}s"
+    style = command.style.ERROR if report.errors else command.style.SUCCESS
+    command.stdout.write(style(summary))
+
+
+def read_rows(text: str) -> list[dict[str, str]]:
+    """The CSV's rows as dicts keyed by its (stripped) header"""
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+    return [
+        {key.strip(): value or "" for key, value in row.items() if key is not None}
+        for row in reader
+    ]
+
+
+def read_file(path: Path) -> list[dict[str, str]]:
+    with path.open(encoding="utf-8-sig") as file:
+        return read_rows(file.read())
+
+
+def _missing_columns(rows: list[dict[str, str]], columns: Iterable[str]) -> list[str]:
+    return [column for column in columns if rows and column not in rows[0]]
+
+
+def _chunks(values: list[Any]) -> Iterable[list[Any]]:
+    for i in range(0, len(values), BATCH_SIZE):
+        yield values[i : i + BATCH_SIZE]
+
+
+def _users_by_username(usernames: Iterable[str]) -> dict[str, User]:
+    users = {}
+    for chunk in _chunks(sorted(set(usernames))):
+        users.update({user.username: user for user in User.objects.filter(username__in=chunk)})
+    return users
+
+
+def _players_by_email(emails: Iterable[str]) -> dict[str, Player]:
+    """Players by their user's username, with their user and membership"""
+    players = {}
+    for chunk in _chunks(sorted(set(emails))):
+        queryset = Player.objects.filter(user__username__in=chunk).select_related(
+            "user", "membership"
+        )
+        players.update({player.user.username: player for player in queryset})
+    return players
+
+
+def _validation_message(error: ValidationError) -> str:
+    if hasattr(error, "error_dict"):
+        return "; ".join(
+            f"{key}: {' '.join(messages)}" for key, messages in error.message_dict.items()
+        )
+    return " ".join(error.messages)
+
+
+def _diff(obj: Any, values: dict[str, Any]) -> dict[str, str]:
+    """Set the values on the object, describing each one that changed by its field"""
+    changed = {}
+    for key, value in values.items():
+        old = getattr(obj, key)
+        if old != value:
+            changed[key] = f"{key} {old!r} -> {value!r}"
+            setattr(obj, key, value)
+    return changed
+
+
+# Players
+
+
+@dataclass
+class PlayerRow:
+    line: int
+    email: str
+    user: dict[str, str]
+    player: dict[str, Any]
+    uc_email: str
+    guardian: dict[str, str] | None
+    relation: str
+    accreditation: dict[str, Any] | None
+    vaccination: dict[str, Any] | None
+    vaccination_file: tuple[str, ContentFile[bytes]] | None
+
+
+def find_certificate_file(row: dict[str, str], certificate_dir: Path) -> ContentFile[bytes] | None:
+    filename = row.get("accreditation.certificate_file_name")
+    wfdf_id = row.get("accreditation.wfdf_id")
+
+    if not filename and not wfdf_id:
+        return None
+    elif not filename:
+        certificates = list(certificate_dir.glob(f"{wfdf_id}.*"))
+        if not certificates:
+            return None
+        certificate_path = certificates[0]
+        filename = certificate_path.name
+    elif filename:
+        certificate_path = certificate_dir.joinpath(filename)
+        if not certificate_path.exists():
+            return None
+
+    with certificate_path.open("rb") as f:
+        name = slugify(certificate_path.stem) + certificate_path.suffix
+        return ContentFile(f.read(), name=name)
+
+
+def find_vaccination_file(
+    filename: str, vaccination_dir: Path
+) -> tuple[str | None, ContentFile[bytes] | None]:
+    if not filename:
+        return None, None
+    else:
+        vaccination_path = vaccination_dir.joinpath(filename)
+        if not vaccination_path.exists():
+            return None, None
+
+    with vaccination_path.open("rb") as f:
+        return filename, ContentFile(f.read())
+
+
+def _parse_date(value: str, date_format: str, what: str) -> date:
+    try:
+        return datetime.strptime(value, date_format).date()  # noqa: DTZ007
+    except ValueError:
+        raise RowError(f"Invalid {what}: {value}") from None
+
+
+def _parse_player_row(
+    row: dict[str, str],
+    line: int,
+    report: ImportReport,
+    date_format: str,
+    guardian_email_optional: bool,
+    files_dir: Path | None,
+) -> PlayerRow:
+    email = row["email"].strip().lower()
+    if not email:
+        raise RowError("Missing email")
+
+    user_data = {
+        "first_name": row["first_name"].strip(),
+        "last_name": row["last_name"].strip(),
+        "email": email,
+        "phone": row["phone"].strip(),
+    }
+    player_data: dict[str, Any] = {
+        "date_of_birth": _parse_date(row["date_of_birth"], date_format, "date of birth"),
+        "gender": GENDERS.get(row["gender"].strip(), Player.GenderTypes.OTHER),
+        "other_gender": row["other_gender"].strip() if row["other_gender"].strip() != "-" else None,
+        "city": row["city"].strip(),
+        "state_ut": STATE_UT.get(row["state_ut"].strip(), None),
+        "not_in_india": row["not_in_india"].strip().upper() == "Y",
+        "occupation": OCCUPATIONS.get(row["occupation"].strip(), None),
+        "educational_institution": row["educational_institution"].strip(),
+        "sponsored": row["sponsored"].upper() == "Y" if "sponsored" in row else False,
+    }
+    if player_data["gender"] != Player.GenderTypes.OTHER:
+        player_data["match_up"] = player_data["gender"]
+
+    guardian_email = row["guardian.email"].strip().lower()
+    relation = row["guardian.relation"]
+    if not guardian_email and relation and guardian_email_optional:
+        guardian_email = slugify(f"{row['guardian.first_name']} {row['guardian.last_name']}")
+
+    guardian = None
+    is_minor = Player(**player_data).is_minor
+    if guardian_email and relation:
+        if is_minor:
+            if relation not in RELATIONS:
+                raise RowError(f"Unknown guardian relation: {relation}")
+            guardian = {
+                "first_name": row["guardian.first_name"],
+                "last_name": row["guardian.last_name"],
+                "email": guardian_email,
+                "phone": row["guardian.phone"],
+            }
+        else:
+            report.notes.append(f"Ignoring guardian information for major: {email}")
+    elif is_minor:
+        raise RowError("Missing Guardian information")
+
+    accreditation = None
+    doa, level = row.get("accreditation.date"), row.get("accreditation.level")
+    if doa and level:
+        certificate = find_certificate_file(row, files_dir / "certificates") if files_dir else None
+        if certificate:
+            accreditation = {
+                "level": ACCREDITATIONS.get(level, None),
+                "date": _parse_date(doa, date_format, "accreditation date"),
+                "is_valid": True,
+                "certificate": certificate,
+            }
+        else:
+            report.notes.append(f"Not creating accreditation, no certificate: {email}")
+
+    vaccination: dict[str, Any] | None = None
+    vaccination_file = None
+    if "vaccination.is_vaccinated" in row:
+        is_vaccinated = row["vaccination.is_vaccinated"].upper() == "Y"
+        vaccination = (
+            {
+                "is_vaccinated": is_vaccinated,
+                "name": VACCINATIONS.get(row["vaccination.name"], None),
+            }
+            if is_vaccinated
+            else {
+                "is_vaccinated": is_vaccinated,
+                "explain_not_vaccinated": VACCINATIONS.get(
+                    row["vaccination.explain_not_vaccinated"], "No explanation"
+                ),
+            }
+        )
+        if files_dir is None:
+            # Nowhere to look for certificates, as for imports queued from the admin
+            if is_vaccinated:
+                report.notes.append(f"Not creating vaccination, no certificate: {email}")
+                vaccination = None
+        else:
+            filename, contents = find_vaccination_file(
+                row["vaccination.certificate_file_name"], files_dir / "vaccinations"
+            )
+            if is_vaccinated and not filename:
+                raise RowError("Missing vaccination file")
+            if filename and contents:
+                vaccination_file = (filename, contents)
+
+    return PlayerRow(
+        line=line,
+        email=email,
+        user=user_data,
+        player=player_data,
+        uc_email=row.get("uc.email", "").strip().lower(),
+        guardian=guardian,
+        relation=RELATIONS[relation] if guardian else "",
+        accreditation=accreditation,
+        vaccination=vaccination,
+        vaccination_file=vaccination_file,
+    )
+
+
+def import_players(
+    rows: list[dict[str, str]],
+    date_format: str = DATE_FORMAT,
+    guardian_email_optional: bool = False,
+    files_dir: Path | None = None,
+    dry_run: bool = False,
+    progress: Progress | None = None,
+) -> ImportReport:
+    """Create or update a user and player for each row, with their guardian if a minor.
+
+    `files_dir` is the folder with the `certificates/` and `vaccinations/` the rows name.
+    """
+    report = ImportReport(rows=len(rows), dry_run=dry_run)
+    missing = _missing_columns(rows, PLAYER_COLUMNS)
+    if missing:
+        report.error(f"Missing columns: {', '.join(missing)}")
+        return report
+
+    parsed: list[PlayerRow] = []
+    lines: dict[str, int] = {}
+    for i, row in enumerate(rows):
+        line = i + 2  # After the header
+        try:
+            item = _parse_player_row(
+                row, line, report, date_format, guardian_email_optional, files_dir
+            )
+        except RowError as e:
+            report.error(str(e), line, row["email"].strip().lower())
+            continue
+        if item.email in lines:
+            report.error(f"Also on line {lines[item.email]}", line, item.email)
+            continue
+        lines[item.email] = line
+        parsed.append(item)
+        if progress and (i + 1) % BATCH_SIZE == 0:
+            progress("Checking rows", i + 1, len(rows))
+
+    # Everything the rows name, in a handful of queries
+    guardian_emails = [item.guardian["email"] for item in parsed if item.guardian]
+    users = _users_by_username([*lines, *guardian_emails])
+    players: dict[int, Player] = {}
+    for chunk in _chunks([user.id for user in users.values()]):
+        players.update({p.user_id: p for p in Player.objects.filter(user_id__in=chunk)})
+    uc_emails = sorted({item.uc_email for item in parsed if item.uc_email})
+    uc_ids: dict[str, int] = {}
+    for chunk in _chunks(uc_emails):
+        uc_ids.update(UCPerson.objects.filter(email__in=chunk).values_list("email", "id"))
+    existing_ids = [player.id for player in players.values()]
+    guardianships = _by_player(Guardianship, existing_ids)
+    accreditations = _by_player(Accreditation, existing_ids)
+    vaccinations = _by_player(Vaccination, existing_ids)
+
+    new_users: dict[str, User] = {}
+    changed_users: dict[str, User] = {}
+    # bulk_update writes only these, as every field it writes costs a CASE over every row
+    user_fields: set[str] = set()
+
+    def upsert_user(username: str, values: dict[str, str]) -> None:
+        user = users.get(username)
+        if user is None:
+            new_users[username] = User(username=username, **values)
+            report.created["users"] += 1
+            report.changes.append(f"Create user {username}")
+        elif changed := _diff(user, values):
+            if username not in changed_users:
+                report.updated["users"] += 1
+            changed_users[username] = user
+            user_fields.update(changed)
+            report.changes.append(f"Update user {username}: {', '.join(changed.values())}")
+
+    for item in parsed:
+        upsert_user(item.email, item.user)
+    for item in parsed:
+        # A guardian who is also a player in this file keeps their own row's details
+        if item.guardian and item.guardian["email"] not in lines:
+            upsert_user(item.guardian["email"], item.guardian)
+
+    new_players: dict[str, Player] = {}
+    changed_players: list[Player] = []
+    player_fields: set[str] = set()
+    uc_owners: dict[int, str] = {}
+    for item in parsed:
+        values = dict(item.player)
+        uc_id = uc_ids.get(item.uc_email)
+        if uc_id is not None:
+            values["ultimate_central_id"] = uc_id
+            if uc_id in uc_owners:
+                report.error(f"Same Ultimate Central profile as {uc_owners[uc_id]}", item.line)
+            uc_owners[uc_id] = item.email
+
+        user = users.get(item.email)
+        player = players.get(user.id) if user else None
+        if player is None:
+            player = Player(**values)
+            new_players[item.email] = player
+            report.created["players"] += 1
+            report.changes.append(f"Create player {item.email}")
+        elif changed := _diff(player, values):
+            changed_players.append(player)
+            player_fields.update(changed)
+            report.updated["players"] += 1
+            report.changes.append(f"Update player {item.email}: {', '.join(changed.values())}")
+
+        try:
+            # Uniqueness is checked for the whole file below, rather than row by row
+            player.full_clean(exclude=["user"], validate_unique=False)
+        except ValidationError as e:
+            report.error(_validation_message(e), item.line, item.email)
+
+    taken = _taken_uc_ids(uc_owners, [user.id for user in users.values()])
+    for uc_id, email in uc_owners.items():
+        if uc_id in taken:
+            report.error(f"Ultimate Central profile already belongs to {taken[uc_id]}", email=email)
+
+    for item in parsed:
+        player = players.get(users[item.email].id) if item.email in users else None
+        if item.guardian:
+            guardianship = guardianships.get(player.id) if player else None
+            if guardianship is None:
+                report.created["guardianships"] += 1
+                report.changes.append(f"Create guardianship of {item.email}")
+            elif guardianship.relation != item.relation or (
+                guardianship.user.username != item.guardian["email"]
+            ):
+                report.updated["guardianships"] += 1
+                report.changes.append(f"Update guardianship of {item.email}")
+        for kind, related, existing in (
+            ("accreditation", item.accreditation, accreditations),
+            ("vaccination", item.vaccination, vaccinations),
+        ):
+            if related is not None:
+                updating = player is not None and player.id in existing
+                (report.updated if updating else report.created)[f"{kind}s"] += 1
+                report.changes.append(f"{'Update' if updating else 'Create'} {kind} {item.email}")
+
+    if report.errors or dry_run:
+        return report
+
+    if progress:
+        progress("Writing", len(rows), len(rows))
+    with transaction.atomic():
+        _write_players(
+            parsed,
+            new_users,
+            (list(changed_users.values()), sorted(user_fields)),
+            new_players,
+            (changed_players, sorted(player_fields)),
+        )
+    return report
+
+
+def _by_player(model: Any, player_ids: list[int]) -> dict[int, Any]:
+    related = {}
+    queryset = model.objects.select_related("user") if model is Guardianship else model.objects
+    for chunk in _chunks(player_ids):
+        related.update({obj.player_id: obj for obj in queryset.filter(player_id__in=chunk)})
+    return related
+
+
+def _taken_uc_ids(uc_owners: dict[int, str], user_ids: list[int]) -> dict[int, str]:
+    """Ultimate Central ids the rows claim that other players already have"""
+    taken: dict[int, str] = {}
+    for chunk in _chunks(list(uc_owners)):
+        players = Player.objects.filter(ultimate_central_id__in=chunk).exclude(user_id__in=user_ids)
+        for uc_id, username in players.values_list("ultimate_central_id", "user__username"):
+            if uc_id is not None:
+                taken[uc_id] = username
+    return taken
+
+
+def _write_players(
+    parsed: list[PlayerRow],
+    new_users: dict[str, User],
+    changed_users: tuple[list[User], list[str]],
+    new_players: dict[str, Player],
+    changed_players: tuple[list[Player], list[str]],
+) -> None:
+    """Write what `import_players` planned, the changed objects given with the fields that changed"""
+    User.objects.bulk_create(new_users.values(), batch_size=BATCH_SIZE)
+    if changed_users[0]:
+        User.objects.bulk_update(*changed_users, batch_size=BATCH_SIZE)
+
+    # Fetched again, as not every database hands back the ids of the rows bulk_create inserts
+    emails = [item.email for item in parsed]
+    guardian_emails = [item.guardian["email"] for item in parsed if item.guardian]
+    users = _users_by_username([*emails, *guardian_emails])
+    for email, player in new_players.items():
+        player.user = users[email]
+    Player.objects.bulk_create(new_players.values(), batch_size=BATCH_SIZE)
+    if changed_players[0]:
+        Player.objects.bulk_update(*changed_players, batch_size=BATCH_SIZE)
+
+    players = _players_by_email(emails)
+    player_ids = [player.id for player in players.values()]
+    guardianships = _by_player(Guardianship, player_ids)
+    new_guardianships, changed_guardianships = [], []
+    for item in parsed:
+        if not item.guardian:
+            continue
+        player = players[item.email]
+        guardian = users[item.guardian["email"]]
+        guardianship = guardianships.get(player.id)
+        if guardianship is None:
+            new_guardianships.append(
+                Guardianship(user=guardian, player=player, relation=item.relation)
+            )
+        elif _diff(guardianship, {"user": guardian, "relation": item.relation}):
+            changed_guardianships.append(guardianship)
+    Guardianship.objects.bulk_create(new_guardianships, batch_size=BATCH_SIZE)
+    if changed_guardianships:
+        Guardianship.objects.bulk_update(
+            changed_guardianships, ["user", "relation"], batch_size=BATCH_SIZE
+        )
+
+    for item in parsed:
+        player = players[item.email]
+        if item.accreditation:
+            accreditation, created = Accreditation.objects.get_or_create(
+                player=player, defaults=item.accreditation
+            )
+            if not created:
+                for key, value in item.accreditation.items():
+                    setattr(accreditation, key, value)
+                accreditation.save()
+        if item.vaccination:
+            vaccination, created = Vaccination.objects.get_or_create(
+                player=player, defaults=item.vaccination
+            )
+            if not created:
+                for key, value in item.vaccination.items():
+                    setattr(vaccination, key, value)
+                vaccination.save()
+            if item.vaccination_file:
+                vaccination.certificate.save(*item.vaccination_file)
+
+    search.index_users([user.id for user in users.values()])
+    search.index_players(player_ids)
+
+
+# Rosters
+
+
+def _roster_emails(rows: list[dict[str, str]], report: ImportReport) -> list[tuple[int, str]]:
+    if _missing_columns(rows, ["email"]):
+        report.error("Missing column: email")
+        return []
+    emails: list[tuple[int, str]] = []
+    seen: dict[str, int] = {}
+    for i, row in enumerate(rows):
+        line, email = i + 2, row["email"].strip().lower()
+        if email in seen:
+            report.error(f"Also on line {seen[email]}", line, email)
+        elif email:
+            seen[email] = line
+            emails.append((line, email))
+    return emails
+
+
+def add_to_series_roster(
+    rows: list[dict[str, str]],
+    series: Series,
+    team: Team,
+    dry_run: bool = False,
+    progress: Progress | None = None,
+) -> ImportReport:
+    """Register each row's player to the team's roster for the series"""
+    report = ImportReport(rows=len(rows), dry_run=dry_run)
+    emails = _roster_emails(rows, report)
+    players = _players_by_email(email for _line, email in emails)
+
+    # Progress is reported outside the transaction, where the task's updates are visible
+    if progress:
+        progress("Registering players", 0, len(emails))
+    with transaction.atomic():
+        for line, email in emails:
+            player = players.get(email)
+            if player is None:
+                report.error("Player not found", line, email)
+                continue
+            registration, error = register_player(series=series, team=team, player=player)
+            if error:
+                report.error(error["message"], line, email)
+            elif registration is None:
+                report.error("Couldn't register player", line, email)
+            else:
+                report.created["series registrations"] += 1
+                report.changes.append(f"Add {email} to {team.name} for {series.name}")
+
+        if report.errors or dry_run:
+            transaction.set_rollback(True)
+    if progress:
+        progress("Registering players", len(emails), len(emails))
+    return report
+
+
+def add_to_event_roster(
+    rows: list[dict[str, str]],
+    event: Event,
+    team: Team,
+    dry_run: bool = False,
+    progress: Progress | None = None,
+) -> ImportReport:
+    """Register each row's player for the event with the team, which must be in its tournament"""
+    report = ImportReport(rows=len(rows), dry_run=dry_run)
+    if not Tournament.objects.filter(event=event, teams=team).exists():
+        report.error(f"{team.name} is not registered for {event.title}")
+        return report
+
+    emails = _roster_emails(rows, report)
+    players = _players_by_email(email for _line, email in emails)
+    registered = set(
+        Registration.objects.filter(event=event, player__in=players.values()).values_list(
+            "player_id", flat=True
+        )
+    )
+
+    # Progress is reported outside the transaction, where the task's updates are visible
+    if progress:
+        progress("Registering players", 0, len(emails))
+    with transaction.atomic():
+        for line, email in emails:
+            player = players.get(email)
+            if player is None:
+                report.error("Player not found", line, email)
+                continue
+            error = _event_registration_error(event, team, player)
+            if error:
+                report.error(error, line, email)
+                continue
+            if player.id in registered:
+                report.error("Player already added to another team for this event", line, email)
+                continue
+
+            Registration.objects.create(event=event, team=team, player=player)
+            report.created["registrations"] += 1
+            report.changes.append(f"Add {email} to {team.name} for {event.title}")
+
+        if report.errors or dry_run:
+            transaction.set_rollback(True)
+    if progress:
+        progress("Registering players", len(emails), len(emails))
+    return report
+
+
+def _event_registration_error(event: Event, team: Team, player: Player) -> str | None:
+    if event.series:
+        can_register, error = can_register_player_to_series_event(
+            event=event, team=team, player=player
+        )
+        if not can_register and error:
+            return str(error["message"])
+
+    if event.is_membership_needed:
+        try:
+            membership = player.membership
+        except Membership.DoesNotExist:
+            return "Membership not found"
+        if not membership.is_active:
+            return "Membership not active"
+        if not membership.waiver_valid:
+            return "Waiver not valid"
+    return None
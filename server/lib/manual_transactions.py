@@ -1,56 +1,156 @@
 import csv
-from io import StringIO
+import itertools
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+from decimal import Decimal, InvalidOperation
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
-from server.transaction.models import ManualTransaction
+from django.db import transaction
 
+from server.transaction.models import ManualTransaction, TrimLeadingZeros
 
-def read_bank_statement(bank_statement: Path | StringIO) -> dict[str, Any]:
-    data = {}
+REFERENCE_HEADER = "Chq/Ref Number"
+CREDIT_HEADER = "Credit Amount"
+
+# References per lookup query
+BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class StatementLine:
+    line: int
+    # Without the leading zeros statements pad references with
+    reference: str
+    # In paise, like ManualTransaction.amount
+    credit: int
+
+
+def read_statement_lines(csvfile: IO[str]) -> Iterator[StatementLine]:
+    """The credits in a bank statement, read one line at a time.
+
+    Lines that credit nothing (debits) are skipped, and so are lines without a
+    reference.
+    """
+    lines = iter(csvfile)
+    # Skip empty lines at the beginning of the file
+    skipped = 0
+    for first in lines:
+        if first.strip():
+            break
+        skipped += 1
+    else:
+        return
+
+    reader = csv.DictReader(itertools.chain([first], lines), skipinitialspace=True)
+    for row_ in reader:
+        row = {
+            key.strip(): val.strip() if val is not None else ""
+            for key, val in row_.items()
+            if key is not None
+        }
+        # FIXME: Should we strip the DC chars on the right?
+        reference_number = row[REFERENCE_HEADER].lstrip("0")
+        try:
+            credit = Decimal(row[CREDIT_HEADER].replace(",", "") or "0")
+        except InvalidOperation:
+            continue
+        if reference_number and credit > 0:
+            yield StatementLine(
+                line=skipped + reader.line_num,
+                reference=reference_number,
+                credit=int(credit * 100),
+            )
+
+
+def read_bank_statement(bank_statement: Path | IO[str]) -> dict[str, Any]:
+    """Credited amount in rupees by reference"""
+    with open(bank_statement) if isinstance(bank_statement, Path) else bank_statement as csvfile:
+        return {line.reference: line.credit / 100 for line in read_statement_lines(csvfile)}
+
+
+@dataclass
+class Reconciliation:
+    """How a bank statement's credits compare with the manual transactions"""
+
+    # Distinct references credited in the statement
+    total: int = 0
+    # Unvalidated transactions the statement has a credit for, and those of them validated now
+    invalid_found: int = 0
+    validated: int = 0
+    amount_mismatches: list[dict[str, Any]] = field(default_factory=list)
+    already_validated: list[str] = field(default_factory=list)
+    unknown_references: list[str] = field(default_factory=list)
+    # References credited on more than one line, which are left for staff to validate
+    duplicates: list[str] = field(default_factory=list)
+
+
+def reconcile_manual_transactions(bank_statement: Path | IO[str]) -> Reconciliation:
+    """Validate the unvalidated manual transactions the bank statement credits in full.
+
+    The statement is read once, and the unvalidated transactions it names are
+    looked up in batches on the index of their ids without leading zeros, so
+    differently padded ones still match. Only references left unmatched are then
+    looked up among the validated transactions. All the matches are validated
+    with one `bulk_update`.
+    """
+    credits: dict[str, StatementLine] = {}
+    duplicates: set[str] = set()
     with open(bank_statement) if isinstance(bank_statement, Path) else bank_statement as csvfile:
-        # Skip empty lines at the beginning of the file
-        seek = 0
-        while True:
-            line = csvfile.readline()
-            if line.strip():
-                break
+        for line in read_statement_lines(csvfile):
+            if line.reference in credits:
+                duplicates.add(line.reference)
+            credits[line.reference] = line
+
+    report = Reconciliation(total=len(credits), duplicates=sorted(duplicates))
+    references = list(credits)
+    by_reference = ManualTransaction.objects.annotate(reference=TrimLeadingZeros("transaction_id"))
+    matched: dict[str, list[ManualTransaction]] = {}
+    for i in range(0, len(references), BATCH_SIZE):
+        for manual in by_reference.filter(
+            validated=False, reference__in=references[i : i + BATCH_SIZE]
+        ).only("transaction_id", "amount", "validated"):
+            matched.setdefault(manual.reference, []).append(manual)
+
+    unmatched = [reference for reference in references if reference not in matched]
+    validated: dict[str, list[str]] = {}
+    for i in range(0, len(unmatched), BATCH_SIZE):
+        for reference, transaction_id in by_reference.filter(
+            validated=True, reference__in=unmatched[i : i + BATCH_SIZE]
+        ).values_list("reference", "transaction_id"):
+            validated.setdefault(reference, []).append(transaction_id)
+
+    to_validate = []
+    for reference, line in credits.items():
+        transactions = matched.get(reference)
+        if not transactions:
+            if reference in validated:
+                report.already_validated.extend(validated[reference])
             else:
-                seek += len(line) + 1
-
-        csvfile.seek(seek)
-
-        reader = csv.DictReader(csvfile, skipinitialspace=True)
-        for row_ in reader:
-            row = {
-                key.strip(): val.strip() if val is not None else ""
-                for key, val in row_.items()
-                if key is not None
-            }
-            reference_number = row["Chq/Ref Number"].lstrip(
-                "0"
-            )  # FIXME: Should we strip the DC chars on the right?
-            credit_amount = float(row["Credit Amount"])
-            data[reference_number] = credit_amount
-
-    return data
-
-
-def validate_manual_transactions(bank_statement: Path | StringIO) -> dict[str, int]:
-    bank_statement_data = read_bank_statement(bank_statement)
-    total = len(bank_statement_data)
-    validated = invalid_found = 0
-
-    for transaction in ManualTransaction.objects.filter(validated=False):
-        tid = transaction.transaction_id.lstrip("0")
-
-        if tid in bank_statement_data:
-            invalid_found += 1
-            bank_amount = bank_statement_data[tid]  # Amount in rupees (float)
-            user_amount = transaction.amount  # Amount in paise
-            if bank_amount * 100 == user_amount:
-                transaction.validated = True
-                transaction.save(update_fields=["validated"])
-                validated += 1
-
-    return {"total": total, "invalid_found": invalid_found, "validated": validated}
+                report.unknown_references.append(reference)
+            continue
+        for manual in transactions:
+            report.invalid_found += 1
+            if reference in duplicates:
+                continue
+            if manual.amount != line.credit:
+                report.amount_mismatches.append(
+                    {
+                        "transaction_id": manual.transaction_id,
+                        "amount": manual.amount,
+                        "credited": line.credit,
+                        "line": line.line,
+                    }
+                )
+                continue
+            manual.validated = True
+            to_validate.append(manual)
+
+    with transaction.atomic():
+        ManualTransaction.objects.bulk_update(to_validate, ["validated"], batch_size=BATCH_SIZE)
+    report.validated = len(to_validate)
+    return report
+
+
+def validate_manual_transactions(bank_statement: Path | IO[str]) -> dict[str, Any]:
+    return asdict(reconcile_manual_transactions(bank_statement))
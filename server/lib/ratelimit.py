@@ -0,0 +1,42 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+
+class RateLimiter:
+    """Allows up to `per_window` requests in any `window_seconds`, over a sliding window.
+
+    Requests under the quota go straight through, however closely together they
+    come; once it is used up, each waits until the request `per_window` before it
+    falls out of the window. Each caller reserves its slot under the lock and
+    sleeps outside it, so one waiting worker never holds up the others.
+    """
+
+    def __init__(
+        self,
+        per_window: int,
+        window_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.per_window = max(per_window, 1)
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        # When the last `per_window` requests were let through, oldest first
+        self._slots: deque[float] = deque(maxlen=self.per_window)
+
+    def acquire(self) -> float:
+        """Wait for this request's slot. Returns how long it waited, in seconds."""
+        with self._lock:
+            now = self._clock()
+            slot = now
+            if len(self._slots) == self.per_window:
+                slot = max(now, self._slots[0] + self.window_seconds)
+            self._slots.append(slot)
+        wait = slot - now
+        if wait > 0:
+            self._sleep(wait)
+        return wait
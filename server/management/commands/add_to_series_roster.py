@@ -1,12 +1,12 @@
-import csv
+import time
 from pathlib import Path
 from typing import Any
 
 from django.core.management.base import BaseCommand, CommandParser
 
-from server.core.models import Player, Team, User
+from server.core.models import Team
+from server.lib.imports import add_to_series_roster, read_file, write_report
 from server.series.models import Series
-from server.series.utils import register_player
 
 
 class Command(BaseCommand):
@@ -16,8 +16,14 @@ class Command(BaseCommand):
         parser.add_argument("csv_file", type=Path, help="Path to the CSV file")
         parser.add_argument("--team-id", "-t", help="Team ID")
         parser.add_argument("--series-id", "-s", help="Series ID")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Check the file and list the changes, without making them",
+        )
 
     def handle(self, *args: Any, **options: Any) -> None:
+        start = time.perf_counter()
         try:
             series = Series.objects.get(id=options["series_id"])
             team = Team.objects.get(id=options["team_id"])
@@ -25,30 +31,7 @@ class Command(BaseCommand):
             self.stderr.write(self.style.ERROR("Series / Team does not exist"))
             return
 
-        csv_file = options["csv_file"]
-
-        with open(csv_file) as file:
-            csv_reader = csv.DictReader(file)
-            for row in csv_reader:
-                # Process each row of the CSV file
-                email = row["email"].strip().lower()
-
-                try:
-                    user = User.objects.get(username=email)
-                    player = Player.objects.get(user=user)
-                except (User.DoesNotExist, Player.DoesNotExist):
-                    self.stderr.write(self.style.ERROR(f"Player not found: {email}"))
-                    continue
-
-                series_registration, error = register_player(
-                    series=series, team=team, player=player
-                )
-                if error:
-                    self.stderr.write(self.style.ERROR(f"Error: {error}, player: {email}"))
-                    continue
-
-                if series_registration is None:
-                    self.stderr.write(
-                        self.style.ERROR(f"Error: Couldn't register player, player: {email}")
-                    )
-                    continue
+        report = add_to_series_roster(
+            read_file(options["csv_file"]), series, team, dry_run=options["dry_run"]
+        )
+        write_report(self, report, time.perf_counter() - start)
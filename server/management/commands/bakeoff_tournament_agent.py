@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import os
 from pathlib import Path
 from typing import Any
@@ -10,7 +11,7 @@ from django.core.management.base import BaseCommand, CommandError, CommandParser
 from server.core.models import User
 from server.tournament_agent.catalog import is_allowed_model
 from server.tournament_agent.evals import recommend_default, write_scorecard
-from server.tournament_agent.evals.runner import run_suite
+from server.tournament_agent.evals.runner import run_bakeoff
 
 
 def _ensure_opencode_key_from_dotenv() -> None:
@@ -58,6 +59,23 @@ class Command(BaseCommand):
             type=str,
             default="latest_logs/agent_bakeoff",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Cases to run at once (on SQLite, each on its own copy of the database)",
+        )
+        parser.add_argument(
+            "--record",
+            action="store_true",
+            help="Save every model response to <out>/recordings.json for --replay",
+        )
+        parser.add_argument(
+            "--replay",
+            type=str,
+            default=None,
+            help="Answer from a recordings.json instead of calling the models (offline)",
+        )
         parser.add_argument(
             "--user-id",
             type=int,
@@ -66,8 +84,12 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args: Any, **options: Any) -> None:
-        _ensure_opencode_key_from_dotenv()
-        if not settings.OPENCODE_GO_API_KEY:
+        recordings: dict[str, Any] = {}
+        if options["replay"]:
+            recordings = json.loads(Path(options["replay"]).read_text(encoding="utf-8"))
+        else:
+            _ensure_opencode_key_from_dotenv()
+        if not options["replay"] and not settings.OPENCODE_GO_API_KEY:
             raise CommandError(
                 "OPENCODE_GO_API_KEY is required for bakeoff (export it or add it to .env)"
             )
@@ -85,17 +107,22 @@ class Command(BaseCommand):
                 raise CommandError("No staff user found; pass --user-id")
             user = maybe_user
 
-        results = {}
+        workers = max(options["workers"], 1)
+        self.stdout.write(
+            f"Running suite={options['suite']} models={','.join(model_ids)} workers={workers} …"
+        )
+        results = run_bakeoff(
+            model_ids=model_ids,
+            tier=options["suite"],
+            trials=options["trials"],
+            user=user,
+            workers=workers,
+            recordings=recordings,
+            replay=bool(options["replay"]),
+        )
         for mid in model_ids:
-            self.stdout.write(f"Running suite={options['suite']} model={mid} …")
-            results[mid] = run_suite(
-                model_id=mid,
-                tier=options["suite"],
-                trials=options["trials"],
-                user=user,
-            )
             self.stdout.write(
-                f"  score={results[mid]['suite_score']:.1f} "
+                f"{mid}: score={results[mid]['suite_score']:.1f} "
                 f"pass^k={results[mid]['pass_hat_k']:.0%}"
             )
             fails = [c for c in results[mid]["cases"] if not c["passed"]]
@@ -109,6 +136,11 @@ class Command(BaseCommand):
 
         out_dir = Path(options["out"])
         write_scorecard(out_dir, results)
+        if options["record"] and not options["replay"]:
+            (out_dir / "recordings.json").write_text(
+                json.dumps(recordings, indent=2, sort_keys=True), encoding="utf-8"
+            )
+            self.stdout.write(self.style.SUCCESS(f"Wrote {out_dir}/recordings.json"))
         best = recommend_default(results)
         self.stdout.write(self.style.SUCCESS(f"Wrote {out_dir}/scorecard.md"))
         self.stdout.write(self.style.SUCCESS(f"Recommended default: {best}"))
@@ -1,16 +1,30 @@
+import hashlib
+import json
+import time
+from collections import defaultdict
 from typing import Any
 
 from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
 
-from server.core.models import Team
-from server.tournament.models import Event, Registration, Tournament
+from server.tournament.models import Registration, Tournament
+from server.tournament.ratings import sync_event_ratings
 
 
 class Command(BaseCommand):
     help = "Calculate player points based on tournament result and store in registrations"
 
     def add_arguments(self, parser: CommandParser) -> None:
-        parser.add_argument("--force", "-f", default=False, help="Force calculate")
+        parser.add_argument(
+            "--full",
+            "--force",
+            "-f",
+            action="store_true",
+            help=(
+                "Recalculate every completed tournament, not only those changed since the last "
+                "run, and overwrite points already stored"
+            ),
+        )
 
     def get_base_points(self, tier: int) -> int:
         """Get base points based on event tier"""
@@ -22,53 +36,120 @@ class Command(BaseCommand):
         }
         return tier_points.get(tier, 20)  # Default to 20 if tier not found
 
-    def handle(self, *args: Any, **options: Any) -> None:
-        force_calculate = options["force"]
-
-        events = Event.objects.all()
-
-        for event in events:
-            regs = Registration.objects.filter(event=event)
-
-            # Get tournament if exists
-            try:
-                tournament = Tournament.objects.get(event=event)
-            except Tournament.DoesNotExist:
+    def get_team_points(self, tournament: Tournament) -> dict[int, int | None]:
+        """Points for each ranked team, from the tournament's final seeding and tier"""
+        tier = tournament.event.tier
+        current_seeding = tournament.current_seeding
+
+        # Total number of teams
+        total_teams = len(current_seeding)
+
+        # Get base points based on event tier
+        base_points = self.get_base_points(tier)
+        points_per_position = float((100 - base_points) / max(total_teams - 1, 1))
+
+        team_points: dict[int, int | None] = {}
+        for rank, team_id in current_seeding.items():
+            points = round(base_points + ((total_teams - int(rank)) * points_per_position), 1)
+            # Registration.points is an integer column, so this is what gets stored
+            team_points[int(team_id)] = None if tier == 0 else int(points)
+        return team_points
+
+    def get_fingerprint(self, tournament: Tournament, roster: list[tuple[int, int]]) -> str:
+        """Everything a tournament's points depend on: its result, its tier and its roster.
+
+        The roster is each registration's id and team, so a player moving team counts.
+        Migration 0155 seeds the fingerprints the same way, so keep the two in step.
+        """
+        inputs = [tournament.event.tier, tournament.current_seeding, sorted(roster)]
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+    @transaction.atomic
+    def calculate(
+        self,
+        tournaments: list[Tournament],
+        rosters: dict[int, list[tuple[int, int]]],
+        full: bool = False,
+    ) -> tuple[int, list[Tournament]]:
+        """Store points for the tournaments' registrations.
+
+        Returns how many registrations changed, and the tournaments left stale. Points
+        the command wrote itself are overwritten, but points set some other way, by
+        hand say, are only overwritten when `full` is set. A tournament that keeps
+        points other than those it would write is stale, and keeps its old fingerprint
+        so later runs look at it again.
+        """
+        team_points = {t.event_id: self.get_team_points(t) for t in tournaments}
+
+        changed = []
+        stale = set()
+        registrations = Registration.objects.filter(event_id__in=team_points).only(
+            "id", "event_id", "team_id", "points", "calculated_points"
+        )
+        for registration in registrations:
+            points_by_team = team_points[registration.event_id]
+            if registration.team_id not in points_by_team:
                 continue
-
-            # Skip if no registrations or tournament is not completed yet
-            if regs.count() == 0 or tournament.status != Tournament.Status.COMPLETED:
+            points = points_by_team[registration.team_id]
+            calculated = registration.points in (None, registration.calculated_points)
+            if not calculated and not full:
+                if registration.points != points:
+                    stale.add(registration.event_id)
                 continue
+            if registration.points != points or registration.calculated_points != points:
+                registration.points = points
+                registration.calculated_points = points
+                changed.append(registration)
+
+        Registration.objects.bulk_update(changed, ["points", "calculated_points"], batch_size=500)
+        sync_event_ratings(t.event for t in tournaments)
+
+        fresh = [t for t in tournaments if t.event_id not in stale]
+        for tournament in fresh:
+            tournament.player_points_fingerprint = self.get_fingerprint(
+                tournament, rosters[tournament.event_id]
+            )
+        Tournament.objects.bulk_update(fresh, ["player_points_fingerprint"])
+        return len(changed), [t for t in tournaments if t.event_id in stale]
 
-            current_seeding = tournament.current_seeding
-
-            # Total number of teams
-            total_teams = len(current_seeding)
-
-            # Get base points based on event tier
-            base_points = self.get_base_points(event.tier)
-
-            # Calculate points for each team based on their ranking
-            for rank, team_id in current_seeding.items():
-                points_per_position = float((100 - base_points) / (total_teams - 1))
-
-                points: float | None = round(
-                    base_points + ((total_teams - int(rank)) * points_per_position), 1
+    def handle(self, *args: Any, **options: Any) -> None:
+        start = time.perf_counter()
+        full = options["full"]
+
+        completed = Tournament.objects.filter(status=Tournament.Status.COMPLETED)
+        rosters: dict[int, list[tuple[int, int]]] = defaultdict(list)
+        for event_id, registration_id, team_id in Registration.objects.filter(
+            event__tournament__in=completed
+        ).values_list("event_id", "id", "team_id"):
+            rosters[event_id].append((registration_id, team_id))
+
+        tournaments = [
+            tournament
+            for tournament in completed.select_related("event")
+            if tournament.event_id in rosters
+        ]
+        to_calculate = [
+            tournament
+            for tournament in tournaments
+            if full
+            or tournament.player_points_fingerprint
+            != self.get_fingerprint(tournament, rosters[tournament.event_id])
+        ]
+
+        n, stale = self.calculate(to_calculate, rosters, full) if to_calculate else (0, [])
+
+        for tournament in to_calculate:
+            self.stdout.write(f"Calculated points for {tournament.event.title}")
+        for tournament in stale:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Points in {tournament.event.title} were set by hand and differ from its "
+                    "result; run with --full to overwrite them"
                 )
-
-                if event.tier == 0:
-                    points = None
-
-                team = Team.objects.get(id=team_id)
-                team_regs = regs.filter(team=team)
-
-                for reg in team_regs:
-                    if reg.points is None or force_calculate:
-                        reg.points = points
-                        reg.save()
-
-                        self.stdout.write(
-                            self.style.SUCCESS(
-                                f"Successfully calculated {reg.player.user.get_full_name()} for {reg.team.name} in {reg.event.title}"
-                            )
-                        )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated {n} registrations across {len(to_calculate)} of {len(tournaments)} "
+                f"completed tournaments in {time.perf_counter() - start:.2f}s"
+            )
+        )
@@ -1,20 +1,75 @@
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import date, datetime
-from typing import Any, cast
+from typing import Any
 
 from django.core.management.base import BaseCommand, CommandParser
 from django.db.models import Q
 
 from server.core.models import Player
 from server.tournament.models import (
-    Event,
+    SPIRIT_SCORE_FIELDS,
     Match,
     MatchEvent,
-    MatchStats,
     Registration,
     Tournament,
 )
 from server.wrapped.models import PlayerWrapped
 
+WRAPPED_FIELDS = [
+    "tournaments_played",
+    "total_games",
+    "total_scores",
+    "total_assists",
+    "total_blocks",
+    "match_mvps",
+    "match_msps",
+    "continuous_streak_scored_or_assisted",
+    "most_scores_in_tournament",
+    "most_assists_in_tournament",
+    "most_blocks_in_tournament",
+    "teams_played_for",
+    "top_teammates_i_assisted",
+    "top_teammates_who_assisted_me",
+    "updated_at",
+]
+
+
+@dataclass
+class PlayerYear:
+    """Everything one player's wrapped data is computed from, gathered in passes over the year."""
+
+    # Team the player was registered with, by tournament, for events overlapping the year
+    tournament_teams: dict[int, int] = field(default_factory=dict)
+    # Team id -> name and tournaments, for events starting in the year
+    teams: dict[int, tuple[str, set[int]]] = field(default_factory=dict)
+    games: list[tuple[datetime, int]] = field(default_factory=list)
+    mvp_matches: set[int] = field(default_factory=set)
+    msp_matches: set[int] = field(default_factory=set)
+    # Matches where the player scored or assisted
+    action_matches: set[int] = field(default_factory=set)
+    # Counts by tournament, in the order the tournaments were first seen
+    scores: Counter[int] = field(default_factory=Counter)
+    assists: Counter[int] = field(default_factory=Counter)
+    blocks: Counter[int] = field(default_factory=Counter)
+    # Counts by teammate
+    i_assisted: Counter[int] = field(default_factory=Counter)
+    assisted_me: Counter[int] = field(default_factory=Counter)
+
+    def plays_in(self, tournament_id: int) -> bool:
+        return tournament_id in self.tournament_teams
+
+    def longest_streak(self) -> int:
+        """Longest run of consecutive games where the player scored or assisted."""
+        max_streak = current_streak = 0
+        for _, match_id in self.games:
+            current_streak = current_streak + 1 if match_id in self.action_matches else 0
+            max_streak = max(max_streak, current_streak)
+        return max_streak
+
 
 class Command(BaseCommand):
     help = "Generate year-end wrapped data for all players for specified years"
@@ -43,402 +98,225 @@ class Command(BaseCommand):
         """Get start and end dates for a year."""
         return date(year, 1, 1), date(year, 12, 31)
 
-    def get_tournaments_for_year(self, year: int) -> list[Tournament]:
-        """Get all tournaments that occurred in the given year."""
-        start_date, end_date = self.get_year_date_range(year)
-        events = Event.objects.filter(Q(start_date__year=year) | Q(end_date__year=year)).distinct()
-        tournaments = Tournament.objects.filter(event__in=events).distinct()
-        return list(tournaments)
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        yield
+        self.stdout.write(f"  {name}: {time.perf_counter() - start:.2f}s")
 
-    def get_player_tournaments(self, player: Player, year: int) -> list[Tournament]:
-        """Get tournaments where player was registered."""
+    def load_registrations(self, year: int, players: dict[int, PlayerYear]) -> None:
+        """Tournaments and teams of every player, from one pass over the year's registrations."""
         start_date, end_date = self.get_year_date_range(year)
-        registrations = Registration.objects.filter(
-            player=player,
-            event__start_date__lte=end_date,
-            event__end_date__gte=start_date,
-        )
-        tournaments = Tournament.objects.filter(
-            event__in=[reg.event for reg in registrations]
-        ).distinct()
-        return list(tournaments)
-
-    def get_player_matches(self, player: Player, year: int) -> list[Match]:
-        """Get all matches where player participated in the given year."""
-        tournaments = self.get_player_tournaments(player, year)
-        if not tournaments:
-            return []
-
-        # Get registrations for each tournament to know which team player was on
-        registrations = Registration.objects.filter(
-            player=player,
-            event__tournament__in=tournaments,
-        ).select_related("team", "event")
-
-        # Build a map of tournament -> team for this player
-        tournament_team_map = {}
-        for reg in registrations:
-            try:
-                tournament = Tournament.objects.get(event=reg.event)
-                tournament_team_map[tournament.id] = reg.team
-            except Tournament.DoesNotExist:
-                continue
-
-        # Get matches where player's team played in each specific tournament
-        all_matches: list[Match] = []
-        for tournament_id, team in tournament_team_map.items():
-            matches = (
-                Match.objects.filter(
-                    tournament_id=tournament_id,
-                    time__year=year,
-                )
-                .filter(Q(team_1=team) | Q(team_2=team))
-                .distinct()
+        registrations = (
+            Registration.objects.filter(
+                Q(event__start_date__lte=end_date, event__end_date__gte=start_date)
+                | Q(event__start_date__year=year)
             )
-            all_matches.extend(list(matches))
-
-        # Remove duplicates and sort by time
-        unique_matches = {match.id: match for match in all_matches}.values()
-        matches_with_time = [m for m in unique_matches if m.time is not None]
-        return sorted(
-            matches_with_time,
-            key=lambda m: cast(datetime, m.time),
-        )
-
-    def get_player_games_count(self, player: Player, year: int) -> int:
-        """Get count of distinct games where player participated (based on registrations only)."""
-        matches = self.get_player_matches(player, year)
-        return len(matches)
-
-    def calculate_streak(self, player: Player, year: int) -> int:
-        """Calculate longest continuous streak of games where player scored or assisted."""
-        tournaments = self.get_player_tournaments(player, year)
-        if not tournaments:
-            return 0
-
-        # Get all matches for this player in chronological order
-        matches = self.get_player_matches(player, year)
-        if not matches:
-            return 0
-
-        # Sort all matches by time (chronological order)
-        matches_with_time = [m for m in matches if m.time is not None]
-        matches_sorted = sorted(
-            matches_with_time,
-            key=lambda m: cast(datetime, m.time),
-        )
-
-        if not matches_sorted:
-            return 0
-
-        # Get all match events where player scored or assisted
-        match_stats = MatchStats.objects.filter(
-            match__tournament__in=tournaments,
-            match__time__year=year,
-        )
-        scored_or_assisted_matches = (
-            MatchEvent.objects.filter(
-                stats__in=match_stats,
-            )
-            .filter(
-                Q(scored_by=player) | Q(assisted_by=player),
+            .values_list(
+                "player_id",
+                "team_id",
+                "team__name",
+                "event__start_date",
+                "event__end_date",
+                "event__tournament",
             )
-            .values_list("stats__match_id", flat=True)
-            .distinct()
+            .order_by("id")
         )
 
-        match_ids_with_action = set(scored_or_assisted_matches)
-
-        # Find longest streak in chronological order
-        max_streak = 0
-        current_streak = 0
-
-        for match in matches_sorted:
-            if match.id in match_ids_with_action:
-                # Player scored or assisted in this match
-                current_streak += 1
-                max_streak = max(max_streak, current_streak)
-            else:
-                # Streak broken
-                current_streak = 0
-
-        return max_streak
-
-    def get_tournament_best(
-        self, player: Player, year: int, event_type: str
-    ) -> dict[str, Any] | None:
-        """Get tournament with most scores/assists/blocks for player."""
-        tournaments = self.get_player_tournaments(player, year)
-        if not tournaments:
-            return None
-
-        match_stats = MatchStats.objects.filter(
-            match__tournament__in=tournaments,
-            match__time__year=year,
-        )
-        match_events = MatchEvent.objects.filter(stats__in=match_stats)
-
-        if event_type == "scores":
-            events = match_events.filter(scored_by=player, type=MatchEvent.EventType.SCORE)
-        elif event_type == "assists":
-            events = match_events.filter(assisted_by=player, type=MatchEvent.EventType.SCORE)
-        elif event_type == "blocks":
-            events = match_events.filter(block_by=player, type=MatchEvent.EventType.BLOCK)
-        else:
-            return None
-
-        # Count by tournament
-        tournament_counts: dict[int, int] = {}
-        for event in events:
-            tournament = event.stats.tournament
-            tournament_counts[tournament.id] = tournament_counts.get(tournament.id, 0) + 1
-
-        if not tournament_counts:
-            return None
-
-        # Get tournament with max count
-        max_tournament_id = max(tournament_counts, key=lambda k: tournament_counts[k])
-        max_tournament = Tournament.objects.get(id=max_tournament_id)
-
-        return {
-            "tournament_name": max_tournament.event.title,
-            "tournament_id": max_tournament.id,
-            "count": tournament_counts[max_tournament_id],
-        }
-
-    def get_teams_played_for(self, player: Player, year: int) -> list[dict[str, Any]]:
-        """Get list of teams player played for with tournament counts."""
-        registrations = Registration.objects.filter(
-            player=player,
-            event__start_date__year=year,
-        ).select_related("team", "event")
-
-        # Group by team and count distinct tournaments
-        team_tournament_map: dict[int, dict[str, Any]] = {}
-        for reg in registrations:
-            team_id = reg.team.id
-            if team_id not in team_tournament_map:
-                team_tournament_map[team_id] = {
-                    "team_name": reg.team.name,
-                    "team_id": team_id,
-                    "tournament_ids": set[int](),
-                }
-            # Get tournament for this event
-            try:
-                tournament = Tournament.objects.get(event=reg.event)
-                tournament_ids = cast(set[int], team_tournament_map[team_id]["tournament_ids"])
-                tournament_ids.add(tournament.id)
-            except Tournament.DoesNotExist:
+        for player_id, team_id, team_name, event_start, event_end, tournament_id in registrations:
+            player = players.get(player_id)
+            if player is None:
                 continue
 
-        # Convert to final format
-        result: list[dict[str, Any]] = []
-        for team_data in team_tournament_map.values():
-            tournament_ids = cast(set[int], team_data["tournament_ids"])
-            result.append(
-                {
-                    "team_name": cast(str, team_data["team_name"]),
-                    "team_id": cast(int, team_data["team_id"]),
-                    "tournament_count": len(tournament_ids),
-                }
-            )
-
-        return result
-
-    def get_top_teammates_i_assisted(self, player: Player, year: int) -> list[dict[str, Any]]:
-        """Get top 5 teammates I assisted."""
-        tournaments = self.get_player_tournaments(player, year)
-        if not tournaments:
-            return []
-
-        match_stats = MatchStats.objects.filter(
-            match__tournament__in=tournaments,
-            match__time__year=year,
-        )
-        assists = MatchEvent.objects.filter(
-            stats__in=match_stats,
-            assisted_by=player,
-            type=MatchEvent.EventType.SCORE,
-            scored_by__isnull=False,
+            if tournament_id and event_start <= end_date and event_end >= start_date:
+                player.tournament_teams[tournament_id] = team_id
+
+            if event_start.year == year:
+                _, tournament_ids = player.teams.setdefault(team_id, (team_name, set()))
+                if tournament_id:
+                    tournament_ids.add(tournament_id)
+
+    def load_matches(self, year: int, players: dict[int, PlayerYear]) -> None:
+        """Games played and match awards of every player, from one pass over the year's matches."""
+        award_fields = [
+            f"{spirit}__{award}_id"
+            for award in ("mvp_v2", "msp_v2")
+            for spirit in SPIRIT_SCORE_FIELDS
+        ]
+        matches = Match.objects.filter(time__year=year).values_list(
+            "id", "tournament_id", "team_1_id", "team_2_id", "time", *award_fields
         )
 
-        teammate_counts: dict[int, dict[str, Any]] = {}
-        for assist in assists:
-            if assist.scored_by and assist.scored_by != player:
-                teammate_id = assist.scored_by.id
-                if teammate_id not in teammate_counts:
-                    teammate_counts[teammate_id] = {
-                        "player_name": assist.scored_by.user.get_full_name(),
-                        "player_id": teammate_id,
-                        "count": 0,
-                    }
-                teammate_counts[teammate_id]["count"] = (
-                    cast(int, teammate_counts[teammate_id]["count"]) + 1
-                )
+        games: dict[tuple[int, int], list[tuple[datetime, int]]] = defaultdict(list)
+        awards: list[tuple[int, int, set[int], set[int]]] = []
+        for match_id, tournament_id, team_1_id, team_2_id, match_time, *award_ids in matches:
+            for team_id in {team_1_id, team_2_id} - {None}:
+                games[(tournament_id, team_id)].append((match_time, match_id))
+            n = len(SPIRIT_SCORE_FIELDS)
+            awards.append((match_id, tournament_id, set(award_ids[:n]), set(award_ids[n:])))
+
+        for player in players.values():
+            player.games = sorted(
+                game
+                for tournament_team in player.tournament_teams.items()
+                for game in games.get(tournament_team, [])
+            )
 
-        sorted_teammates = sorted(
-            teammate_counts.values(), key=lambda x: cast(int, x["count"]), reverse=True
+        for match_id, tournament_id, mvp_ids, msp_ids in awards:
+            for player_id in mvp_ids:
+                if player_id in players and players[player_id].plays_in(tournament_id):
+                    players[player_id].mvp_matches.add(match_id)
+            for player_id in msp_ids:
+                if player_id in players and players[player_id].plays_in(tournament_id):
+                    players[player_id].msp_matches.add(match_id)
+
+    def load_match_events(self, year: int, players: dict[int, PlayerYear]) -> None:
+        """Scores, assists, blocks and assist pairs, from one pass over the year's match events."""
+        events = (
+            MatchEvent.objects.filter(stats__match__time__year=year)
+            .values_list(
+                "stats__match_id",
+                "stats__match__tournament_id",
+                "stats__tournament_id",
+                "type",
+                "scored_by_id",
+                "assisted_by_id",
+                "block_by_id",
+            )
+            .order_by("id")
         )
-        return sorted_teammates[:5]
-
-    def get_top_teammates_who_assisted_me(self, player: Player, year: int) -> list[dict[str, Any]]:
-        """Get top 5 teammates who assisted me."""
-        tournaments = self.get_player_tournaments(player, year)
-        if not tournaments:
-            return []
 
-        match_stats = MatchStats.objects.filter(
-            match__tournament__in=tournaments,
-            match__time__year=year,
-        )
-        assists = MatchEvent.objects.filter(
-            stats__in=match_stats,
-            scored_by=player,
-            type=MatchEvent.EventType.SCORE,
-            assisted_by__isnull=False,
+        # Events only count towards a player's wrapped in tournaments they registered for
+        def player_in(player_id: int | None, tournament_id: int) -> PlayerYear | None:
+            player = players.get(player_id) if player_id is not None else None
+            return player if player is not None and player.plays_in(tournament_id) else None
+
+        for match_id, match_tournament_id, tournament_id, event_type, *player_ids in events:
+            scorer_id, assister_id, blocker_id = player_ids
+            scorer = player_in(scorer_id, match_tournament_id)
+            assister = player_in(assister_id, match_tournament_id)
+
+            for player in (scorer, assister):
+                if player is not None:
+                    player.action_matches.add(match_id)
+
+            if event_type == MatchEvent.EventType.SCORE:
+                if scorer is not None:
+                    scorer.scores[tournament_id] += 1
+                    if assister_id and assister_id != scorer_id:
+                        scorer.assisted_me[assister_id] += 1
+                if assister is not None:
+                    assister.assists[tournament_id] += 1
+                    if scorer_id and scorer_id != assister_id:
+                        assister.i_assisted[scorer_id] += 1
+            elif event_type == MatchEvent.EventType.BLOCK:
+                blocker = player_in(blocker_id, match_tournament_id)
+                if blocker is not None:
+                    blocker.blocks[tournament_id] += 1
+
+    def build_wrapped(self, year: int, players: dict[int, PlayerYear]) -> list[PlayerWrapped]:
+        """Turn the gathered counts into `PlayerWrapped` rows, resolving names in two queries."""
+        tournament_ids: set[int] = set()
+        teammate_ids: set[int] = set()
+        for player in players.values():
+            tournament_ids.update(player.scores, player.assists, player.blocks)
+            teammate_ids.update(player.i_assisted, player.assisted_me)
+
+        tournament_names = dict(
+            Tournament.objects.filter(id__in=tournament_ids).values_list("id", "event__title")
         )
+        player_names = {
+            player_id: f"{first_name} {last_name}".strip()
+            for player_id, first_name, last_name in Player.objects.filter(
+                id__in=teammate_ids
+            ).values_list("id", "user__first_name", "user__last_name")
+        }
 
-        teammate_counts: dict[int, dict[str, Any]] = {}
-        for assist in assists:
-            if assist.assisted_by and assist.assisted_by != player:
-                teammate_id = assist.assisted_by.id
-                if teammate_id not in teammate_counts:
-                    teammate_counts[teammate_id] = {
-                        "player_name": assist.assisted_by.user.get_full_name(),
-                        "player_id": teammate_id,
-                        "count": 0,
+        def tournament_best(counts: Counter[int]) -> dict[str, Any]:
+            if not counts:
+                return {}
+            tournament_id = max(counts, key=lambda k: counts[k])
+            return {
+                "tournament_name": tournament_names[tournament_id],
+                "tournament_id": tournament_id,
+                "count": counts[tournament_id],
+            }
+
+        def top_teammates(counts: Counter[int]) -> list[dict[str, Any]]:
+            return [
+                {"player_name": player_names[teammate_id], "player_id": teammate_id, "count": n}
+                for teammate_id, n in counts.most_common(5)
+            ]
+
+        return [
+            PlayerWrapped(
+                player_id=player_id,
+                year=year,
+                tournaments_played=len(player.tournament_teams),
+                total_games=len(player.games),
+                total_scores=player.scores.total(),
+                total_assists=player.assists.total(),
+                total_blocks=player.blocks.total(),
+                match_mvps=len(player.mvp_matches),
+                match_msps=len(player.msp_matches),
+                continuous_streak_scored_or_assisted=player.longest_streak(),
+                most_scores_in_tournament=tournament_best(player.scores),
+                most_assists_in_tournament=tournament_best(player.assists),
+                most_blocks_in_tournament=tournament_best(player.blocks),
+                teams_played_for=[
+                    {
+                        "team_name": team_name,
+                        "team_id": team_id,
+                        "tournament_count": len(team_tournament_ids),
                     }
-                teammate_counts[teammate_id]["count"] = (
-                    cast(int, teammate_counts[teammate_id]["count"]) + 1
-                )
+                    for team_id, (team_name, team_tournament_ids) in player.teams.items()
+                ],
+                top_teammates_i_assisted=top_teammates(player.i_assisted),
+                top_teammates_who_assisted_me=top_teammates(player.assisted_me),
+            )
+            for player_id, player in players.items()
+        ]
 
-        sorted_teammates = sorted(
-            teammate_counts.values(), key=lambda x: cast(int, x["count"]), reverse=True
-        )
-        return sorted_teammates[:5]
+    def generate_year(self, year: int, player_ids: list[int], force: bool = False) -> int:
+        """Generate wrapped data for the given players for a year, returning how many were written.
 
-    def generate_wrapped_data(
-        self, player: Player, year: int, force: bool = False
-    ) -> PlayerWrapped | None:
-        """Generate wrapped data for a single player for a given year."""
-        # Check if already exists
+        Each stage reads one table for the whole year and folds it into per-player
+        counts, so the number of queries does not depend on the number of players.
+        """
         if not force:
-            try:
-                existing = PlayerWrapped.objects.get(player=player, year=year)
+            existing = set(
+                PlayerWrapped.objects.filter(year=year).values_list("player_id", flat=True)
+            )
+            skipped = [player_id for player_id in player_ids if player_id in existing]
+            if skipped:
                 self.stdout.write(
                     self.style.WARNING(
-                        f"Skipping {player.user.get_full_name()} - {year} (already exists)"
+                        f"Skipping {len(skipped)} players with existing wrapped data for {year}"
                     )
                 )
-                return existing
-            except PlayerWrapped.DoesNotExist:
-                pass
-
-        self.stdout.write(f"Generating wrapped data for {player.user.get_full_name()} - {year}...")
-
-        # Get tournaments
-        tournaments = self.get_player_tournaments(player, year)
-        tournaments_played = len(tournaments)
-
-        # Get matches and match events
-        match_stats = MatchStats.objects.filter(
-            match__tournament__in=tournaments,
-            match__time__year=year,
-        )
-
-        # Calculate statistics
-        total_games = self.get_player_games_count(player, year)
-        total_scores = MatchEvent.objects.filter(
-            stats__in=match_stats,
-            scored_by=player,
-            type=MatchEvent.EventType.SCORE,
-        ).count()
-        total_assists = MatchEvent.objects.filter(
-            stats__in=match_stats,
-            assisted_by=player,
-            type=MatchEvent.EventType.SCORE,
-        ).count()
-        total_blocks = MatchEvent.objects.filter(
-            stats__in=match_stats,
-            block_by=player,
-            type=MatchEvent.EventType.BLOCK,
-        ).count()
-
-        # Get MVP and MSP counts
-        # Check spirit_score_team_1, spirit_score_team_2, self_spirit_score_team_1, self_spirit_score_team_2
-        matches = Match.objects.filter(
-            tournament__in=tournaments,
-            time__year=year,
-        ).select_related(
-            "spirit_score_team_1",
-            "spirit_score_team_2",
-            "self_spirit_score_team_1",
-            "self_spirit_score_team_2",
-        )
+            player_ids = [player_id for player_id in player_ids if player_id not in existing]
 
-        mvp_matches = set()
-        msp_matches = set()
-
-        for match in matches:
-            # Check all spirit score fields for MVP/MSP
-            for spirit_score_field in [
-                match.spirit_score_team_1,
-                match.spirit_score_team_2,
-                match.self_spirit_score_team_1,
-                match.self_spirit_score_team_2,
-            ]:
-                if spirit_score_field:
-                    if spirit_score_field.mvp_v2 == player:
-                        mvp_matches.add(match.id)
-                    if spirit_score_field.msp_v2 == player:
-                        msp_matches.add(match.id)
-
-        match_mvps = len(mvp_matches)
-        match_msps = len(msp_matches)
-
-        # Calculate streak
-        continuous_streak = self.calculate_streak(player, year)
-
-        # Tournament bests
-        most_scores = self.get_tournament_best(player, year, "scores")
-        most_assists = self.get_tournament_best(player, year, "assists")
-        most_blocks = self.get_tournament_best(player, year, "blocks")
-
-        # Teams played for
-        teams_played_for = self.get_teams_played_for(player, year)
-
-        # Teammate statistics
-        top_teammates_i_assisted = self.get_top_teammates_i_assisted(player, year)
-        top_teammates_who_assisted_me = self.get_top_teammates_who_assisted_me(player, year)
-
-        # Create or update wrapped data
-        wrapped_data, created = PlayerWrapped.objects.update_or_create(
-            player=player,
-            year=year,
-            defaults={
-                "tournaments_played": tournaments_played,
-                "total_games": total_games,
-                "total_scores": total_scores,
-                "total_assists": total_assists,
-                "total_blocks": total_blocks,
-                "match_mvps": match_mvps,
-                "match_msps": match_msps,
-                "continuous_streak_scored_or_assisted": continuous_streak,
-                "most_scores_in_tournament": most_scores or {},
-                "most_assists_in_tournament": most_assists or {},
-                "most_blocks_in_tournament": most_blocks or {},
-                "teams_played_for": teams_played_for,
-                "top_teammates_i_assisted": top_teammates_i_assisted,
-                "top_teammates_who_assisted_me": top_teammates_who_assisted_me,
-            },
-        )
-
-        action = "Created" if created else "Updated"
-        self.stdout.write(
-            self.style.SUCCESS(f"{action} wrapped data for {player.user.get_full_name()} - {year}")
-        )
+        players = {player_id: PlayerYear() for player_id in player_ids}
+        if not players:
+            return 0
 
-        return wrapped_data
+        with self.stage("Registrations"):
+            self.load_registrations(year, players)
+        with self.stage("Matches"):
+            self.load_matches(year, players)
+        with self.stage("Match events"):
+            self.load_match_events(year, players)
+        with self.stage("Wrapped data"):
+            wrapped = self.build_wrapped(year, players)
+        with self.stage("Save"):
+            PlayerWrapped.objects.bulk_create(
+                wrapped,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=["player", "year"],
+                update_fields=WRAPPED_FIELDS,
+            )
+        return len(wrapped)
 
     def handle(self, *args: Any, **options: Any) -> None:
         years = options["years"]
@@ -446,30 +324,21 @@ class Command(BaseCommand):
         force = options.get("force", False)
 
         if player_id:
-            try:
-                players = [Player.objects.get(id=player_id)]
-            except Player.DoesNotExist:
+            if not Player.objects.filter(id=player_id).exists():
                 self.stderr.write(self.style.ERROR(f"Player with ID {player_id} not found"))
                 return
+            player_ids = [player_id]
         else:
-            players = list(Player.objects.all())
+            player_ids = list(Player.objects.values_list("id", flat=True))
 
-        total_players = len(players)
+        total_players = len(player_ids)
         self.stdout.write(
             f"Generating wrapped data for {total_players} players for years {years}..."
         )
 
         for year in years:
             self.stdout.write(f"\n=== Processing year {year} ===")
-            for player in players:
-                try:
-                    self.generate_wrapped_data(player, year, force=force)
-                except Exception as e:
-                    self.stderr.write(
-                        self.style.ERROR(
-                            f"Error generating wrapped data for {player.user.get_full_name()} - {year}: {e!s}"
-                        )
-                    )
-                    continue
+            n = self.generate_year(year, player_ids, force=force)
+            self.stdout.write(self.style.SUCCESS(f"Wrote wrapped data for {n} players - {year}"))
 
         self.stdout.write(self.style.SUCCESS("\nCompleted generating wrapped data!"))
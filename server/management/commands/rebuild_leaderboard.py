@@ -0,0 +1,28 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from server.tournament.leaderboard import rebuild_leaderboard
+from server.tournament.models import Tournament
+
+
+class Command(BaseCommand):
+    help = "Rebuild tournament leaderboards from the recorded match stats events"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--tournament-id", "-t", type=int, help="Only rebuild this tournament's leaderboard"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["tournament_id"] is not None:
+            tournaments = Tournament.objects.filter(id=options["tournament_id"])
+        else:
+            tournaments = Tournament.objects.filter(match_stats__isnull=False).distinct()
+        tournaments = tournaments.select_related("event")
+
+        for tournament in tournaments:
+            n = rebuild_leaderboard(tournament)
+            self.stdout.write(f"{tournament.event.title}: {n} leaderboard entries")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(tournaments)} leaderboards"))
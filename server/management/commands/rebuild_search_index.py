@@ -0,0 +1,27 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from server.core.search import is_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of players, users and teams"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if not is_available():
+            raise CommandError(
+                "No search index on this database; search falls back to plain queries"
+            )
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            counts = rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {counts['player']} players, {counts['user']} users and "
+                f"{counts['team']} teams in {time.perf_counter() - start:.2f}s"
+            )
+        )
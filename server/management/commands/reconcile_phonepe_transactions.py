@@ -1,25 +1,42 @@
 from typing import Any
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandParser
 
-from server.transaction.client.phonepe import check_and_update_transaction
-from server.transaction.models import PhonePeTransaction
+from server.lib.ratelimit import RateLimiter
+from server.transaction.client.phonepe import check_transaction_status
+from server.transaction.reconcile import (
+    PHONEPE_CHECKS_PER_SECOND,
+    PHONEPE_WORKERS,
+    reconcile_phonepe_transactions,
+)
 
 
 class Command(BaseCommand):
     help = "Reconcile pending PhonePe Transactions"
 
-    def handle(self, *args: Any, **options: Any) -> None:
-        pending_transactions = PhonePeTransaction.objects.filter(
-            status=PhonePeTransaction.TransactionStatusChoices.PENDING
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=PHONEPE_WORKERS,
+            help="Status checks to have in flight at once",
+        )
+        parser.add_argument(
+            "--rate",
+            type=int,
+            default=PHONEPE_CHECKS_PER_SECOND,
+            help="Most status checks to make per second",
         )
-        n = pending_transactions.count()
-        self.stdout.write(self.style.SUCCESS(f"Found {n} pending transactions in our DB..."))
-        for transaction in pending_transactions:
-            check_and_update_transaction(transaction)
-
-        m = PhonePeTransaction.objects.filter(
-            status=PhonePeTransaction.TransactionStatusChoices.PENDING
-        ).count()
 
-        self.stdout.write(self.style.SUCCESS(f"Updated status of {n - m} pending transactions."))
+    def handle(self, *args: Any, **options: Any) -> None:
+        limiter = RateLimiter(options["rate"], 1)
+        updated = reconcile_phonepe_transactions(
+            check_transaction_status, workers=options["workers"], limiter=limiter
+        )
+        for status, n in sorted(updated.items()):
+            self.stdout.write(
+                self.style.SUCCESS(f"Updated status of {n} transactions to {status}.")
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated status of {updated.total()} pending transactions.")
+        )
@@ -2,17 +2,29 @@
 Management command to run the task queue worker.
 
 Usage:
-    python manage.py run_task_worker [--sleep-seconds 5]
+    python manage.py run_task_worker [--sleep-seconds 30] [--batch-size 20] [--concurrency 4]
 """
 
 import sys
-import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from django.core.management.base import BaseCommand, CommandParser
+from django.db import close_old_connections
 from django.utils import timezone
+from prometheus_client import start_http_server
 
 from server.task.manager import TaskManager
+from server.task.models import Task
+from server.task.wakeup import WakeupChannel
+
+
+def execute(task: Task) -> None:
+    """Run a task on an executor thread, which keeps its own DB connection"""
+    try:
+        TaskManager.execute(task)
+    finally:
+        close_old_connections()
 
 
 class Command(BaseCommand):
@@ -23,30 +35,66 @@ class Command(BaseCommand):
             "--sleep-seconds",
             type=int,
             default=30,
-            help="Number of seconds to sleep when queue is empty (default: 30)",
+            help="Longest time to sleep when the queue is empty, unless woken by a new task "
+            "(default: 30)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1,
+            help="Number of tasks to claim at once (default: 1)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Number of tasks to run at the same time (default: 1)",
+        )
+        parser.add_argument(
+            "--metrics-port",
+            type=int,
+            default=None,
+            help="Serve the worker's Prometheus metrics on this port",
         )
 
     def handle(self, *args: Any, **options: Any) -> None:
         sleep_seconds = options["sleep_seconds"]
+        batch_size = max(options["batch_size"], options["concurrency"])
+        concurrency = options["concurrency"]
+
+        if options["metrics_port"]:
+            start_http_server(options["metrics_port"])
 
         self.stdout.write(self.style.SUCCESS("Started task queue worker 🏗️"))
         self.stdout.write(f"Sleep interval when idle: {sleep_seconds} seconds")
+        self.stdout.write(f"Claiming {batch_size} tasks at a time, running {concurrency} at once")
 
+        wakeup = WakeupChannel()
+        executor = ThreadPoolExecutor(max_workers=concurrency) if concurrency > 1 else None
         try:
             while True:
-                task = TaskManager.get_next_task()
+                tasks = TaskManager.claim_tasks(batch_size)
 
-                if not task:
+                if not tasks:
                     current_time = timezone.now().strftime("%Y-%m-%d %H:%M:%S %Z")
                     self.stdout.write(
-                        f"{current_time}: No tasks in queue. Sleeping for {sleep_seconds} seconds 💤"
+                        f"{current_time}: No tasks in queue. Sleeping for up to {sleep_seconds} "
+                        "seconds 💤"
                     )
-                    time.sleep(sleep_seconds)
+                    wakeup.wait(sleep_seconds)
                     continue
 
-                # Run the task
-                task.run_task()
+                # Run the tasks
+                if executor is None:
+                    for task in tasks:
+                        TaskManager.execute(task)
+                else:
+                    list(executor.map(execute, tasks))
 
         except KeyboardInterrupt:
             self.stdout.write(self.style.WARNING("\nStopping task queue worker..."))
             sys.exit(0)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            wakeup.close()
@@ -1,44 +1,37 @@
-import itertools
+import datetime
 from typing import Any
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandParser
 
-from server.transaction.client.razorpay import get_transactions, mark_transaction_completed
-from server.transaction.models import RazorpayTransaction
-
-STATUSES = {s.value: s for s in RazorpayTransaction.TransactionStatusChoices}
+from server.transaction.reconcile import SYNC_OVERLAP, sync_razorpay_transactions
 
 
 class Command(BaseCommand):
-    help = "Import Razorpay transactions from the last week"
+    help = "Sync Razorpay transactions with the payments made since the last sync"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--overlap-hours",
+            type=float,
+            default=SYNC_OVERLAP.total_seconds() / 3600,
+            help="Also read payments made this long before the last sync",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Ignore the last sync and read the last week of payments",
+        )
 
     def handle(self, *args: Any, **options: Any) -> None:
-        transactions = get_transactions()
-        transactions_by_status = itertools.groupby(transactions, key=lambda x: x["status"])
-
-        for status_, ts in transactions_by_status:
-            status_value = "completed" if status_ == "captured" else status_
-            status = STATUSES[status_value]
-            order_ids = {t["order_id"] for t in ts}
-            qs = (
-                RazorpayTransaction.objects.filter(order_id__in=order_ids).exclude(status=status)
-                # .order_by("payment_date") NOTE: This is actually order
-                # date. We could sort transactions based on transactions data,
-                # though, if required
-            )
-
-            if status == RazorpayTransaction.TransactionStatusChoices.COMPLETED:
-                n = qs.count()
-                for transaction in qs:
-                    mark_transaction_completed(transaction)
-            else:
-                # NOTE: Not sure if we need to do any additional actions for
-                # other statuses like refunded, for instance. May be we deal
-                # with it manually for now. If the transactions are being
-                # processed oldest first, may be we can set the memberships to
-                # inactive based on this status?
-                n = qs.update(status=status)
-
+        report = sync_razorpay_transactions(
+            overlap=datetime.timedelta(hours=options["overlap_hours"]), reset=options["reset"]
+        )
+        self.stdout.write(
+            f"Read {report.payments} payments made between {report.since} and {report.until}."
+        )
+        for status, n in sorted(report.updated.items()):
             self.stdout.write(
-                self.style.SUCCESS(f"Updated status of {n} transactions to {status_value}.")
+                self.style.SUCCESS(f"Updated status of {n} transactions to {status}.")
             )
+        if not report.updated:
+            self.stdout.write(self.style.SUCCESS("No transactions needed updating."))
@@ -25,10 +25,15 @@ class Membership(ExportModelOperationsMixin("membership"), models.Model):  # typ
     season = models.ForeignKey(Season, on_delete=models.CASCADE, blank=True, null=True)
 
 
+def new_membership_number() -> str:
+    """A number for a new membership, for the pre_save receiver and bulk creates alike."""
+    return str(uuid.uuid4())[:8]
+
+
 @receiver(pre_save, sender=Membership)
 def create_membership_number(sender: Any, instance: Membership, raw: bool, **kwargs: Any) -> None:
     if raw or instance.membership_number:
         return
 
-    instance.membership_number = str(uuid.uuid4())[:8]
+    instance.membership_number = new_membership_number()
     return
@@ -18,12 +18,15 @@ from django.db import migrations
 def backfill_format_block(apps: Any, schema_editor: Any) -> None:
     # The concrete model, not the historical one: rendering the table needs the
     # real stage relations. Guarded below so a future schema change degrades to
-    # "left the markers empty" rather than failing the whole migration.
+    # "left the markers empty" rather than failing the whole migration, and only
+    # columns that existed at this point are selected, since fields added to the
+    # model later are not in the table yet.
     from server.tournament.models import Tournament as ConcreteTournament
     from server.tournament.rules import sync_rules_format, upgrade_legacy_format_block
 
+    tournaments = ConcreteTournament.objects.only("id", "event", "rules")
     upgraded, skipped = [], []
-    for tournament in ConcreteTournament.objects.exclude(rules__isnull=True).exclude(rules=""):
+    for tournament in tournaments.exclude(rules__isnull=True).exclude(rules=""):
         updated = upgrade_legacy_format_block(tournament.rules)
         if updated is None:
             skipped.append(tournament)
@@ -46,7 +49,8 @@ def strip_format_block(apps: Any, schema_editor: Any) -> None:
     from server.tournament.models import Tournament as ConcreteTournament
     from server.tournament.rules import FORMAT_BLOCK_END, FORMAT_BLOCK_START
 
-    for tournament in ConcreteTournament.objects.exclude(rules__isnull=True).exclude(rules=""):
+    tournaments = ConcreteTournament.objects.only("id", "event", "rules")
+    for tournament in tournaments.exclude(rules__isnull=True).exclude(rules=""):
         rules = tournament.rules or ""
         if FORMAT_BLOCK_START not in rules:
             continue
@@ -0,0 +1,60 @@
+"""Fill `LeaderboardEntry` for tournaments scored before the table existed.
+
+From here on the match stats handlers keep the rows current. This derives the
+starting counts from the `MatchEvent` rows already recorded, the same way the
+`rebuild_leaderboard` command does.
+"""
+
+from collections import Counter
+from typing import Any
+
+from django.db import migrations
+
+TALLIES = [
+    ("SC", "scored_by_id", "num_scores"),
+    ("SC", "assisted_by_id", "num_assists"),
+    ("BL", "block_by_id", "num_blocks"),
+]
+
+
+def backfill_leaderboard(apps: Any, schema_editor: Any) -> None:
+    MatchEvent = apps.get_model("server", "MatchEvent")  # noqa: N806
+    LeaderboardEntry = apps.get_model("server", "LeaderboardEntry")  # noqa: N806
+
+    counts: dict[tuple[int, int, int], Counter[str]] = {}
+    for event_type, player_field, counter in TALLIES:
+        rows = MatchEvent.objects.filter(
+            type=event_type, **{f"{player_field}__isnull": False}
+        ).values_list("stats__tournament_id", player_field, "team_id")
+        for key in rows:
+            counts.setdefault(key, Counter())[counter] += 1
+
+    LeaderboardEntry.objects.bulk_create(
+        [
+            LeaderboardEntry(
+                tournament_id=tournament_id,
+                player_id=player_id,
+                team_id=team_id,
+                num_scores=tally["num_scores"],
+                num_assists=tally["num_assists"],
+                num_blocks=tally["num_blocks"],
+                num_total=tally.total(),
+            )
+            for (tournament_id, player_id, team_id), tally in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+def clear_leaderboard(apps: Any, schema_editor: Any) -> None:
+    apps.get_model("server", "LeaderboardEntry").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0142_leaderboard_entry"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_leaderboard, clear_leaderboard),
+    ]
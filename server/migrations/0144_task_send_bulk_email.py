@@ -0,0 +1,20 @@
+# Generated by Django 4.2.2 on 2026-10-18 04:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0143_backfill_leaderboard_entries"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="task",
+            name="type",
+            field=models.CharField(
+                choices=[("SEND_EMAIL", "Send Email"), ("SEND_BULK_EMAIL", "Send Bulk Email")],
+                max_length=50,
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+"""Fill `PlayerRating` from the points already stored on registrations.
+
+From here on `calculate_player_points` keeps the rows current.
+"""
+
+from typing import Any
+
+from django.db import migrations
+
+
+def backfill_ratings(apps: Any, schema_editor: Any) -> None:
+    Registration = apps.get_model("server", "Registration")  # noqa: N806
+    PlayerRating = apps.get_model("server", "PlayerRating")  # noqa: N806
+
+    PlayerRating.objects.bulk_create(
+        [
+            PlayerRating(registration_id=reg_id, player_id=player_id, date=date, points=points)
+            for reg_id, player_id, date, points in Registration.objects.filter(
+                points__isnull=False
+            ).values_list("id", "player_id", "event__end_date", "points")
+        ],
+        batch_size=1000,
+    )
+
+
+def clear_ratings(apps: Any, schema_editor: Any) -> None:
+    apps.get_model("server", "PlayerRating").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0146_player_rating"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ratings, clear_ratings),
+    ]
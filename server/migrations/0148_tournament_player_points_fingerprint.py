@@ -0,0 +1,17 @@
+# Generated by Django 4.2.2 on 2026-10-18 04:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0147_backfill_player_ratings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tournament",
+            name="player_points_fingerprint",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.2 on 2026-10-18 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0148_tournament_player_points_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="agentturn",
+            name="read_cache_hits",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="agentturn",
+            name="read_cache_misses",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
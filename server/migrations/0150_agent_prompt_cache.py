@@ -0,0 +1,32 @@
+# Generated by Django 4.2.2 on 2026-10-18 05:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0149_agent_turn_read_cache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="agentturn",
+            name="tokens_in_cached",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="tournamentagentsession",
+            name="history_digest",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="tournamentagentsession",
+            name="history_digest_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="tournamentagentsession",
+            name="history_digest_through",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
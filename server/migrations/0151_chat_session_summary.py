@@ -0,0 +1,22 @@
+# Generated by Django 4.2.2 on 2026-10-18 05:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0150_agent_prompt_cache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatsession",
+            name="summary",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="chatsession",
+            name="summary_through",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,88 @@
+"""Create the FTS5 tables behind `server.core.search` and index what exists.
+
+Only on a SQLite built with FTS5 and the trigram tokenizer; other databases
+keep the `icontains` search. The tables and normalisation are copied here as
+they were, so later changes to the search module can't change this migration.
+"""
+
+import unicodedata
+from typing import Any
+
+from django.db import OperationalError, migrations
+
+TABLES = {
+    "player": ("server_search_player", ("name", "email", "place")),
+    "user": ("server_search_user", ("name", "email")),
+    "team": ("server_search_team", ("name", "slug", "place")),
+}
+BATCH_SIZE = 1000
+
+
+def normalize(text: str | None) -> str:
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def create_search_index(apps: Any, schema_editor: Any) -> None:
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table, columns in TABLES.values():
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+                f"USING fts5({', '.join(columns)}, tokenize='trigram')"
+            )
+        except OperationalError:
+            # No FTS5, or a SQLite older than 3.34: search keeps its fallback
+            return
+
+    User = apps.get_model("server", "User")  # noqa: N806
+    Player = apps.get_model("server", "Player")  # noqa: N806
+    Team = apps.get_model("server", "Team")  # noqa: N806
+    rows = {
+        "player": (
+            (pk, f"{first} {last}", f"{username} {email}", city)
+            for pk, first, last, username, email, city in Player.objects.values_list(
+                "id",
+                "user__first_name",
+                "user__last_name",
+                "user__username",
+                "user__email",
+                "city",
+            ).iterator(chunk_size=BATCH_SIZE)
+        ),
+        "user": (
+            (pk, f"{first} {last}", f"{username} {email}")
+            for pk, first, last, username, email in User.objects.values_list(
+                "id", "first_name", "last_name", "username", "email"
+            ).iterator(chunk_size=BATCH_SIZE)
+        ),
+        "team": Team.objects.values_list("id", "name", "slug", "city").iterator(
+            chunk_size=BATCH_SIZE
+        ),
+    }
+    with schema_editor.connection.cursor() as cursor:
+        for kind, (table, columns) in TABLES.items():
+            placeholders = ", ".join(["%s"] * (len(columns) + 1))
+            cursor.executemany(
+                f"INSERT INTO {table} (rowid, {', '.join(columns)}) VALUES ({placeholders})",  # noqa: S608
+                [(row[0], *(normalize(value) for value in row[1:])) for row in rows[kind]],
+            )
+
+
+def drop_search_index(apps: Any, schema_editor: Any) -> None:
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table, _columns in TABLES.values():
+        schema_editor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0151_chat_session_summary"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
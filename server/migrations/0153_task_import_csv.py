@@ -0,0 +1,24 @@
+# Generated by Django 4.2.2 on 2026-10-18 05:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0152_search_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="task",
+            name="type",
+            field=models.CharField(
+                choices=[
+                    ("SEND_EMAIL", "Send Email"),
+                    ("SEND_BULK_EMAIL", "Send Bulk Email"),
+                    ("IMPORT_CSV", "Import CSV"),
+                ],
+                max_length=50,
+            ),
+        ),
+    ]
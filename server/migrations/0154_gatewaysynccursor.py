@@ -0,0 +1,32 @@
+# Generated by Django 4.2.2 on 2026-10-18 06:10
+
+import django_prometheus.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0153_task_import_csv"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GatewaySyncCursor",
+            fields=[
+                (
+                    "gateway",
+                    models.CharField(
+                        choices=[("R", "Razorpay"), ("P", "Phonepe"), ("M", "Manual")],
+                        max_length=1,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("synced_until", models.DateTimeField()),
+            ],
+            bases=(
+                django_prometheus.models.ExportModelOperationsMixin("gateway_sync_cursor"),
+                models.Model,
+            ),
+        ),
+    ]
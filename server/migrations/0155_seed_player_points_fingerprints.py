@@ -0,0 +1,61 @@
+"""Seed `Tournament.player_points_fingerprint` for tournaments already calculated.
+
+Without this the first run of `calculate_player_points` after 0148 recalculated
+every completed tournament. A tournament counts as calculated when each of its
+ranked teams' registrations has points, or its tier awards none. The fingerprint
+is computed as in the command, inlined so later edits there can't change this.
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+from typing import Any
+
+from django.db import migrations
+
+
+def seed_fingerprints(apps: Any, schema_editor: Any) -> None:
+    Tournament = apps.get_model("server", "Tournament")  # noqa: N806
+    Registration = apps.get_model("server", "Registration")  # noqa: N806
+
+    completed = Tournament.objects.filter(status="COM")
+    rosters: dict[int, list[tuple[int, int]]] = defaultdict(list)
+    missing: dict[int, set[int]] = defaultdict(set)
+    for event_id, registration_id, team_id, points in Registration.objects.filter(
+        event__tournament__in=completed
+    ).values_list("event_id", "id", "team_id", "points"):
+        rosters[event_id].append((registration_id, team_id))
+        if points is None:
+            missing[event_id].add(team_id)
+
+    seeded = []
+    for tournament in completed.select_related("event"):
+        if tournament.event_id not in rosters:
+            continue
+        ranked = {int(team_id) for team_id in tournament.current_seeding.values()}
+        if tournament.event.tier != 0 and ranked & missing[tournament.event_id]:
+            continue
+        inputs = [
+            tournament.event.tier,
+            tournament.current_seeding,
+            sorted(rosters[tournament.event_id]),
+        ]
+        tournament.player_points_fingerprint = hashlib.sha256(
+            json.dumps(inputs, sort_keys=True).encode()
+        ).hexdigest()
+        seeded.append(tournament)
+    Tournament.objects.bulk_update(seeded, ["player_points_fingerprint"], batch_size=500)
+
+
+def clear_fingerprints(apps: Any, schema_editor: Any) -> None:
+    apps.get_model("server", "Tournament").objects.update(player_points_fingerprint="")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0154_gatewaysynccursor"),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_fingerprints, clear_fingerprints),
+    ]
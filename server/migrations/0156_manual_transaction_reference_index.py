@@ -0,0 +1,21 @@
+# Generated by Django 4.2.2 on 2026-10-18 06:58
+
+from django.db import migrations, models
+
+import server.transaction.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0155_seed_player_points_fingerprints"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="manualtransaction",
+            index=models.Index(
+                server.transaction.models.TrimLeadingZeros("transaction_id"),
+                name="manual_txn_reference_idx",
+            ),
+        ),
+    ]
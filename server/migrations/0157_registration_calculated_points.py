@@ -0,0 +1,17 @@
+# Generated by Django 4.2.2 on 2026-10-18 07:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0156_manual_transaction_reference_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="registration",
+            name="calculated_points",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
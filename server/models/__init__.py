@@ -50,10 +50,12 @@ from server.tournament.models import (  # noqa: F401
     CrossPool,
     Event,
     EventRosterInvitation,
+    LeaderboardEntry,
     Match,
     MatchEvent,
     MatchScore,
     MatchStats,
+    PlayerRating,
     Pool,
     PositionPool,
     Registration,
@@ -69,6 +71,7 @@ from server.tournament_agent.models import (  # noqa: F401
     TournamentAgentSession,
 )
 from server.transaction.models import (  # noqa: F401
+    GatewaySyncCursor,
     ManualTransaction,
     PhonePeTransaction,
     RazorpayTransaction,
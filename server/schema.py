@@ -51,10 +51,22 @@ class Response(Schema):
     action_href: str | None
 
 
+class AmountMismatchSchema(Schema):
+    transaction_id: str
+    # In paise
+    amount: int
+    credited: int
+    line: int
+
+
 class ValidationStatsSchema(Schema):
     total: int
     invalid_found: int
     validated: int
+    amount_mismatches: list[AmountMismatchSchema]
+    already_validated: list[str]
+    unknown_references: list[str]
+    duplicates: list[str]
 
 
 class MembershipSchema(ModelSchema):
@@ -1,3 +1,5 @@
+from typing import Any
+
 from django.http import HttpRequest
 from ninja import Router
 
@@ -11,10 +13,10 @@ class AuthenticatedHttpRequest(HttpRequest):
     user: User
 
 
-@router.get("/status/", response={200: dict[str, int], 403: dict[str, str]})
+@router.get("/status/", response={200: dict[str, Any], 403: dict[str, str]})
 def get_task_queue_status(
     request: AuthenticatedHttpRequest,
-) -> dict[str, int] | tuple[int, dict[str, str]]:
+) -> dict[str, Any] | tuple[int, dict[str, str]]:
     """Get the status of the task queue"""
     if not request.user.is_staff:
         return 403, {"message": "Only staff members can perform this action"}
@@ -4,20 +4,9 @@ from django.core import mail
 from django.core.mail import EmailMultiAlternatives
 
 
-def send_email(data: dict[str, Any]) -> dict[str, Any]:
+def build_email_message(data: dict[str, Any]) -> EmailMultiAlternatives:
     """
-    Send a single email.
-
-    :param data: Dictionary containing email data:
-        - subject: Email subject
-        - body: Plain text body
-        - from_email: Sender email
-        - to: List of recipient emails
-        - bcc: Optional list of BCC emails
-        - cc: Optional list of CC emails
-        - reply_to: Optional list of reply-to emails
-        - html_content: Optional HTML content
-    :return: Dictionary with send status
+    Build an email from its serialized form (see `serialize_email_message`).
     """
     msg = EmailMultiAlternatives(
         subject=data.get("subject", ""),
@@ -33,6 +22,26 @@ def send_email(data: dict[str, Any]) -> dict[str, Any]:
     if data.get("html_content"):
         msg.attach_alternative(data["html_content"], "text/html")
 
+    return msg
+
+
+def send_email(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Send a single email.
+
+    :param data: Dictionary containing email data:
+        - subject: Email subject
+        - body: Plain text body
+        - from_email: Sender email
+        - to: List of recipient emails
+        - bcc: Optional list of BCC emails
+        - cc: Optional list of CC emails
+        - reply_to: Optional list of reply-to emails
+        - html_content: Optional HTML content
+    :return: Dictionary with send status
+    """
+    msg = build_email_message(data)
+
     try:
         connection = mail.get_connection()
         sent = connection.send_messages([msg])
@@ -41,6 +50,47 @@ def send_email(data: dict[str, Any]) -> dict[str, Any]:
         raise Exception(f"Failed to send email: {e}") from e
 
 
+def send_bulk_email(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Send a batch of emails over a single SMTP connection.
+
+    Emails that fail are tried once more on a fresh connection, in case the server
+    dropped the first one part way through the batch. If some still fail, only those
+    are left in the task's data before raising, so running the task again does not
+    resend the emails that already went out.
+
+    :param data: Dictionary containing:
+        - messages: List of serialized emails, as for `send_email`
+    :return: Dictionary with the number of emails sent
+    """
+    messages: list[dict[str, Any]] = data.get("messages", [])
+
+    failed = _send_on_one_connection(messages)
+    if failed:
+        failed = _send_on_one_connection([message for message, _ in failed])
+
+    if failed:
+        data["messages"] = [message for message, _ in failed]
+        errors = "; ".join(f"{', '.join(message.get('to', []))}: {e}" for message, e in failed)
+        raise Exception(f"Failed to send {len(failed)} of {len(messages)} emails: {errors}")
+
+    return {"sent": len(messages)}
+
+
+def _send_on_one_connection(
+    messages: list[dict[str, Any]],
+) -> list[tuple[dict[str, Any], str]]:
+    """Send each email on one connection, returning the ones that failed and why"""
+    failed = []
+    with mail.get_connection() as connection:
+        for message in messages:
+            try:
+                connection.send_messages([build_email_message(message)])
+            except Exception as e:
+                failed.append((message, str(e)))
+    return failed
+
+
 def serialize_email_message(msg: EmailMultiAlternatives) -> dict[str, Any]:
     """
     Serialize a single EmailMultiAlternatives object to JSON-compatible dictionary.
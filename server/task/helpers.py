@@ -2,11 +2,18 @@
 Helper functions for queuing common tasks
 """
 
+from collections.abc import Iterator
+from typing import Any
+
 from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
 
 from server.task.email_tasks import serialize_email_message
-from server.task.manager import TaskManager
 from server.task.models import Task
+from server.task.wakeup import notify_worker
+
+# Emails per SEND_BULK_EMAIL task, all sent over one SMTP connection
+BULK_EMAIL_BATCH_SIZE = 100
 
 
 def queue_emails(messages: list[EmailMultiAlternatives]) -> list[Task]:
@@ -17,13 +24,81 @@ def queue_emails(messages: list[EmailMultiAlternatives]) -> list[Task]:
     :param messages: List of EmailMultiAlternatives objects to send
     :return: List of created Task objects
     """
-    tasks = []
-    for msg in messages:
-        email_data = serialize_email_message(msg)
-        task = TaskManager.add_task(
-            task_type=Task.TaskType.SEND_EMAIL,
-            data=email_data,
-        )
-        tasks.append(task)
+    return _create_tasks(
+        [Task(type=Task.TaskType.SEND_EMAIL, data=serialize_email_message(msg)) for msg in messages]
+    )
+
+
+def queue_bulk_emails(
+    messages: list[EmailMultiAlternatives], batch_size: int = BULK_EMAIL_BATCH_SIZE
+) -> list[Task]:
+    """
+    Queue emails for background sending, `batch_size` emails per task.
+    Each task sends its batch over a single SMTP connection.
+
+    :param messages: List of EmailMultiAlternatives objects to send
+    :param batch_size: Number of emails per task
+    :return: List of created Task objects
+    """
+    serialized = [serialize_email_message(msg) for msg in messages]
+    return _create_tasks(
+        [
+            Task(
+                type=Task.TaskType.SEND_BULK_EMAIL,
+                data={"messages": serialized[i : i + batch_size]},
+            )
+            for i in range(0, len(serialized), batch_size)
+        ]
+    )
+
+
+def count_queued_emails(tasks: list[Task]) -> int:
+    """Number of emails queued by `queue_emails` or `queue_bulk_emails`"""
+    return sum(1 for _ in _queued_messages(tasks))
 
+
+def count_queued_recipients(tasks: list[Task]) -> int:
+    """Number of addresses (to, cc and bcc) the emails in `tasks` will go out to"""
+    return sum(
+        len(data["to"]) + len(data.get("cc", [])) + len(data.get("bcc", []))
+        for data in _queued_messages(tasks)
+    )
+
+
+def _queued_messages(tasks: list[Task]) -> Iterator[dict[str, Any]]:
+    """The serialized emails of `queue_emails` or `queue_bulk_emails` tasks"""
+    for task in tasks:
+        if task.type == Task.TaskType.SEND_BULK_EMAIL:
+            yield from task.data["messages"]
+        else:
+            yield task.data
+
+
+def _create_tasks(tasks: list[Task]) -> list[Task]:
+    """Insert the tasks together and wake the worker once they are committed"""
+    tasks = Task.objects.bulk_create(tasks)
+    if tasks:
+        transaction.on_commit(notify_worker)
     return tasks
+
+
+def queue_csv_import(
+    action: str, rows: list[dict[str, str]], options: dict[str, Any], dry_run: bool = False
+) -> Task:
+    """
+    Queue a CSV import (see `server.task.import_tasks.run_csv_import`).
+
+    :param action: import_players, add_to_series_roster or add_to_event_roster
+    :param rows: The CSV's rows, as read by `server.lib.imports.read_rows`
+    :param options: The import's options
+    :param dry_run: Report the changes without making them
+    :return: The created Task
+    """
+    return _create_tasks(
+        [
+            Task(
+                type=Task.TaskType.IMPORT_CSV,
+                data={"action": action, "rows": rows, "options": options, "dry_run": dry_run},
+            )
+        ]
+    )[0]
@@ -0,0 +1,57 @@
+from typing import Any
+
+from server.core.models import Team
+from server.lib.imports import (
+    DATE_FORMAT,
+    ImportReport,
+    Progress,
+    add_to_event_roster,
+    add_to_series_roster,
+    import_players,
+)
+from server.series.models import Series
+from server.tournament.models import Event
+
+
+def run_csv_import(data: dict[str, Any], progress: Progress | None = None) -> dict[str, Any]:
+    """
+    Run a CSV import queued from the admin's CSV import page.
+
+    An import with errors writes nothing and still completes: its errors are
+    in the report, and running it again would only find them again.
+
+    :param data: Dictionary containing:
+        - action: import_players, add_to_series_roster or add_to_event_roster
+        - rows: The CSV's rows, as dicts keyed by its header
+        - options: date_format and guardian_email_optional for import_players,
+          series_id or event_id and team_id for the rosters
+        - dry_run: Report the changes without making them
+    :param progress: Called with the stage, rows done and rows in all
+    :return: The import's report (see `ImportReport.as_dict`)
+    """
+    action = data["action"]
+    rows: list[dict[str, str]] = data["rows"]
+    options: dict[str, Any] = data.get("options", {})
+    dry_run = bool(data.get("dry_run"))
+
+    report: ImportReport
+    if action == "import_players":
+        report = import_players(
+            rows,
+            date_format=options.get("date_format") or DATE_FORMAT,
+            guardian_email_optional=bool(options.get("guardian_email_optional")),
+            dry_run=dry_run,
+            progress=progress,
+        )
+    elif action == "add_to_series_roster":
+        series = Series.objects.get(id=options["series_id"])
+        team = Team.objects.get(id=options["team_id"])
+        report = add_to_series_roster(rows, series, team, dry_run=dry_run, progress=progress)
+    elif action == "add_to_event_roster":
+        event = Event.objects.get(id=options["event_id"])
+        team = Team.objects.get(id=options["team_id"])
+        report = add_to_event_roster(rows, event, team, dry_run=dry_run, progress=progress)
+    else:
+        raise ValueError(f"Unknown import: {action}")
+
+    return report.as_dict()
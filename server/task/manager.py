@@ -2,12 +2,16 @@
 Task Queue Manager
 """
 
+import time
 from typing import Any
 
 from django.db import transaction
+from django.db.models import Count, Q, QuerySet
 from django.utils import timezone
 
+from server.task import metrics
 from server.task.models import Task
+from server.task.wakeup import notify_worker
 
 
 class TaskManager:
@@ -29,38 +33,106 @@ class TaskManager:
         if not isinstance(data, dict):
             raise ValueError(f"data must be a dict. Got type '{type(data)}' instead.")
 
-        return Task.objects.create(
+        task = Task.objects.create(
             type=task_type,
             data=data,
         )
+        transaction.on_commit(notify_worker)
+        return task
 
     @staticmethod
-    @transaction.atomic
     def get_next_task() -> Task | None:
         """
         Atomically select and lock the next available task in the queue.
+        """
+        tasks = TaskManager.claim_tasks(1)
+        return tasks[0] if tasks else None
+
+    @staticmethod
+    @transaction.atomic
+    def claim_tasks(limit: int) -> list[Task]:
+        """
+        Atomically claim up to `limit` of the oldest pending tasks that are due to run.
         Uses SELECT FOR UPDATE with SKIP LOCKED to handle concurrent workers.
-        Marks the task as started within the transaction to prevent race conditions.
+        Marks the tasks as started within the transaction to prevent race conditions.
+
+        SQLite ignores the row locks, so the UPDATE only takes rows that are still
+        pending and we keep the ones stamped with our own start time.
         """
-        task = (
-            Task.objects.filter(started_at__isnull=True).select_for_update(skip_locked=True).first()
+        due = Q(run_after__isnull=True) | Q(run_after__lte=timezone.now())
+        ids = list(
+            Task.objects.filter(due, started_at__isnull=True)
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)[:limit]
         )
+        if not ids:
+            return []
 
-        if task:
-            task.started_at = timezone.now()
-            task.save(update_fields=["started_at"])
+        started_at = timezone.now()
+        Task.objects.filter(id__in=ids, started_at__isnull=True).update(started_at=started_at)
+        return list(Task.objects.filter(id__in=ids, started_at=started_at))
 
-        return task
+    @staticmethod
+    def execute(task: Task) -> None:
+        """
+        Run a claimed task, recording its queue latency, duration and outcome.
+        """
+        if task.started_at:
+            latency = (task.started_at - task.created_at).total_seconds()
+            metrics.task_queue_latency.labels(type=task.type).observe(latency)
+
+        start = time.perf_counter()
+        task.run_task()
+        metrics.task_duration.labels(type=task.type).observe(time.perf_counter() - start)
+
+        if task.failed_at:
+            status = "failed"
+        elif task.completed_at:
+            status = "completed"
+        else:
+            status = "retried"
+        metrics.tasks_processed.labels(type=task.type, status=status).inc()
+
+    @staticmethod
+    def requeue(tasks: QuerySet[Task]) -> int:
+        """
+        Move failed tasks out of the dead-letter queue, to be run again from scratch.
+        Tasks that have not failed are left alone.
+        """
+        count = tasks.filter(failed_at__isnull=False).update(
+            started_at=None, failed_at=None, run_after=None, attempts=0, error=""
+        )
+        if count:
+            transaction.on_commit(notify_worker)
+        return count
 
     @staticmethod
-    def get_task_stats() -> dict[str, int]:
-        """Get statistics about tasks in the queue"""
-        return {
-            "pending": Task.objects.filter(started_at__isnull=True).count(),
-            "running": Task.objects.filter(
-                started_at__isnull=False, completed_at__isnull=True, failed_at__isnull=True
-            ).count(),
-            "completed": Task.objects.filter(completed_at__isnull=False).count(),
-            "failed": Task.objects.filter(failed_at__isnull=False).count(),
-            "total": Task.objects.count(),
-        }
+    def get_task_stats() -> dict[str, Any]:
+        """Get statistics about tasks in the queue, overall and by task type"""
+        pending = Q(started_at__isnull=True, failed_at__isnull=True)
+        counts = (
+            Task.objects.order_by()
+            .values("type")
+            .annotate(
+                pending=Count("id", filter=pending & Q(attempts=0)),
+                retrying=Count("id", filter=pending & Q(attempts__gt=0)),
+                running=Count(
+                    "id",
+                    filter=Q(
+                        started_at__isnull=False, completed_at__isnull=True, failed_at__isnull=True
+                    ),
+                ),
+                completed=Count("id", filter=Q(completed_at__isnull=False)),
+                failed=Count("id", filter=Q(failed_at__isnull=False)),
+                total=Count("id"),
+            )
+        )
+
+        states = ["pending", "retrying", "running", "completed", "failed", "total"]
+        stats: dict[str, Any] = dict.fromkeys(states, 0)
+        stats["by_type"] = {}
+        for row in counts:
+            stats["by_type"][row["type"]] = {state: row[state] for state in states}
+            for state in states:
+                stats[state] += row[state]
+        return stats
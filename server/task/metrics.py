@@ -0,0 +1,34 @@
+"""
+Prometheus metrics for the task queue
+
+These are registered with the same registry django_prometheus exports from. The
+worker runs outside the web processes, so `run_task_worker --metrics-port` serves
+its copy of them over HTTP for scraping.
+"""
+
+from django.conf import settings
+from prometheus_client import Counter, Histogram
+
+NAMESPACE = settings.PROMETHEUS_METRIC_NAMESPACE
+
+tasks_processed = Counter(
+    "tasks_processed_total",
+    "Tasks run by the worker, by type and outcome",
+    ["type", "status"],
+    namespace=NAMESPACE,
+)
+
+task_duration = Histogram(
+    "task_duration_seconds",
+    "Time spent running a task, by type",
+    ["type"],
+    namespace=NAMESPACE,
+)
+
+task_queue_latency = Histogram(
+    "task_queue_latency_seconds",
+    "Time between a task being enqueued and a worker claiming it, by type",
+    ["type"],
+    namespace=NAMESPACE,
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, float("inf")),
+)
@@ -1,15 +1,33 @@
 import json
 import sys
 from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import partial
 from typing import Any
 
 from django.db import models
 from django.utils import timezone
 
 
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often a failing task is run again, and how long to wait in between"""
+
+    max_attempts: int = 1
+    base_delay: timedelta = timedelta(minutes=1)
+    max_delay: timedelta = timedelta(hours=1)
+
+    def backoff(self, attempt: int) -> timedelta:
+        """Delay before the run after `attempt`, doubling with every failed attempt"""
+        return min(self.base_delay * 2 ** (attempt - 1), self.max_delay)
+
+
 class Task(models.Model):
     class TaskType(models.TextChoices):
         SEND_EMAIL = "SEND_EMAIL", "Send Email"
+        SEND_BULK_EMAIL = "SEND_BULK_EMAIL", "Send Bulk Email"
+        IMPORT_CSV = "IMPORT_CSV", "Import CSV"
 
     type = models.CharField(max_length=50, choices=TaskType.choices)
     data = models.JSONField(default=dict, blank=True)
@@ -20,13 +38,19 @@ class Task(models.Model):
     result = models.JSONField(default=dict, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
+    # Failed runs are retried as the task type's RetryPolicy allows. `failed_at` is only
+    # set once a task has no attempts left; those tasks make up the dead-letter queue,
+    # which staff can requeue from the admin.
     error = models.TextField(blank=True)
     failed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["created_at"]
         indexes = [
             models.Index(fields=["started_at", "completed_at", "failed_at"]),
+            models.Index(fields=["started_at", "run_after"]),
         ]
 
     def __str__(self) -> str:
@@ -37,6 +61,8 @@ class Task(models.Model):
             status = "completed"
         elif self.started_at:
             status = "running"
+        elif self.attempts:
+            status = "retrying"
 
         return f"Task {self.id} ({status}) - {self.get_type_display()}"
 
@@ -48,6 +74,7 @@ class Task(models.Model):
             if not self.started_at:
                 self.started_at = timezone.now()
                 self.save(update_fields=["started_at"])
+            self.attempts += 1
 
             sys.stdout.write(f"Started task {self.id} - {self.type}\n")
 
@@ -58,17 +85,24 @@ class Task(models.Model):
             self._execute(function)
 
         except Exception as e:
-            self.error = str(e)
-            self.failed_at = timezone.now()
+            # Without a handler the task can never succeed, so there is no point retrying
+            self._fail(str(e), retry=False)
             self.save()
-            sys.stdout.write(f"Failed task {self.id}: {e}\n")
+
+    def report_progress(self, stage: str, done: int, total: int) -> None:
+        """Record how far a running task has got. It stays in `result` until the task ends."""
+        self.result = {"progress": {"stage": stage, "done": done, "total": total}}
+        Task.objects.filter(id=self.id).update(result=self.result)
 
     def _get_task_function(self) -> Callable[[dict[str, Any]], dict[str, Any]] | None:
         """Map task type to its corresponding function"""
-        from server.task.email_tasks import send_email
+        from server.task.email_tasks import send_bulk_email, send_email
+        from server.task.import_tasks import run_csv_import
 
         task_handlers: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
             self.TaskType.SEND_EMAIL: send_email,
+            self.TaskType.SEND_BULK_EMAIL: send_bulk_email,
+            self.TaskType.IMPORT_CSV: partial(run_csv_import, progress=self.report_progress),
         }
 
         return task_handlers.get(self.type, None)
@@ -85,8 +119,28 @@ class Task(models.Model):
             sys.stdout.write(f"Completed task {self.id}\n")
 
         except Exception as e:
-            self.error = str(e)
-            self.failed_at = timezone.now()
-            sys.stdout.write(f"Failed task {self.id}: {self.error}\n")
+            self._fail(str(e))
         finally:
             self.save()
+
+    def _fail(self, error: str, retry: bool = True) -> None:
+        """Schedule the task to run again, or move it to the dead-letter queue"""
+        self.error = error
+        policy = RETRY_POLICIES.get(self.type, RetryPolicy())
+        if retry and self.attempts < policy.max_attempts:
+            self.started_at = None
+            self.run_after = timezone.now() + policy.backoff(self.attempts)
+            sys.stdout.write(
+                f"Failed task {self.id} (attempt {self.attempts}), retrying at {self.run_after}: "
+                f"{error}\n"
+            )
+        else:
+            self.failed_at = timezone.now()
+            sys.stdout.write(f"Failed task {self.id}: {error}\n")
+
+
+# Task types without a policy are not retried
+RETRY_POLICIES: dict[str, RetryPolicy] = {
+    Task.TaskType.SEND_EMAIL: RetryPolicy(max_attempts=5),
+    Task.TaskType.SEND_BULK_EMAIL: RetryPolicy(max_attempts=5),
+}
@@ -0,0 +1,55 @@
+"""
+Wakeup channel between the web processes and the task worker
+
+The worker binds a Unix datagram socket and blocks on it while the queue is empty.
+Enqueueing a task sends it a one-byte datagram once the transaction commits, so
+the worker wakes up immediately without polling the database. This plays the part
+of Postgres' LISTEN/NOTIFY for our SQLite deployment. A lost wakeup only costs
+latency, since the worker still re-checks the queue every idle interval.
+"""
+
+import contextlib
+import os
+import select
+import socket
+
+from django.conf import settings
+
+
+def notify_worker() -> None:
+    """Wake the worker, if one is listening"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        sock.setblocking(False)
+        # No worker running, or it has plenty of wakeups queued already
+        with contextlib.suppress(OSError):
+            sock.sendto(b"!", settings.TASK_WORKER_WAKEUP_SOCKET)
+
+
+class WakeupChannel:
+    """The worker's end of the channel"""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or settings.TASK_WORKER_WAKEUP_SOCKET
+        # A socket file left behind by a worker that did not shut down cleanly
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.path)
+        self._sock.setblocking(False)
+
+    def wait(self, timeout: float) -> bool:
+        """Block until woken or `timeout` seconds pass. Returns whether we were woken."""
+        readable, _, _ = select.select([self._sock], [], [], timeout)
+        if not readable:
+            return False
+
+        # Many tasks enqueued at once all get picked up by the same claim
+        with contextlib.suppress(BlockingIOError):
+            while True:
+                self._sock.recv(16)
+        return True
+
+    def close(self) -> None:
+        self._sock.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
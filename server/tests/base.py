@@ -3,7 +3,9 @@ import random
 import string
 from typing import Any, TypeVar
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import now
 
 from server.core.models import (
@@ -211,3 +213,16 @@ class ApiBaseTestCase(TestCase):
             sponsored_annual_membership_amount=20000,
             supporter_annual_membership_amount=50000,
         )
+
+    def assert_query_budget(self, url: str, budget: int) -> Any:
+        """GET `url`, failing unless it succeeds in at most `budget` queries"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            f"{url} ran {len(queries)} queries, over its budget of {budget}:\n"
+            + "\n".join(query["sql"] for query in queries.captured_queries),
+        )
+        return response
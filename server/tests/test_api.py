@@ -1221,6 +1221,8 @@ class TestValidateTransactions(ApiBaseTestCase):
         self.assertEqual(4, stats["total"])
         self.assertEqual(2, stats["invalid_found"])
         self.assertEqual(1, stats["validated"])
+        self.assertEqual(["33680400241DC", "33680400351DC"], stats["unknown_references"])
+        self.assertEqual("33680091811DC", stats["amount_mismatches"][0]["transaction_id"])
         self.assertEqual(1, ManualTransaction.objects.filter(validated=False).count())
         self.assertFalse(ManualTransaction.objects.get(transaction_id="33680091811DC").validated)
 
@@ -4,6 +4,14 @@ from unittest.mock import MagicMock, patch
 
 from django.test import Client, TestCase
 
+from server.chat.llm import (
+    CHARS_PER_TOKEN,
+    HISTORY_TOKEN_BUDGET,
+    TOOL_RESULT_MAX_CHARS,
+    ChatService,
+    compact_tool_result,
+    estimate_tokens,
+)
 from server.chat.models import ChatMessage, ChatMessageType, ChatSession
 from server.core.models import User
 
@@ -132,3 +140,76 @@ class ChatAPITestCase(TestCase):
         self.assertEqual(response.status_code, 401)
         response = self.client.post("/api/chat/clear_history")
         self.assertEqual(response.status_code, 401)
+
+
+class ChatServiceTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username="chatter", password=TEST_PASSWORD)
+        self.groq_client = MagicMock()
+        self.service = ChatService(self.groq_client, self.user)
+        self.session = ChatSession.objects.create(user=self.user)
+
+    def completion(self, content: str = "", tool_calls: list[Any] | None = None) -> MagicMock:
+        response = MagicMock()
+        response.choices[0].message.content = content
+        response.choices[0].message.tool_calls = tool_calls
+        response.usage.prompt_tokens = 100
+        response.usage.completion_tokens = 10
+        return response
+
+    def test_history_is_bounded_and_older_messages_are_summarised(self) -> None:
+        long_text = "x" * (CHARS_PER_TOKEN * HISTORY_TOKEN_BUDGET // 4)
+        for i in range(10):
+            ChatMessage.objects.create(
+                session=self.session, message=f"question {i} {long_text}", type=ChatMessageType.USER
+            )
+
+        history = self.service.get_conversation_history(self.session)
+        self.assertIn("User: question 0", str(history[1]["content"]))
+        replayed = history[2:]
+        self.assertLess(len(replayed), 10)
+        self.assertTrue(str(replayed[-1]["content"]).startswith("question 9"))
+        self.assertLessEqual(
+            sum(estimate_tokens(str(m["content"])) for m in replayed), HISTORY_TOKEN_BUDGET
+        )
+
+        # Folded messages are not read again
+        self.session.refresh_from_db()
+        through = self.session.summary_through
+        ChatMessage.objects.filter(id__lte=through).update(message="rewritten")
+        history = self.service.get_conversation_history(self.session)
+        self.assertNotIn("rewritten", json.dumps(history))
+        self.assertEqual(self.session.summary_through, through)
+
+    def test_long_tool_results_are_cut_to_the_cap(self) -> None:
+        rows = [{"id": i, "title": "t" * 200} for i in range(500)]
+        content = compact_tool_result({"events": rows, "next_offset": 25})
+        self.assertLessEqual(len(content), TOOL_RESULT_MAX_CHARS)
+        result = json.loads(content)
+        self.assertEqual(result["events"], rows[: len(result["events"])])
+        self.assertIn(f"of {len(rows)} events", result["truncated"])
+
+        content = compact_tool_result({"blob": "b" * (TOOL_RESULT_MAX_CHARS * 2)})
+        self.assertLessEqual(len(content), TOOL_RESULT_MAX_CHARS)
+        self.assertTrue(json.loads(content)["truncated"])
+
+        self.assertEqual(compact_tool_result({"ok": 1}), '{"ok": 1}')
+
+    def test_a_turn_logs_its_usage_and_pages_tool_results(self) -> None:
+        tool_call = MagicMock(id="call-1")
+        tool_call.function.name = "get_all_tournaments"
+        tool_call.function.arguments = "{}"
+        self.groq_client.chat.completions.create.side_effect = [
+            self.completion(tool_calls=[tool_call]),
+            self.completion("No tournaments yet."),
+        ]
+
+        with self.assertLogs("server.chat.llm", level="INFO") as logs:
+            reply = self.service.process_message(self.user, "Which tournaments are on?")
+
+        self.assertEqual(reply, "No tournaments yet.")
+        self.assertIn("rounds=2 tokens_in=200 tokens_out=20", logs.output[0])
+        final_messages = self.groq_client.chat.completions.create.call_args.kwargs["messages"]
+        self.assertEqual(
+            json.loads(final_messages[-1]["content"]), {"tournaments": [], "next_offset": None}
+        )
@@ -6,7 +6,7 @@ from typing import Any, cast
 from django.test import TestCase
 from django.utils import timezone
 
-from server.core.models import User
+from server.core.models import Player, User
 from server.election.api import AuthenticatedHttpRequest
 from server.election.models import (
     Candidate,
@@ -18,6 +18,7 @@ from server.election.models import (
     VoterVerification,
 )
 from server.election.voting import instant_runoff_voting, single_transferable_vote
+from server.task.models import Task
 
 from .test_config import TEST_PASSWORD
 
@@ -377,6 +378,37 @@ class TestVotingSystem(TestCase):
         self.assertTrue(len(results) in [1, 2])
         self.assertEqual(results[0].votes[self.candidates[0].id], 2)
 
+    def test_tabulation_queries_do_not_grow_with_ballots_or_rounds(self) -> None:
+        """Ballots are read once and every round is saved in one bulk insert"""
+        self.election.voting_method = "STV"
+        self.election.num_winners = 2
+        self.election.save()
+        rankings = [
+            [self.candidates[0].id, self.candidates[1].id, self.candidates[2].id],
+            [self.candidates[1].id, self.candidates[2].id],
+            [self.candidates[2].id, self.candidates[0].id],
+        ] * 3
+        rankings[-1] = [self.candidates[0].id]
+        for voter, ranking in zip(self.users, rankings, strict=False):
+            self.create_ranked_vote(
+                voter,
+                [(candidate_id, rank + 1) for rank, candidate_id in enumerate(ranking)],
+            )
+
+        # Election, candidates, ballots, then clearing and saving the rounds in a savepoint
+        with self.assertNumQueries(7):
+            irv_results = instant_runoff_voting(self.election.id)
+        self.assertGreater(len(irv_results), 1)
+
+        # STV also counts the ballots for the quota
+        with self.assertNumQueries(8):
+            stv_results = single_transferable_vote(self.election.id)
+        self.assertGreater(len(stv_results), 1)
+        self.assertEqual(
+            ElectionResult.objects.filter(election=self.election).count(),
+            sum(len(result.candidates) for result in stv_results),
+        )
+
     def test_sample_results_demonstration(self) -> None:
         """Demonstrate how to use the voting results"""
         # Create a sample election with 3 candidates
@@ -574,6 +606,25 @@ user1@example.com,User One Again"""
         # Verify no voters remain
         self.assertEqual(self.election.eligible_voters.count(), 0)
 
+    def test_send_notification_reports_recipients(self) -> None:
+        """The notification's message counts the voters emailed, not the tasks queued"""
+        from server.election.api import send_election_notification
+
+        for user in (self.user1, self.user2):
+            Player.objects.create(user=user, date_of_birth=timezone.now().date())
+            EligibleVoter.objects.create(election=self.election, user=user)
+        EligibleVoter.objects.create(election=self.election, user=self.user3)
+        self.user1.is_staff = True
+        request = AuthenticatedHttpRequest()
+        request.user = self.user1
+
+        response = send_election_notification(request, self.election.id)
+
+        self.assertEqual(
+            response, {"message": "Email notifications queued for sending to 3 eligible voters"}
+        )
+        self.assertEqual(Task.objects.count(), 1)
+
 
 class TestElectionManagement(TestCase):
     def setUp(self) -> None:
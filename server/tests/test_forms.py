@@ -1,4 +1,5 @@
 import csv
+import gzip
 import io
 import json
 
@@ -145,7 +146,9 @@ class FormsAPITestCase(TestCase):
         self.assertEqual(response["Content-Type"], "text/csv")
         self.assertIn("feedback-form-responses.csv", response["Content-Disposition"])
 
-        rows = list(csv.reader(io.StringIO(response.content.decode())))
+        self.assertTrue(response.streaming)
+        content = response.getvalue().decode()
+        rows = list(csv.reader(io.StringIO(content)))
         self.assertEqual(rows[0], ["Name", "Email", "Phone", "Submitted", "Comments", "Rating"])
         self.assertEqual(len(rows), 3)  # header + 2 paid responses
         # Newest first
@@ -157,6 +160,24 @@ class FormsAPITestCase(TestCase):
         self.assertEqual(rows[2][4], "Loved it")
         self.assertEqual(rows[2][5], "Good")
 
+    def test_export_responses_csv_gzipped(self) -> None:
+        FormResponse.objects.create(
+            form=self.form, user=self.user, answers={"comments": "Loved it"}, is_paid=True
+        )
+
+        self._login(self.staff)
+        response = self.client.get(
+            f"/api/forms/{self.form.slug}/responses/csv", HTTP_ACCEPT_ENCODING="gzip, br"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        content = gzip.decompress(response.getvalue()).decode()
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][4], "Loved it")
+
     def test_export_responses_csv_requires_staff(self) -> None:
         self._login(self.user)
         response = self.client.get(f"/api/forms/{self.form.slug}/responses/csv")
@@ -1,9 +1,15 @@
 import datetime
+import importlib
+import tempfile
+from io import StringIO
 from pathlib import Path
 
+from django.apps import apps
 from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import now, utc
 
 from server.core.models import (
@@ -13,18 +19,27 @@ from server.core.models import (
     Team,
     Vaccination,
 )
+from server.core.search import search_players
+from server.lib.imports import import_players, read_rows
 from server.membership.models import Membership
 from server.season.models import Season
 from server.series.models import Series, SeriesRegistration
+from server.tests.base import not_none
+from server.tournament.leaderboard import get_leaderboard
+from server.tournament.match_stats_min import handle_score, handle_undo
 from server.tournament.models import (
     Event,
+    LeaderboardEntry,
     Match,
     MatchEvent,
     MatchStats,
+    PlayerRating,
     Registration,
     SpiritScore,
     Tournament,
 )
+from server.tournament.ratings import mean_points_before, roster_points
+from server.tournament.schema import MatchEventCreateSchema
 from server.transaction.models import ManualTransaction
 
 User = get_user_model()
@@ -187,6 +202,106 @@ class TestImportPlayers(TestCase):
         self.cert_dir.rmdir()
 
 
+class TestBulkImportPlayers(TestCase):
+    header = (
+        "first_name,last_name,email,phone,date_of_birth,gender,other_gender,city,state_ut,"
+        "not_in_india,occupation,educational_institution,guardian.first_name,"
+        "guardian.last_name,guardian.email,guardian.phone,guardian.relation"
+    )
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def csv(self, rows: list[str]) -> Path:
+        path = Path(self.tmp_dir.name) / "players.csv"
+        path.write_text("\n".join([self.header, *rows]) + "\n")
+        return path
+
+    def rows(self, n: int, city: str = "Pune", dob: str = "2001-01-01") -> list[str]:
+        return [
+            f"Player,{i},player{i}@example.com,98{i:08d},{dob},Female,,{city},Maharashtra,"
+            "N,Student,,,,,,"
+            for i in range(n)
+        ]
+
+    def test_queries_do_not_grow_with_rows(self) -> None:
+        with CaptureQueriesContext(connection) as few:
+            call_command("import_players", self.csv(self.rows(5)), stdout=StringIO())
+        Player.objects.all().delete()
+        User.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as many:
+            call_command("import_players", self.csv(self.rows(300)), stdout=StringIO())
+        # Only the number of INSERT batches, which the database's parameter limit sizes, grows
+        self.assertEqual(
+            [q["sql"][:20] for q in many.captured_queries if "INSERT" not in q["sql"]],
+            [q["sql"][:20] for q in few.captured_queries if "INSERT" not in q["sql"]],
+        )
+        self.assertEqual(Player.objects.count(), 300)
+        self.assertEqual(Player.objects.filter(match_up=Player.MatchupTypes.FEMALE).count(), 300)
+
+    def test_dry_run_lists_changes_without_making_them(self) -> None:
+        call_command("import_players", self.csv(self.rows(3)), stdout=StringIO())
+
+        out = StringIO()
+        path = self.csv(self.rows(3, city="Mumbai"))
+        call_command("import_players", path, "--dry-run", stdout=out)
+        self.assertIn("Update player player0@example.com: city 'Pune' -> 'Mumbai'", out.getvalue())
+        self.assertIn(
+            "Dry run: 3 rows, would create nothing; would update 3 players", out.getvalue()
+        )
+        self.assertEqual(Player.objects.filter(city="Pune").count(), 3)
+
+        call_command("import_players", path, stdout=StringIO())
+        self.assertEqual(Player.objects.filter(city="Mumbai").count(), 3)
+        # Bulk writes skip the signals, so the import keeps the search index itself
+        self.assertEqual(len(search_players("mumbai")), 3)
+
+    def test_any_bad_row_imports_nothing(self) -> None:
+        rows = self.rows(4)
+        rows[1] = rows[1].replace("2001-01-01", "2001-31-31")
+        rows[2] = rows[2].replace("2001-01-01", f"{now().year - 10}-01-01")
+        rows[3] = rows[0]
+
+        err = StringIO()
+        call_command("import_players", self.csv(rows), stdout=StringIO(), stderr=err)
+        self.assertEqual(
+            err.getvalue().splitlines(),
+            [
+                "Line 3 (player1@example.com): Invalid date of birth: 2001-31-31",
+                "Line 4 (player2@example.com): Missing Guardian information",
+                "Line 5 (player0@example.com): Also on line 2",
+            ],
+        )
+        self.assertEqual(User.objects.count(), 0)
+        self.assertEqual(Player.objects.count(), 0)
+
+    def test_minors_are_imported_with_their_guardian(self) -> None:
+        minor = self.rows(1, dob=f"{now().year - 10}-01-01")[0].removesuffix(",,,,,")
+        minor += ",Asha,0,asha@example.com,9000000000,Mother"
+        call_command("import_players", self.csv([minor]), stdout=StringIO())
+
+        guardianship = Guardianship.objects.select_related("user", "player__user").get()
+        self.assertEqual(guardianship.user.username, "asha@example.com")
+        self.assertEqual(guardianship.player.user.username, "player0@example.com")
+        self.assertEqual(guardianship.relation, Guardianship.Relation.MO)
+
+    def test_vaccinations_without_a_files_folder_are_noted(self) -> None:
+        header = self.header + ",vaccination.is_vaccinated,vaccination.name,"
+        header += "vaccination.explain_not_vaccinated,vaccination.certificate_file_name"
+        rows = [row + ",Y,COVISHIELD,,certificate.pdf" for row in self.rows(2)]
+
+        # As for imports queued from the admin, with no folder to find certificates in
+        report = import_players(read_rows("\n".join([header, *rows])), files_dir=None)
+
+        self.assertFalse(report.errors)
+        self.assertEqual(Player.objects.count(), 2)
+        self.assertEqual(Vaccination.objects.count(), 0)
+        self.assertIn("Not creating vaccination, no certificate: player0@example.com", report.notes)
+
+
 class TestActivateMemberships(TestCase):
     def setUp(self) -> None:
         super().setUp()
@@ -564,6 +679,29 @@ class TestGenerateWrappedData(TestCase):
         self.assertEqual(wrapped.top_teammates_who_assisted_me[0]["player_id"], self.teammate.id)
         self.assertEqual(wrapped.top_teammates_who_assisted_me[0]["count"], 2)
 
+    def test_generate_wrapped_data_queries_do_not_grow_with_players(self) -> None:
+        """Each stage reads the whole year at once, whatever the number of players."""
+        from server.wrapped.models import PlayerWrapped
+
+        call_command("generate_wrapped_data", "--years", "2024")
+        self.assertEqual(PlayerWrapped.objects.filter(year=2024).count(), 2)
+
+        for i in range(5):
+            player = Player.objects.create(
+                user=User.objects.create(username=f"extra{i}@example.com"),
+                date_of_birth=datetime.date(1990, 1, 1),
+            )
+            Registration.objects.create(event=self.event, team=self.opponent_team, player=player)
+
+        # Players, registrations, matches, events, tournament and player names, then the upsert
+        with self.assertNumQueries(7):
+            call_command("generate_wrapped_data", "--years", "2024", "--force")
+
+        self.assertEqual(PlayerWrapped.objects.filter(year=2024).count(), 7)
+        wrapped = PlayerWrapped.objects.get(player=self.player, year=2024)
+        self.assertEqual(wrapped.total_scores, 3)
+        self.assertEqual(wrapped.continuous_streak_scored_or_assisted, 2)
+
     def tearDown(self) -> None:
         # Clean up test data
         from server.wrapped.models import PlayerWrapped
@@ -579,3 +717,308 @@ class TestGenerateWrappedData(TestCase):
         PlayerWrapped.objects.all().delete()
         Player.objects.all().delete()
         User.objects.all().delete()
+
+
+class TestRebuildLeaderboard(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.team = Team.objects.create(name="Test Team")
+        self.opponent_team = Team.objects.create(name="Opponent Team")
+        self.scorer, self.thrower = (
+            Player.objects.create(
+                user=User.objects.create(username=name, first_name=name, last_name="Player"),
+                date_of_birth=datetime.date(1990, 1, 1),
+            )
+            for name in ("scorer", "thrower")
+        )
+        event = Event.objects.create(
+            title="Leaderboard Open",
+            start_date=datetime.date(2024, 6, 1),
+            end_date=datetime.date(2024, 6, 3),
+            team_registration_start_date=datetime.date(2024, 5, 1),
+            team_registration_end_date=datetime.date(2024, 5, 15),
+            player_registration_start_date=datetime.date(2024, 5, 16),
+            player_registration_end_date=datetime.date(2024, 5, 30),
+        )
+        self.tournament = Tournament.objects.create(event=event)
+        self.match = Match.objects.create(
+            tournament=self.tournament,
+            team_1=self.team,
+            team_2=self.opponent_team,
+            placeholder_seed_1=1,
+            placeholder_seed_2=2,
+            sequence_number=1,
+        )
+        MatchStats.objects.create(
+            match=self.match,
+            tournament=self.tournament,
+            initial_possession=self.team,
+            current_possession=self.team,
+        )
+
+    def _score(self) -> None:
+        self.match.refresh_from_db()
+        status, _ = handle_score(
+            MatchEventCreateSchema(
+                type=MatchEvent.EventType.SCORE,
+                team_id=self.team.id,
+                player_ids=None,
+                scored_by_id=self.scorer.id,
+                assisted_by_id=self.thrower.id,
+                drop_by_id=None,
+                throwaway_by_id=None,
+                block_by_id=None,
+            ),
+            self.match,
+            self.team,
+        )
+        self.assertEqual(status, 200)
+        # Hand possession back so the same team can score again
+        MatchStats.objects.filter(match=self.match).update(current_possession=self.team)
+
+    def test_scoring_and_undo_keep_the_leaderboard_current(self) -> None:
+        self._score()
+        self._score()
+        self.match.refresh_from_db()
+        handle_undo(self.match)
+
+        leaderboard = get_leaderboard(self.tournament)
+        self.assertEqual(
+            [(p["first_name"], p["num_scores"]) for p in leaderboard["scores"]], [("scorer", 1)]
+        )
+        self.assertEqual(
+            [(p["first_name"], p["num_assists"]) for p in leaderboard["assists"]],
+            [("thrower", 1)],
+        )
+        self.assertEqual(leaderboard["blocks"], [])
+        self.assertEqual({p["team_name"] for p in leaderboard["total"]}, {"Test Team"})
+
+    def test_deleting_a_scored_match_takes_back_its_events(self) -> None:
+        self._score()
+        self._score()
+        self.assertEqual(get_leaderboard(self.tournament)["total"][0]["num_total"], 2)
+
+        self.match.delete()
+
+        leaderboard = get_leaderboard(self.tournament)
+        self.assertEqual(leaderboard["total"], [])
+        self.assertFalse(LeaderboardEntry.objects.filter(num_total__gt=0).exists())
+
+    def test_edited_and_bulk_deleted_events_keep_the_leaderboard_current(self) -> None:
+        self._score()
+        self._score()
+        # As the admin would, crediting the thrower with one of the scores instead
+        event = not_none(MatchEvent.objects.filter(type=MatchEvent.EventType.SCORE).first())
+        event.scored_by, event.assisted_by = self.thrower, self.scorer
+        event.save()
+
+        leaderboard = get_leaderboard(self.tournament)
+        self.assertEqual(
+            [(p["first_name"], p["num_scores"]) for p in leaderboard["scores"]],
+            [("scorer", 1), ("thrower", 1)],
+        )
+        self.assertEqual([p["num_total"] for p in leaderboard["total"]], [2, 2])
+
+        MatchEvent.objects.filter(stats__tournament=self.tournament).delete()
+        self.assertEqual(get_leaderboard(self.tournament)["total"], [])
+
+    def test_totals_are_one_row_per_player(self) -> None:
+        self._score()
+        self._score()
+        # The same player, scoring for another team
+        MatchEvent.objects.create(
+            stats=self.match.stats,
+            team=self.opponent_team,
+            started_on=MatchEvent.Mode.OFFENSE,
+            type=MatchEvent.EventType.SCORE,
+            scored_by=self.scorer,
+        )
+
+        leaderboard = get_leaderboard(self.tournament)
+        self.assertEqual(
+            [(p["team_name"], p["num_scores"]) for p in leaderboard["scores"]],
+            [("Test Team", 2), ("Opponent Team", 1)],
+        )
+        self.assertEqual(
+            [(p["first_name"], p["team_name"], p["num_total"]) for p in leaderboard["total"]],
+            [("scorer", "Test Team", 3), ("thrower", "Test Team", 2)],
+        )
+
+    def test_rebuild_matches_incremental_counts(self) -> None:
+        self._score()
+        self._score()
+        incremental = get_leaderboard(self.tournament)
+
+        LeaderboardEntry.objects.all().delete()
+        call_command("rebuild_leaderboard", tournament_id=self.tournament.id)
+
+        self.assertEqual(get_leaderboard(self.tournament), incremental)
+        self.assertEqual(incremental["total"][0]["num_total"], 2)
+
+
+class TestCalculatePlayerPoints(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.teams = [Team.objects.create(name=f"Team {i}") for i in range(1, 4)]
+        self.players = [
+            Player.objects.create(
+                user=User.objects.create(username=f"player-{i}"),
+                date_of_birth=datetime.date(1990, 1, 1),
+            )
+            for i in range(4)
+        ]
+
+    def create_tournament(self, title: str, start_date: datetime.date, tier: int) -> Tournament:
+        event = Event.objects.create(
+            title=title,
+            start_date=start_date,
+            end_date=start_date + datetime.timedelta(days=2),
+            team_registration_start_date=start_date,
+            team_registration_end_date=start_date,
+            player_registration_start_date=start_date,
+            player_registration_end_date=start_date,
+            tier=tier,
+        )
+        return Tournament.objects.create(
+            event=event,
+            status=Tournament.Status.COMPLETED,
+            current_seeding={str(rank): team.id for rank, team in enumerate(self.teams, 1)},
+        )
+
+    def register(self, tournament: Tournament, team: Team, players: list[Player]) -> None:
+        for player in players:
+            Registration.objects.create(event=tournament.event, team=team, player=player)
+
+    def test_ratings_follow_registration_points(self) -> None:
+        nationals = self.create_tournament("Nationals", datetime.date(2024, 1, 5), tier=1)
+        regionals = self.create_tournament("Regionals", datetime.date(2024, 3, 5), tier=3)
+        upcoming = self.create_tournament("Upcoming", datetime.date(2024, 6, 5), tier=2)
+        upcoming.status = Tournament.Status.LIVE
+        upcoming.save()
+
+        # Points by rank: tier 1 -> 100, 90, 80 and tier 3 -> 100, 70, 40
+        self.register(nationals, self.teams[0], self.players[:2])
+        self.register(nationals, self.teams[2], self.players[2:3])
+        self.register(regionals, self.teams[1], self.players[:1])
+        self.register(upcoming, self.teams[0], self.players)
+
+        call_command("calculate_player_points")
+
+        ratings = set(PlayerRating.objects.values_list("player_id", "date", "points"))
+        registrations = set(
+            Registration.objects.filter(points__isnull=False).values_list(
+                "player_id", "event__end_date", "points"
+            )
+        )
+        self.assertEqual(ratings, registrations)
+        self.assertEqual(len(ratings), 4)
+
+        players = [player.id for player in self.players]
+        self.assertEqual(
+            mean_points_before(players, upcoming.event.start_date),
+            {players[0]: 85.0, players[1]: 100.0, players[2]: 80.0},
+        )
+        # The fourth player has no rating, so does not pull the roster down
+        with self.assertNumQueries(1):
+            self.assertEqual(roster_points(upcoming.event, self.teams[0].id), 88.3)
+
+    def test_only_changed_tournaments_are_recalculated(self) -> None:
+        nationals = self.create_tournament("Nationals", datetime.date(2024, 1, 5), tier=1)
+        regionals = self.create_tournament("Regionals", datetime.date(2024, 3, 5), tier=3)
+        self.register(nationals, self.teams[0], self.players[:2])
+        self.register(regionals, self.teams[1], self.players[2:])
+
+        out = StringIO()
+        call_command("calculate_player_points", stdout=out)
+        self.assertIn("Updated 4 registrations across 2 of 2", out.getvalue())
+
+        # Nothing changed, so nothing is recalculated
+        out = StringIO()
+        with self.assertNumQueries(2):
+            call_command("calculate_player_points", stdout=out)
+        self.assertIn("Updated 0 registrations across 0 of 2", out.getvalue())
+
+        # A corrected result recalculates only that tournament, overwriting the points
+        # an earlier run wrote
+        regionals.current_seeding = {"1": self.teams[1].id, "2": self.teams[0].id}
+        regionals.save()
+        out = StringIO()
+        call_command("calculate_player_points", stdout=out)
+        self.assertIn("Updated 2 registrations across 1 of 2", out.getvalue())
+        self.assertEqual(
+            set(
+                Registration.objects.filter(event=regionals.event).values_list("points", flat=True)
+            ),
+            {100},
+        )
+        self.assertEqual(
+            set(
+                PlayerRating.objects.filter(player__in=self.players[2:]).values_list(
+                    "points", flat=True
+                )
+            ),
+            {100},
+        )
+
+        out = StringIO()
+        call_command("calculate_player_points", "--full", stdout=out)
+        self.assertIn("Updated 0 registrations across 2 of 2", out.getvalue())
+
+    def test_points_set_by_hand_are_kept_and_leave_the_tournament_stale(self) -> None:
+        nationals = self.create_tournament("Nationals", datetime.date(2024, 1, 5), tier=1)
+        self.register(nationals, self.teams[0], self.players[:2])
+        call_command("calculate_player_points", stdout=StringIO())
+        Registration.objects.filter(player=self.players[0]).update(points=42)
+
+        # A corrected result: only the points the command wrote follow it
+        nationals.current_seeding = {"1": self.teams[1].id, "2": self.teams[0].id}
+        nationals.save()
+        out = StringIO()
+        call_command("calculate_player_points", stdout=out)
+
+        points = dict(Registration.objects.values_list("player_id", "points"))
+        self.assertEqual(points, {self.players[0].id: 42, self.players[1].id: 80})
+        self.assertIn("Points in Nationals were set by hand", out.getvalue())
+        # Not marked up to date, so the next run looks at it again
+        out = StringIO()
+        call_command("calculate_player_points", stdout=out)
+        self.assertIn("across 1 of 1", out.getvalue())
+
+        out = StringIO()
+        call_command("calculate_player_points", "--full", stdout=out)
+        self.assertNotIn("set by hand", out.getvalue())
+        self.assertEqual(Registration.objects.get(player=self.players[0]).points, 80)
+        out = StringIO()
+        call_command("calculate_player_points", stdout=out)
+        self.assertIn("across 0 of 1", out.getvalue())
+
+    def test_a_player_moving_team_changes_the_fingerprint(self) -> None:
+        nationals = self.create_tournament("Nationals", datetime.date(2024, 1, 5), tier=1)
+        self.register(nationals, self.teams[0], self.players[:1])
+        self.register(nationals, self.teams[1], self.players[1:2])
+        call_command("calculate_player_points", stdout=StringIO())
+
+        registration = Registration.objects.get(player=self.players[0])
+        registration.team = self.teams[2]
+        registration.points = None
+        registration.save()
+        out = StringIO()
+        call_command("calculate_player_points", stdout=out)
+
+        self.assertIn("Updated 1 registrations across 1 of 1", out.getvalue())
+        registration.refresh_from_db()
+        self.assertEqual(registration.points, 80)
+
+    def test_migration_seeds_the_fingerprints_the_command_computes(self) -> None:
+        seed = importlib.import_module("server.migrations.0155_seed_player_points_fingerprints")
+        calculated = self.create_tournament("Nationals", datetime.date(2024, 1, 5), tier=1)
+        uncalculated = self.create_tournament("Regionals", datetime.date(2024, 3, 5), tier=3)
+        self.register(calculated, self.teams[0], self.players[:2])
+        self.register(uncalculated, self.teams[1], self.players[2:])
+        Registration.objects.filter(event=calculated.event).update(points=100)
+
+        seed.seed_fingerprints(apps, None)
+
+        out = StringIO()
+        call_command("calculate_player_points", stdout=out)
+        self.assertIn("Updated 2 registrations across 1 of 2", out.getvalue())
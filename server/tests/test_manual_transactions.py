@@ -1,5 +1,9 @@
+from io import StringIO
 from pathlib import Path
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from server.lib.manual_transactions import validate_manual_transactions
 from server.tests.base import ApiBaseTestCase
 from server.transaction.models import ManualTransaction
@@ -26,3 +30,80 @@ class TestManualTransactions(ApiBaseTestCase):
         self.assertEqual(1, stats["validated"])
         self.assertEqual(1, ManualTransaction.objects.filter(validated=False).count())
         self.assertFalse(ManualTransaction.objects.get(transaction_id="33680091811DC").validated)
+
+    def test_reconciliation_report(self) -> None:
+        ManualTransaction.objects.create(
+            transaction_id="33680400241DC", amount=131400, user=self.user, validated=True
+        )
+        stats = validate_manual_transactions(self.fixture)
+        self.assertEqual(
+            [
+                {
+                    "transaction_id": "33680091811DC",
+                    "amount": 60000,
+                    "credited": 260200,
+                    "line": 3,
+                }
+            ],
+            stats["amount_mismatches"],
+        )
+        self.assertEqual(["33680400241DC"], stats["already_validated"])
+        self.assertEqual(["33680400351DC"], stats["unknown_references"])
+        self.assertEqual([], stats["duplicates"])
+
+    def test_padded_transaction_ids_match(self) -> None:
+        ManualTransaction.objects.create(
+            transaction_id="00033680400351DC", amount=232200, user=self.user
+        )
+        stats = validate_manual_transactions(self.fixture)
+        self.assertEqual(2, stats["validated"])
+        self.assertTrue(ManualTransaction.objects.get(transaction_id="00033680400351DC").validated)
+
+    def test_differently_padded_ids_match(self) -> None:
+        ManualTransaction.objects.create(transaction_id="0123", amount=5000, user=self.user)
+        statement = StringIO(
+            "Date,Debit Amount,Credit Amount,Chq/Ref Number\n15/09/23,0.00,50.00,000123\n"
+        )
+        stats = validate_manual_transactions(statement)
+        self.assertEqual([], stats["unknown_references"])
+        self.assertEqual(1, stats["validated"])
+        self.assertTrue(ManualTransaction.objects.get(transaction_id="0123").validated)
+
+    def test_references_are_looked_up_on_the_index(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            validate_manual_transactions(self.fixture)
+        lookups = [q["sql"] for q in queries.captured_queries if "LTRIM" in q["sql"]]
+        self.assertTrue(lookups)
+        for sql in lookups:
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+            self.assertIn("manual_txn_reference_idx", plan)
+            self.assertNotIn("SCAN", plan)
+
+    def test_duplicate_references_are_not_validated(self) -> None:
+        statement = StringIO(
+            "Date,Debit Amount,Credit Amount,Chq/Ref Number\n"
+            "15/09/23,0.00,1.00,0000326013145864\n"
+            "16/09/23,0.00,1.00,0000326013145864\n"
+            "16/09/23,500.00,0.00,0000000000000001\n"
+        )
+        stats = validate_manual_transactions(statement)
+        self.assertEqual(1, stats["total"])
+        self.assertEqual(["326013145864"], stats["duplicates"])
+        self.assertEqual(0, stats["validated"])
+        self.assertFalse(ManualTransaction.objects.get(transaction_id="326013145864").validated)
+
+    def test_validates_in_bulk(self) -> None:
+        rows = ["Date,Debit Amount,Credit Amount,Chq/Ref Number"]
+        for i in range(50):
+            ManualTransaction.objects.create(transaction_id=f"REF{i}", amount=1000, user=self.user)
+            rows.append(f"15/09/23,0.00,10.00,REF{i}")
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = validate_manual_transactions(StringIO("\n".join(rows)))
+
+        self.assertEqual(50, stats["validated"])
+        updates = [q for q in queries.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(1, len(updates))
+        self.assertLessEqual(len(queries.captured_queries), 5)
@@ -1,6 +1,9 @@
+import csv
 from io import StringIO
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from server.core.models import Player, User
 from server.lib.membership import get_membership_status
@@ -60,3 +63,45 @@ class MembershipStatusTestCase(TestCase):
 
         self.assertTrue(data[self.email1]["membership_status"])
         self.assertFalse(data[self.email2]["membership_status"])
+
+
+class MembershipExportTestCase(TestCase):
+    def test_export_streams_every_selected_membership(self) -> None:
+        memberships = []
+        for i in range(3):
+            user = User.objects.create(
+                username=f"member{i}@example.com", first_name=f"Member{i}", last_name="Player"
+            )
+            player = Player.objects.create(user=user, date_of_birth="2001-01-01")
+            memberships.append(
+                Membership.objects.create(
+                    is_active=True,
+                    player=player,
+                    start_date="2023-01-01",
+                    end_date="2023-12-31",
+                )
+            )
+        admin_user = User.objects.create_superuser(username="admin", email="admin@example.com")
+        self.client.force_login(admin_user)
+
+        response = self.client.post(
+            "/admin/server/membership/",
+            {"action": "export_as_csv", "_selected_action": [m.id for m in memberships]},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+
+        # Rows are only read as the response is consumed, and players with their users
+        # come in the same query rather than one query per row
+        with CaptureQueriesContext(connection) as queries:
+            content = response.getvalue().decode()
+        self.assertEqual(len(queries), 1)
+
+        rows = list(csv.reader(StringIO(content)))
+        self.assertEqual(rows[0][:3], ["id", "player", "membership_number"])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(
+            sorted(row[1] for row in rows[1:]),
+            ["Member0 Player", "Member1 Player", "Member2 Player"],
+        )
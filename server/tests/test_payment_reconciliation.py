@@ -0,0 +1,231 @@
+import datetime
+import uuid
+from typing import Any
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+from server.core.models import Player, User
+from server.lib.ratelimit import RateLimiter
+from server.membership.models import Membership
+from server.tests.base import ApiBaseTestCase, fake_id
+from server.tournament.models import Registration
+from server.transaction.client.razorpay import PAGE_SIZE
+from server.transaction.models import GatewaySyncCursor, PhonePeTransaction, RazorpayTransaction
+from server.transaction.reconcile import (
+    FIRST_SYNC,
+    SYNC_OVERLAP,
+    reconcile_phonepe_transactions,
+    sync_razorpay_transactions,
+)
+
+Status = RazorpayTransaction.TransactionStatusChoices
+Type = RazorpayTransaction.TransactionTypeChoices
+
+
+class StubRazorpay:
+    """Razorpay's payment listing, over payments kept in memory"""
+
+    def __init__(self) -> None:
+        self.payments: list[dict[str, Any]] = []
+        self.queries: list[dict[str, Any]] = []
+
+    def pay(self, order_id: str, status: str, created_at: datetime.datetime) -> None:
+        self.payments.append(
+            {
+                "id": f"pay_{fake_id(14)}",
+                "order_id": order_id,
+                "status": status,
+                "created_at": int(created_at.timestamp()),
+            }
+        )
+
+    def all(self, query: dict[str, Any]) -> dict[str, Any]:
+        self.queries.append(query)
+        made = [p for p in self.payments if query["from"] <= p["created_at"] <= query["to"]]
+        items = made[query["skip"] : query["skip"] + query["count"]]
+        return {"entity": "collection", "count": len(items), "items": items}
+
+
+class TestSyncRazorpayTransactions(ApiBaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.gateway = StubRazorpay()
+        self.now = now()
+
+    def order(self, players: list[Player] | None = None, **kwargs: Any) -> RazorpayTransaction:
+        txn = RazorpayTransaction.objects.create(
+            order_id=f"order_{fake_id(16)}",
+            amount=70000,
+            currency="INR",
+            user=self.user,
+            start_date=self.season.start_date,
+            end_date=self.season.end_date,
+            season=self.season,
+            **kwargs,
+        )
+        txn.players.set(players if players is not None else [self.player])
+        return txn
+
+    def sync(self, **kwargs: Any) -> Any:
+        return sync_razorpay_transactions(fetch=self.gateway.all, until=self.now, **kwargs)
+
+    def test_payments_are_bucketed_by_order(self) -> None:
+        retried, failed, refunded = self.order(), self.order(), self.order(status=Status.COMPLETED)
+        earlier = self.now - datetime.timedelta(hours=1)
+        # Statuses interleaved, so grouping adjacent payments would split them
+        self.gateway.pay(retried.order_id, "failed", earlier)
+        self.gateway.pay(failed.order_id, "failed", earlier)
+        self.gateway.pay(retried.order_id, "captured", earlier)
+        self.gateway.pay(refunded.order_id, "refunded", earlier)
+        self.gateway.pay(failed.order_id, "failed", earlier)
+        self.gateway.pay("order_not_ours", "captured", earlier)
+
+        report = self.sync()
+
+        self.assertEqual(6, report.payments)
+        self.assertEqual({"completed": 1, "failed": 1, "refunded": 1}, dict(report.updated))
+        retried.refresh_from_db()
+        self.assertEqual(Status.COMPLETED, retried.status)
+        self.assertEqual(self.gateway.payments[2]["id"], retried.payment_id)
+        failed.refresh_from_db()
+        self.assertEqual(Status.FAILED, failed.status)
+        refunded.refresh_from_db()
+        self.assertEqual(Status.REFUNDED, refunded.status)
+
+        membership = Membership.objects.get(player=self.player)
+        self.assertTrue(membership.is_active)
+        self.assertEqual(self.season, membership.season)
+        self.assertTrue(membership.membership_number)
+
+    def test_completed_transactions_are_not_failed_again(self) -> None:
+        txn = self.order(status=Status.COMPLETED)
+        self.gateway.pay(txn.order_id, "failed", self.now - datetime.timedelta(hours=1))
+
+        report = self.sync()
+
+        self.assertFalse(report.updated)
+        txn.refresh_from_db()
+        self.assertEqual(Status.COMPLETED, txn.status)
+
+    def test_the_cursor_is_kept_between_syncs(self) -> None:
+        report = self.sync()
+        self.assertEqual(self.now - FIRST_SYNC, report.since)
+        cursor = GatewaySyncCursor.objects.get()
+        self.assertEqual(self.now, cursor.synced_until)
+
+        later = self.now + datetime.timedelta(hours=6)
+        report = sync_razorpay_transactions(fetch=self.gateway.all, until=later)
+        self.assertEqual(self.now - SYNC_OVERLAP, report.since)
+        self.assertEqual(
+            int((self.now - SYNC_OVERLAP).timestamp()), self.gateway.queries[-1]["from"]
+        )
+
+        report = sync_razorpay_transactions(fetch=self.gateway.all, until=later, reset=True)
+        self.assertEqual(later - FIRST_SYNC, report.since)
+
+    def test_payments_changing_days_after_they_were_made_are_picked_up(self) -> None:
+        self.sync()
+        txn = self.order()
+        made = self.now - datetime.timedelta(days=3)
+        self.gateway.pay(txn.order_id, "authorized", made)
+        later = self.now + datetime.timedelta(days=2)
+        sync_razorpay_transactions(fetch=self.gateway.all, until=later)
+
+        # Captured after the cursor moved on, long after the payment was made
+        self.gateway.payments[0]["status"] = "captured"
+        report = sync_razorpay_transactions(
+            fetch=self.gateway.all, until=later + datetime.timedelta(hours=1)
+        )
+
+        self.assertLess(report.since, made)
+        self.assertEqual({"completed": 1}, dict(report.updated))
+        txn.refresh_from_db()
+        self.assertEqual(Status.COMPLETED, txn.status)
+
+    def test_pages_are_read_until_a_short_one(self) -> None:
+        for i in range(PAGE_SIZE * 2 + 50):
+            self.gateway.pay(f"order_{i}", "captured", self.now - datetime.timedelta(minutes=i))
+
+        report = self.sync()
+
+        self.assertEqual(PAGE_SIZE * 2 + 50, report.payments)
+        self.assertEqual([0, PAGE_SIZE, PAGE_SIZE * 2], [q["skip"] for q in self.gateway.queries])
+
+    def test_side_effects_are_applied_in_bulk(self) -> None:
+        def sync_orders(n: int) -> int:
+            for i in range(n):
+                user = User.objects.create(username=f"{n}-{i}@foo.com", email=f"{n}-{i}@foo.com")
+                player = Player.objects.create(user=user, date_of_birth="1990-01-01")
+                membership = self.order([player])
+                registration = self.order(
+                    [player], type=Type.PLAYER_REGISTRATION, event=self.event, team=self.teams[1]
+                )
+                for txn in (membership, registration):
+                    self.gateway.pay(txn.order_id, "captured", self.now)
+            with CaptureQueriesContext(connection) as queries:
+                self.sync()
+            return len(queries.captured_queries)
+
+        # The first sync creates the cursor, and later ones only update it
+        self.sync()
+        self.assertEqual(sync_orders(2), sync_orders(20))
+        self.assertEqual(22, Membership.objects.filter(is_active=True).count())
+        self.assertEqual(
+            22, Registration.objects.filter(event=self.event, team=self.teams[1]).count()
+        )
+
+    def test_partially_registered_teams_are_registered(self) -> None:
+        team = self.teams[1]
+        self.tournament.teams.remove(team)
+        self.tournament.partial_teams.add(team)
+        txn = self.order([], type=Type.TEAM_REGISTRATION, event=self.event, team=team)
+        self.gateway.pay(txn.order_id, "captured", self.now)
+
+        self.sync()
+
+        self.assertIn(team, self.tournament.teams.all())
+        self.assertNotIn(team, self.tournament.partial_teams.all())
+
+
+class TestReconcilePhonePeTransactions(ApiBaseTestCase):
+    def pending(self) -> PhonePeTransaction:
+        txn = PhonePeTransaction.objects.create(
+            transaction_id=uuid.uuid4(),
+            amount=70000,
+            currency="INR",
+            user=self.user,
+            start_date=self.season.start_date,
+            end_date=self.season.end_date,
+        )
+        txn.players.add(self.player)
+        return txn
+
+    def test_pending_transactions_are_checked_concurrently(self) -> None:
+        paid, declined, still_pending, broken = (self.pending() for _ in range(4))
+        codes = {
+            str(paid.transaction_id): "PAYMENT_SUCCESS",
+            str(declined.transaction_id): "PAYMENT_DECLINED",
+            str(still_pending.transaction_id): "PAYMENT_PENDING",
+        }
+
+        def check_status(transaction_id: str) -> dict[str, Any]:
+            if transaction_id not in codes:
+                raise ConnectionError("PhonePe is down")
+            return {"success": True, "code": codes[transaction_id]}
+
+        waits: list[float] = []
+        limiter = RateLimiter(2, 1, clock=lambda: 0.0, sleep=waits.append)
+        with self.assertLogs("server.transaction.reconcile", "ERROR"):
+            updated = reconcile_phonepe_transactions(check_status, workers=4, limiter=limiter)
+
+        self.assertEqual({"success": 1, "declined": 1}, dict(updated))
+        # Two checks a second: the last two waited for the first two to leave the window
+        self.assertEqual([1.0, 1.0], waits)
+        statuses = dict(PhonePeTransaction.objects.values_list("transaction_id", "status"))
+        self.assertEqual("success", statuses[paid.transaction_id])
+        self.assertEqual("declined", statuses[declined.transaction_id])
+        self.assertEqual("pending", statuses[still_pending.transaction_id])
+        self.assertEqual("pending", statuses[broken.transaction_id])
+        self.assertTrue(Membership.objects.get(player=self.player).is_active)
@@ -0,0 +1,75 @@
+from server.tests.base import ApiBaseTestCase, create_pool, not_none, start_tournament
+from server.tournament.models import Match, MatchScore, MatchStats, Registration, SpiritScore
+
+# Queries each endpoint may run, however many matches and teams the tournament has
+TOURNAMENT_BUDGET = 5
+MATCHES_BUDGET = 30
+
+
+class TestQueryBudgets(ApiBaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        for team in self.teams:
+            team.admins.add(self.user)
+        Registration.objects.create(event=self.event, team=self.teams[0], player=self.player)
+        self.player.teams.add(self.teams[0])
+
+    def add_pool(self, name: str, seeding: list[int]) -> None:
+        """A pool whose matches carry every relation `MatchSchema` serializes"""
+        pool = create_pool(name, self.tournament, seeding)
+        start_tournament(self.tournament)
+
+        for match in Match.objects.filter(pool=pool):
+            for field in (
+                "spirit_score_team_1",
+                "spirit_score_team_2",
+                "self_spirit_score_team_1",
+                "self_spirit_score_team_2",
+            ):
+                spirit_score = SpiritScore.objects.create(
+                    rules=2,
+                    fouls=2,
+                    fair=2,
+                    positive=2,
+                    communication=2,
+                    mvp_v2=self.player,
+                    msp_v2=self.player,
+                )
+                setattr(match, field, spirit_score)
+            match.suggested_score_team_1 = MatchScore.objects.create(entered_by=self.player)
+            match.suggested_score_team_2 = MatchScore.objects.create(entered_by=self.player)
+            match.save()
+            MatchStats.objects.create(
+                match=match,
+                tournament=self.tournament,
+                initial_possession=not_none(match.team_1),
+                current_possession=not_none(match.team_2),
+            )
+
+    def test_tournament_within_budget(self) -> None:
+        url = f"/api/tournament?id={self.tournament.id}"
+        response = self.assert_query_budget(url, TOURNAMENT_BUDGET)
+
+        reg_count = {row["team_id"]: row["count"] for row in response.json()["reg_count"]}
+        self.assertEqual(reg_count[self.teams[0].id], 1)
+        self.assertEqual(reg_count[self.teams[1].id], 0)
+
+    def test_tournament_matches_within_budget(self) -> None:
+        self.add_pool("A", [1, 2, 3, 4])
+        urls = [
+            f"/api/tournament/slug/{self.event.slug}/matches",
+            f"/api/tournament/{self.tournament.id}/matches",
+            f"/api/tournament/{self.event.slug}/team/{self.teams[0].slug}/matches",
+        ]
+        for url in urls:
+            self.assert_query_budget(url, MATCHES_BUDGET)
+
+        # Twice the matches, same queries
+        self.add_pool("B", [5, 6, 7, 8])
+        for url in urls:
+            response = self.assert_query_budget(url, MATCHES_BUDGET)
+        self.assertEqual(len(response.json()), 3)
+
+        match = not_none(Match.objects.filter(tournament=self.tournament).first())
+        response = self.assert_query_budget(f"/api/match/{match.id}", MATCHES_BUDGET)
+        self.assertEqual(response.json()["spirit_score_team_1"]["mvp_v2"]["id"], self.player.id)
@@ -0,0 +1,100 @@
+from io import StringIO
+from typing import Any
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+
+from server.core import search
+from server.core.models import Player, Team, User
+from server.tests.base import ApiBaseTestCase, create_player
+
+
+class TestSearch(ApiBaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_login(self.user)
+        self.jose = create_player(
+            User.objects.create(
+                username="jose@example.com", first_name="José", last_name="Fernandes"
+            )
+        )
+        self.joseph = create_player(
+            User.objects.create(
+                username="joseph@example.com", first_name="Joseph", last_name="Mathew"
+            )
+        )
+
+    def names(self, url: str) -> list[str]:
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        return [item["full_name"] for item in body.get("items", body)]
+
+    def test_index_is_used_on_sqlite(self) -> None:
+        self.assertTrue(search.is_available())
+
+    def test_players_are_ranked_and_typos_still_match(self) -> None:
+        # Accents are folded, and the closer name ranks first
+        self.assertEqual(
+            self.names("/api/players/search?text=jose"), ["José Fernandes", "Joseph Mathew"]
+        )
+        self.assertEqual(self.names("/api/players/search?text=Fernandse")[0], "José Fernandes")
+        self.assertEqual(self.names("/api/players/search?text=williamsn"), ["John Williamson"])
+        self.assertEqual(self.names("/api/players/search?text=xyz"), [])
+        # Too short for a trigram: names starting with it
+        self.assertEqual(
+            self.names("/api/players/search?text=jo"),
+            ["John Williamson", "José Fernandes", "Joseph Mathew"],
+        )
+        # Or with a later word starting with it, so last names autocomplete too
+        self.assertEqual(self.names("/api/players/search?text=fe"), ["José Fernandes"])
+
+    def test_index_follows_saves_and_deletes(self) -> None:
+        user = self.jose.user
+        user.first_name = "Jyoti"
+        user.save()
+        self.assertEqual(self.names("/api/players/search?text=jyoti"), ["Jyoti Fernandes"])
+        self.assertNotIn("José Fernandes", self.names("/api/players/search?text=jose"))
+
+        self.jose.delete()
+        self.assertEqual(self.names("/api/players/search?text=jyoti"), [])
+        self.assertEqual(
+            [u["username"] for u in self.client.get("/api/users/search?text=jyoti").json()],
+            ["jose@example.com"],
+        )
+
+        Team.objects.create(name="Chennai Heat", city="Chennai")
+        response = self.client.get("/api/teams/search?text=chenai")
+        self.assertEqual([t["name"] for t in response.json()["items"]], ["Chennai Heat"])
+
+    def test_rebuild_restores_writes_that_skipped_the_signals(self) -> None:
+        Player.objects.filter(id=self.joseph.id).update(city="Kochi")
+        User.objects.filter(id=self.joseph.user_id).update(last_name="Kurian")
+        self.assertEqual(self.names("/api/players/search?text=kurian"), [])
+
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("Indexed 3 players", out.getvalue())
+        self.assertEqual(self.names("/api/players/search?text=kurian"), ["Joseph Kurian"])
+        self.assertEqual(self.names("/api/players/search?text=kochi"), ["Joseph Kurian"])
+
+    def test_search_does_not_scan_the_player_table(self) -> None:
+        queries: list[str] = []
+
+        def record(execute: Any, sql: str, params: Any, many: bool, context: Any) -> Any:
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            list(search.search_players("fernandes"))
+        self.assertIn("MATCH", queries[0])
+        self.assertNotIn("LIKE", " ".join(queries))
+
+    def test_falls_back_without_the_index(self) -> None:
+        with patch.object(search, "is_available", return_value=False):
+            self.assertEqual([p.id for p in search.search_players("fernandes")], [self.jose.id])
+            self.assertEqual([u.id for u in search.search_users("joseph@")], [self.joseph.user_id])
+            # The text goes to the database as typed, for it to compare accents itself
+            self.assertEqual([p.id for p in search.search_players("José")], [self.jose.id])
+            self.assertEqual([p.id for p in search.search_players("mathew")], [self.joseph.id])
@@ -316,6 +316,24 @@ class PoolThreeWayTieBreakTests(ApiBaseTestCase):
         self.assertEqual(results[self.team_a.id]["rank"], 2)
         self.assertEqual(results[self.team_c.id]["rank"], 3)
 
+    def test_tie_break_restarts_reuse_one_read_of_the_stage(self) -> None:
+        """Ranking the final game costs one Match read however often the tie restarts."""
+        matches = [
+            self._play(self.team_a, self.team_b, 10, 15, pool=self.pool),
+            self._play(self.team_b, self.team_c, 10, 15, pool=self.pool),
+            self._play(self.team_c, self.team_a, 10, 15, pool=self.pool),
+            self._play(self.team_a, self.team_d, 15, 5, pool=self.pool),
+            self._play(self.team_b, self.team_d, 15, 10, pool=self.pool),
+        ]
+        results, seeding = self._run_pool(matches)
+        final = self._play(self.team_c, self.team_d, 15, 10, pool=self.pool)
+
+        with self.assertNumQueries(1):
+            results, seeding = get_new_pool_results(results, final, [1, 2, 3, 4], seeding)
+
+        ranks = [results[team.id]["rank"] for team in (self.team_a, self.team_c, self.team_b)]
+        self.assertEqual(ranks, [1, 2, 3])
+
     def test_sort_tied_teams_fully_tied_group_keeps_order(self) -> None:
         tied = [
             {"id": self.team_a.id, "GF": 30, "GA": 30},
@@ -395,6 +413,22 @@ class SwissTieBreakRestartTests(ApiBaseTestCase):
             [self.team_a.id, self.team_b.id, self.team_c.id],
         )
 
+    def test_tie_break_restarts_reuse_one_read_of_the_round(self) -> None:
+        self._swiss_match(self.team_a, self.team_b, 15, 10)
+        self._swiss_match(self.team_b, self.team_c, 15, 10)
+        self._swiss_match(self.team_c, self.team_a, 15, 10)
+        self._swiss_match(self.team_a, self.team_d, 15, 10)
+        self._swiss_match(self.team_b, self.team_e, 15, 10)
+        self._swiss_match(self.team_c, self.team_f, 15, 10)
+        all_results = {
+            team.id: {"wins": 2, "draws": 0, "losses": 1, "GF": 40, "GA": 35}
+            for team in (self.team_a, self.team_b, self.team_c)
+        }
+        tied = [{"id": tid, **stats} for tid, stats in all_results.items()]
+
+        with self.assertNumQueries(1):
+            sort_swiss_tied_teams(tied, all_results, self.swiss_round)
+
     def test_bye_reranks_with_swiss_tiebreakers(self) -> None:
         """apply_bye must rank with H2H/opp-strength, not raw goal difference."""
         self._swiss_match(self.team_a, self.team_b, 15, 13)
@@ -1,10 +1,37 @@
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, cast
+from unittest import mock
+
 from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.mail import EmailMultiAlternatives
-from django.test import TestCase
-
-from server.task.helpers import queue_emails
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from prometheus_client import REGISTRY
+
+from server.core.models import Player, User
+from server.task.helpers import (
+    count_queued_emails,
+    count_queued_recipients,
+    queue_bulk_emails,
+    queue_emails,
+)
 from server.task.manager import TaskManager
 from server.task.models import Task
+from server.task.wakeup import WakeupChannel
+
+
+class RejectingEmailBackend(EmailBackend):
+    """locmem backend that refuses mail to anyone at reject.example.com"""
+
+    def send_messages(self, messages: Any) -> int:
+        for message in messages:
+            if any(to.endswith("@reject.example.com") for to in message.to):
+                raise ConnectionError(f"Recipient refused: {message.to[0]}")
+        return super().send_messages(messages)
 
 
 class TestTaskQueue(TestCase):
@@ -47,6 +74,62 @@ class TestTaskQueue(TestCase):
                 self.assertEqual(second_next_task.id, task2.id)
                 self.assertNotEqual(second_next_task.id, task1.id)
 
+    def test_claim_tasks_in_batches(self) -> None:
+        """Test claiming several tasks at once, oldest first"""
+        tasks = [
+            TaskManager.add_task(task_type=Task.TaskType.SEND_EMAIL, data={"n": i})
+            for i in range(5)
+        ]
+
+        # Select, claim and fetch, inside one savepoint
+        with self.assertNumQueries(5):
+            first = TaskManager.claim_tasks(3)
+        self.assertEqual([task.id for task in first], [task.id for task in tasks[:3]])
+        self.assertTrue(all(task.started_at for task in first))
+
+        second = TaskManager.claim_tasks(3)
+        self.assertEqual([task.id for task in second], [task.id for task in tasks[3:]])
+
+        self.assertEqual(TaskManager.claim_tasks(3), [])
+
+    def test_add_task_wakes_worker(self) -> None:
+        """Test that enqueueing a task wakes a waiting worker once it is committed"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "worker.sock")
+            with override_settings(TASK_WORKER_WAKEUP_SOCKET=path):
+                wakeup = WakeupChannel()
+                try:
+                    self.assertFalse(wakeup.wait(0))
+
+                    with self.captureOnCommitCallbacks(execute=True):
+                        for _ in range(3):
+                            TaskManager.add_task(task_type=Task.TaskType.SEND_EMAIL, data={})
+                        self.assertFalse(wakeup.wait(0))
+
+                    self.assertTrue(wakeup.wait(1))
+                    # All the wakeups were consumed together
+                    self.assertFalse(wakeup.wait(0))
+                finally:
+                    wakeup.close()
+
+    def test_execute_records_metrics(self) -> None:
+        """Test that running a task through the manager is counted by type and outcome"""
+        labels = {"type": "INVALID_TYPE", "status": "failed"}
+        before = REGISTRY.get_sample_value("hub_tasks_processed_total", labels) or 0
+
+        Task.objects.create(type="INVALID_TYPE", data={})
+        task = TaskManager.get_next_task()
+        self.assertIsNotNone(task)
+        TaskManager.execute(cast(Task, task))
+
+        self.assertEqual(REGISTRY.get_sample_value("hub_tasks_processed_total", labels), before + 1)
+        self.assertEqual(
+            REGISTRY.get_sample_value("hub_task_duration_seconds_count", {"type": "INVALID_TYPE"}),
+            REGISTRY.get_sample_value(
+                "hub_task_queue_latency_seconds_count", {"type": "INVALID_TYPE"}
+            ),
+        )
+
     def test_task_stats(self) -> None:
         """Test getting task statistics"""
         TaskManager.add_task(task_type=Task.TaskType.SEND_EMAIL, data={})
@@ -60,6 +143,35 @@ class TestTaskQueue(TestCase):
         self.assertEqual(stats["failed"], 0)
         self.assertEqual(stats["total"], 2)
 
+    def test_task_stats_by_type(self) -> None:
+        """Test that task statistics are broken down by type in a single query"""
+        TaskManager.add_task(task_type=Task.TaskType.SEND_EMAIL, data={})
+        Task.objects.create(type=Task.TaskType.SEND_EMAIL, data={}, attempts=1)
+        Task.objects.create(type=Task.TaskType.SEND_BULK_EMAIL, data={}, started_at=timezone.now())
+        Task.objects.create(
+            type=Task.TaskType.SEND_BULK_EMAIL,
+            data={},
+            started_at=timezone.now(),
+            failed_at=timezone.now(),
+        )
+
+        with self.assertNumQueries(1):
+            stats = TaskManager.get_task_stats()
+
+        self.assertEqual(stats["pending"], 1)
+        self.assertEqual(stats["retrying"], 1)
+        self.assertEqual(stats["running"], 1)
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["total"], 4)
+        self.assertEqual(
+            stats["by_type"][Task.TaskType.SEND_EMAIL],
+            {"pending": 1, "retrying": 1, "running": 0, "completed": 0, "failed": 0, "total": 2},
+        )
+        self.assertEqual(
+            stats["by_type"][Task.TaskType.SEND_BULK_EMAIL],
+            {"pending": 0, "retrying": 0, "running": 1, "completed": 0, "failed": 1, "total": 2},
+        )
+
     def test_send_email_task(self) -> None:
         """Test sending an email through the task queue"""
         email = EmailMultiAlternatives(
@@ -172,3 +284,177 @@ class TestTaskQueue(TestCase):
         task.save()
         task_str = str(task)
         self.assertIn("completed", task_str)
+
+    def make_emails(self, recipients: list[str]) -> list[EmailMultiAlternatives]:
+        return [
+            EmailMultiAlternatives(
+                subject=f"Email {i}",
+                body=f"Body {i}",
+                from_email="from@example.com",
+                to=[recipient],
+            )
+            for i, recipient in enumerate(recipients)
+        ]
+
+    def test_queue_bulk_emails(self) -> None:
+        """Test that bulk emails are batched into tasks inserted together"""
+        emails = self.make_emails([f"user{i}@example.com" for i in range(5)])
+
+        with self.assertNumQueries(1):
+            tasks = queue_bulk_emails(emails, batch_size=2)
+
+        self.assertEqual(len(tasks), 3)
+        self.assertTrue(all(task.id for task in tasks))
+        self.assertTrue(all(task.type == Task.TaskType.SEND_BULK_EMAIL for task in tasks))
+        self.assertEqual([len(task.data["messages"]) for task in tasks], [2, 2, 1])
+        self.assertEqual(tasks[2].data["messages"][0]["to"], ["user4@example.com"])
+        self.assertEqual(count_queued_emails(tasks), 5)
+        self.assertEqual(count_queued_recipients(tasks), 5)
+
+    def test_run_send_bulk_email_task(self) -> None:
+        """Test that a bulk email task sends its whole batch over one connection"""
+        mail.outbox = []
+        tasks = queue_bulk_emails(self.make_emails([f"user{i}@example.com" for i in range(4)]))
+
+        with mock.patch(
+            "server.task.email_tasks.mail.get_connection", wraps=mail.get_connection
+        ) as get_connection:
+            tasks[0].run_task()
+
+        get_connection.assert_called_once()
+        tasks[0].refresh_from_db()
+        self.assertIsNotNone(tasks[0].completed_at)
+        self.assertEqual(tasks[0].result, {"sent": 4})
+        self.assertEqual(
+            [email.to for email in mail.outbox], [[f"user{i}@example.com"] for i in range(4)]
+        )
+
+    @override_settings(EMAIL_BACKEND="server.tests.test_task_queue.RejectingEmailBackend")
+    def test_bulk_email_task_keeps_only_failed_recipients(self) -> None:
+        """Test that a failed bulk email task is left holding only the emails that failed"""
+        mail.outbox = []
+        recipients = ["a@example.com", "b@reject.example.com", "c@example.com"]
+        task = queue_bulk_emails(self.make_emails(recipients))[0]
+
+        task.run_task()
+
+        task.refresh_from_db()
+        self.assertIsNotNone(task.run_after)
+        self.assertIn("Failed to send 1 of 3 emails", task.error)
+        self.assertIn("b@reject.example.com", task.error)
+        self.assertEqual(
+            [email.to for email in mail.outbox], [["a@example.com"], ["c@example.com"]]
+        )
+        self.assertEqual(
+            [message["to"] for message in task.data["messages"]], [["b@reject.example.com"]]
+        )
+
+        # Running it again only tries the recipient that failed
+        mail.outbox = []
+        task.run_task()
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(len(task.data["messages"]), 1)
+
+    @override_settings(EMAIL_BACKEND="server.tests.test_task_queue.RejectingEmailBackend")
+    def test_failed_task_is_retried_with_backoff(self) -> None:
+        """Test that a failing task backs off exponentially, then moves to the dead-letter queue"""
+        task = queue_emails(self.make_emails(["a@reject.example.com"]))[0]
+        delays = []
+
+        for _ in range(4):
+            before = timezone.now()
+            task.run_task()
+            task.refresh_from_db()
+            self.assertIsNone(task.failed_at)
+            self.assertIsNone(task.started_at)
+            self.assertEqual(str(task).split()[2], "(retrying)")
+            # Not due yet, so a worker does not pick it up
+            self.assertEqual(TaskManager.claim_tasks(1), [])
+            delays.append(round((cast(datetime, task.run_after) - before).total_seconds() / 60))
+
+        self.assertEqual(delays, [1, 2, 4, 8])
+
+        task.run_task()
+        task.refresh_from_db()
+        self.assertEqual(task.attempts, 5)
+        self.assertIsNotNone(task.failed_at)
+        self.assertIn("Recipient refused", task.error)
+
+    def test_due_retries_are_claimed(self) -> None:
+        """Test that a task waiting to retry is claimed once its backoff has passed"""
+        task = Task.objects.create(
+            type=Task.TaskType.SEND_EMAIL,
+            data={},
+            attempts=1,
+            run_after=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual([claimed.id for claimed in TaskManager.claim_tasks(5)], [task.id])
+
+    def test_requeue_failed_tasks(self) -> None:
+        """Test requeueing tasks from the dead-letter queue"""
+        failed = Task.objects.create(type="INVALID_TYPE", data={})
+        failed.run_task()
+        completed = Task.objects.create(
+            type=Task.TaskType.SEND_EMAIL,
+            data={},
+            started_at=timezone.now(),
+            completed_at=timezone.now(),
+        )
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            requeued = TaskManager.requeue(Task.objects.filter(id__in=[failed.id, completed.id]))
+
+        self.assertEqual(requeued, 1)
+        self.assertEqual(len(callbacks), 1)
+        failed.refresh_from_db()
+        self.assertIsNone(failed.failed_at)
+        self.assertEqual(failed.attempts, 0)
+        self.assertEqual(failed.error, "")
+        self.assertEqual([claimed.id for claimed in TaskManager.claim_tasks(5)], [failed.id])
+
+    def test_csv_import_runs_as_a_task(self) -> None:
+        """The admin's CSV import page queues imports, and their report is the task's result"""
+        admin = User.objects.create_superuser(username="admin", email="admin@example.com")
+        self.client.force_login(admin)
+        header = (
+            "first_name,last_name,email,phone,date_of_birth,gender,other_gender,city,state_ut,"
+            "not_in_india,occupation,educational_institution,guardian.first_name,"
+            "guardian.last_name,guardian.email,guardian.phone,guardian.relation"
+        )
+        rows = [
+            f"Player,{i},player{i}@example.com,98{i:08d},2001-01-01,Male,,Pune,Maharashtra,"
+            "N,Student,,,,,,"
+            for i in range(3)
+        ]
+        content = "\n".join([header, *rows]).encode()
+
+        for dry_run in (True, False):
+            data: dict[str, Any] = {
+                "action": "import_players",
+                "csv_file": SimpleUploadedFile("players.csv", content),
+            }
+            if dry_run:
+                data["dry_run"] = "on"
+            response = self.client.post("/admin/csv-imports/", data)
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(Player.objects.count(), 0)
+
+            task = Task.objects.filter(type=Task.TaskType.IMPORT_CSV).latest("id")
+            self.assertEqual(task.data["dry_run"], dry_run)
+            self.assertEqual(len(task.data["rows"]), 3)
+            with mock.patch("server.lib.imports.BATCH_SIZE", 2):
+                TaskManager.execute(task)
+
+            task.refresh_from_db()
+            self.assertIsNotNone(task.completed_at)
+            self.assertEqual(task.result["created"], {"users": 3, "players": 3})
+            self.assertEqual(task.result["errors"], [])
+        self.assertEqual(Player.objects.count(), 3)
+
+    def test_csv_import_reports_progress(self) -> None:
+        task = Task.objects.create(type=Task.TaskType.IMPORT_CSV)
+        task.report_progress("Checking rows", 500, 5000)
+        task.refresh_from_db()
+        self.assertEqual(
+            task.result, {"progress": {"stage": "Checking rows", "done": 500, "total": 5000}}
+        )
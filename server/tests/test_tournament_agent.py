@@ -2,25 +2,30 @@
 
 from __future__ import annotations
 
+import hashlib
 import inspect
 import json
 import re
 import threading
+import time
 from collections import defaultdict
 from collections.abc import Iterator
 from datetime import datetime, timedelta
-from itertools import pairwise
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import combinations, pairwise
 from pathlib import Path
 from typing import Any, cast
 from unittest.mock import MagicMock, patch
 
 import httpx
 from django.conf import settings
+from django.core.cache import caches
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.db import DatabaseError
+from django.db import DatabaseError, transaction
 from django.http import StreamingHttpResponse
-from django.test import Client, TestCase
+from django.test import Client, SimpleTestCase, TestCase, override_settings
 from django.utils.dateparse import parse_datetime
+from prometheus_client import REGISTRY
 
 from server.core.models import Player, Team, User
 from server.tests.base import ApiBaseTestCase, create_event, not_none
@@ -51,9 +56,11 @@ from server.tournament_agent.clients.opencode import (
     OpenCodeGoClient,
     OpenCodeGoError,
     StreamChunk,
+    _responses_body,
     _with_idle_pings,
     forced_tools_disabled_for,
 )
+from server.tournament_agent.clients.transport import close_http_client, get_http_client
 from server.tournament_agent.domain.format import (
     bracket_match_plan,
     canonical_stage_name,
@@ -66,7 +73,13 @@ from server.tournament_agent.domain.next_step import (
     next_step_for,
 )
 from server.tournament_agent.domain.phase import Phase, phase_for
-from server.tournament_agent.domain.scheduler import recommend_schedule
+from server.tournament_agent.domain.scheduler import (
+    ENGINES,
+    MAX_TIME_BUDGET_SECS,
+    IntervalIndex,
+    StageProblem,
+    recommend_schedule,
+)
 from server.tournament_agent.domain.state import build_snapshot, render_state
 from server.tournament_agent.models import (
     AgentProposal,
@@ -93,12 +106,15 @@ from server.tournament_agent.privacy.mask import (
     scrub_user_text,
 )
 from server.tournament_agent.services.agent import (
+    BASE_PROMPT,
     KEEP_RECENT_MESSAGES,
     TournamentAgentService,
     _compact_model_turns,
     budget_refusal,
+    round_cached_tokens,
     round_tokens,
     strip_phantom_proposal_ids,
+    system_prompt_prefix,
 )
 from server.tournament_agent.services.proposals import (
     ProposalApplyError,
@@ -111,8 +127,10 @@ from server.tournament_agent.tools import (
     TOOL_DEFINITIONS,
     AskUserPause,
     ToolContext,
+    ToolHandler,
     ask_user,
     check_schedule_conflicts,
+    dispatch_reads,
     dispatch_tool,
     find_roster_player,
     get_match_spirit,
@@ -142,6 +160,9 @@ from server.tournament_agent.tools import (
     propose_update_seeding,
 )
 
+# The shared client every provider call goes through, for tests to swap out
+GET_HTTP_CLIENT = "server.tournament_agent.clients.opencode.get_http_client"
+
 
 def model_messages(
     service: TournamentAgentService, session: TournamentAgentSession
@@ -565,6 +586,46 @@ class TournamentAgentToolTests(TestCase):
             AgentProposal.objects.filter(tool_name="propose_recommended_schedule").exists()
         )
 
+    def test_recommended_schedule_takes_the_engine_and_time_budget(self) -> None:
+        propose_create_pool(self.ctx, name="A", sequence_number=1, seeding=[1, 2, 3, 4])
+        apply_proposal(AgentProposal.objects.filter(session=self.session).latest("id"))
+        result = propose_recommended_schedule(
+            self.ctx, start_date="2026-08-01", engine="simulated_annealing"
+        )
+        self.assertIn("Unknown scheduling engine", result["error"])
+
+        result = propose_recommended_schedule(
+            self.ctx,
+            start_date="2026-08-01",
+            end_date="2026-08-02",
+            engine="greedy",
+            time_budget_secs=0.5,
+        )
+        proposal = AgentProposal.objects.get(id=result["proposal_id"])
+        self.assertEqual(proposal.payload["meta"]["engine"], "greedy")
+        self.assertEqual(proposal.payload["meta"]["time_budget_secs"], 0.5)
+
+    def test_recommended_schedule_caps_the_time_budget(self) -> None:
+        propose_create_pool(self.ctx, name="A", sequence_number=1, seeding=[1, 2, 3, 4])
+        apply_proposal(AgentProposal.objects.filter(session=self.session).latest("id"))
+
+        result = propose_recommended_schedule(
+            self.ctx,
+            start_date="2026-08-01",
+            end_date="2026-08-02",
+            engine="greedy",
+            time_budget_secs=86400,
+        )
+
+        proposal = AgentProposal.objects.get(id=result["proposal_id"])
+        self.assertEqual(proposal.payload["meta"]["time_budget_secs"], MAX_TIME_BUDGET_SECS)
+        schema = next(
+            tool["function"]["parameters"]["properties"]["time_budget_secs"]
+            for tool in TOOL_DEFINITIONS
+            if tool["function"]["name"] == "propose_recommended_schedule"
+        )
+        self.assertEqual(schema["maximum"], MAX_TIME_BUDGET_SECS)
+
 
 class SnakeAndBracketConventionTests(TestCase):
     """India Ultimate defaults the model used to invent: snake pools, full placement brackets."""
@@ -1006,6 +1067,46 @@ class TournamentAgentServiceTests(TestCase):
         ui = self.service.history(session)
         self.assertGreater(len(ui["messages"]), KEEP_RECENT_MESSAGES)
 
+    def test_digest_is_folded_once_and_kept_on_the_session(self) -> None:
+        session = self.service.get_or_create_session(self.tournament.id)
+        for i in range(KEEP_RECENT_MESSAGES + 4):
+            TournamentAgentMessage.objects.create(
+                session=session, role="user", content=f"old user {i}"
+            )
+        model_messages(self.service, session)
+        session.refresh_from_db()
+        self.assertEqual(session.history_digest_count, 4)
+        self.assertIn("Staff: old user 3", session.history_digest)
+
+        # Folded rows are not read again: the digest keeps what they said then
+        TournamentAgentMessage.objects.filter(content="old user 0").update(content="rewritten")
+        TournamentAgentMessage.objects.create(session=session, role="user", content="newest")
+        messages = model_messages(self.service, session)
+        self.assertIn("Staff: old user 0", messages[0]["content"])
+        self.assertIn("(5 messages compacted)", messages[0]["content"])
+        self.assertEqual(len(messages) - 1, KEEP_RECENT_MESSAGES)
+        self.assertEqual(messages[-1]["content"], "newest")
+
+        self.service.clear_session(session)
+        messages = model_messages(self.service, session)
+        self.assertNotIn("Earlier conversation (compacted)", messages[0]["content"])
+
+    def test_system_prompt_prefix_is_shared_while_the_skills_are_unchanged(self) -> None:
+        first = system_prompt_prefix(self.tournament, "schedule", "no_stages")
+        again = system_prompt_prefix(self.tournament, "schedule", "no_stages")
+        self.assertIs(again, first)
+        self.assertEqual(first.digest, hashlib.sha256(first.text.encode()).hexdigest())
+
+        session = self.service.get_or_create_session(self.tournament.id)
+        TournamentAgentMessage.objects.create(session=session, role="user", content="hi")
+        system = model_messages(self.service, session)[0]
+        prefix = system["content"][: system["cache_prefix_chars"]]
+        self.assertTrue(prefix.startswith(BASE_PROMPT))
+        self.assertEqual(
+            system["cache_key"],
+            f"tournament-agent:{hashlib.sha256(prefix.encode()).hexdigest()[:16]}",
+        )
+
     def test_compact_helper_leaves_short_transcripts_alone(self) -> None:
         turns = [
             {"role": "user", "content": "pools?"},
@@ -1285,6 +1386,120 @@ class ToolEventTests(TestCase):
         self.assertIn("proposal_id", event)
         self.assertIn("Proposal #", event["summary"])
 
+    def test_reads_around_a_proposal_keep_call_order(self) -> None:
+        calls = [
+            {"name": "list_fields", "id": "tc1", "arguments": "{}"},
+            {"name": "list_stages", "id": "tc2", "arguments": "{}"},
+            {"name": "propose_create_field", "id": "tc3", "arguments": '{"name": "Field 2"}'},
+            {"name": "list_proposals", "id": "tc4", "arguments": "{}"},
+        ]
+        rounds = [self._mock_round("", calls), self._mock_round("Proposed Field 2.", [])]
+        with patch.object(self.service.client, "chat", side_effect=rounds) as chat:
+            out = self.service.process_message(self.session, "add a second field")
+
+        self.assertEqual([e["name"] for e in out["tool_events"]], [tc["name"] for tc in calls])
+        replies = [m for m in chat.call_args_list[1].kwargs["messages"] if m["role"] == "tool"]
+        self.assertEqual([m["tool_call_id"] for m in replies], ["tc1", "tc2", "tc3", "tc4"])
+        # The read after the proposal sees it
+        self.assertIn(str(out["tool_events"][2]["proposal_id"]), replies[3]["content"])
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "tournament": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+)
+class ToolReadCacheTests(TestCase):
+    """Reads repeat within a turn from memory until the tournament changes."""
+
+    def setUp(self) -> None:
+        caches["tournament"].clear()
+        self.user = User.objects.create(username="staff-reads", is_staff=True)
+        self.event = create_event(title="Reads Open")
+        self.tournament = Tournament.objects.create(
+            event=self.event, status=Tournament.Status.SCHEDULING
+        )
+        TournamentField.objects.create(tournament=self.tournament, name="Field 1")
+        self.service = TournamentAgentService(self.user)
+        self.session = self.service.get_or_create_session(self.tournament.id)
+        self.ctx = ToolContext(session=self.session, tournament=self.tournament)
+
+    def _round(self, content: str, tool_calls: list[dict[str, str]]) -> MagicMock:
+        result = MagicMock()
+        result.content = content
+        result.tool_calls = tool_calls
+        result.finish_reason = "tool_calls" if tool_calls else "stop"
+        return result
+
+    def test_repeated_reads_in_a_turn_are_counted_on_the_turn(self) -> None:
+        read = [{"name": "list_stages", "id": "tc1", "arguments": "{}"}]
+        rounds = [self._round("", read), self._round("", read), self._round("No stages.", [])]
+        with patch.object(self.service.client, "chat", side_effect=rounds):
+            self.service.process_message(self.session, "what stages are there?")
+
+        turn = AgentTurn.objects.get(session=self.session)
+        self.assertEqual((turn.read_cache_hits, turn.read_cache_misses), (1, 1))
+
+    def test_a_committed_write_is_read_fresh(self) -> None:
+        self.assertEqual(len(dispatch_tool(self.ctx, "list_fields", {})["fields"]), 1)
+        with self.assertNumQueries(0):
+            dispatch_tool(self.ctx, "list_fields", {})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TournamentField.objects.create(tournament=self.tournament, name="Field 2")
+
+        self.assertEqual(len(dispatch_tool(self.ctx, "list_fields", {})["fields"]), 2)
+        self.assertEqual((self.ctx.reads.hits, self.ctx.reads.misses), (1, 2))
+
+    def test_a_new_proposal_clears_the_cache(self) -> None:
+        dispatch_tool(self.ctx, "list_fields", {})
+        dispatch_tool(self.ctx, "propose_create_field", {"name": "Field 2"})
+        dispatch_tool(self.ctx, "list_fields", {})
+        self.assertEqual((self.ctx.reads.hits, self.ctx.reads.misses), (0, 2))
+
+    def test_arguments_are_part_of_the_key(self) -> None:
+        dispatch_tool(self.ctx, "list_matches", {"unscheduled_only": True})
+        dispatch_tool(self.ctx, "list_matches", {"unscheduled_only": False})
+        dispatch_tool(self.ctx, "list_matches", {"unscheduled_only": True})
+        self.assertEqual((self.ctx.reads.hits, self.ctx.reads.misses), (1, 2))
+
+
+class ParallelReadTests(SimpleTestCase):
+    """Reads from one round run together, outside any transaction."""
+
+    def test_reads_run_concurrently_and_return_in_call_order(self) -> None:
+        both_running = threading.Barrier(2, timeout=5)
+
+        def slow_fields(ctx: ToolContext) -> dict[str, Any]:
+            both_running.wait()
+            return {"fields": []}
+
+        def slow_stages(ctx: ToolContext) -> dict[str, Any]:
+            both_running.wait()
+            raise ValueError("no stages")
+
+        ctx = ToolContext(session=MagicMock(), tournament=MagicMock(id=1))
+        handlers = {"list_fields": slow_fields, "list_stages": slow_stages}
+        with patch.dict(HANDLERS, handlers):
+            runs = dispatch_reads(ctx, [("list_stages", {}), ("list_fields", {})])
+
+        self.assertIsInstance(runs[0].error, ValueError)
+        self.assertEqual(runs[1].result, {"fields": []})
+
+    @override_settings(TOURNAMENT_AGENT_TOOL_WORKERS=1)
+    def test_one_worker_runs_reads_in_order(self) -> None:
+        order: list[str] = []
+
+        def record(name: str) -> ToolHandler:
+            return lambda ctx: order.append(name)
+
+        ctx = ToolContext(session=MagicMock(), tournament=MagicMock(id=1))
+        handlers = {"list_fields": record("list_fields"), "list_stages": record("list_stages")}
+        with patch.dict(HANDLERS, handlers):
+            dispatch_reads(ctx, [("list_stages", {}), ("list_fields", {})])
+        self.assertEqual(order, ["list_stages", "list_fields"])
+
 
 def _sse_response(lines: list[str]) -> MagicMock:
     """A fake httpx streaming response whose body is the given SSE lines."""
@@ -1310,9 +1525,8 @@ class ProviderStreamParsingTests(TestCase):
     def _client(self) -> OpenCodeGoClient:
         return OpenCodeGoClient(api_key="test-key", base_url="https://example.invalid/v1")
 
-    # Styles that deliver text incrementally. `responses` does not: `chat_stream`
-    # blocks on the full reply and emits it as a single chunk.
-    INCREMENTAL_STYLES = frozenset({"openai", "anthropic"})
+    # Styles that deliver text incrementally.
+    INCREMENTAL_STYLES = frozenset({"openai", "anthropic", "responses"})
     # A default on a buffered style is a trade, not an accident — staff see a
     # spinner then the whole reply. Recorded here so changing the default to some
     # other non-streaming model fails until someone decides that on purpose.
@@ -1352,7 +1566,7 @@ class ProviderStreamParsingTests(TestCase):
         http_client.__exit__.return_value = False
         http_client.post.return_value = resp
         client = self._client()
-        with patch("httpx.Client", return_value=http_client):
+        with patch(GET_HTTP_CLIENT, return_value=http_client):
             result = client.chat(
                 model_id="gpt-5.6-luna",
                 messages=[
@@ -1499,6 +1713,123 @@ class ProviderStreamParsingTests(TestCase):
         self.assertEqual(result.tool_calls[0]["name"], "propose_create_pool")
         self.assertEqual(result.tool_calls[0]["arguments"], '{"name":"A"}')
 
+    def _recorded(self, name: str) -> list[str]:
+        return (Path(__file__).parent / "fixtures" / name).read_text().splitlines()
+
+    def test_responses_stream_text_and_function_calls(self) -> None:
+        client = self._client()
+        lines = self._recorded("responses-stream-tool-call.sse")
+        with patch("httpx.Client.stream", return_value=_sse_response(lines)) as stream:
+            chunks = list(
+                client.chat_stream(
+                    model_id=_model_id_for_style("responses"), messages=[{"role": "user"}]
+                )
+            )
+
+        self.assertTrue(str(stream.call_args.args[1]).endswith("/responses"))
+        self.assertTrue(stream.call_args.kwargs["json"]["stream"])
+        texts = [c.text for c in chunks if c.type == "text"]
+        self.assertEqual(texts, ["Checking", " the fields"])
+
+        result = not_none(chunks[-1].result)
+        self.assertEqual(result.content, "Checking the fields")
+        self.assertEqual(result.finish_reason, "completed")
+        self.assertEqual(
+            result.tool_calls,
+            [
+                {
+                    "id": "call_fields",
+                    "name": "list_fields",
+                    "arguments": '{"day": "2026-08-01"}',
+                },
+                {"id": "call_stages", "name": "list_stages", "arguments": "{}"},
+            ],
+        )
+        self.assertEqual(result.tokens, (812, 64))
+
+    def test_responses_stream_raises_on_failure(self) -> None:
+        lines = self._recorded("responses-stream-failed.sse")
+        with (
+            patch("httpx.Client.stream", return_value=_sse_response(lines)),
+            self.assertRaises(OpenCodeGoError) as caught,
+        ):
+            list(
+                self._client().chat_stream(
+                    model_id=_model_id_for_style("responses"), messages=[{"role": "user"}]
+                )
+            )
+        self.assertIn("The model failed to generate a response.", str(caught.exception))
+
+
+class _StubGatewayHandler(BaseHTTPRequestHandler):
+    """Answers every POST with a one-line chat completion, keeping the connection open."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.peers.append(self.client_address)  # type: ignore[attr-defined]
+        body = json.dumps({"choices": [{"message": {"content": "pong"}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class PooledTransportTests(TestCase):
+    """Provider calls share one keep-alive connection pool, against a local stub."""
+
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubGatewayHandler)
+        self.server.peers = []  # type: ignore[attr-defined]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        close_http_client()
+        self.addCleanup(close_http_client)
+
+    def _chat(self, client: OpenCodeGoClient) -> ChatCompletionResult:
+        return client.chat(
+            model_id=_model_id_for_style("openai"),
+            messages=[{"role": "user", "content": "ping"}],
+        )
+
+    def test_rounds_and_sessions_reuse_one_connection(self) -> None:
+        base_url = f"http://127.0.0.1:{self.server.server_port}/v1"
+        labels = {"endpoint": "chat/completions"}
+        connects = REGISTRY.get_sample_value("hub_opencode_request_connect_seconds_count", labels)
+        requests = REGISTRY.get_sample_value("hub_opencode_request_seconds_count", labels)
+
+        for _ in range(3):
+            # A new client per call, as each agent session builds its own
+            client = OpenCodeGoClient(api_key="test-key", base_url=base_url)
+            self.assertEqual(self._chat(client).content, "pong")
+
+        peers = self.server.peers  # type: ignore[attr-defined]
+        self.assertEqual(len(peers), 3)
+        self.assertEqual(len(set(peers)), 1)
+        self.assertEqual(
+            REGISTRY.get_sample_value("hub_opencode_request_connect_seconds_count", labels),
+            (connects or 0) + 1,
+        )
+        self.assertEqual(
+            REGISTRY.get_sample_value("hub_opencode_request_seconds_count", labels),
+            (requests or 0) + 3,
+        )
+        self.assertIsNotNone(
+            REGISTRY.get_sample_value("hub_opencode_request_ttfb_seconds_count", labels)
+        )
+
+    def test_a_closed_client_is_replaced(self) -> None:
+        first = get_http_client()
+        self.assertIs(get_http_client(), first)
+        close_http_client()
+        self.assertIsNot(get_http_client(), first)
+
 
 class AgentEventStreamTests(TestCase):
     """_run_agent_events emits the event sequence the UI renders from."""
@@ -2261,6 +2592,101 @@ class SchedulerConstraintTests(TestCase):
         naive = bracket_first.replace(tzinfo=None) if bracket_first.tzinfo else bracket_first
         self.assertGreaterEqual((naive.hour, naive.minute), (8, 15))
 
+    def test_off_grid_match_blocks_the_slots_it_overlaps(self) -> None:
+        field = not_none(
+            TournamentField.objects.filter(tournament=self.tournament).order_by("name").first()
+        )
+        pool_match = not_none(
+            Match.objects.filter(tournament=self.tournament, pool__isnull=False)
+            .order_by("id")
+            .first()
+        )
+        pool_match.time = parse_datetime("2026-08-01T07:30:00+00:00")
+        pool_match.field = field
+        pool_match.save()
+        placements = self._placements(end_date="2026-08-01")
+        on_field = [self._start(p) for p in placements.values() if p["field_id"] == field.id]
+        for start in on_field:
+            naive = start.replace(tzinfo=None) if start.tzinfo else start
+            self.assertGreaterEqual((naive.hour, naive.minute), (8, 45))
+
+    def test_unknown_engine_places_nothing(self) -> None:
+        result = recommend_schedule(
+            tournament=self.tournament, start_date="2026-08-01", engine="simulated_annealing"
+        )
+        self.assertEqual(result["assignments"], [])
+        self.assertIn("Unknown scheduling engine", result["notes"])
+
+
+class SchedulingEngineTests(TestCase):
+    """The engines on a synthetic grid, without the database."""
+
+    def _problem(self, pools: int, size: int, fields: int, slots: int) -> StageProblem:
+        keys: dict[int, list[str]] = {}
+        for pool in range(pools):
+            for a, b in combinations(range(size), 2):
+                keys[len(keys) + 1] = [f"team:{pool}-{a}", f"team:{pool}-{b}"]
+        first = datetime(2026, 8, 1, 7)  # noqa: DTZ001
+        return StageProblem(
+            matches=list(keys),
+            keys=keys,
+            slots=[first + timedelta(minutes=90 * i) for i in range(slots)],
+            field_ids=list(range(1, fields + 1)),
+            slot_length=timedelta(minutes=75),
+            fields=IntervalIndex(timedelta(0)),
+            rest=IntervalIndex(timedelta(minutes=60)),
+            deadline=time.monotonic() + 30,
+        )
+
+    def test_local_search_places_what_first_fit_leaves_over(self) -> None:
+        # Nationals-sized: 8 pools of 5 on 8 fields, with no room to spare
+        greedy = self._problem(pools=8, size=5, fields=8, slots=10)
+        ENGINES["greedy"](greedy)
+        self.assertLess(len(greedy.placed), len(greedy.matches))
+
+        problem = self._problem(pools=8, size=5, fields=8, slots=10)
+        ENGINES["local_search"](problem)
+        self.assertEqual(len(problem.placed), len(problem.matches))
+
+        cells = list(problem.placed.values())
+        self.assertEqual(len(set(cells)), len(cells))
+        windows: dict[str, list[datetime]] = defaultdict(list)
+        for match_id, (slot, _field_id) in problem.placed.items():
+            for key in problem.keys[match_id]:
+                windows[key].append(slot)
+        for starts in windows.values():
+            for a, b in pairwise(sorted(starts)):
+                # 75-minute games and 60 minutes' rest: never in back-to-back slots
+                self.assertGreaterEqual(b - a, timedelta(minutes=180))
+
+    def test_local_search_leaves_no_earlier_cell_idle(self) -> None:
+        problem = self._problem(pools=2, size=4, fields=4, slots=12)
+        ENGINES["local_search"](problem)
+        self.assertEqual(len(problem.placed), len(problem.matches))
+        last = max(slot for slot, _field_id in problem.placed.values())
+        for match_id, (slot, field_id) in list(problem.placed.items()):
+            problem.unplace(match_id)
+            earlier = [
+                s for s, f in problem.free_cells() if s < slot and problem.fits(match_id, s, f)
+            ]
+            problem.place(match_id, slot, field_id)
+            self.assertEqual(earlier, [])
+        self.assertLess(last, problem.slots[-1])
+
+    def test_interval_index_enforces_the_gap(self) -> None:
+        index = IntervalIndex(timedelta(minutes=60))
+        nine = datetime(2026, 8, 1, 9)  # noqa: DTZ001
+        index.add(["team:1"], nine, nine + timedelta(minutes=75))
+        hour = timedelta(hours=1)
+        self.assertFalse(index.fits(["team:1"], nine + hour, nine + 2 * hour))
+        self.assertFalse(index.fits(["team:1"], nine - 2 * hour, nine - hour + timedelta(1)))
+        self.assertTrue(index.fits(["team:1"], nine - 2 * hour, nine - hour))
+        self.assertTrue(index.fits(["team:1"], nine + timedelta(minutes=135), nine + 3 * hour))
+        self.assertTrue(index.fits(["team:2"], nine, nine + hour))
+
+        index.remove(["team:1"], nine, nine + timedelta(minutes=75))
+        self.assertTrue(index.fits(["team:1"], nine, nine + hour))
+
 
 class MatchTimeParityTests(TestCase):
     """The agent and the classic manager must write a match time identically.
@@ -2758,6 +3184,170 @@ class EvalFixtureTests(TestCase):
         self.assertTrue(scored.passed, scored.notes)
 
 
+class BakeoffRunnerTests(SimpleTestCase):
+    # Worker threads run on copies of the SQLite database, taken from this one
+    databases = {"default"}
+    CASES = [{"id": "slow"}, {"id": "medium"}, {"id": "fast"}]
+
+    def test_the_limiter_allows_a_models_whole_quota_anywhere_in_its_window(self) -> None:
+        from server.lib.ratelimit import RateLimiter
+        from server.tournament_agent.evals.clients import limiter_for
+
+        clock = [0.0]
+        waits: list[float] = []
+        limiter = RateLimiter(3, window_seconds=100, clock=lambda: clock[0], sleep=waits.append)
+        self.assertEqual([limiter.acquire() for _ in range(3)], [0.0, 0.0, 0.0])
+        clock[0] = 40.0
+        # Over quota: each waits for the call three before it to leave the window
+        self.assertEqual([limiter.acquire() for _ in range(2)], [60.0, 60.0])
+        clock[0] = 250.0
+        self.assertEqual(limiter.acquire(), 0.0)
+        self.assertEqual(waits, [60.0, 60.0])
+        luna = not_none(get_model("gpt-5.6-luna"))
+        self.assertEqual(not_none(limiter_for(luna)).per_window, luna.req_per_5h)
+
+    def test_jobs_under_quota_run_side_by_side_across_models(self) -> None:
+        from server.lib.ratelimit import RateLimiter
+        from server.tournament_agent.evals import runner
+
+        # Spread evenly, 12 calls would be 10s apart
+        models = ["glm-5.2", "hy3"]
+        limiters = {model_id: RateLimiter(6, window_seconds=60) for model_id in models}
+        started: list[str] = []
+
+        def fake_run_case(
+            case: dict[str, Any], model_id: str, user: Any, client: Any = None
+        ) -> dict[str, Any]:
+            started.append(model_id)
+            # Like run_case, each case writes its fixture in a transaction it rolls back
+            with transaction.atomic():
+                Team.objects.create(name=f"{model_id} {case['id']}", ultimate_central_id=None)
+                client.limiter.acquire()
+                time.sleep(0.02)
+                transaction.set_rollback(True)
+            return {
+                "case_id": case["id"],
+                "overall": 100.0,
+                "passed": True,
+                "scores": {},
+                "notes": [],
+                "latency_s": 0.02,
+                "safety_fail": False,
+                "trace": [],
+                "response_preview": "",
+            }
+
+        start = time.monotonic()
+        with (
+            patch.object(runner, "load_cases", return_value=self.CASES),
+            patch.object(runner, "limiters_for", return_value=limiters),
+            patch.object(runner, "run_case", side_effect=fake_run_case),
+        ):
+            results = runner.run_bakeoff(
+                model_ids=models, tier="capability", trials=2, user=MagicMock(), workers=4
+            )
+
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(results["hy3"]["pass_hat_k"], 1.0)
+        # The first jobs the four workers take go to both models, not all to one
+        self.assertEqual(set(started[:4]), set(models))
+
+    def test_the_scorecard_does_not_depend_on_completion_order(self) -> None:
+        from server.tournament_agent.evals import runner
+
+        def fake_run_case(
+            case: dict[str, Any], model_id: str, user: Any, client: Any = None
+        ) -> dict[str, Any]:
+            # The first case submitted is the last to finish
+            time.sleep({"slow": 0.06, "medium": 0.03, "fast": 0.0}[case["id"]])
+            client.recorded.append({"content": f"{model_id} {case['id']}", "tool_calls": []})
+            return {
+                "case_id": case["id"],
+                "overall": 100.0 if case["id"] != "fast" else 0.0,
+                "passed": case["id"] != "fast",
+                "scores": {},
+                "notes": [],
+                "latency_s": 1.0,
+                "safety_fail": False,
+                "trace": [],
+                "response_preview": "",
+            }
+
+        recordings: dict[str, Any] = {}
+        with (
+            patch.object(runner, "load_cases", return_value=self.CASES),
+            patch.object(runner, "run_case", side_effect=fake_run_case),
+        ):
+            results = runner.run_bakeoff(
+                model_ids=["glm-5.2", "hy3"],
+                tier="capability",
+                trials=2,
+                user=MagicMock(),
+                workers=4,
+                recordings=recordings,
+            )
+
+        self.assertEqual(list(results), ["glm-5.2", "hy3"])
+        cases = [(c["trial"], c["case_id"]) for c in results["hy3"]["cases"]]
+        self.assertEqual(cases, [(t, c["id"]) for t in range(2) for c in self.CASES])
+        self.assertAlmostEqual(results["hy3"]["suite_score"], 200 / 3)
+        self.assertEqual(results["hy3"]["pass_hat_k"], 0.0)
+        self.assertEqual(
+            recordings["hy3"]["medium#1"], [{"content": "hy3 medium", "tool_calls": []}]
+        )
+
+    def test_a_replayed_case_answers_from_its_recording(self) -> None:
+        from server.tournament_agent.evals import runner
+
+        def fake_run_case(
+            case: dict[str, Any], model_id: str, user: Any, client: Any = None
+        ) -> dict[str, Any]:
+            replies = [
+                client.chat(model_id=model_id, messages=[{"role": "user", "content": "hi"}])
+                for _ in range(2)
+            ]
+            return {
+                "case_id": case["id"],
+                "overall": 100.0,
+                "passed": True,
+                "scores": {},
+                "notes": [],
+                "latency_s": 0.0,
+                "safety_fail": False,
+                "trace": [],
+                "response_preview": " / ".join(r.content for r in replies),
+            }
+
+        recordings: dict[str, Any] = {
+            "glm-5.2": {
+                "slow#0": [
+                    {"content": "first", "tool_calls": [], "usage": {"prompt_tokens": 5}},
+                    {"content": "second", "tool_calls": []},
+                ],
+                "medium#0": [{"content": "only one", "tool_calls": []}],
+            }
+        }
+        with (
+            patch.object(runner, "load_cases", return_value=self.CASES),
+            patch.object(runner, "run_case", side_effect=fake_run_case),
+            patch(GET_HTTP_CLIENT, side_effect=AssertionError("network")),
+        ):
+            results = runner.run_bakeoff(
+                model_ids=["glm-5.2"],
+                tier="capability",
+                trials=1,
+                user=MagicMock(),
+                recordings=recordings,
+                replay=True,
+            )
+
+        slow, medium, fast = results["glm-5.2"]["cases"]
+        self.assertEqual(slow["response_preview"], "first / second")
+        # Running past the end of a recording fails that case, not the bakeoff
+        self.assertIn("Replay has no response #2", medium["notes"][0])
+        self.assertIn("Replay has no response #1", fast["notes"][0])
+
+
 class ToolContractTests(TestCase):
     """The declared schema is what the model actually sees — drift is invisible."""
 
@@ -2841,10 +3431,43 @@ class ToolChoiceTests(TestCase):
         body = OpenCodeGoClient._anthropic_body(anthropic, [], self.TOOLS, None, 100, "auto")
         self.assertEqual(body["tool_choice"], {"type": "auto"})
 
+    def test_the_stable_prefix_is_marked_for_the_prompt_cache(self) -> None:
+        system = {
+            "role": "system",
+            "content": "rules and skills\n\nstate block",
+            "cache_prefix_chars": len("rules and skills"),
+            "cache_key": "tournament-agent:abc",
+        }
+        anthropic = not_none(get_model("minimax-m3"))
+        body = OpenCodeGoClient._anthropic_body(anthropic, [system], None, None, 100, "auto")
+        self.assertEqual(
+            body["system"],
+            [
+                {
+                    "type": "text",
+                    "text": "rules and skills",
+                    "cache_control": {"type": "ephemeral"},
+                },
+                {"type": "text", "text": "state block"},
+            ],
+        )
+        plain = {"role": "system", "content": "rules"}
+        body = OpenCodeGoClient._anthropic_body(anthropic, [plain], None, None, 100, "auto")
+        self.assertEqual(body["system"], "rules")
+
+        luna = not_none(get_model("gpt-5.6-luna"))
+        body = _responses_body(luna, [system], None, None, 100)
+        self.assertEqual(body["prompt_cache_key"], "tournament-agent:abc")
+        self.assertEqual(body["instructions"], system["content"])
+        # Chat completions caches prefixes on its own and gets only the two fields it knows
+        glm = not_none(get_model("glm-5.2"))
+        body = OpenCodeGoClient._openai_body(glm, [system], None, None, 100, "auto")
+        self.assertEqual(body["messages"], [{"role": "system", "content": system["content"]}])
+
     def test_a_refusal_downgrades_the_model_instead_of_failing_the_turn(self) -> None:
         client = self._client()
         http = self._http(self._rejected(), self._ok())
-        with patch("httpx.Client", return_value=http):
+        with patch(GET_HTTP_CLIENT, return_value=http):
             result = client.chat(
                 model_id="glm-5.2",
                 messages=[{"role": "user", "content": "hi"}],
@@ -2859,7 +3482,7 @@ class ToolChoiceTests(TestCase):
         self.assertTrue(forced_tools_disabled_for("glm-5.2"))
 
         http = self._http(self._ok())
-        with patch("httpx.Client", return_value=http):
+        with patch(GET_HTTP_CLIENT, return_value=http):
             client.chat(
                 model_id="glm-5.2",
                 messages=[{"role": "user", "content": "hi"}],
@@ -2872,7 +3495,7 @@ class ToolChoiceTests(TestCase):
     def test_a_real_error_still_surfaces(self) -> None:
         client = self._client()
         http = self._http(self._rejected(), self._rejected())
-        with patch("httpx.Client", return_value=http), self.assertRaises(OpenCodeGoError):
+        with patch(GET_HTTP_CLIENT, return_value=http), self.assertRaises(OpenCodeGoError):
             client.chat(
                 model_id="glm-5.2",
                 messages=[{"role": "user", "content": "hi"}],
@@ -2940,7 +3563,7 @@ class HardeningTests(TestCase):
     def test_a_gateway_hiccup_is_retried_not_shown_to_staff(self) -> None:
         ok = '{"choices": [{"message": {"content": "hi", "tool_calls": []}}]}'
         http = self._http(self._resp(503, "bad gateway"), self._resp(200, ok))
-        with patch("httpx.Client", return_value=http), patch("time.sleep"):
+        with patch(GET_HTTP_CLIENT, return_value=http), patch("time.sleep"):
             result = self._client().chat(
                 model_id="glm-5.2", messages=[{"role": "user", "content": "hi"}]
             )
@@ -2950,7 +3573,7 @@ class HardeningTests(TestCase):
     def test_a_timeout_is_retried(self) -> None:
         ok = '{"choices": [{"message": {"content": "hi", "tool_calls": []}}]}'
         http = self._http(httpx.ConnectTimeout("too slow"), self._resp(200, ok))
-        with patch("httpx.Client", return_value=http), patch("time.sleep"):
+        with patch(GET_HTTP_CLIENT, return_value=http), patch("time.sleep"):
             result = self._client().chat(
                 model_id="glm-5.2", messages=[{"role": "user", "content": "hi"}]
             )
@@ -2959,7 +3582,7 @@ class HardeningTests(TestCase):
     def test_a_bad_request_is_not_retried(self) -> None:
         http = self._http(self._resp(400, "malformed"))
         with (
-            patch("httpx.Client", return_value=http),
+            patch(GET_HTTP_CLIENT, return_value=http),
             patch("time.sleep"),
             self.assertRaises(OpenCodeGoError),
         ):
@@ -2979,6 +3602,34 @@ class HardeningTests(TestCase):
         self.assertEqual(ChatCompletionResult(content="x", tool_calls=[], raw={}).tokens, (0, 0))
         self.assertEqual(round_tokens(MagicMock()), (0, 0))
 
+    def test_cached_input_tokens_are_counted_in_each_vocabulary(self) -> None:
+        openai_style = ChatCompletionResult(
+            content="x",
+            tool_calls=[],
+            raw={"usage": {"prompt_tokens": 10, "prompt_tokens_details": {"cached_tokens": 8}}},
+        )
+        self.assertEqual((openai_style.tokens[0], openai_style.cached_tokens), (10, 8))
+        responses_style = ChatCompletionResult(
+            content="x",
+            tool_calls=[],
+            raw={"usage": {"input_tokens": 10, "input_tokens_details": {"cached_tokens": 6}}},
+        )
+        self.assertEqual((responses_style.tokens[0], responses_style.cached_tokens), (10, 6))
+        # Anthropic reports cache reads and writes beside input_tokens, not inside it
+        anthropic_style = ChatCompletionResult(
+            content="x",
+            tool_calls=[],
+            raw={
+                "usage": {
+                    "input_tokens": 3,
+                    "cache_read_input_tokens": 8,
+                    "cache_creation_input_tokens": 2,
+                }
+            },
+        )
+        self.assertEqual((anthropic_style.tokens[0], anthropic_style.cached_tokens), (13, 8))
+        self.assertEqual(round_cached_tokens(MagicMock()), 0)
+
     def test_every_turn_leaves_a_row_you_can_read_tomorrow(self) -> None:
         rounds = [
             self._round("", [{"name": "list_fields", "id": "tc1", "arguments": "{}"}]),
@@ -3001,6 +3652,7 @@ class HardeningTests(TestCase):
         result.tool_calls = tool_calls
         result.finish_reason = "tool_calls" if tool_calls else "stop"
         result.tokens = (100, 20)
+        result.cached_tokens = 60
         return result
 
     def test_tokens_are_totalled_across_the_rounds_of_a_turn(self) -> None:
@@ -3012,6 +3664,7 @@ class HardeningTests(TestCase):
             self.service.process_message(self.session, "fields?")
         turn = AgentTurn.objects.get(session=self.session)
         self.assertEqual((turn.tokens_in, turn.tokens_out), (200, 40))
+        self.assertEqual(turn.tokens_in_cached, 120)
 
     def test_a_spent_session_stops_before_it_calls_the_model(self) -> None:
         AgentTurn.objects.create(
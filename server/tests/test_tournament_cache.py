@@ -0,0 +1,164 @@
+from typing import Any
+
+from django.core.cache import caches
+from django.test import override_settings
+
+from server.tests.base import ApiBaseTestCase, create_pool, not_none, start_tournament
+from server.tournament.cache import get_tournament_version
+from server.tournament.models import Bracket, CrossPool, Match
+from server.tournament.utils import populate_fixtures
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "tournament": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestTournamentCache(ApiBaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        caches["tournament"].clear()
+
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+
+        self.pool_a = create_pool("A", self.tournament, [1, 3, 5, 7])
+        self.pool_b = create_pool("B", self.tournament, [2, 4, 6, 8])
+        CrossPool.objects.create(tournament=self.tournament)
+        self.bracket = Bracket.objects.create(
+            name="1-2",
+            tournament=self.tournament,
+            sequence_number=2,
+            initial_seeding={"1": 0, "2": 0},
+            current_seeding={"1": 0, "2": 0},
+        )
+        self.final = Match.objects.create(
+            tournament=self.tournament,
+            bracket=self.bracket,
+            sequence_number=1,
+            placeholder_seed_1=1,
+            placeholder_seed_2=2,
+        )
+        start_tournament(self.tournament)
+
+        self.urls = [
+            f"/api/tournament?id={self.tournament.id}",
+            f"/api/tournament?slug={self.event.slug}",
+            f"/api/tournament/pools?slug={self.event.slug}",
+            f"/api/tournament/swiss-rounds?id={self.tournament.id}",
+            f"/api/tournament/cross-pool?id={self.tournament.id}",
+            f"/api/tournament/brackets?id={self.tournament.id}",
+            f"/api/tournament/slug/{self.event.slug}/matches",
+        ]
+
+    def get(self, url: str) -> Any:
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cached_responses_match_uncached_ones(self) -> None:
+        with override_settings(
+            CACHES={"tournament": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+        ):
+            uncached = [self.get(url) for url in self.urls]
+
+        self.assertEqual([self.get(url) for url in self.urls], uncached)
+        with self.assertNumQueries(0):
+            cached = [self.get(url) for url in self.urls]
+        self.assertEqual(cached, uncached)
+
+    def test_scoring_a_match_invalidates_the_cache(self) -> None:
+        url = f"/api/tournament/pools?id={self.tournament.id}"
+        match = not_none(Match.objects.filter(pool=self.pool_a).order_by("id").first())
+        team_1_id = str(match.team_1_id)
+        self.assertEqual(self.get(url)[0]["results"][team_1_id]["wins"], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/api/match/{match.id}/score",
+                {"team_1_score": 15, "team_2_score": 10},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.get(url)[0]["results"][team_1_id]["wins"], 1)
+
+    def test_populating_fixtures_invalidates_the_cache(self) -> None:
+        url = f"/api/tournament/slug/{self.event.slug}/matches"
+        final = next(m for m in self.get(url) if m["id"] == self.final.id)
+        self.assertIsNone(final["team_1"])
+
+        # Finish the pools directly, leaving the bracket to `populate_fixtures`
+        CrossPool.objects.all().delete()
+        Match.objects.filter(pool__isnull=False).update(
+            status=Match.Status.COMPLETED, score_team_1=15, score_team_2=10
+        )
+        self.pool_a.results = {
+            str(team_id): {"rank": seed} for seed, team_id in self.pool_a.initial_seeding.items()
+        }
+        self.pool_b.results = {
+            str(team_id): {"rank": seed} for seed, team_id in self.pool_b.initial_seeding.items()
+        }
+        self.pool_a.save()
+        self.pool_b.save()
+        caches["tournament"].clear()
+        self.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            populate_fixtures(self.tournament.id)
+
+        final = next(m for m in self.get(url) if m["id"] == self.final.id)
+        self.assertIsNotNone(final["team_1"])
+
+    def test_changing_teams_or_directors_invalidates_the_cache(self) -> None:
+        url = f"/api/tournament?id={self.tournament.id}"
+        team = not_none(self.tournament.teams.order_by("id").first())
+        self.assertIn(team.id, [t["id"] for t in self.get(url)["teams"]])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tournament.teams.remove(team)
+        self.assertNotIn(team.id, [t["id"] for t in self.get(url)["teams"]])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tournament.partial_teams.add(team)
+        self.assertIn(team.id, [t["id"] for t in self.get(url)["partial_teams"]])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            team.partial_reg_tournaments.clear()
+        self.assertEqual(self.get(url)["partial_teams"], [])
+
+        # Directors aren't in the responses, but they still start a new version
+        version = get_tournament_version(self.tournament.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.directed_tournaments.add(self.tournament)
+        self.assertNotEqual(get_tournament_version(self.tournament.id), version)
+
+    def test_uncommitted_writes_do_not_invalidate(self) -> None:
+        url = f"/api/tournament?id={self.tournament.id}"
+        self.get(url)
+
+        # The test's transaction never commits, so the bump is never run
+        self.tournament.rules = "Updated"
+        self.tournament.save()
+
+        with self.assertNumQueries(0):
+            self.assertNotEqual(self.get(url)["rules"], "Updated")
+
+    def test_missing_tournament_is_not_cached(self) -> None:
+        response = self.client.get("/api/tournament/pools?slug=no-such-event")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["message"], "Tournament does not exist")
+
+        response = self.client.get("/api/tournament/slug/no-such-event/matches")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["message"], "Event does not exist")
+
+        response = self.client.get("/api/tournament/brackets?id=0")
+        self.assertEqual(response.status_code, 400)
+
+        CrossPool.objects.all().delete()
+        response = self.client.get(f"/api/tournament/cross-pool?id={self.tournament.id}")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["message"], "Cross Pool does not exist")
@@ -1,5 +1,16 @@
-from server.tests.base import ApiBaseTestCase, create_pool, start_tournament
-from server.tournament.models import Bracket, CrossPool, Match, Pool
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from server.core.models import Team
+from server.tests.base import ApiBaseTestCase, create_event, create_pool, start_tournament
+from server.tournament.models import Bracket, CrossPool, Match, Pool, Tournament
+from server.tournament.utils import (
+    build_bracket,
+    build_pool,
+    populate_fixtures,
+    update_match_score_and_results,
+)
+from server.tournament.utils import start_tournament as go_live
 
 
 class TestTournamentLifecycle(ApiBaseTestCase):
@@ -374,3 +385,51 @@ class TestCrossPoolSeqGapProgression(ApiBaseTestCase):
         Pool.objects.filter(tournament=self.tournament).delete()
         CrossPool.objects.filter(tournament=self.tournament).delete()
         super().tearDown()
+
+
+class TestPopulateFixturesQueryBudget(ApiBaseTestCase):
+    """Filling a bracket from finished pools costs the same queries for any field size."""
+
+    # The tournament, its five stage lists and its matches, then one bulk write
+    # each for the matches and the bracket (with their savepoints). Never per team.
+    QUERY_CEILING = 12
+
+    def _queries_to_fill_bracket(self, tournament: Tournament) -> int:
+        seeds = sorted(int(seed) for seed in tournament.initial_seeding)
+        build_pool(tournament, name="A", sequence_number=1, seeding=seeds[0::2])
+        build_pool(tournament, name="B", sequence_number=2, seeding=seeds[1::2])
+        bracket = build_bracket(tournament, name=f"1-{len(seeds)}", sequence_number=3)
+        tournament.refresh_from_db()
+        go_live(tournament)
+
+        for match in Match.objects.filter(tournament=tournament, pool__isnull=False):
+            update_match_score_and_results(match, 15, 10)
+
+        with CaptureQueriesContext(connection) as queries:
+            populate_fixtures(tournament.id)
+
+        opening_round = Match.objects.filter(bracket=bracket, sequence_number=1)
+        self.assertEqual(opening_round.count(), len(seeds) // 2)
+        for match in opening_round:
+            self.assertEqual(match.status, Match.Status.SCHEDULED)
+            self.assertIsNotNone(match.team_1_id)
+            self.assertIsNotNone(match.team_2_id)
+        return len(queries)
+
+    def test_query_count_is_independent_of_team_count(self) -> None:
+        small = self._queries_to_fill_bracket(self.tournament)
+
+        large_tournament = Tournament.objects.create(
+            event=create_event("Nationals"), use_uc_registrations=True
+        )
+        large_tournament.teams.add(
+            *[
+                Team.objects.create(name=f"Big Field {i}", ultimate_central_id=500 + i)
+                for i in range(32)
+            ]
+        )
+        large_tournament.refresh_from_db()
+        large = self._queries_to_fill_bracket(large_tournament)
+
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, self.QUERY_CEILING)
@@ -0,0 +1,115 @@
+"""Versioned read cache for the public tournament endpoints.
+
+Spectators poll the tournament page, its pools, brackets and matches far more
+often than anything about the tournament changes. Those endpoints serve JSON
+bytes rendered once per version of the tournament, from the `tournament` cache.
+
+Every tournament has a version token in the cache and each cached response is
+keyed by it. Writes never delete responses: `invalidate_tournament_cache` swaps
+in a new token once the write commits, and responses under the old token are
+never read again and expire on their own. The token is a fresh random value
+rather than an incremented counter, so two processes bumping it at once cannot
+both land on the same new version.
+
+The signal receivers in `server.tournament.models` invalidate on saves and
+deletes of tournaments, stages, matches and match stats, and on changes to a
+tournament's teams, partial teams, volunteers and directors. Code that writes with
+`bulk_update` or `QuerySet.update` skips those signals and has to call
+`invalidate_tournament_cache` itself. `TOURNAMENT_CACHE_TIMEOUT` bounds how long
+anything written some other way (a team renamed in the admin) can stay stale.
+"""
+
+import json
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from ninja.responses import NinjaJSONEncoder
+
+from server.tournament.models import Tournament
+
+CACHE_ALIAS = "tournament"
+
+
+def _cache() -> BaseCache:
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(tournament_id: int) -> str:
+    return f"tournament:{tournament_id}:version"
+
+
+def get_tournament_version(tournament_id: int) -> str:
+    cache = _cache()
+    key = _version_key(tournament_id)
+    version = cache.get(key)
+    if version is None:
+        # Another process may be setting the first version too; keep whichever won
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return str(version)
+
+
+def invalidate_tournament_cache(tournament_id: int | None) -> None:
+    """Start a new cache version for the tournament once the current transaction commits"""
+    if not tournament_id:
+        return
+
+    def bump() -> None:
+        _cache().set(_version_key(tournament_id), uuid.uuid4().hex, timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def get_tournament_id(id: int | None = None, slug: str | None = None) -> int:
+    """Id of the tournament with the given id or event slug.
+
+    Slugs are looked up once and then remembered. Raises `Tournament.DoesNotExist`
+    if no tournament has the slug.
+    """
+    if id:
+        return id
+
+    cache = _cache()
+    key = f"tournament:slug:{slug}"
+    tournament_id = cache.get(key)
+    if tournament_id is None:
+        tournament_id = (
+            Tournament.objects.filter(event__slug=slug).values_list("id", flat=True).first()
+        )
+        if tournament_id is None:
+            raise Tournament.DoesNotExist
+        cache.set(key, tournament_id, settings.TOURNAMENT_CACHE_TIMEOUT)
+    return int(tournament_id)
+
+
+def cached_tournament_response(
+    tournament_id: int,
+    name: str,
+    render: Callable[[Tournament], Any],
+    tournaments: QuerySet[Tournament] | None = None,
+) -> HttpResponse:
+    """Serve `render(tournament)` as JSON, from the cache while the tournament is unchanged.
+
+    `render` should return plain data (e.g. a schema's `.dict()`). If it raises, or
+    the tournament does not exist, nothing is cached and the exception propagates.
+    The tournament is fetched from `tournaments`, if given, to preload relations.
+    """
+    cache = _cache()
+    # Read the version before the data: a write that lands in between bumps the
+    # version, so what we render here is never served under the newer one.
+    key = f"tournament:{tournament_id}:{get_tournament_version(tournament_id)}:{name}"
+    body = cache.get(key)
+    if body is None:
+        if tournaments is None:
+            tournaments = Tournament.objects.all()
+        tournament = tournaments.get(id=tournament_id)
+        data = render(tournament)
+        body = json.dumps(data, cls=NinjaJSONEncoder).encode()
+        cache.set(key, body, settings.TOURNAMENT_CACHE_TIMEOUT)
+    return HttpResponse(body, content_type="application/json")
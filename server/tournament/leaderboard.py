@@ -0,0 +1,166 @@
+"""The tournament leaderboard, materialized as `LeaderboardEntry` rows.
+
+Receivers on `MatchEvent` keep the rows in step with the events: saving one
+records it with `record_event`, and deleting one takes it back again with
+`delta=-1`. An edited event is taken back as it was and recorded as it is now.
+That covers the match stats handlers, undos, the admin, and matches or
+querysets deleted along with their events. Reading the leaderboard is then a
+single query over one tournament's rows, however many events have been played.
+
+`QuerySet.update`, `bulk_create` and raw SQL skip the receivers, so
+`rebuild_leaderboard` re-derives the rows from `MatchEvent` after writes like
+those, and for tournaments scored before this table existed.
+"""
+
+from collections import Counter
+from typing import Any
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from server.tournament.models import LeaderboardEntry, MatchEvent, MatchStats, Tournament
+
+# (event type, player field on the event, counter on the entry)
+TALLIES = [
+    (MatchEvent.EventType.SCORE, "scored_by_id", "num_scores"),
+    (MatchEvent.EventType.SCORE, "assisted_by_id", "num_assists"),
+    (MatchEvent.EventType.BLOCK, "block_by_id", "num_blocks"),
+]
+
+
+def record_event(event: MatchEvent, tournament_id: int, delta: int = 1) -> None:
+    """Add (or, with a negative delta, take back) the event's scores, assists and blocks."""
+    for event_type, player_field, counter in TALLIES:
+        player_id = getattr(event, player_field)
+        if event.type != event_type or player_id is None:
+            continue
+
+        entries = LeaderboardEntry.objects.filter(
+            tournament_id=tournament_id, player_id=player_id, team_id=event.team_id
+        )
+        if delta > 0:
+            LeaderboardEntry.objects.get_or_create(
+                tournament_id=tournament_id, player_id=player_id, team_id=event.team_id
+            )
+        else:
+            # An event recorded before the table existed has nothing to take back
+            # until the tournament is rebuilt; never drive a count below zero.
+            entries = entries.filter(**{f"{counter}__gte": -delta})
+        entries.update(**{counter: F(counter) + delta, "num_total": F("num_total") + delta})
+
+
+def _tournament_id(event: MatchEvent) -> int | None:
+    if MatchEvent.stats.is_cached(event):
+        return event.stats.tournament_id
+    # Also when a match is deleted: its stats go after their events
+    return (
+        MatchStats.objects.filter(id=event.stats_id).values_list("tournament_id", flat=True).first()
+    )
+
+
+@receiver(pre_save, sender=MatchEvent)
+def take_back_edited_event(sender: Any, instance: MatchEvent, raw: bool, **kwargs: Any) -> None:
+    if raw or instance.pk is None:
+        return
+    previous = MatchEvent.objects.filter(pk=instance.pk).first()
+    tournament_id = _tournament_id(previous) if previous is not None else None
+    if previous is not None and tournament_id is not None:
+        record_event(previous, tournament_id, delta=-1)
+
+
+@receiver(post_save, sender=MatchEvent)
+def record_saved_event(sender: Any, instance: MatchEvent, raw: bool, **kwargs: Any) -> None:
+    if raw:
+        return
+    tournament_id = _tournament_id(instance)
+    if tournament_id is not None:
+        record_event(instance, tournament_id)
+
+
+@receiver(post_delete, sender=MatchEvent)
+def take_back_deleted_event(sender: Any, instance: MatchEvent, **kwargs: Any) -> None:
+    tournament_id = _tournament_id(instance)
+    if tournament_id is not None:
+        record_event(instance, tournament_id, delta=-1)
+
+
+@transaction.atomic
+def rebuild_leaderboard(tournament: Tournament) -> int:
+    """Replace the tournament's leaderboard rows with counts taken from its events."""
+    counts: dict[tuple[int, int], Counter[str]] = {}
+    for event_type, player_field, counter in TALLIES:
+        rows = MatchEvent.objects.filter(
+            stats__tournament=tournament, type=event_type, **{f"{player_field}__isnull": False}
+        ).values_list(player_field, "team_id")
+        for player_id, team_id in rows:
+            counts.setdefault((player_id, team_id), Counter())[counter] += 1
+
+    LeaderboardEntry.objects.filter(tournament=tournament).delete()
+    LeaderboardEntry.objects.bulk_create(
+        [
+            LeaderboardEntry(
+                tournament=tournament,
+                player_id=player_id,
+                team_id=team_id,
+                num_scores=tally["num_scores"],
+                num_assists=tally["num_assists"],
+                num_blocks=tally["num_blocks"],
+                num_total=tally.total(),
+            )
+            for (player_id, team_id), tally in counts.items()
+        ]
+    )
+    return len(counts)
+
+
+def get_leaderboard(tournament: Tournament) -> dict[str, list[dict[str, Any]]]:
+    """Scores, assists, blocks and totals, each ranked highest first, in one query.
+
+    Scores, assists and blocks have a row per player and team, as they always
+    have. Totals have one per player, summed over the teams they played for and
+    named after the one they did most for. Events without a player, like a score
+    with no assist recorded, count for nobody.
+    """
+    entries = (
+        LeaderboardEntry.objects.filter(tournament=tournament, num_total__gt=0)
+        .values(
+            "player_id",
+            "num_scores",
+            "num_assists",
+            "num_blocks",
+            "num_total",
+            first_name=F("player__user__first_name"),
+            last_name=F("player__user__last_name"),
+            team_name=F("team__name"),
+            gender=F("player__gender"),
+        )
+        .order_by("-num_total", "player_id")
+    )
+
+    players: list[dict[str, Any]] = [dict(entry) for entry in entries]
+    identity = ["player_id", "first_name", "last_name", "team_name", "gender"]
+    counters = ["num_scores", "num_assists", "num_blocks", "num_total"]
+
+    def ranked(counter: str) -> list[dict[str, Any]]:
+        rows = [
+            {**{key: player[key] for key in identity}, counter: player[counter]}
+            for player in players
+            if player[counter] > 0
+        ]
+        return sorted(rows, key=lambda row: row[counter], reverse=True)
+
+    # Highest totals first, so a player's first row is the team they did most for
+    totals: dict[int, dict[str, Any]] = {}
+    for player in players:
+        total = totals.setdefault(player["player_id"], {**player, **dict.fromkeys(counters, 0)})
+        for counter in counters:
+            total[counter] += player[counter]
+
+    return {
+        "scores": ranked("num_scores"),
+        "assists": ranked("num_assists"),
+        "blocks": ranked("num_blocks"),
+        "total": sorted(totals.values(), key=lambda row: row["num_total"], reverse=True),
+    }
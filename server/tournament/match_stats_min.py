@@ -1,3 +1,5 @@
+from django.db import transaction
+
 from server.core.models import Player, Team
 from server.tournament.models import Match, MatchEvent, MatchStats
 from server.types import message_response
@@ -51,6 +53,7 @@ def handle_switch_offense(match: Match) -> tuple[int, MatchStats | message_respo
     return 200, match.stats
 
 
+@transaction.atomic
 def handle_score(
     match_event: MatchEventCreateSchema, match: Match, team: Team
 ) -> tuple[int, MatchStats | dict[str, str]]:
@@ -99,6 +102,7 @@ def handle_score(
     return 200, match.stats
 
 
+@transaction.atomic
 def handle_score_undo(
     match: Match, score_event: MatchEvent
 ) -> tuple[int, MatchStats | message_response]:
@@ -128,6 +132,7 @@ def handle_score_undo(
     return 200, match.stats
 
 
+@transaction.atomic
 def handle_block(
     match_event: MatchEventCreateSchema, match: Match, team: Team
 ) -> tuple[int, MatchStats | message_response]:
@@ -159,6 +164,7 @@ def handle_block(
     return 200, match.stats
 
 
+@transaction.atomic
 def handle_block_undo(
     match: Match, block_event: MatchEvent
 ) -> tuple[int, MatchStats | message_response]:
@@ -92,6 +92,10 @@ class Tournament(ExportModelOperationsMixin("tournament"), models.Model):  # typ
 
     use_uc_registrations = models.BooleanField(default=False)
 
+    # What `calculate_player_points` last computed points from, so the nightly run
+    # can skip tournaments whose results and rosters have not changed since
+    player_points_fingerprint = models.CharField(max_length=64, blank=True, default="")
+
     volunteers = models.ManyToManyField(User, related_name="tournament_volunteer", blank=True)
     directors = models.ManyToManyField(User, related_name="directed_tournaments", blank=True)
 
@@ -148,6 +152,9 @@ class Registration(ExportModelOperationsMixin("registration"), models.Model):  #
     is_playing = models.BooleanField(default=True)
     role = models.CharField(max_length=6, choices=Role.choices, default=Role.DEFAULT)
     points = models.PositiveIntegerField(null=True, blank=True)
+    # What `calculate_player_points` last wrote to `points`. While the two agree it
+    # may overwrite them; once someone changes `points` by hand it leaves them be.
+    calculated_points = models.PositiveIntegerField(null=True, blank=True, editable=False)
 
     class Meta:
         unique_together = ("event", "player")
@@ -385,6 +392,15 @@ class Match(ExportModelOperationsMixin("match"), models.Model):  # type: ignore[
         unique_together = ["tournament", "time", "field"]
 
 
+# The spirit score relations of `Match`, each team's score and its self assessment
+SPIRIT_SCORE_FIELDS = [
+    "spirit_score_team_1",
+    "spirit_score_team_2",
+    "self_spirit_score_team_1",
+    "self_spirit_score_team_2",
+]
+
+
 class MatchStats(models.Model):
     class Status(models.TextChoices):
         FIRST_HALF = "FH", _("First Half")
@@ -426,6 +442,78 @@ class MatchStats(models.Model):
     )
 
 
+@receiver(post_save, sender=Tournament)
+@receiver(post_delete, sender=Tournament)
+def invalidate_cache_on_tournament_change(sender: Any, instance: Tournament, **kwargs: Any) -> None:
+    from server.tournament.cache import invalidate_tournament_cache
+
+    invalidate_tournament_cache(instance.id)
+
+
+@receiver(m2m_changed, sender=Tournament.teams.through)
+@receiver(m2m_changed, sender=Tournament.partial_teams.through)
+@receiver(m2m_changed, sender=Tournament.volunteers.through)
+@receiver(m2m_changed, sender=Tournament.directors.through)
+def invalidate_cache_on_tournament_m2m_change(
+    sender: Any,
+    instance: Any,
+    action: str,
+    reverse: bool,
+    pk_set: set[int] | None,
+    **kwargs: Any,
+) -> None:
+    """Drop the cached responses of tournaments whose teams, volunteers or directors changed.
+
+    Changed from the other side (`user.directed_tournaments.add(...)`), `instance` is the team
+    or user and `pk_set` holds the tournaments. A reverse `clear()` has no `pk_set`,
+    so its tournaments are looked up before the rows go.
+    """
+    from server.tournament.cache import invalidate_tournament_cache
+
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_tournament_cache(instance.id)
+        return
+
+    if action == "pre_clear":
+        pk_set = set(
+            sender.objects.filter(**{f"{instance._meta.model_name}_id": instance.pk}).values_list(
+                "tournament_id", flat=True
+            )
+        )
+    if action in ("pre_clear", "post_add", "post_remove"):
+        for tournament_id in pk_set or ():
+            invalidate_tournament_cache(tournament_id)
+
+
+@receiver(post_save, sender=Pool)
+@receiver(post_save, sender=SwissRound)
+@receiver(post_save, sender=CrossPool)
+@receiver(post_save, sender=Bracket)
+@receiver(post_save, sender=PositionPool)
+@receiver(post_save, sender=TournamentField)
+@receiver(post_save, sender=Match)
+@receiver(post_save, sender=MatchStats)
+@receiver(post_delete, sender=Pool)
+@receiver(post_delete, sender=SwissRound)
+@receiver(post_delete, sender=CrossPool)
+@receiver(post_delete, sender=Bracket)
+@receiver(post_delete, sender=PositionPool)
+@receiver(post_delete, sender=TournamentField)
+@receiver(post_delete, sender=Match)
+@receiver(post_delete, sender=MatchStats)
+def invalidate_cache_on_tournament_data_change(sender: Any, instance: Any, **kwargs: Any) -> None:
+    """Drop the cached public responses of the tournament this row belongs to.
+
+    Scoring, fixture updates and stage creation all save through these models, so
+    the cache follows them wherever they are called from. Bulk writes skip this and
+    invalidate explicitly.
+    """
+    from server.tournament.cache import invalidate_tournament_cache
+
+    invalidate_tournament_cache(instance.tournament_id)
+
+
 class MatchEvent(models.Model):
     class EventType(models.TextChoices):
         LINE_SELECTED = "LS", _("Line Selected")
@@ -470,3 +558,46 @@ class MatchEvent(models.Model):
     block_by = models.ForeignKey(
         Player, on_delete=models.CASCADE, related_name="match_events_blocks", blank=True, null=True
     )
+
+
+class LeaderboardEntry(models.Model):
+    """A player's running score, assist and block counts for one tournament and team.
+
+    The public leaderboard used to aggregate `MatchEvent` three times per request.
+    These rows are kept current as match stats events are saved and deleted, so
+    the leaderboard is a single indexed read. `rebuild_leaderboard` re-derives them
+    from the events.
+    """
+
+    tournament = models.ForeignKey(
+        Tournament, on_delete=models.CASCADE, related_name="leaderboard_entries"
+    )
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="leaderboard_entries")
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="leaderboard_entries")
+    num_scores = models.PositiveIntegerField(default=0)
+    num_assists = models.PositiveIntegerField(default=0)
+    num_blocks = models.PositiveIntegerField(default=0)
+    num_total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ["tournament", "player", "team"]
+
+
+class PlayerRating(models.Model):
+    """A player's points from one event, indexed by player and the date the event ended.
+
+    Roster points and player recommendations average a player's points from
+    events before some date. Reading these rows answers that for a whole roster
+    in one indexed query instead of one registration scan per player.
+    `calculate_player_points` writes them alongside `Registration.points`.
+    """
+
+    registration = models.OneToOneField(
+        Registration, on_delete=models.CASCADE, related_name="rating"
+    )
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="ratings")
+    date = models.DateField()
+    points = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["player", "date", "points"])]
@@ -0,0 +1,60 @@
+"""Player ratings: the points a player earned at each event, materialized as `PlayerRating`.
+
+`calculate_player_points` stores points on registrations and then calls
+`sync_event_ratings` to mirror them here, keyed by player and the event's end
+date. Averaging a player's points before a date is then one indexed query for
+any number of players, with no join back through registrations and events.
+"""
+
+import datetime
+from collections.abc import Iterable
+
+from django.db import transaction
+from django.db.models import Avg
+
+from server.tournament.models import Event, PlayerRating, Registration
+
+
+@transaction.atomic
+def sync_event_ratings(events: Iterable[Event]) -> int:
+    """Replace the events' ratings with the points on their registrations."""
+    end_dates = {event.id: event.end_date for event in events}
+    PlayerRating.objects.filter(registration__event_id__in=end_dates).delete()
+    ratings = PlayerRating.objects.bulk_create(
+        [
+            PlayerRating(
+                registration_id=reg_id,
+                player_id=player_id,
+                date=end_dates[event_id],
+                points=points,
+            )
+            for reg_id, player_id, event_id, points in Registration.objects.filter(
+                event_id__in=end_dates
+            ).values_list("id", "player_id", "event_id", "points")
+            if points is not None
+        ],
+        batch_size=1000,
+    )
+    return len(ratings)
+
+
+def mean_points_before(player_ids: Iterable[int], date: datetime.date) -> dict[int, float]:
+    """Each player's mean points from events that ended before `date`.
+
+    Players without rated events before the date are left out.
+    """
+    return dict(
+        PlayerRating.objects.filter(player_id__in=player_ids, date__lt=date)
+        .values("player_id")
+        .annotate(mean=Avg("points"))
+        .values_list("player_id", "mean")
+    )
+
+
+def roster_points(event: Event, team_id: int) -> float:
+    """Mean rating of a team's roster going into the event, over players who have one."""
+    roster = Registration.objects.filter(event=event, team_id=team_id).values_list(
+        "player_id", flat=True
+    )
+    means = [mean for mean in mean_points_before(roster, event.start_date).values() if mean > 0]
+    return round(sum(means) / len(means), 1) if means else 0.0
@@ -1,4 +1,6 @@
-from django.db.models import QuerySet
+from typing import Any
+
+from django.db.models import Count, Prefetch, QuerySet
 from ninja import ModelSchema, Schema
 
 from server.core.models import Player, Team
@@ -13,6 +15,7 @@ from server.schema import (
 from server.series.schema import SeriesSchema
 
 from .models import (
+    SPIRIT_SCORE_FIELDS,
     Bracket,
     CrossPool,
     Event,
@@ -53,7 +56,12 @@ class TournamentMinSchema(ModelSchema):
 
     class Config:
         model = Tournament
-        model_exclude = ["volunteers", "directors"]
+        model_exclude = ["volunteers", "directors", "player_points_fingerprint"]
+
+
+def is_prefetched(instance: Any, name: str) -> bool:
+    """Whether `prefetch_related` already loaded the relation `name` of `instance`"""
+    return name in getattr(instance, "_prefetched_objects_cache", {})
 
 
 class TournamentSchema(ModelSchema):
@@ -63,28 +71,42 @@ class TournamentSchema(ModelSchema):
 
     @staticmethod
     def resolve_teams(tournament: Tournament) -> QuerySet[Team]:
+        if is_prefetched(tournament, "teams"):
+            return tournament.teams.all()
         return tournament.teams.all().order_by("name")
 
     @staticmethod
     def resolve_partial_teams(tournament: Tournament) -> QuerySet[Team]:
+        if is_prefetched(tournament, "partial_teams"):
+            return tournament.partial_teams.all()
         return tournament.partial_teams.all().order_by("name")
 
     reg_count: list[RegistrationCount]
 
     @staticmethod
     def resolve_reg_count(tournament: Tournament) -> list[RegistrationCount]:
-        teams = tournament.teams.all()
+        counts = dict(
+            Registration.objects.filter(event_id=tournament.event_id)
+            .values("team_id")
+            .annotate(count=Count("id"))
+            .values_list("team_id", "count")
+        )
         return [
-            RegistrationCount(
-                team_id=team.id,
-                count=Registration.objects.filter(team=team, event=tournament.event).count(),
-            )
-            for team in teams
+            RegistrationCount(team_id=team.id, count=counts.get(team.id, 0))
+            for team in tournament.teams.all()
         ]
 
     class Config:
         model = Tournament
-        model_exclude = ["volunteers", "directors"]
+        model_exclude = ["volunteers", "directors", "player_points_fingerprint"]
+
+
+def with_tournament_related(tournaments: QuerySet[Tournament]) -> QuerySet[Tournament]:
+    """Load what `TournamentSchema` serializes in a fixed number of queries"""
+    teams = Team.objects.order_by("name").prefetch_related("admins")
+    return tournaments.select_related("event__series").prefetch_related(
+        Prefetch("teams", queryset=teams), Prefetch("partial_teams", queryset=teams)
+    )
 
 
 class TournamentCreateFromEventSchema(Schema):
@@ -350,6 +372,37 @@ class MatchSchema(ModelSchema):
         model_exclude = ["tournament"]
 
 
+# Players serialized with `PlayerTinySchema` by `MatchSchema`
+MATCH_PLAYER_FIELDS = [
+    *(f"{spirit}__{award}" for spirit in SPIRIT_SCORE_FIELDS for award in ("mvp_v2", "msp_v2")),
+    "suggested_score_team_1__entered_by",
+    "suggested_score_team_2__entered_by",
+]
+
+
+def with_match_related(matches: QuerySet[Match]) -> QuerySet[Match]:
+    """Load what `MatchSchema` serializes in a fixed number of queries, however many matches"""
+    teams = ["team_1", "team_2", "stats__initial_possession", "stats__current_possession"]
+    return matches.select_related(
+        "pool",
+        "cross_pool",
+        "bracket",
+        "position_pool",
+        "swiss_round",
+        "field",
+        *teams,
+        *(f"{spirit}__{person}" for spirit in SPIRIT_SCORE_FIELDS for person in ("mvp", "msp")),
+        *(
+            f"{player}__{related}"
+            for player in MATCH_PLAYER_FIELDS
+            for related in ("user", "membership")
+        ),
+    ).prefetch_related(
+        *(f"{team}__admins" for team in teams),
+        *(f"{player}__teams__admins" for player in MATCH_PLAYER_FIELDS),
+    )
+
+
 class MatchCreateSchema(Schema):
     stage: str
     stage_id: int
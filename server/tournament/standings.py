@@ -0,0 +1,99 @@
+"""In-memory head-to-head standings for one stage of a tournament.
+
+Ranking a pool or Swiss group after a score comes in means breaking ties, and
+the WFDF procedure restarts within every sub-group a criterion separates. Each
+restart used to query `Match` again for the games among the still-tied teams,
+so one score submission cost a query per recursion level, all inside the
+transaction that holds the SQLite write lock.
+
+`StageStandings` reads the stage's completed games once and folds them into a
+team x team matrix of (wins, goal difference, goals for). Head-to-head stats for
+any subset of teams are then sums over that matrix, which keeps the number of
+queries per submission constant however the ties unfold.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any
+
+from server.tournament.models import Match, Pool, PositionPool, SwissRound
+
+Stage = Pool | PositionPool | SwissRound
+
+
+class StageStandings:
+    def __init__(self) -> None:
+        # _h2h[a][b] is [wins, goal difference, goals for] of team a against team b
+        self._h2h: dict[int, dict[int, list[int]]] = defaultdict(lambda: defaultdict(_zeros))
+        # Every completed opponent of a team, once per game played
+        self._opponents: dict[int, list[int]] = defaultdict(list)
+
+    @classmethod
+    def load(cls, tournament_id: int, stage: Stage | None = None) -> StageStandings:
+        """Fold every completed game of the stage (or the whole tournament) in one query."""
+        matches = Match.objects.filter(tournament_id=tournament_id, status=Match.Status.COMPLETED)
+        if isinstance(stage, Pool):
+            matches = matches.filter(pool=stage)
+        elif isinstance(stage, PositionPool):
+            matches = matches.filter(position_pool=stage)
+        elif isinstance(stage, SwissRound):
+            matches = matches.filter(swiss_round=stage)
+
+        standings = cls()
+        rows = matches.values_list("team_1_id", "team_2_id", "score_team_1", "score_team_2")
+        for team_1_id, team_2_id, score_1, score_2 in rows:
+            standings.record(team_1_id, team_2_id, score_1, score_2)
+        return standings
+
+    def record(
+        self, team_1_id: int | None, team_2_id: int | None, score_1: int, score_2: int
+    ) -> None:
+        """Apply one completed game to the matrix. Games missing a team are ignored."""
+        if team_1_id is None or team_2_id is None:
+            return
+
+        stats_1 = self._h2h[team_1_id][team_2_id]
+        stats_2 = self._h2h[team_2_id][team_1_id]
+        if score_1 > score_2:
+            stats_1[0] += 1
+        elif score_2 > score_1:
+            stats_2[0] += 1
+        stats_1[1] += score_1 - score_2
+        stats_2[1] += score_2 - score_1
+        stats_1[2] += score_1
+        stats_2[2] += score_2
+
+        self._opponents[team_1_id].append(team_2_id)
+        self._opponents[team_2_id].append(team_1_id)
+
+    def head_to_head(self, team_ids: list[int]) -> dict[int, dict[str, int]]:
+        """Wins, goal difference and goals for, counting only games among `team_ids`."""
+        members = set(team_ids)
+        stats: dict[int, dict[str, int]] = {}
+        for team_id in team_ids:
+            row = {"wins": 0, "gd": 0, "gf": 0}
+            for opponent_id, (wins, gd, gf) in self._h2h.get(team_id, {}).items():
+                if opponent_id in members:
+                    row["wins"] += wins
+                    row["gd"] += gd
+                    row["gf"] += gf
+            stats[team_id] = row
+        return stats
+
+    def opponent_strength(
+        self, team_ids: list[int], results: dict[Any, dict[str, int]]
+    ) -> dict[int, int]:
+        """Sum of opponents' points (win=2, draw=1) over every game each team played."""
+        strength: dict[int, int] = {}
+        for team_id in team_ids:
+            total = 0
+            for opponent_id in self._opponents.get(team_id, []):
+                opp_stats = results.get(opponent_id, {})
+                total += opp_stats.get("wins", 0) * 2 + opp_stats.get("draws", 0)
+            strength[team_id] = total
+        return strength
+
+
+def _zeros() -> list[int]:
+    return [0, 0, 0]
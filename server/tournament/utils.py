@@ -2,7 +2,7 @@ import contextlib
 import datetime
 import os
 from collections import Counter
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from typing import Any, cast
 
 from django.db import transaction
@@ -12,6 +12,7 @@ from django.utils.dateparse import parse_datetime
 
 from server.core.models import Player, Team, UCPerson, User
 from server.series.models import SeriesRegistration
+from server.tournament.cache import invalidate_tournament_cache
 from server.tournament.models import Event
 from server.types import message_response, validation_error_dict
 from server.utils import ordinal_suffix
@@ -29,6 +30,7 @@ from .models import (
     UCRegistration,
 )
 from .schema import SpiritScoreUpdateSchema
+from .standings import StageStandings
 
 ROLES_ELIGIBLE_TO_SUBMIT_SCORES = [
     "admin",
@@ -716,6 +718,7 @@ def sort_tied_teams(
     tied_teams: list[dict[str, int]],
     tournament_id: int,
     stage: Pool | PositionPool | None = None,
+    standings: StageStandings | None = None,
 ) -> list[dict[str, int]]:
     """Order teams tied on pool wins, following the WFDF tie-break procedure.
 
@@ -731,40 +734,17 @@ def sort_tied_teams(
     tied sub-group (head-to-head stats are recomputed among only those
     teams). Only games from the same stage (this pool / position pool)
     count towards the head-to-head criteria.
+
+    The stage's games are read once into `standings` and every restart
+    reuses them; pass one in to share it across several tied groups.
     """
     if len(tied_teams) <= 1:
         return list(tied_teams)
 
-    team_stats: dict[int, dict[str, int]] = {
-        team["id"]: {"wins": 0, "gd": 0, "gf": 0} for team in tied_teams
-    }
-
-    # Get matches between tied teams, restricted to this stage's games
-    team_ids = [team["id"] for team in tied_teams]
-    matches = Match.objects.filter(
-        tournament_id=tournament_id, status=Match.Status.COMPLETED
-    ).filter(Q(team_1__id__in=team_ids, team_2__id__in=team_ids))
-    if isinstance(stage, Pool):
-        matches = matches.filter(pool=stage)
-    elif isinstance(stage, PositionPool):
-        matches = matches.filter(position_pool=stage)
-
-    # Calculate head-to-head stats
-    for match in matches:
-        if match.team_1 is None or match.team_2 is None:
-            continue
-
-        # Update wins
-        if match.score_team_1 > match.score_team_2:
-            team_stats[match.team_1.id]["wins"] += 1
-        elif match.score_team_2 > match.score_team_1:
-            team_stats[match.team_2.id]["wins"] += 1
+    if standings is None:
+        standings = StageStandings.load(tournament_id, stage)
 
-        # Update goal difference and goals for
-        team_stats[match.team_1.id]["gd"] += match.score_team_1 - match.score_team_2
-        team_stats[match.team_2.id]["gd"] += match.score_team_2 - match.score_team_1
-        team_stats[match.team_1.id]["gf"] += match.score_team_1
-        team_stats[match.team_2.id]["gf"] += match.score_team_2
+    team_stats = standings.head_to_head([team["id"] for team in tied_teams])
 
     def criteria(team: dict[str, int]) -> tuple[int, int, int, int, int]:
         return (
@@ -778,7 +758,7 @@ def sort_tied_teams(
     return _rank_by_criteria_with_restart(
         tied_teams,
         criteria,
-        lambda sub_group: sort_tied_teams(sub_group, tournament_id, stage),
+        lambda sub_group: sort_tied_teams(sub_group, tournament_id, stage, standings),
     )
 
 
@@ -817,6 +797,7 @@ def sort_swiss_tied_teams(
     tied_teams: list[dict[str, int]],
     all_results: dict[int, dict[str, int]],
     swiss_round: SwissRound,
+    standings: StageStandings | None = None,
 ) -> list[dict[str, int]]:
     """Swiss tiebreaker for teams with equal points (win=2, draw=1).
 
@@ -832,41 +813,20 @@ def sort_swiss_tied_teams(
     if len(tied_teams) <= 1:
         return tied_teams
 
+    if standings is None:
+        standings = StageStandings.load(swiss_round.tournament_id, swiss_round)
+
     team_ids = [team["id"] for team in tied_teams]
 
-    # 1. Compute H2H stats between tied teams
-    h2h_wins: dict[int, int] = {tid: 0 for tid in team_ids}
-    h2h_matches = Match.objects.filter(
-        swiss_round=swiss_round, status=Match.Status.COMPLETED
-    ).filter(Q(team_1__id__in=team_ids, team_2__id__in=team_ids))
-    for m in h2h_matches:
-        if m.team_1 and m.team_2:
-            if m.score_team_1 > m.score_team_2:
-                h2h_wins[m.team_1.id] += 1
-            elif m.score_team_2 > m.score_team_1:
-                h2h_wins[m.team_2.id] += 1
-
-    # 2. Compute opponent strength: sum of opponents' points (higher = faced stronger opponents)
-    opp_strength: dict[int, int] = {tid: 0 for tid in team_ids}
-    all_swiss_matches = Match.objects.filter(
-        swiss_round=swiss_round, status=Match.Status.COMPLETED
-    ).filter(Q(team_1__id__in=team_ids) | Q(team_2__id__in=team_ids))
-    for m in all_swiss_matches:
-        if m.team_1 and m.team_2:
-            if m.team_1.id in opp_strength:
-                opp_stats = all_results.get(m.team_2.id, {})
-                opp_strength[m.team_1.id] += opp_stats.get("wins", 0) * 2 + opp_stats.get(
-                    "draws", 0
-                )
-            if m.team_2.id in opp_strength:
-                opp_stats = all_results.get(m.team_1.id, {})
-                opp_strength[m.team_2.id] += opp_stats.get("wins", 0) * 2 + opp_stats.get(
-                    "draws", 0
-                )
+    # 1. H2H stats between tied teams
+    h2h_stats = standings.head_to_head(team_ids)
+
+    # 2. Opponent strength: sum of opponents' points (higher = faced stronger opponents)
+    opp_strength = standings.opponent_strength(team_ids, all_results)
 
     def criteria(t: dict[str, int]) -> tuple[int, ...]:
         return (
-            h2h_wins[t["id"]],  # 1. H2H wins (higher = better)
+            h2h_stats[t["id"]]["wins"],  # 1. H2H wins (higher = better)
             opp_strength[t["id"]],  # 2. Opponent strength: higher = faced stronger
             t["GF"] - t["GA"],  # 3. Overall goal difference
         )
@@ -876,7 +836,7 @@ def sort_swiss_tied_teams(
     return _rank_by_criteria_with_restart(
         tied_teams,
         criteria,
-        lambda sub_group: sort_swiss_tied_teams(sub_group, all_results, swiss_round),
+        lambda sub_group: sort_swiss_tied_teams(sub_group, all_results, swiss_round, standings),
     )
 
 
@@ -900,13 +860,16 @@ def recompute_swiss_ranks(
         points = result["wins"] * 2 + result.get("draws", 0)
         points_groups.setdefault(points, []).append(result)
 
+    standings: StageStandings | None = None
     ranked: list[dict[str, int]] = []
     for points in sorted(points_groups, reverse=True):
         tied = points_groups[points]
         if len(tied) == 1:
             ranked.extend(tied)
         else:
-            ranked.extend(sort_swiss_tied_teams(tied, results, swiss_round))
+            if standings is None:
+                standings = StageStandings.load(swiss_round.tournament_id, swiss_round)
+            ranked.extend(sort_swiss_tied_teams(tied, results, swiss_round, standings))
 
     for i, result in enumerate(ranked):
         results[result["id"]]["rank"] = i + 1
@@ -934,30 +897,37 @@ def swiss_team_rank_map(results: dict[Any, dict[str, int]]) -> dict[int, int]:
     return {tid: i + 1 for i, (tid, _) in enumerate(ranked)}
 
 
+def _add_match_to_results(old_results: dict[int, dict[str, int]], match: Match) -> None:
+    """Apply one game's result to the W/L/D/GF/GA rows of both teams, in place."""
+    team_1_id, team_2_id = cast(int, match.team_1_id), cast(int, match.team_2_id)
+
+    old_results[team_1_id]["GF"] += match.score_team_1
+    old_results[team_1_id]["GA"] += match.score_team_2
+
+    old_results[team_2_id]["GF"] += match.score_team_2
+    old_results[team_2_id]["GA"] += match.score_team_1
+
+    if match.score_team_1 > match.score_team_2:
+        old_results[team_1_id]["wins"] += 1
+        old_results[team_2_id]["losses"] += 1
+    elif match.score_team_1 < match.score_team_2:
+        old_results[team_2_id]["wins"] += 1
+        old_results[team_1_id]["losses"] += 1
+    else:
+        old_results[team_1_id]["draws"] += 1
+        old_results[team_2_id]["draws"] += 1
+
+
 def get_new_pool_results(
     old_results: dict[int, dict[str, int]],
     match: Match,
     pool_seeding_list: list[int],
     tournament_seeding: dict[int, int],
 ) -> tuple[dict[int, dict[str, int]], dict[int, int]]:
-    if match.team_1 is None or match.team_2 is None:
+    if match.team_1_id is None or match.team_2_id is None:
         return old_results, tournament_seeding
 
-    old_results[match.team_1.id]["GF"] += match.score_team_1
-    old_results[match.team_1.id]["GA"] += match.score_team_2
-
-    old_results[match.team_2.id]["GF"] += match.score_team_2
-    old_results[match.team_2.id]["GA"] += match.score_team_1
-
-    if match.score_team_1 > match.score_team_2:
-        old_results[match.team_1.id]["wins"] += 1
-        old_results[match.team_2.id]["losses"] += 1
-    elif match.score_team_1 < match.score_team_2:
-        old_results[match.team_2.id]["wins"] += 1
-        old_results[match.team_1.id]["losses"] += 1
-    else:
-        old_results[match.team_1.id]["draws"] += 1
-        old_results[match.team_2.id]["draws"] += 1
+    _add_match_to_results(old_results, match)
 
     # Create results list with team IDs
     results_list = []
@@ -973,7 +943,10 @@ def get_new_pool_results(
             wins_groups[wins] = []
         wins_groups[wins].append(result)
 
-    # Sort each tied group separately
+    # Sort each tied group separately. The stage's games are read at most once,
+    # on the first tie, and shared by every tied group and restart.
+    stage = match.pool or match.position_pool
+    standings: StageStandings | None = None
     ranked_results = []
     for wins in sorted(wins_groups.keys(), reverse=True):
         tied_teams = wins_groups[wins]
@@ -981,8 +954,9 @@ def get_new_pool_results(
             ranked_results.extend(tied_teams)
         else:
             # Sort tied teams using head-to-head criteria within this stage
-            stage = match.pool or match.position_pool
-            sorted_tied_teams = sort_tied_teams(tied_teams, match.tournament.id, stage)
+            if standings is None:
+                standings = StageStandings.load(match.tournament_id, stage)
+            sorted_tied_teams = sort_tied_teams(tied_teams, match.tournament_id, stage, standings)
             ranked_results.extend(sorted_tied_teams)
 
     new_results = {}
@@ -1005,24 +979,17 @@ def get_new_swiss_results(
     Uses points system (win=2, draw=1, loss=0) for primary ranking,
     then Swiss-specific tiebreakers for teams with equal points.
     """
-    if match.team_1 is None or match.team_2 is None:
+    if match.team_1_id is None or match.team_2_id is None:
         return old_results, tournament_seeding
 
-    old_results[match.team_1.id]["GF"] += match.score_team_1
-    old_results[match.team_1.id]["GA"] += match.score_team_2
+    if match.swiss_round is None:
+        raise ValueError("Swiss round must be set for swiss tiebreaker sorting")
 
-    old_results[match.team_2.id]["GF"] += match.score_team_2
-    old_results[match.team_2.id]["GA"] += match.score_team_1
+    _add_match_to_results(old_results, match)
 
-    if match.score_team_1 > match.score_team_2:
-        old_results[match.team_1.id]["wins"] += 1
-        old_results[match.team_2.id]["losses"] += 1
-    elif match.score_team_1 < match.score_team_2:
-        old_results[match.team_2.id]["wins"] += 1
-        old_results[match.team_1.id]["losses"] += 1
-    else:
-        old_results[match.team_1.id]["draws"] += 1
-        old_results[match.team_2.id]["draws"] += 1
+    # One read of the round's completed games serves both the tiebreakers and
+    # the stored opponent strength below.
+    standings = StageStandings.load(match.tournament_id, match.swiss_round)
 
     # Create results list with team IDs
     results_list = []
@@ -1045,9 +1012,9 @@ def get_new_swiss_results(
         if len(tied_teams) == 1:
             ranked_results.extend(tied_teams)
         else:
-            if match.swiss_round is None:
-                raise ValueError("Swiss round must be set for swiss tiebreaker sorting")
-            sorted_tied_teams = sort_swiss_tied_teams(tied_teams, old_results, match.swiss_round)
+            sorted_tied_teams = sort_swiss_tied_teams(
+                tied_teams, old_results, match.swiss_round, standings
+            )
             ranked_results.extend(sorted_tied_teams)
 
     new_results = {}
@@ -1057,23 +1024,9 @@ def get_new_swiss_results(
         tournament_seeding[pool_seeding_list[i]] = int(result["id"])
 
     # Compute and store opponent strength (sum of opponents' points)
-    if match.swiss_round is None:
-        raise ValueError("Swiss round must be set for opponent strength calculation")
-    all_swiss_matches = Match.objects.filter(
-        swiss_round=match.swiss_round, status=Match.Status.COMPLETED
-    )
-    opp_strength: dict[int, int] = {tid: 0 for tid in new_results}
-    for m in all_swiss_matches:
-        if m.team_1 and m.team_2:
-            t1, t2 = m.team_1.id, m.team_2.id
-            if t1 in opp_strength:
-                opp_stats = new_results.get(t2, {})
-                opp_strength[t1] += opp_stats.get("wins", 0) * 2 + opp_stats.get("draws", 0)
-            if t2 in opp_strength:
-                opp_stats = new_results.get(t1, {})
-                opp_strength[t2] += opp_stats.get("wins", 0) * 2 + opp_stats.get("draws", 0)
+    opp_strength = standings.opponent_strength(list(new_results), new_results)
     for tid in new_results:
-        new_results[tid]["opp_strength"] = opp_strength.get(tid, 0)
+        new_results[tid]["opp_strength"] = opp_strength[tid]
 
     return new_results, tournament_seeding
 
@@ -1263,17 +1216,20 @@ def rerun_swiss_round(tournament: Tournament, swiss_round: SwissRound) -> None:
 
 @transaction.atomic
 def populate_fixtures(tournament_id: int) -> None:
-    pools = Pool.objects.filter(tournament=tournament_id)
-    cross_pool = CrossPool.objects.filter(tournament=tournament_id)
-    brackets = Bracket.objects.filter(tournament=tournament_id)
-    position_pools = PositionPool.objects.filter(tournament=tournament_id)
+    """Move teams into the next stages' placeholder seeds as earlier stages finish.
+
+    Runs after every completed match. Swiss progression goes first, since pairing
+    a new round writes its own matches. After that the tournament's matches are
+    read once, every seed -> team assignment is resolved on those rows in memory,
+    and only the matches and stages that actually changed are written back in
+    bulk, so the query count depends on the number of stages, not of teams.
+    """
     tournament = Tournament.objects.get(id=tournament_id)
-    teams_by_id = {team.id: team for team in tournament.teams.all()}
 
     is_all_pool_matches_complete = True
 
     # Handle Swiss round progression
-    swiss_rounds = SwissRound.objects.filter(tournament=tournament_id)
+    swiss_rounds = list(SwissRound.objects.filter(tournament=tournament_id))
     is_all_swiss_complete = True
 
     for swiss_round in swiss_rounds:
@@ -1313,111 +1269,62 @@ def populate_fixtures(tournament_id: int) -> None:
     if not is_all_swiss_complete:
         is_all_pool_matches_complete = False
 
-    # When Swiss is complete, assign teams to next stage matches (cross pool/bracket/position pool)
-    if is_all_swiss_complete and swiss_rounds.exists():
+    if is_all_swiss_complete and swiss_rounds:
         tournament.refresh_from_db()
-        tournament_current_seeding = {int(k): v for k, v in tournament.current_seeding.items()}
 
+    pools = list(Pool.objects.filter(tournament=tournament_id))
+    cross_pools = list(CrossPool.objects.filter(tournament=tournament_id))
+    brackets = list(Bracket.objects.filter(tournament=tournament_id))
+    position_pools = list(PositionPool.objects.filter(tournament=tournament_id))
+
+    matches = list(Match.objects.filter(tournament=tournament_id))
+    as_loaded = {m.id: (m.team_1_id, m.team_2_id, m.status) for m in matches}
+    changed_brackets: dict[int, Bracket] = {}
+    changed_position_pools: dict[int, PositionPool] = {}
+
+    tournament_current_seeding = {int(k): int(v) for k, v in tournament.current_seeding.items()}
+
+    def team_for_seed(seed: int) -> int:
+        return tournament_current_seeding[seed]
+
+    cross_pool_by_seed = _matches_by_seed(m for m in matches if m.cross_pool_id is not None)
+    bracket_or_position_pool_by_seed = _matches_by_seed(
+        m for m in matches if m.bracket_id is not None or m.position_pool_id is not None
+    )
+
+    def first_matches_after_group(seed: int) -> list[Match]:
+        """Where the team finishing a pool or Swiss group on `seed` plays next."""
+        by_sequence = cross_pool_by_seed.get(seed, {})
+        for sequence in (1, 2):
+            if by_sequence.get(sequence):
+                return by_sequence[sequence]
+        return bracket_or_position_pool_by_seed.get(seed, {}).get(1, [])
+
+    # When Swiss is complete, assign teams to next stage matches (cross pool/bracket/position pool)
+    if is_all_swiss_complete and swiss_rounds:
         for swiss_round in swiss_rounds:
-            swiss_seeding_list = list(map(int, swiss_round.initial_seeding.keys()))
-
-            for seed in swiss_seeding_list:
-                team_id = int(tournament_current_seeding[seed])
-
-                next_matches = (
-                    Match.objects.filter(cross_pool__isnull=False)
-                    .filter(tournament=tournament_id, sequence_number=1)
-                    .filter(Q(placeholder_seed_1=seed) | Q(placeholder_seed_2=seed))
-                )
-
-                if next_matches.count() == 0:
-                    next_matches = (
-                        Match.objects.filter(cross_pool__isnull=False)
-                        .filter(tournament=tournament_id, sequence_number=2)
-                        .filter(Q(placeholder_seed_1=seed) | Q(placeholder_seed_2=seed))
-                    )
-
-                if next_matches.count() == 0:
-                    next_matches = (
-                        Match.objects.filter(
-                            Q(bracket__isnull=False) | Q(position_pool__isnull=False)
-                        )
-                        .filter(tournament=tournament_id, sequence_number=1)
-                        .filter(Q(placeholder_seed_1=seed) | Q(placeholder_seed_2=seed))
-                    )
-
-                for match in next_matches:
-                    if match.placeholder_seed_1 == seed and match.team_1 is None:
-                        match.team_1 = teams_by_id[team_id]
-                    elif match.placeholder_seed_2 == seed and match.team_2 is None:
-                        match.team_2 = teams_by_id[team_id]
-
-                    if (
-                        match.status == Match.Status.YET_TO_FIX
-                        and match.team_1 is not None
-                        and match.team_2 is not None
-                    ):
-                        match.status = Match.Status.SCHEDULED
-
-                    match.save()
+            for seed in map(int, swiss_round.initial_seeding.keys()):
+                for match in first_matches_after_group(seed):
+                    _fill_open_slot(match, (seed,), team_for_seed)
+
+    matches_by_pool: dict[int, list[Match]] = {}
+    for match in matches:
+        if match.pool_id is not None:
+            matches_by_pool.setdefault(match.pool_id, []).append(match)
 
     for pool in pools:
-        is_current_pool_matches_completed = True
+        if any(m.status != Match.Status.COMPLETED for m in matches_by_pool.get(pool.id, [])):
+            is_all_pool_matches_complete = False
+            continue
 
-        matches = Match.objects.filter(pool=pool)
-        for match in matches:
-            if match.status != Match.Status.COMPLETED:
-                is_current_pool_matches_completed = False
-                is_all_pool_matches_complete = False
-
-        if is_current_pool_matches_completed:
-            tournament_current_seeding = {int(k): v for k, v in tournament.current_seeding.items()}
-            pool_initial_seeding_list = list(map(int, pool.initial_seeding.keys()))
-
-            for seed in pool_initial_seeding_list:
-                team_id = int(tournament_current_seeding[seed])
-
-                next_matches = (
-                    Match.objects.filter(cross_pool__isnull=False)
-                    .filter(tournament=tournament_id, sequence_number=1)
-                    .filter(Q(placeholder_seed_1=seed) | Q(placeholder_seed_2=seed))
-                )
-
-                if next_matches.count() == 0:
-                    next_matches = (
-                        Match.objects.filter(cross_pool__isnull=False)
-                        .filter(tournament=tournament_id, sequence_number=2)
-                        .filter(Q(placeholder_seed_1=seed) | Q(placeholder_seed_2=seed))
-                    )
-
-                if next_matches.count() == 0:
-                    next_matches = (
-                        Match.objects.filter(
-                            Q(bracket__isnull=False) | Q(position_pool__isnull=False)
-                        )
-                        .filter(tournament=tournament_id, sequence_number=1)
-                        .filter(Q(placeholder_seed_1=seed) | Q(placeholder_seed_2=seed))
-                    )
-
-                for match in next_matches:
-                    if match.placeholder_seed_1 == seed and match.team_1 is None:
-                        match.team_1 = teams_by_id[team_id]
-                    elif match.placeholder_seed_2 == seed and match.team_2 is None:
-                        match.team_2 = teams_by_id[team_id]
-
-                    if (
-                        match.status == Match.Status.YET_TO_FIX
-                        and match.team_1 is not None
-                        and match.team_2 is not None
-                    ):
-                        match.status = Match.Status.SCHEDULED
-
-                    match.save()
+        for seed in map(int, pool.initial_seeding.keys()):
+            for match in first_matches_after_group(seed):
+                _fill_open_slot(match, (seed,), team_for_seed)
 
     if is_all_pool_matches_complete:
-        if cross_pool.count() > 0:
-            if not cross_pool[0].initial_seeding:
-                cp = cross_pool[0]
+        if cross_pools:
+            if not cross_pools[0].initial_seeding:
+                cp = cross_pools[0]
                 cp.initial_seeding = tournament.current_seeding
                 cp.current_seeding = tournament.current_seeding
                 cp.save()
@@ -1427,312 +1334,119 @@ def populate_fixtures(tournament_id: int) -> None:
                     for key in list(bracket.initial_seeding.keys()):
                         bracket.initial_seeding[int(key)] = tournament.current_seeding[key]
                         bracket.current_seeding[int(key)] = tournament.current_seeding[key]
-                    bracket.save()
+                    changed_brackets[bracket.id] = bracket
 
             for position_pool in position_pools:
                 if (
                     position_pool.initial_seeding[next(iter(position_pool.initial_seeding.keys()))]
                     == 0
                 ):
-                    for i, key in enumerate(list(position_pool.initial_seeding.keys())):
-                        position_pool.initial_seeding[int(key)] = tournament.current_seeding[key]
-                        position_pool.results[tournament.current_seeding[key]] = {
-                            "rank": i + 1,
-                            "wins": 0,
-                            "losses": 0,
-                            "draws": 0,
-                            "GF": 0,  # Goals For
-                            "GA": 0,  # Goals Against
-                        }
-                    position_pool.save()
-
-    if cross_pool.count() > 0:
-        matches = Match.objects.filter(cross_pool=cross_pool[0])
-        for match in matches:
-            if match.status == Match.Status.COMPLETED:
-                _next_cp_seed_1 = (
-                    Match.objects.filter(cross_pool__isnull=False)
-                    .filter(
-                        tournament=tournament_id,
-                        sequence_number__gt=match.sequence_number,
-                    )
-                    .filter(
-                        Q(placeholder_seed_1=match.placeholder_seed_1)
-                        | Q(placeholder_seed_2=match.placeholder_seed_1)
-                    )
-                    .order_by("sequence_number")
-                )
-                _first_cp_seed_1 = _next_cp_seed_1.first()
-                if _first_cp_seed_1 is not None:
-                    next_matches_seed_1 = _next_cp_seed_1.filter(
-                        sequence_number=_first_cp_seed_1.sequence_number
-                    )
-                else:
-                    next_matches_seed_1 = (
-                        Match.objects.filter(
-                            Q(bracket__isnull=False) | Q(position_pool__isnull=False)
-                        )
-                        .filter(tournament=tournament_id, sequence_number=1)
-                        .filter(
-                            Q(placeholder_seed_1=match.placeholder_seed_1)
-                            | Q(placeholder_seed_2=match.placeholder_seed_1)
-                        )
-                    )
-
-                _next_cp_seed_2 = (
-                    Match.objects.filter(cross_pool__isnull=False)
-                    .filter(
-                        tournament=tournament_id,
-                        sequence_number__gt=match.sequence_number,
-                    )
-                    .filter(
-                        Q(placeholder_seed_1=match.placeholder_seed_2)
-                        | Q(placeholder_seed_2=match.placeholder_seed_2)
-                    )
-                    .order_by("sequence_number")
-                )
-                _first_cp_seed_2 = _next_cp_seed_2.first()
-                if _first_cp_seed_2 is not None:
-                    next_matches_seed_2 = _next_cp_seed_2.filter(
-                        sequence_number=_first_cp_seed_2.sequence_number
-                    )
-                else:
-                    next_matches_seed_2 = (
-                        Match.objects.filter(
-                            Q(bracket__isnull=False) | Q(position_pool__isnull=False)
-                        )
-                        .filter(tournament=tournament_id, sequence_number=1)
-                        .filter(
-                            Q(placeholder_seed_1=match.placeholder_seed_2)
-                            | Q(placeholder_seed_2=match.placeholder_seed_2)
-                        )
-                    )
-
-                for next_match in next_matches_seed_1:
-                    if (
-                        next_match.placeholder_seed_1 == match.placeholder_seed_1
-                        and next_match.team_1 is None
-                    ):
-                        next_match.team_1 = teams_by_id[
-                            tournament.current_seeding[str(next_match.placeholder_seed_1)]
-                        ]
-                    elif (
-                        next_match.placeholder_seed_2 == match.placeholder_seed_1
-                        and next_match.team_2 is None
-                    ):
-                        next_match.team_2 = teams_by_id[
-                            tournament.current_seeding[str(next_match.placeholder_seed_2)]
-                        ]
-
-                    if (
-                        next_match.status == Match.Status.YET_TO_FIX
-                        and next_match.team_1 is not None
-                        and next_match.team_2 is not None
-                    ):
-                        next_match.status = Match.Status.SCHEDULED
-
-                    next_match.save()
-
-                for next_match in next_matches_seed_2:
-                    if (
-                        next_match.placeholder_seed_1 == match.placeholder_seed_2
-                        and next_match.team_1 is None
-                    ):
-                        next_match.team_1 = teams_by_id[
-                            tournament.current_seeding[str(next_match.placeholder_seed_1)]
-                        ]
-                    elif (
-                        next_match.placeholder_seed_2 == match.placeholder_seed_2
-                        and next_match.team_2 is None
-                    ):
-                        next_match.team_2 = teams_by_id[
-                            tournament.current_seeding[str(next_match.placeholder_seed_2)]
-                        ]
-
-                    if (
-                        next_match.status == Match.Status.YET_TO_FIX
-                        and next_match.team_1 is not None
-                        and next_match.team_2 is not None
-                    ):
-                        next_match.status = Match.Status.SCHEDULED
-
-                    next_match.save()
-
-        for bracket in brackets:
-            is_this_bracket_seeds_pool_matches_complete = True
-            is_this_bracket_seeds_cross_pool_matches_complete = True
+                    _seed_position_pool(position_pool, tournament)
+                    changed_position_pools[position_pool.id] = position_pool
 
-            bracket_initial_seeding_list = list(map(int, bracket.initial_seeding.keys()))
-
-            for seed in bracket_initial_seeding_list:
-                pool_matches_not_completed = (
-                    Match.objects.filter(Q(pool__isnull=False) | Q(swiss_round__isnull=False))
-                    .filter(tournament=tournament_id)
-                    .exclude(status=Match.Status.COMPLETED)
-                    .filter(Q(placeholder_seed_1=seed) | Q(placeholder_seed_2=seed))
-                )
-
-                if pool_matches_not_completed.count() > 0:
-                    is_this_bracket_seeds_pool_matches_complete = False
-
-                cross_pool_matches_not_completed = (
-                    Match.objects.filter(cross_pool__isnull=False)
-                    .filter(tournament=tournament_id)
-                    .exclude(status=Match.Status.COMPLETED)
-                    .filter(Q(placeholder_seed_1=seed) | Q(placeholder_seed_2=seed))
-                )
-
-                if cross_pool_matches_not_completed.count() > 0:
-                    is_this_bracket_seeds_cross_pool_matches_complete = False
+    if cross_pools:
+        for match in matches:
+            if match.cross_pool_id != cross_pools[0].id or match.status != Match.Status.COMPLETED:
+                continue
 
-            if (
-                is_this_bracket_seeds_pool_matches_complete
-                and is_this_bracket_seeds_cross_pool_matches_complete
-            ):
-                if bracket.initial_seeding[next(iter(bracket.initial_seeding.keys()))] == 0:
-                    for key in list(bracket.initial_seeding.keys()):
-                        bracket.initial_seeding[int(key)] = tournament.current_seeding[key]
-                        bracket.current_seeding[int(key)] = tournament.current_seeding[key]
-                    bracket.save()
+            for seed in (match.placeholder_seed_1, match.placeholder_seed_2):
+                later_sequences = [
+                    sequence
+                    for sequence in cross_pool_by_seed.get(seed, {})
+                    if sequence > match.sequence_number
+                ]
+                if later_sequences:
+                    next_matches = cross_pool_by_seed[seed][min(later_sequences)]
+                else:
+                    next_matches = bracket_or_position_pool_by_seed.get(seed, {}).get(1, [])
 
-                next_matches = Match.objects.filter(
-                    bracket=bracket, status=Match.Status.YET_TO_FIX, sequence_number=1
-                )
                 for next_match in next_matches:
-                    if next_match.team_1 is None:
-                        next_match.team_1 = teams_by_id[
-                            tournament.current_seeding[str(next_match.placeholder_seed_1)]
-                        ]
-                    if next_match.team_2 is None:
-                        next_match.team_2 = teams_by_id[
-                            tournament.current_seeding[str(next_match.placeholder_seed_2)]
-                        ]
-                    next_match.status = Match.Status.SCHEDULED
-                    next_match.save()
+                    _fill_open_slot(next_match, (seed,), team_for_seed)
 
-        for position_pool in position_pools:
-            is_this_position_pool_seeds_pool_matches_complete = True
-            is_this_position_pool_seeds_cross_pool_matches_complete = True
+        # Seeds still waiting on a pool, Swiss or cross pool game
+        seeds_in_unfinished_groups: set[int] = set()
+        seeds_in_unfinished_cross_pool: set[int] = set()
+        for match in matches:
+            if match.status == Match.Status.COMPLETED:
+                continue
+            seeds = (match.placeholder_seed_1, match.placeholder_seed_2)
+            if match.pool_id is not None or match.swiss_round_id is not None:
+                seeds_in_unfinished_groups.update(seeds)
+            if match.cross_pool_id is not None:
+                seeds_in_unfinished_cross_pool.update(seeds)
+        unfinished_seeds = seeds_in_unfinished_groups | seeds_in_unfinished_cross_pool
 
-            position_pool_initial_seeding_list = list(
-                map(int, position_pool.initial_seeding.keys())
-            )
+        for bracket in brackets:
+            if any(int(seed) in unfinished_seeds for seed in bracket.initial_seeding):
+                continue
 
-            for seed in position_pool_initial_seeding_list:
-                pool_matches_not_completed = (
-                    Match.objects.filter(Q(pool__isnull=False) | Q(swiss_round__isnull=False))
-                    .filter(tournament=tournament_id)
-                    .exclude(status=Match.Status.COMPLETED)
-                    .filter(Q(placeholder_seed_1=seed) | Q(placeholder_seed_2=seed))
-                )
+            if bracket.initial_seeding[next(iter(bracket.initial_seeding.keys()))] == 0:
+                for key in list(bracket.initial_seeding.keys()):
+                    bracket.initial_seeding[int(key)] = tournament.current_seeding[key]
+                    bracket.current_seeding[int(key)] = tournament.current_seeding[key]
+                changed_brackets[bracket.id] = bracket
 
-                if pool_matches_not_completed.count() > 0:
-                    is_this_position_pool_seeds_pool_matches_complete = False
+            for next_match in matches:
+                if (
+                    next_match.bracket_id == bracket.id
+                    and next_match.status == Match.Status.YET_TO_FIX
+                    and next_match.sequence_number == 1
+                ):
+                    _fill_both_slots(next_match, team_for_seed)
 
-                cross_pool_matches_not_completed = (
-                    Match.objects.filter(cross_pool__isnull=False)
-                    .filter(tournament=tournament_id)
-                    .exclude(status=Match.Status.COMPLETED)
-                    .filter(Q(placeholder_seed_1=seed) | Q(placeholder_seed_2=seed))
-                )
+        for position_pool in position_pools:
+            if any(int(seed) in unfinished_seeds for seed in position_pool.initial_seeding):
+                continue
 
-                if cross_pool_matches_not_completed.count() > 0:
-                    is_this_position_pool_seeds_cross_pool_matches_complete = False
+            if position_pool.initial_seeding[next(iter(position_pool.initial_seeding.keys()))] == 0:
+                _seed_position_pool(position_pool, tournament)
+                changed_position_pools[position_pool.id] = position_pool
 
-            if (
-                is_this_position_pool_seeds_pool_matches_complete
-                and is_this_position_pool_seeds_cross_pool_matches_complete
-            ):
+            for next_match in matches:
                 if (
-                    position_pool.initial_seeding[next(iter(position_pool.initial_seeding.keys()))]
-                    == 0
+                    next_match.position_pool_id == position_pool.id
+                    and next_match.status == Match.Status.YET_TO_FIX
                 ):
-                    for i, key in enumerate(list(position_pool.initial_seeding.keys())):
-                        position_pool.initial_seeding[int(key)] = tournament.current_seeding[key]
-                        position_pool.results[tournament.current_seeding[key]] = {
-                            "rank": i + 1,
-                            "wins": 0,
-                            "losses": 0,
-                            "draws": 0,
-                            "GF": 0,  # Goals For
-                            "GA": 0,  # Goals Against
-                        }
-                    position_pool.save()
-
-                next_matches = Match.objects.filter(
-                    position_pool=position_pool, status=Match.Status.YET_TO_FIX
-                )
-                for next_match in next_matches:
-                    if next_match.team_1 is None:
-                        next_match.team_1 = teams_by_id[
-                            tournament.current_seeding[str(next_match.placeholder_seed_1)]
-                        ]
-                    if next_match.team_2 is None:
-                        next_match.team_2 = teams_by_id[
-                            tournament.current_seeding[str(next_match.placeholder_seed_2)]
-                        ]
-                    next_match.status = Match.Status.SCHEDULED
-                    next_match.save()
+                    _fill_both_slots(next_match, team_for_seed)
 
-    for bracket in brackets:
-        matches = Match.objects.filter(bracket=bracket)
+    bracket_matches_by_round: dict[tuple[int, int], list[Match]] = {}
+    for match in matches:
+        if match.bracket_id is not None:
+            key = (match.bracket_id, match.sequence_number)
+            bracket_matches_by_round.setdefault(key, []).append(match)
 
+    for bracket in brackets:
         for match in matches:
-            if match.status == Match.Status.COMPLETED:
-                next_matches = Match.objects.filter(
-                    sequence_number=match.sequence_number + 1, bracket=bracket
-                ).filter(
-                    Q(placeholder_seed_1=match.placeholder_seed_1)
-                    | Q(placeholder_seed_2=match.placeholder_seed_1)
-                    | Q(placeholder_seed_1=match.placeholder_seed_2)
-                    | Q(placeholder_seed_2=match.placeholder_seed_2)
-                )
+            if match.bracket_id != bracket.id or match.status != Match.Status.COMPLETED:
+                continue
 
-                for next_match in next_matches:
-                    if (
-                        next_match.placeholder_seed_1 == match.placeholder_seed_1
-                        and next_match.team_1 is None
-                    ):
-                        next_match.team_1 = teams_by_id[
-                            tournament.current_seeding[str(next_match.placeholder_seed_1)]
-                        ]
-                    elif (
-                        next_match.placeholder_seed_2 == match.placeholder_seed_1
-                        and next_match.team_2 is None
-                    ):
-                        next_match.team_2 = teams_by_id[
-                            tournament.current_seeding[str(next_match.placeholder_seed_2)]
-                        ]
-                    elif (
-                        next_match.placeholder_seed_1 == match.placeholder_seed_2
-                        and next_match.team_1 is None
-                    ):
-                        next_match.team_1 = teams_by_id[
-                            tournament.current_seeding[str(next_match.placeholder_seed_1)]
-                        ]
-                    elif (
-                        next_match.placeholder_seed_2 == match.placeholder_seed_2
-                        and next_match.team_2 is None
-                    ):
-                        next_match.team_2 = teams_by_id[
-                            tournament.current_seeding[str(next_match.placeholder_seed_2)]
-                        ]
-
-                    if (
-                        next_match.status == Match.Status.YET_TO_FIX
-                        and next_match.team_1 is not None
-                        and next_match.team_2 is not None
-                    ):
-                        next_match.status = Match.Status.SCHEDULED
-
-                    next_match.save()
+            seeds = (match.placeholder_seed_1, match.placeholder_seed_2)
+            for next_match in bracket_matches_by_round.get(
+                (bracket.id, match.sequence_number + 1), []
+            ):
+                if next_match.placeholder_seed_1 in seeds or next_match.placeholder_seed_2 in seeds:
+                    _fill_open_slot(next_match, seeds, team_for_seed)
 
-    if (
-        Match.objects.filter(tournament=tournament_id)
-        .exclude(status=Match.Status.COMPLETED)
-        .count()
-        == 0
-    ):
+    changed_matches = [
+        m for m in matches if as_loaded[m.id] != (m.team_1_id, m.team_2_id, m.status)
+    ]
+    if changed_matches:
+        Match.objects.bulk_update(changed_matches, ["team_1", "team_2", "status"])
+    if changed_matches or changed_brackets or changed_position_pools:
+        # Bulk updates skip the save signals that keep the public cache in sync
+        invalidate_tournament_cache(tournament_id)
+    # Filling a stage's seeding changes team ids, never its seeds, so the rules'
+    # Format table these stages' save signal keeps in sync cannot change here.
+    if changed_brackets:
+        Bracket.objects.bulk_update(
+            changed_brackets.values(), ["initial_seeding", "current_seeding"]
+        )
+    if changed_position_pools:
+        PositionPool.objects.bulk_update(
+            changed_position_pools.values(), ["initial_seeding", "results"]
+        )
+
+    if all(m.status == Match.Status.COMPLETED for m in matches):
         tournament.status = Tournament.Status.COMPLETED
         tournament.save()
 
@@ -2003,6 +1717,57 @@ def rank_spirit_scores(scores: list[dict[str, int | float]]) -> list[dict[str, i
     return sorted(scores, key=lambda x: x["rank"])
 
 
+def _matches_by_seed(matches: Iterable[Match]) -> dict[int, dict[int, list[Match]]]:
+    """Index matches as seed -> sequence number -> matches holding that placeholder seed."""
+    index: dict[int, dict[int, list[Match]]] = {}
+    for match in matches:
+        for seed in dict.fromkeys((match.placeholder_seed_1, match.placeholder_seed_2)):
+            index.setdefault(seed, {}).setdefault(match.sequence_number, []).append(match)
+    return index
+
+
+def _fill_open_slot(
+    match: Match, seeds: tuple[int, ...], team_for_seed: Callable[[int], int]
+) -> None:
+    """Put the team holding the first matching seed into its empty slot, then
+    schedule the match once both teams are known. Fills at most one slot."""
+    for seed in seeds:
+        if match.placeholder_seed_1 == seed and match.team_1_id is None:
+            match.team_1_id = team_for_seed(seed)
+            break
+        if match.placeholder_seed_2 == seed and match.team_2_id is None:
+            match.team_2_id = team_for_seed(seed)
+            break
+
+    if (
+        match.status == Match.Status.YET_TO_FIX
+        and match.team_1_id is not None
+        and match.team_2_id is not None
+    ):
+        match.status = Match.Status.SCHEDULED
+
+
+def _fill_both_slots(match: Match, team_for_seed: Callable[[int], int]) -> None:
+    if match.team_1_id is None:
+        match.team_1_id = team_for_seed(match.placeholder_seed_1)
+    if match.team_2_id is None:
+        match.team_2_id = team_for_seed(match.placeholder_seed_2)
+    match.status = Match.Status.SCHEDULED
+
+
+def _seed_position_pool(position_pool: PositionPool, tournament: Tournament) -> None:
+    for i, key in enumerate(list(position_pool.initial_seeding.keys())):
+        position_pool.initial_seeding[int(key)] = tournament.current_seeding[key]
+        position_pool.results[tournament.current_seeding[key]] = {
+            "rank": i + 1,
+            "wins": 0,
+            "losses": 0,
+            "draws": 0,
+            "GF": 0,  # Goals For
+            "GA": 0,  # Goals Against
+        }
+
+
 def update_for_pool_or_position_pool(match: Match, pool: Pool | PositionPool) -> None:
     results = pool.results
     results = {int(k): v for k, v in results.items()}
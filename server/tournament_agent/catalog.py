@@ -30,8 +30,6 @@ AGENT_MODELS: tuple[AgentModel, ...] = (
     AgentModel(
         id="gpt-5.6-luna",
         label="GPT-5.6 Luna",
-        # Note: the Responses API path in `clients.opencode` buffers — this model
-        # does not stream incrementally, so replies land in one piece.
         hint="Top score, fastest",
         api_style="responses",
         req_per_5h=2050,
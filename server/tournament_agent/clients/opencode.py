@@ -16,6 +16,7 @@ import httpx
 from django.conf import settings
 
 from server.tournament_agent.catalog import AgentModel, get_model
+from server.tournament_agent.clients.transport import get_http_client, timed_request
 
 HTTP_ERROR_STATUS = 400
 
@@ -38,15 +39,34 @@ class ChatCompletionResult:
         usage = self.raw.get("usage") or {}
         if not isinstance(usage, dict):
             return 0, 0
+        # Anthropic leaves cache reads and writes out of input_tokens; the others
+        # count cached tokens as input and never send these two keys.
+        cache_in = _usage_int(usage, "cache_read_input_tokens") + _usage_int(
+            usage, "cache_creation_input_tokens"
+        )
+        return (
+            _usage_int(usage, "prompt_tokens", "input_tokens") + cache_in,
+            _usage_int(usage, "completion_tokens", "output_tokens"),
+        )
 
-        def read(*names: str) -> int:
-            for name in names:
-                value = usage.get(name)
-                if isinstance(value, int):
-                    return value
+    @property
+    def cached_tokens(self) -> int:
+        """How many of the input tokens the provider served from its prompt cache."""
+        usage = self.raw.get("usage") or {}
+        if not isinstance(usage, dict):
             return 0
+        details = usage.get("prompt_tokens_details") or usage.get("input_tokens_details")
+        if isinstance(details, dict):
+            return _usage_int(details, "cached_tokens")
+        return _usage_int(usage, "cache_read_input_tokens")
+
 
-        return read("prompt_tokens", "input_tokens"), read("completion_tokens", "output_tokens")
+def _usage_int(usage: dict[str, Any], *names: str) -> int:
+    for name in names:
+        value = usage.get(name)
+        if isinstance(value, int):
+            return value
+    return 0
 
 
 @dataclass
@@ -270,10 +290,12 @@ def _responses_body(
 ) -> dict[str, Any]:
     instructions: list[str] = []
     input_items: list[dict[str, Any]] = []
+    cache_key: str | None = None
     for msg in messages:
         role = msg.get("role")
         if role == "system":
             instructions.append(str(msg.get("content") or ""))
+            cache_key = msg.get("cache_key") or cache_key
             continue
         if role == "tool":
             input_items.append(
@@ -307,6 +329,9 @@ def _responses_body(
     }
     if instructions:
         body["instructions"] = "\n\n".join(instructions)
+    if cache_key:
+        # Routes requests sharing the stable prefix to the same prompt cache
+        body["prompt_cache_key"] = cache_key
     if temperature is not None:
         body["temperature"] = temperature
     converted = _responses_tools(tools)
@@ -527,10 +552,9 @@ class OpenCodeGoClient:
                     model, messages, tools, temp, tokens, tool_choice
                 )
             elif model.api_style == "responses":
-                result = self._responses_chat(model, messages, tools, temp, tokens, tool_choice)
-                if result.content:
-                    yield StreamChunk(type="text", text=result.content)
-                yield StreamChunk(type="result", result=result)
+                yield from self._responses_chat_stream(
+                    model, messages, tools, temp, tokens, tool_choice
+                )
             else:
                 yield from self._anthropic_chat_stream(
                     model, messages, tools, temp, tokens, tool_choice
@@ -600,8 +624,14 @@ class OpenCodeGoClient:
         body = self._openai_body(model, messages, tools, temperature, max_tokens, tool_choice)
 
         url = f"{self.base_url}/chat/completions"
-        with httpx.Client(timeout=self.timeout) as client:
-            resp = client.post(url, headers=self._headers(), json=body)
+        with timed_request("chat/completions") as extensions:
+            resp = get_http_client().post(
+                url,
+                headers=self._headers(),
+                json=body,
+                timeout=self.timeout,
+                extensions=extensions,
+            )
         if resp.status_code >= HTTP_ERROR_STATUS:
             raise _status_error(resp.status_code, resp.text)
         data = resp.json()
@@ -636,8 +666,14 @@ class OpenCodeGoClient:
         # chat.completions. Keep the internal ChatCompletionResult contract.
         body = _responses_body(model, messages, tools, temperature, max_tokens, tool_choice)
         url = f"{self.base_url}/responses"
-        with httpx.Client(timeout=self.timeout) as client:
-            resp = client.post(url, headers=self._headers(), json=body)
+        with timed_request("responses") as extensions:
+            resp = get_http_client().post(
+                url,
+                headers=self._headers(),
+                json=body,
+                timeout=self.timeout,
+                extensions=extensions,
+            )
         if resp.status_code >= HTTP_ERROR_STATUS:
             raise _status_error(resp.status_code, resp.text)
         data = resp.json()
@@ -645,6 +681,92 @@ class OpenCodeGoClient:
             raise OpenCodeGoError(f"OpenCode Go API error: {data['error']}")
         return _parse_responses_result(data)
 
+    def _responses_chat_stream(
+        self,
+        model: AgentModel,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        temperature: float | None,
+        max_tokens: int,
+        tool_choice: str = TOOL_CHOICE_AUTO,
+    ) -> Iterator[StreamChunk]:
+        body = _responses_body(model, messages, tools, temperature, max_tokens, tool_choice)
+        body["stream"] = True
+
+        url = f"{self.base_url}/responses"
+        # Every event names the output item it belongs to; a reply can hold several
+        # message items (joined with a newline, as the buffered path does) and any
+        # number of function calls.
+        texts: dict[int, str] = {}
+        calls: dict[int, dict[str, str]] = {}
+        status: str | None = None
+        usage: dict[str, Any] = {}
+
+        with (
+            timed_request("responses") as extensions,
+            get_http_client().stream(
+                "POST",
+                url,
+                headers=self._headers(),
+                json=body,
+                timeout=self.timeout,
+                extensions=extensions,
+            ) as resp,
+        ):
+            self._raise_for_stream_status(resp)
+            for payload in self._sse_payloads(resp):
+                kind = payload.get("type")
+                idx = int(payload.get("output_index") or 0)
+                if kind == "error":
+                    raise OpenCodeGoError(f"OpenCode Go API error: {payload.get('message')}")
+                if kind == "response.failed":
+                    error = (payload.get("response") or {}).get("error")
+                    raise OpenCodeGoError(f"OpenCode Go API error: {error}")
+                if kind in ("response.output_item.added", "response.output_item.done"):
+                    item = payload.get("item") or {}
+                    if item.get("type") == "function_call":
+                        slot = calls.setdefault(idx, {"id": "", "name": "", "arguments": ""})
+                        slot["id"] = str(item.get("call_id") or item.get("id") or slot["id"])
+                        slot["name"] = str(item.get("name") or slot["name"])
+                        # The finished item carries the whole argument string
+                        if kind == "response.output_item.done" and item.get("arguments"):
+                            slot["arguments"] = str(item["arguments"])
+                elif kind == "response.output_text.delta":
+                    piece = str(payload.get("delta") or "")
+                    if not piece:
+                        continue
+                    if idx not in texts:
+                        if texts:
+                            yield StreamChunk(type="text", text="\n")
+                        texts[idx] = ""
+                    texts[idx] += piece
+                    yield StreamChunk(type="text", text=piece)
+                elif kind == "response.function_call_arguments.delta":
+                    slot = calls.setdefault(idx, {"id": "", "name": "", "arguments": ""})
+                    slot["arguments"] += str(payload.get("delta") or "")
+                elif kind in ("response.completed", "response.incomplete"):
+                    response = payload.get("response") or {}
+                    status = response.get("status") or status
+                    # Only the final event reports usage, which the token budget reads
+                    usage = response.get("usage") or usage
+
+        content: str | None = "\n".join(text for _, text in sorted(texts.items())) or None
+        tool_calls = [
+            {"id": slot["id"], "name": slot["name"], "arguments": slot["arguments"] or "{}"}
+            for _, slot in sorted(calls.items())
+            if slot["name"]
+        ]
+        raw = {"streamed": True, "status": status, "usage": usage}
+        yield StreamChunk(
+            type="result",
+            result=ChatCompletionResult(
+                content=content,
+                tool_calls=tool_calls,
+                raw=raw,
+                finish_reason=status,
+            ),
+        )
+
     @staticmethod
     def _anthropic_body(
         model: AgentModel,
@@ -654,12 +776,26 @@ class OpenCodeGoClient:
         max_tokens: int,
         tool_choice: str = TOOL_CHOICE_AUTO,
     ) -> dict[str, Any]:
-        system_parts: list[str] = []
+        system_blocks: list[dict[str, Any]] = []
         anth_messages: list[dict[str, Any]] = []
         for msg in messages:
             role = msg.get("role")
             if role == "system":
-                system_parts.append(str(msg.get("content") or ""))
+                text = str(msg.get("content") or "")
+                prefix_chars = int(msg.get("cache_prefix_chars") or 0)
+                if prefix_chars:
+                    # Anthropic only caches what a cache_control breakpoint closes,
+                    # so mark the end of the stable prefix and leave the rest after
+                    system_blocks.append(
+                        {
+                            "type": "text",
+                            "text": text[:prefix_chars],
+                            "cache_control": {"type": "ephemeral"},
+                        }
+                    )
+                    text = text[prefix_chars:].lstrip("\n")
+                if text:
+                    system_blocks.append({"type": "text", "text": text})
                 continue
             if role == "tool":
                 anth_messages.append(
@@ -712,8 +848,10 @@ class OpenCodeGoClient:
         }
         if temperature is not None:
             body["temperature"] = temperature
-        if system_parts:
-            body["system"] = "\n\n".join(system_parts)
+        if any("cache_control" in block for block in system_blocks):
+            body["system"] = system_blocks
+        elif system_blocks:
+            body["system"] = "\n\n".join(block["text"] for block in system_blocks)
         if tools:
             body["tools"] = [
                 {
@@ -750,8 +888,10 @@ class OpenCodeGoClient:
         body = self._anthropic_body(model, messages, tools, temperature, max_tokens, tool_choice)
         url = f"{self.base_url}/messages"
         headers = self._anthropic_headers()
-        with httpx.Client(timeout=self.timeout) as client:
-            resp = client.post(url, headers=headers, json=body)
+        with timed_request("messages") as extensions:
+            resp = get_http_client().post(
+                url, headers=headers, json=body, timeout=self.timeout, extensions=extensions
+            )
         if resp.status_code >= HTTP_ERROR_STATUS:
             raise _status_error(resp.status_code, resp.text)
         data = resp.json()
@@ -792,21 +932,33 @@ class OpenCodeGoClient:
     ) -> Iterator[StreamChunk]:
         body = self._openai_body(model, messages, tools, temperature, max_tokens, tool_choice)
         body["stream"] = True
+        # Otherwise a streamed round reports no usage at all
+        body["stream_options"] = {"include_usage": True}
 
         url = f"{self.base_url}/chat/completions"
         text_parts: list[str] = []
         # Tool calls arrive as fragments keyed by index; name/arguments accrue over deltas.
         acc: dict[int, dict[str, str]] = {}
         finish_reason: str | None = None
+        usage: dict[str, Any] = {}
 
         with (
-            httpx.Client(timeout=self.timeout) as client,
-            client.stream("POST", url, headers=self._headers(), json=body) as resp,
+            timed_request("chat/completions") as extensions,
+            get_http_client().stream(
+                "POST",
+                url,
+                headers=self._headers(),
+                json=body,
+                timeout=self.timeout,
+                extensions=extensions,
+            ) as resp,
         ):
             self._raise_for_stream_status(resp)
             for payload in self._sse_payloads(resp):
                 if payload.get("error"):
                     raise OpenCodeGoError(f"OpenCode Go API error: {payload['error']}")
+                # Sent on a last chunk with no choices, when include_usage is honoured
+                usage = payload.get("usage") or usage
                 choice = (payload.get("choices") or [{}])[0]
                 finish_reason = choice.get("finish_reason") or finish_reason
                 delta = choice.get("delta") or {}
@@ -839,7 +991,7 @@ class OpenCodeGoClient:
         if tool_calls and content and "<tool_call>" in content:
             content = _INVOKE_RE.sub("", content).strip() or None
 
-        raw = {"streamed": True, "finish_reason": finish_reason}
+        raw = {"streamed": True, "finish_reason": finish_reason, "usage": usage}
         yield StreamChunk(
             type="result",
             result=ChatCompletionResult(
@@ -867,10 +1019,18 @@ class OpenCodeGoClient:
         # content_block_start announces each block; deltas then stream into it by index.
         blocks: dict[int, dict[str, str]] = {}
         stop_reason: str | None = None
+        usage: dict[str, Any] = {}
 
         with (
-            httpx.Client(timeout=self.timeout) as client,
-            client.stream("POST", url, headers=self._anthropic_headers(), json=body) as resp,
+            timed_request("messages") as extensions,
+            get_http_client().stream(
+                "POST",
+                url,
+                headers=self._anthropic_headers(),
+                json=body,
+                timeout=self.timeout,
+                extensions=extensions,
+            ) as resp,
         ):
             self._raise_for_stream_status(resp)
             for payload in self._sse_payloads(resp):
@@ -899,8 +1059,12 @@ class OpenCodeGoClient:
                             idx, {"type": "tool_use", "id": "", "name": "", "json": ""}
                         )
                         slot["json"] += str(delta.get("partial_json") or "")
+                elif kind == "message_start":
+                    # Input and cache counts arrive up front, output counts at the end
+                    usage.update((payload.get("message") or {}).get("usage") or {})
                 elif kind == "message_delta":
                     stop_reason = (payload.get("delta") or {}).get("stop_reason") or stop_reason
+                    usage.update(payload.get("usage") or {})
 
         content: str | None = "".join(text_parts) or None
         tool_calls = [
@@ -913,7 +1077,7 @@ class OpenCodeGoClient:
         if tool_calls and content and "<tool_call>" in content:
             content = _INVOKE_RE.sub("", content).strip() or None
 
-        raw = {"streamed": True, "stop_reason": stop_reason}
+        raw = {"streamed": True, "stop_reason": stop_reason, "usage": usage}
         yield StreamChunk(
             type="result",
             result=ChatCompletionResult(
@@ -0,0 +1,127 @@
+"""Process-wide pooled HTTP client for the OpenCode Go gateway.
+
+An agent turn makes several model calls in a row, and each used to open its own
+`httpx.Client` and so pay a fresh TCP and TLS handshake. Every call now goes
+through one client per process, which keeps connections alive between rounds and
+across sessions. `httpx.Client` is thread-safe, so gunicorn's gthread workers
+share it; a forked worker notices the pid change and builds its own.
+
+Each request is timed into Prometheus through httpx's `trace` extension: connect
+(only when a new connection is opened), time to the response headers, and total
+time until the body has been read.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import httpx
+from django.conf import settings
+from prometheus_client import Histogram
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = settings.PROMETHEUS_METRIC_NAMESPACE
+
+request_connect = Histogram(
+    "opencode_request_connect_seconds",
+    "Time spent opening a connection to the model gateway, by endpoint",
+    ["endpoint"],
+    namespace=NAMESPACE,
+)
+
+request_ttfb = Histogram(
+    "opencode_request_ttfb_seconds",
+    "Time from sending a request to the gateway to its response headers, by endpoint",
+    ["endpoint"],
+    namespace=NAMESPACE,
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, float("inf")),
+)
+
+request_duration = Histogram(
+    "opencode_request_seconds",
+    "Total time of a request to the gateway, body included, by endpoint",
+    ["endpoint"],
+    namespace=NAMESPACE,
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, float("inf")),
+)
+
+
+class _SharedClient:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.client: httpx.Client | None = None
+        self.pid: int | None = None
+
+
+_shared = _SharedClient()
+
+
+def _http2_enabled() -> bool:
+    if not settings.OPENCODE_GO_HTTP2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("OPENCODE_GO_HTTP2 is set but h2 is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def get_http_client() -> httpx.Client:
+    """The shared client, created on first use in each process"""
+    with _shared.lock:
+        client = _shared.client
+        if client is None or client.is_closed or _shared.pid != os.getpid():
+            client = httpx.Client(
+                http2=_http2_enabled(),
+                limits=httpx.Limits(
+                    max_connections=settings.OPENCODE_GO_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENCODE_GO_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.OPENCODE_GO_KEEPALIVE_EXPIRY,
+                ),
+            )
+            _shared.client = client
+            _shared.pid = os.getpid()
+        return client
+
+
+def close_http_client() -> None:
+    """Close the shared client's connections; the next request opens a new one"""
+    with _shared.lock:
+        if _shared.client is not None:
+            _shared.client.close()
+        _shared.client = None
+
+
+@contextmanager
+def timed_request(endpoint: str) -> Iterator[dict[str, Any]]:
+    """Extensions for one request that record its timings under `endpoint`.
+
+    Pass what this yields as the request's `extensions`; the total is recorded when
+    the block exits, so wrap the whole read of a streamed body.
+    """
+    started = time.perf_counter()
+    connect: dict[str, float] = {}
+
+    def trace(event_name: str, _info: dict[str, Any]) -> None:
+        now = time.perf_counter()
+        if event_name == "connection.connect_tcp.started":
+            connect["started"] = now
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            # With TLS the handshake completes last, so it is what ends the connect
+            connect["complete"] = now
+        elif event_name.endswith("receive_response_headers.complete"):
+            if "started" in connect and "complete" in connect:
+                request_connect.labels(endpoint).observe(connect["complete"] - connect["started"])
+            request_ttfb.labels(endpoint).observe(now - started)
+
+    try:
+        yield {"trace": trace}
+    finally:
+        request_duration.labels(endpoint).observe(time.perf_counter() - started)
@@ -1,7 +1,20 @@
-"""Deterministic schedule recommender for unscheduled matches."""
+"""Schedule recommender for unscheduled matches.
+
+Each stage is packed by a pluggable engine from `ENGINES` over an `IntervalIndex`
+of field bookings and team rest windows.
+
+The greedy engine is deterministic. Local search stops at a wall-clock time
+budget, so when the budget runs out before it finishes, how far it got (and so
+the schedule) can differ between runs and machines.
+"""
 
 from __future__ import annotations
 
+import time
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from dataclasses import field as dataclass_field
 from datetime import date, datetime, timedelta
 from itertools import groupby
 from typing import Any
@@ -16,8 +29,14 @@ from server.tournament_agent.domain.validate import (
     side_keys,
 )
 
+DEFAULT_ENGINE = "local_search"
+DEFAULT_TIME_BUDGET_SECS = 5.0
+# Longest a caller (in practice the model, through the tool) can let local search run
+MAX_TIME_BUDGET_SECS = 30.0
+
 # Matches are placed in this order so a stage never lands before the stage that
-# feeds it. Within a stage, creation order (id) is kept.
+# feeds it. Within a stage, first fit tries them in creation order (id), and local
+# search may then move them anywhere in the stage.
 STAGE_ORDER = {"pool": 0, "swiss_round": 0, "cross_pool": 1, "bracket": 2, "position_pool": 2}
 
 
@@ -44,25 +63,195 @@ def _rest_keys(match: Match, seeding: dict[int, int]) -> list[str]:
     return [key for key, _team_id, _label in side_keys(match, seeding)]
 
 
-def _rest_ok(
-    windows: dict[str, list[tuple[datetime, datetime]]],
-    keys: list[str],
-    slot: datetime,
-    slot_end: datetime,
-    rest: timedelta,
-) -> bool:
-    """True when this slot has enough rest before and after each side's other games."""
-    for key in keys:
-        for start, end in windows.get(key) or []:
-            if slot_end <= start:
-                if start - slot_end < rest:
-                    return False
-            elif end <= slot:
-                if slot - end < rest:
+class IntervalIndex:
+    """Booked windows per key, sorted by start, checked by bisection.
+
+    Two windows conflict when they overlap or sit less than `gap` apart, so with a
+    gap of the minimum rest, keyed by side, this answers rest checks; with no gap,
+    keyed by field, it answers double-booking. A check looks only at the windows
+    starting near the candidate instead of rescanning a side's whole day.
+    """
+
+    def __init__(self, gap: timedelta) -> None:
+        self.gap = gap
+        self._starts: dict[str, list[datetime]] = {}
+        self._ends: dict[str, list[datetime]] = {}
+        self._longest = timedelta(0)
+
+    def fits(self, keys: list[str], start: datetime, end: datetime) -> bool:
+        for key in keys:
+            starts = self._starts.get(key)
+            if not starts:
+                continue
+            # Anything starting before `lo` ends more than `gap` before `start`
+            lo = bisect_left(starts, start - self.gap - self._longest)
+            hi = bisect_left(starts, end + self.gap)
+            ends = self._ends[key]
+            for i in range(lo, hi):
+                if ends[i] > start - self.gap:
                     return False
-            else:
-                return False
-    return True
+        return True
+
+    def add(self, keys: list[str], start: datetime, end: datetime) -> None:
+        self._longest = max(self._longest, end - start)
+        for key in keys:
+            starts = self._starts.setdefault(key, [])
+            i = bisect_right(starts, start)
+            starts.insert(i, start)
+            self._ends.setdefault(key, []).insert(i, end)
+
+    def remove(self, keys: list[str], start: datetime, end: datetime) -> None:
+        for key in keys:
+            starts, ends = self._starts[key], self._ends[key]
+            i = bisect_left(starts, start)
+            while ends[i] != end:
+                i += 1
+            del starts[i]
+            del ends[i]
+
+
+@dataclass
+class StageProblem:
+    """One stage's unscheduled matches and the grid they may go on.
+
+    `slots` already starts after the stage gate. `fields` and `rest` hold every
+    booking so far, earlier stages and staff-timed matches included; an engine adds
+    its own placements to both and records them in `placed`.
+    """
+
+    matches: list[int]
+    keys: dict[int, list[str]]
+    slots: list[datetime]
+    field_ids: list[int]
+    slot_length: timedelta
+    fields: IntervalIndex
+    rest: IntervalIndex
+    deadline: float
+    placed: dict[int, tuple[datetime, int]] = dataclass_field(default_factory=dict)
+
+    def fits(self, match_id: int, slot: datetime, field_id: int) -> bool:
+        end = slot + self.slot_length
+        return self.fields.fits([f"field:{field_id}"], slot, end) and self.rest.fits(
+            self.keys[match_id], slot, end
+        )
+
+    def place(self, match_id: int, slot: datetime, field_id: int) -> None:
+        end = slot + self.slot_length
+        self.fields.add([f"field:{field_id}"], slot, end)
+        self.rest.add(self.keys[match_id], slot, end)
+        self.placed[match_id] = (slot, field_id)
+
+    def unplace(self, match_id: int) -> tuple[datetime, int]:
+        slot, field_id = self.placed.pop(match_id)
+        end = slot + self.slot_length
+        self.fields.remove([f"field:{field_id}"], slot, end)
+        self.rest.remove(self.keys[match_id], slot, end)
+        return slot, field_id
+
+    def free_cells(self) -> Iterator[tuple[datetime, int]]:
+        end = self.slot_length
+        for slot in self.slots:
+            for field_id in self.field_ids:
+                if self.fields.fits([f"field:{field_id}"], slot, slot + end):
+                    yield slot, field_id
+
+    def out_of_time(self) -> bool:
+        return time.monotonic() > self.deadline
+
+
+def greedy_engine(problem: StageProblem) -> None:
+    """First fit: fill each slot, field by field, with the first pending match that rests.
+
+    Filling a timeslot across fields before moving on keeps one pool from
+    exhausting every team at 07:00 and leaving 08:30 empty.
+    """
+    pending = list(problem.matches)
+    for slot in problem.slots:
+        for field_id in problem.field_ids:
+            if not pending:
+                return
+            if not problem.fields.fits([f"field:{field_id}"], slot, slot + problem.slot_length):
+                continue
+            chosen_at = next(
+                (i for i, m in enumerate(pending) if problem.fits(m, slot, field_id)), None
+            )
+            if chosen_at is None:
+                # Rest does not depend on the field: nothing fits this slot anywhere
+                break
+            problem.place(pending.pop(chosen_at), slot, field_id)
+
+
+# How many placed matches one insertion may displace in a chain
+MAX_EJECTION_DEPTH = 3
+
+
+def _insert(problem: StageProblem, match_id: int, depth: int, moved: set[int]) -> bool:
+    """Place the match, displacing up to `depth` placed ones into other cells if needed."""
+    for slot, field_id in problem.free_cells():
+        if problem.rest.fits(problem.keys[match_id], slot, slot + problem.slot_length):
+            problem.place(match_id, slot, field_id)
+            return True
+    if depth == 0:
+        return False
+
+    moved = moved | {match_id}
+    for other, (slot, field_id) in sorted(problem.placed.items(), key=lambda kv: kv[1]):
+        if other in moved or problem.out_of_time():
+            continue
+        problem.unplace(other)
+        if problem.fits(match_id, slot, field_id):
+            problem.place(match_id, slot, field_id)
+            if _insert(problem, other, depth - 1, moved):
+                return True
+            problem.unplace(match_id)
+        problem.place(other, slot, field_id)
+    return False
+
+
+def _compact(problem: StageProblem) -> None:
+    """Pull the latest matches into earlier free cells, closing gaps on the fields."""
+    improved = True
+    while improved and not problem.out_of_time():
+        improved = False
+        for match_id, (slot, field_id) in sorted(
+            problem.placed.items(), key=lambda kv: kv[1], reverse=True
+        ):
+            if problem.out_of_time():
+                return
+            problem.unplace(match_id)
+            earlier = next(
+                (
+                    (s, f)
+                    for s, f in problem.free_cells()
+                    if s < slot and problem.fits(match_id, s, f)
+                ),
+                None,
+            )
+            problem.place(match_id, *(earlier or (slot, field_id)))
+            improved = improved or earlier is not None
+
+
+def local_search_engine(problem: StageProblem) -> None:
+    """First fit, then repair and compact until the time budget runs out.
+
+    Matches first fit leaves over are inserted by ejection chains: a placed match
+    gives up its cell and is itself re-inserted elsewhere, to increasing depth.
+    Then every match is pulled as early as it can go, which closes idle gaps on
+    the fields and lets the next stage's gate open sooner.
+    """
+    greedy_engine(problem)
+    for depth in range(1, MAX_EJECTION_DEPTH + 1):
+        for match_id in problem.matches:
+            if match_id in problem.placed or problem.out_of_time():
+                continue
+            _insert(problem, match_id, depth, set())
+    _compact(problem)
+
+
+ENGINES: dict[str, Callable[[StageProblem], None]] = {
+    "greedy": greedy_engine,
+    "local_search": local_search_engine,
+}
 
 
 def recommend_schedule(
@@ -78,7 +267,20 @@ def recommend_schedule(
     lunch_start_hour: int | None = 13,
     lunch_end_hour: int | None = 14,
     field_ids: list[int] | None = None,
+    engine: str = DEFAULT_ENGINE,
+    time_budget_secs: float = DEFAULT_TIME_BUDGET_SECS,
 ) -> dict[str, Any]:
+    """Place every unscheduled match on a slot grid, stage by stage.
+
+    `engine` picks how each stage is packed (see `ENGINES`). The local search
+    stops improving once `time_budget_secs` is spent and returns the best schedule
+    it has, so only a run that finishes within the budget is the same every time.
+    The budget is clamped to `MAX_TIME_BUDGET_SECS`.
+    """
+    if engine not in ENGINES:
+        return {"assignments": [], "notes": f"Unknown scheduling engine {engine}", "meta": {}}
+    time_budget_secs = min(max(0.0, time_budget_secs), MAX_TIME_BUDGET_SECS)
+    deadline = time.monotonic() + time_budget_secs
     start = _parse_date(start_date)
     end = _parse_date(end_date) if end_date else start
 
@@ -99,23 +301,24 @@ def recommend_schedule(
         key=lambda m: (_stage_rank(m), m.id),
     )
 
-    # Occupancy: (field_id, datetime) slots already taken. Also seed rest and
-    # stage gates from matches staff have already timed, so a semi cannot jump
-    # onto a free field while a scheduled pool is still on.
-    occupied: set[tuple[int, datetime]] = set()
-    team_windows: dict[str, list[tuple[datetime, datetime]]] = {}
+    slot_length = timedelta(minutes=duration_mins)
+    slot_step = timedelta(minutes=duration_mins + max(0, slot_buffer_mins))
+
+    # Seed field occupancy, rest and stage gates from matches staff have already
+    # timed, so a semi cannot jump onto a free field while a scheduled pool is on.
+    field_index = IntervalIndex(timedelta(0))
+    rest_index = IntervalIndex(timedelta(minutes=min_rest_mins))
     stage_latest_end: dict[int, datetime] = {}
     seeding = seed_to_team(tournament)
     for m in Match.objects.filter(tournament=tournament, time__isnull=False, field__isnull=False):
         if m.field_id is None or m.time is None:
             continue
         naive = m.time.replace(tzinfo=None) if m.time.tzinfo else m.time
-        occupied.add((m.field_id, naive))
         existing_end = naive + timedelta(minutes=int(m.duration_mins or DEFAULT_MATCH_MINS))
+        field_index.add([f"field:{m.field_id}"], naive, existing_end)
         rank = _stage_rank(m)
         stage_latest_end[rank] = max(stage_latest_end.get(rank, existing_end), existing_end)
-        for key in _rest_keys(m, seeding):
-            team_windows.setdefault(key, []).append((naive, existing_end))
+        rest_index.add(_rest_keys(m, seeding), naive, existing_end)
 
     assignments: list[dict[str, Any]] = []
     unplaced = 0
@@ -126,10 +329,6 @@ def recommend_schedule(
         days.append(d)
         d += timedelta(days=1)
 
-    slot_length = timedelta(minutes=duration_mins)
-    slot_step = timedelta(minutes=duration_mins + max(0, slot_buffer_mins))
-    rest = timedelta(minutes=min_rest_mins)
-
     def candidate_slots(day: date) -> list[datetime]:
         # Naive on purpose: slots are a wall-clock grid for the day, and each one
         # is made aware in the tournament's timezone only when it is assigned.
@@ -155,55 +354,38 @@ def recommend_schedule(
             cursor += slot_step
         return slots
 
-    slots_by_day = {day: candidate_slots(day) for day in days}
+    all_slots = [slot for day in days for slot in candidate_slots(day)]
 
-    # Fill each timeslot with as many same-stage matches as fields allow, so
-    # one pool does not exhaust every team at 07:00 and leave 08:30 empty.
-    # Later stages still wait until every earlier-stage match has ended.
+    # Later stages wait until every earlier-stage match has ended.
     for rank, group in groupby(matches, key=_stage_rank):
-        pending = list(group)
+        stage_matches = {m.id: m for m in group}
         earlier_ends = [stage_latest_end[e] for e in range(rank) if e in stage_latest_end]
         stage_gate = max(earlier_ends) if earlier_ends else None
-        for day in days:
-            for slot in slots_by_day[day]:
-                if stage_gate is not None and slot < stage_gate:
-                    continue
-                slot_end = slot + slot_length
-                for field in fields:
-                    if (field.id, slot) in occupied:
-                        continue
-                    chosen_at = next(
-                        (
-                            i
-                            for i, match in enumerate(pending)
-                            if _rest_ok(
-                                team_windows,
-                                _rest_keys(match, seeding),
-                                slot,
-                                slot_end,
-                                rest,
-                            )
-                        ),
-                        None,
-                    )
-                    if chosen_at is None:
-                        continue
-                    match = pending.pop(chosen_at)
-                    keys = _rest_keys(match, seeding)
-                    occupied.add((field.id, slot))
-                    for key in keys:
-                        team_windows.setdefault(key, []).append((slot, slot_end))
-                    stage_latest_end[rank] = max(stage_latest_end.get(rank, slot_end), slot_end)
-                    aware = timezone.make_aware(slot) if timezone.is_naive(slot) else slot
-                    assignments.append(
-                        {
-                            "match_id": match.id,
-                            "time": aware.isoformat(),
-                            "field_id": field.id,
-                            "duration_mins": duration_mins,
-                        }
-                    )
-        unplaced += len(pending)
+        problem = StageProblem(
+            matches=list(stage_matches),
+            keys={m.id: _rest_keys(m, seeding) for m in stage_matches.values()},
+            slots=[s for s in all_slots if stage_gate is None or s >= stage_gate],
+            field_ids=[f.id for f in fields],
+            slot_length=slot_length,
+            fields=field_index,
+            rest=rest_index,
+            deadline=deadline,
+        )
+        ENGINES[engine](problem)
+
+        for match_id, (slot, field_id) in sorted(problem.placed.items(), key=lambda kv: kv[1]):
+            slot_end = slot + slot_length
+            stage_latest_end[rank] = max(stage_latest_end.get(rank, slot_end), slot_end)
+            aware = timezone.make_aware(slot) if timezone.is_naive(slot) else slot
+            assignments.append(
+                {
+                    "match_id": match_id,
+                    "time": aware.isoformat(),
+                    "field_id": field_id,
+                    "duration_mins": duration_mins,
+                }
+            )
+        unplaced += len(stage_matches) - len(problem.placed)
 
     notes = f"Placed {len(assignments)} matches"
     if unplaced:
@@ -219,5 +401,7 @@ def recommend_schedule(
             "min_rest_mins": min_rest_mins,
             "fields_used": [f.id for f in fields],
             "unplaced": unplaced,
+            "engine": engine,
+            "time_budget_secs": time_budget_secs,
         },
     }
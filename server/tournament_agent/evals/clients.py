@@ -0,0 +1,99 @@
+"""Model clients for the bakeoff: per-model rate limits, recording and replay.
+
+A bakeoff spends nearly all of its time waiting on the gateway, so the runner
+runs cases side by side. What keeps that inside OpenCode Go's quotas is one
+`RateLimiter` per model, shared by every case running against it.
+
+Recording keeps each case's model responses in the order they were made.
+Replaying hands them back in the same order without touching the network, which
+makes a recorded bakeoff an offline regression run for the harness, the tools
+and the scoring. A replayed run only follows the recording while the agent asks
+for the same things, so tool arguments naming row ids can land differently on
+a fresh fixture. That shows up as a lower score, not as an error.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from server.lib.ratelimit import RateLimiter
+from server.tournament_agent.catalog import AgentModel, get_model
+from server.tournament_agent.clients.opencode import (
+    ChatCompletionResult,
+    OpenCodeGoClient,
+    OpenCodeGoError,
+)
+
+# OpenCode Go publishes its quotas per five hours
+QUOTA_WINDOW_SECONDS = 5 * 60 * 60
+
+
+def limiter_for(model: AgentModel | None) -> RateLimiter | None:
+    """The limiter for a model's published quota, or None when it has none."""
+    if model is None or model.req_per_5h <= 0:
+        return None
+    return RateLimiter(model.req_per_5h, QUOTA_WINDOW_SECONDS)
+
+
+def limiters_for(model_ids: list[str]) -> dict[str, RateLimiter | None]:
+    return {model_id: limiter_for(get_model(model_id)) for model_id in model_ids}
+
+
+def _recorded(result: ChatCompletionResult) -> dict[str, Any]:
+    return {
+        "content": result.content,
+        "tool_calls": result.tool_calls,
+        "finish_reason": result.finish_reason,
+        "usage": result.raw.get("usage") or {},
+    }
+
+
+class EvalClient(OpenCodeGoClient):
+    """An `OpenCodeGoClient` for one eval case.
+
+    With `replay` it answers from those recorded responses and never calls the
+    gateway. Otherwise every attempt, retries included, waits on `limiter`, and
+    each response is appended to `recorded`.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter | None = None,
+        replay: list[dict[str, Any]] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if replay is not None:
+            # Nothing is sent, but the model lookup still wants a key to be set
+            kwargs.setdefault("api_key", "replay")
+        super().__init__(**kwargs)
+        self.limiter = limiter
+        self.replay = replay
+        self.recorded: list[dict[str, Any]] = []
+
+    def _dispatch_chat(
+        self,
+        model: AgentModel,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        temp: float | None,
+        tokens: int,
+        tool_choice: str,
+    ) -> ChatCompletionResult:
+        if self.replay is not None:
+            index = len(self.recorded)
+            if index >= len(self.replay):
+                raise OpenCodeGoError(f"Replay has no response #{index + 1} for {model.id}")
+            item = self.replay[index]
+            self.recorded.append(item)
+            return ChatCompletionResult(
+                content=item.get("content"),
+                tool_calls=list(item.get("tool_calls") or []),
+                raw={"replayed": True, "usage": item.get("usage") or {}},
+                finish_reason=item.get("finish_reason"),
+            )
+
+        if self.limiter is not None:
+            self.limiter.acquire()
+        result = super()._dispatch_chat(model, messages, tools, temp, tokens, tool_choice)
+        self.recorded.append(_recorded(result))
+        return result
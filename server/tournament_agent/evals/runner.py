@@ -3,22 +3,33 @@
 from __future__ import annotations
 
 import datetime
+import sqlite3
+import tempfile
 import time
 import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from queue import SimpleQueue
 from typing import Any
 
-from django.db import transaction
+from django.db import connection, transaction
 
 from server.core.models import Team, User
+from server.lib.ratelimit import RateLimiter
 from server.tests.base import create_event
 from server.tournament.models import Match, Tournament, TournamentField
 from server.tournament.utils import build_bracket, build_pool, start_tournament
+from server.tournament_agent.clients.opencode import OpenCodeGoClient
 from server.tournament_agent.domain.validate import _rank
 from server.tournament_agent.evals import (
     TrajectoryTrace,
     load_cases,
     score_case,
 )
+from server.tournament_agent.evals.clients import EvalClient, limiters_for
 from server.tournament_agent.models import AgentProposal
 from server.tournament_agent.services.agent import TournamentAgentService
 from server.tournament_agent.services.proposals import ProposalApplyError, apply_proposal
@@ -152,11 +163,16 @@ def _mark_ask_before_propose(trace: TrajectoryTrace) -> None:
             return
 
 
-def run_case(case: dict[str, Any], model_id: str, user: User) -> dict[str, Any]:
+def run_case(
+    case: dict[str, Any],
+    model_id: str,
+    user: User,
+    client: OpenCodeGoClient | None = None,
+) -> dict[str, Any]:
     # Roll back fixture/session rows so bakeoff does not pollute the local DB.
     with transaction.atomic():
         tournament = _build_fixture(case, user)
-        service = TournamentAgentService(user)
+        service = TournamentAgentService(user, client=client)
         expect = case.get("expect_state") or {}
         session = service.get_or_create_session(tournament.id, model_id=model_id)
         trace = TrajectoryTrace()
@@ -300,47 +316,92 @@ def run_case(case: dict[str, Any], model_id: str, user: User) -> dict[str, Any]:
         return result
 
 
-def run_suite(
-    *,
-    model_id: str,
-    tier: str,
-    trials: int,
-    user: User,
-) -> dict[str, Any]:
-    cases = load_cases(tier=tier)
-    all_scores: list[float] = []
-    trial_passes: list[bool] = []
-    latencies: list[float] = []
-    safety_fails = 0
-    case_details: list[dict[str, Any]] = []
-
-    for trial in range(trials):
-        trial_ok = True
-        for case in cases:
-            try:
-                result = run_case(case, model_id, user)
-            except Exception as exc:  # — bakeoff must continue across models
-                result = {
-                    "case_id": case["id"],
-                    "overall": 0.0,
-                    "passed": False,
-                    "scores": {},
-                    "notes": [f"Runner error: {exc}"],
-                    "latency_s": 0.0,
-                    "safety_fail": False,
-                    "trace": [],
-                    "response_preview": "",
-                    "trial": trial,
-                }
-            case_details.append({**result, "trial": trial})
-            all_scores.append(result["overall"])
-            latencies.append(result["latency_s"])
-            if result["safety_fail"]:
-                safety_fails += 1
-            if not result["passed"]:
-                trial_ok = False
-        trial_passes.append(trial_ok)
+@dataclass(frozen=True)
+class BakeoffJob:
+    """One trial of one case against one model."""
+
+    model_id: str
+    trial: int
+    case_index: int
+    case: dict[str, Any] = field(compare=False)
+
+    @property
+    def recording_key(self) -> str:
+        return f"{self.case['id']}#{self.trial}"
 
+
+def _error_result(case: dict[str, Any], exc: Exception) -> dict[str, Any]:
+    return {
+        "case_id": case["id"],
+        "overall": 0.0,
+        "passed": False,
+        "scores": {},
+        "notes": [f"Runner error: {exc}"],
+        "latency_s": 0.0,
+        "safety_fail": False,
+        "trace": [],
+        "response_preview": "",
+    }
+
+
+def _run_job(
+    job: BakeoffJob,
+    user: User,
+    limiter: RateLimiter | None,
+    replay: list[dict[str, Any]] | None,
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    client = EvalClient(limiter=limiter, replay=replay)
+    try:
+        result = run_case(job.case, job.model_id, user, client=client)
+    except Exception as exc:  # — bakeoff must continue across models
+        result = _error_result(job.case, exc)
+    return {**result, "trial": job.trial}, client.recorded
+
+
+def _run_pooled_job(
+    job: BakeoffJob,
+    user: User,
+    limiter: RateLimiter | None,
+    replay: list[dict[str, Any]] | None,
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    # Each worker thread has its own connection, so each case's fixture lives in
+    # its own transaction; close it rather than leave one open per worker
+    try:
+        return _run_job(job, user, limiter, replay)
+    finally:
+        connection.close()
+
+
+def _snapshot_database(count: int, directory: Path) -> SimpleQueue[str]:
+    """Copies of the SQLite database, one for each worker to run its cases on.
+
+    SQLite allows one write transaction at a time and every case holds one for
+    its whole run, so cases sharing the database would fail on a locked one.
+    Nothing a case writes is kept, and its result comes back in memory, so each
+    worker can as well write to a copy of its own.
+    """
+    connection.ensure_connection()
+    paths: SimpleQueue[str] = SimpleQueue()
+    for i in range(count):
+        path = str(directory / f"worker-{i}.sqlite3")
+        with closing(sqlite3.connect(path)) as copy:
+            connection.connection.backup(copy)
+        paths.put(path)
+    return paths
+
+
+def _use_snapshot(paths: SimpleQueue[str]) -> None:
+    # Runs first in each worker thread, before its connection is opened. The
+    # settings dict is shared between threads, so it is replaced, not changed.
+    connection.settings_dict = {**connection.settings_dict, "NAME": paths.get()}
+
+
+def _summarize(case_details: list[dict[str, Any]], trials: int) -> dict[str, Any]:
+    all_scores = [r["overall"] for r in case_details]
+    latencies = [r["latency_s"] for r in case_details]
+    trial_passes = [
+        all(r["passed"] for r in case_details if r["trial"] == trial) for trial in range(trials)
+    ]
     suite_score = sum(all_scores) / len(all_scores) if all_scores else 0.0
     pass_at_1 = (
         sum(1 for s in all_scores if s >= PASS_MARK) / len(all_scores) if all_scores else 0.0
@@ -353,6 +414,92 @@ def run_suite(
         "pass_hat_k": pass_hat_k,
         "k": trials,
         "mean_latency_s": sum(latencies) / len(latencies) if latencies else 0.0,
-        "safety_fails": safety_fails,
+        "safety_fails": sum(1 for r in case_details if r["safety_fail"]),
         "cases": case_details,
     }
+
+
+def run_bakeoff(
+    *,
+    model_ids: list[str],
+    tier: str,
+    trials: int,
+    user: User,
+    workers: int = 1,
+    recordings: dict[str, dict[str, list[dict[str, Any]]]] | None = None,
+    replay: bool = False,
+) -> dict[str, dict[str, Any]]:
+    """Run every trial of every case against each model, `workers` cases at a time.
+
+    Each model's calls wait on a limiter derived from its `req_per_5h` quota.
+    The jobs alternate between models, so the workers spread over every model's
+    quota instead of queueing on one at a time. On SQLite each worker runs its
+    cases on its own copy of the database. Results are put back in model, trial
+    and case order before they are scored, so the scorecard does not depend on
+    which case happened to finish first.
+
+    Each case's model responses are stored in `recordings` (model -> case#trial
+    -> responses), when given. With `replay` they are read back from it instead
+    and nothing is sent to the gateway.
+    """
+    cases = load_cases(tier=tier)
+    if recordings is None:
+        recordings = {}
+    limiters = dict.fromkeys(model_ids, None) if replay else limiters_for(model_ids)
+    jobs = [
+        BakeoffJob(model_id, trial, case_index, case)
+        for trial in range(trials)
+        for case_index, case in enumerate(cases)
+        for model_id in model_ids
+    ]
+
+    def replay_for(job: BakeoffJob) -> list[dict[str, Any]] | None:
+        if not replay:
+            return None
+        return recordings.get(job.model_id, {}).get(job.recording_key, [])
+
+    outcomes: dict[BakeoffJob, tuple[dict[str, Any], list[dict[str, Any]]]] = {}
+    if workers <= 1:
+        for job in jobs:
+            outcomes[job] = _run_job(job, user, limiters[job.model_id], replay_for(job))
+    else:
+        with tempfile.TemporaryDirectory(prefix="bakeoff-") as directory:
+            initializer: Callable[..., None] | None = None
+            initargs: tuple[Any, ...] = ()
+            if connection.vendor == "sqlite":
+                initializer = _use_snapshot
+                initargs = (_snapshot_database(workers, Path(directory)),)
+            with ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="bakeoff",
+                initializer=initializer,
+                initargs=initargs,
+            ) as pool:
+                futures = {
+                    job: pool.submit(
+                        _run_pooled_job, job, user, limiters[job.model_id], replay_for(job)
+                    )
+                    for job in jobs
+                }
+                outcomes = {job: future.result() for job, future in futures.items()}
+
+    results: dict[str, dict[str, Any]] = {}
+    for model_id in model_ids:
+        model_jobs = sorted(
+            (job for job in jobs if job.model_id == model_id),
+            key=lambda job: (job.trial, job.case_index),
+        )
+        if not replay:
+            recordings[model_id] = {job.recording_key: outcomes[job][1] for job in model_jobs}
+        results[model_id] = _summarize([outcomes[job][0] for job in model_jobs], trials)
+    return results
+
+
+def run_suite(
+    *,
+    model_id: str,
+    tier: str,
+    trials: int,
+    user: User,
+) -> dict[str, Any]:
+    return run_bakeoff(model_ids=[model_id], tier=tier, trials=trials, user=user)[model_id]
@@ -21,6 +21,11 @@ class TournamentAgentSession(models.Model):
     # measured from here, so clearing actually does what its button says; the
     # AgentTurn rows themselves stay, because they are the audit trail.
     history_cleared_at = models.DateTimeField(null=True, blank=True)
+    # Recap of the messages that have aged out of the replayed window, folded in as
+    # they age out so a turn only reads the messages newer than the last one folded.
+    history_digest = models.TextField(blank=True, default="")
+    history_digest_count = models.PositiveIntegerField(default=0)
+    history_digest_through = models.PositiveBigIntegerField(default=0)
 
     class Meta:
         indexes = [
@@ -172,10 +177,14 @@ class AgentTurn(models.Model):
     model_id = models.CharField(max_length=64, blank=True, default="")
     rounds = models.PositiveSmallIntegerField(default=0)
     tokens_in = models.PositiveIntegerField(default=0)
+    # The part of tokens_in the provider served from its prompt cache
+    tokens_in_cached = models.PositiveIntegerField(default=0)
     tokens_out = models.PositiveIntegerField(default=0)
     latency_ms = models.PositiveIntegerField(default=0)
     tool_names = models.JSONField(default=list, blank=True)
     proposal_ids = models.JSONField(default=list, blank=True)
+    read_cache_hits = models.PositiveIntegerField(default=0)
+    read_cache_misses = models.PositiveIntegerField(default=0)
     outcome = models.CharField(
         max_length=16, choices=TurnOutcome.choices, default=TurnOutcome.REPLIED
     )
@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import re
 import time
 from collections.abc import Generator, Iterator
+from dataclasses import dataclass
 from datetime import timedelta
 from typing import Any
 
@@ -52,11 +54,20 @@ from server.tournament_agent.privacy.display import (
     resolve_player_tokens,
 )
 from server.tournament_agent.privacy.mask import scrub_user_text
-from server.tournament_agent.services.skills import load_skills, render_skills, select_skills
+from server.tournament_agent.services.skills import (
+    Skill,
+    load_skills,
+    render_skills,
+    select_skills,
+)
 from server.tournament_agent.tools import (
+    PARALLEL_SAFE_TOOLS,
     READ_ONLY_TOOLS,
     AskUserPause,
     ToolContext,
+    ToolReadCache,
+    ToolRun,
+    dispatch_reads,
     dispatch_tool,
 )
 
@@ -90,15 +101,48 @@ Examples:
 """
 
 
-def build_system_prompt(tournament: Tournament, user_text: str = "", phase: str = "") -> str:
+@dataclass(frozen=True)
+class PromptPrefix:
+    """The stable head of the system prompt, and a hash naming its content."""
+
+    text: str
+    digest: str
+    skills: tuple[Skill, ...]
+
+    @property
+    def cache_key(self) -> str:
+        return f"tournament-agent:{self.digest[:16]}"
+
+
+# Rendered prefixes by (phase, skill names). Every turn in a phase that pulls in the
+# same skills sends the same bytes, which is what a provider's prompt cache matches.
+_prompt_prefixes: dict[tuple[str, tuple[str, ...]], PromptPrefix] = {}
+
+
+def system_prompt_prefix(
+    tournament: Tournament, user_text: str = "", phase: str = ""
+) -> PromptPrefix:
     """Base rules plus the skills relevant to this tournament, phase and turn."""
-    skills = select_skills(
-        load_skills(),
-        tournament_status=tournament.status,
-        user_text=user_text,
-        phase=phase,
+    skills = tuple(
+        select_skills(
+            load_skills(),
+            tournament_status=tournament.status,
+            user_text=user_text,
+            phase=phase,
+        )
     )
-    return BASE_PROMPT + render_skills(skills)
+    key = (phase, tuple(skill.name for skill in skills))
+    prefix = _prompt_prefixes.get(key)
+    # An edited skill file loads as new objects, so a stale prefix never matches
+    if prefix is None or prefix.skills != skills:
+        text = BASE_PROMPT + render_skills(list(skills))
+        prefix = PromptPrefix(text, hashlib.sha256(text.encode()).hexdigest(), skills)
+        _prompt_prefixes[key] = prefix
+    return prefix
+
+
+def build_system_prompt(tournament: Tournament, user_text: str = "", phase: str = "") -> str:
+    return system_prompt_prefix(tournament, user_text, phase).text
 
 
 BUDGET_MESSAGE = (
@@ -111,6 +155,12 @@ DAILY_BUDGET_MESSAGE = (
 )
 
 
+def round_cached_tokens(result: ChatCompletionResult) -> int:
+    """Input tokens served from the provider's prompt cache, 0 when it says nothing."""
+    cached = getattr(result, "cached_tokens", 0)
+    return max(cached, 0) if isinstance(cached, int) else 0
+
+
 def round_tokens(result: ChatCompletionResult) -> tuple[int, int]:
     """Usage for one round, tolerant of a provider that reports none.
 
@@ -176,6 +226,40 @@ def _truncate_chars(text: str, limit: int) -> str:
     return text[: max(limit - 1, 0)].rstrip() + "…"
 
 
+def _digest_line(turn: dict[str, Any]) -> str:
+    speaker = "Staff" if turn.get("role") == "user" else "Agent"
+    return f"{speaker}: {_truncate_chars(str(turn.get('content') or ''), COMPACT_TURN_CHARS)}"
+
+
+def _render_digest(count: int, lines: str) -> str:
+    if not count:
+        return ""
+    digest = (
+        f"Earlier in this session ({count} messages compacted). "
+        "Tournament state may have changed — use tools, not this recap, "
+        "for live scores, seeding, or who is in which stage.\n" + lines
+    )
+    return _truncate_chars(digest, COMPACT_DIGEST_CHARS)
+
+
+def _fold_lines(lines: str, turns: list[dict[str, Any]]) -> str:
+    """Append digest lines for the turns, stopping once the digest is full."""
+    for turn in turns:
+        if len(lines) > COMPACT_DIGEST_CHARS:
+            break
+        line = _digest_line(turn)
+        lines = f"{lines}\n{line}" if lines else line
+    return lines
+
+
+def _trim_recent(digest: str, recent: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    recent_total = sum(len(t.get("content") or "") for t in recent)
+    while len(recent) > MIN_RECENT_MESSAGES and (len(digest) + recent_total) > HISTORY_CHAR_BUDGET:
+        dropped = recent.pop(0)
+        recent_total -= len(dropped.get("content") or "")
+    return recent
+
+
 def _compact_model_turns(turns: list[dict[str, Any]]) -> tuple[str, list[dict[str, Any]]]:
     """Fold older turns into a digest. Returns (digest_or_empty, recent_turns).
 
@@ -191,25 +275,26 @@ def _compact_model_turns(turns: list[dict[str, Any]]) -> tuple[str, list[dict[st
 
     keep_n = min(KEEP_RECENT_MESSAGES, len(turns))
     older, recent = turns[:-keep_n], turns[-keep_n:]
-    digest = ""
-    if older:
-        lines: list[str] = []
-        for turn in older:
-            speaker = "Staff" if turn.get("role") == "user" else "Agent"
-            snippet = _truncate_chars(str(turn.get("content") or ""), COMPACT_TURN_CHARS)
-            lines.append(f"{speaker}: {snippet}")
-        digest = (
-            f"Earlier in this session ({len(older)} messages compacted). "
-            "Tournament state may have changed — use tools, not this recap, "
-            "for live scores, seeding, or who is in which stage.\n" + "\n".join(lines)
-        )
-        digest = _truncate_chars(digest, COMPACT_DIGEST_CHARS)
-
-    recent_total = sum(len(t.get("content") or "") for t in recent)
-    while len(recent) > MIN_RECENT_MESSAGES and (len(digest) + recent_total) > HISTORY_CHAR_BUDGET:
-        dropped = recent.pop(0)
-        recent_total -= len(dropped.get("content") or "")
-    return digest, recent
+    digest = _render_digest(len(older), _fold_lines("", older))
+    return digest, _trim_recent(digest, recent)
+
+
+def _model_turn(message: TournamentAgentMessage) -> dict[str, Any]:
+    if message.role == MessageRole.USER:
+        content = (message.payload or {}).get("masked_content") or scrub_user_text(message.content)
+        return {"role": "user", "content": content}
+    if message.role == MessageRole.ASSISTANT:
+        # Replay what the turn actually did, not only what it said about it.
+        # Without this the model's own "I've created pools A and B" comes back
+        # as the most recent authority on a tournament it never changed.
+        return {
+            "role": "assistant",
+            "content": _with_tool_evidence(message.content or "", message.payload),
+        }
+    # Confirm/Reject outcomes. Delivered as a user turn because the providers
+    # behind the gateway do not all accept a system message part-way through a
+    # conversation.
+    return {"role": "user", "content": message.content or ""}
 
 
 # How many of a turn's tool calls are replayed back to the model next turn. A long
@@ -269,6 +354,26 @@ def _tool_event_args(args: dict[str, Any]) -> dict[str, Any]:
     return args
 
 
+def _tool_call_args(tc: dict[str, Any]) -> dict[str, Any]:
+    try:
+        args = json.loads(tc["arguments"] or "{}")
+    except json.JSONDecodeError:
+        return {}
+    return args if isinstance(args, dict) else {}
+
+
+def _read_batch(
+    calls: list[tuple[str, dict[str, Any]]], start: int, phase: Phase
+) -> list[tuple[str, dict[str, Any]]]:
+    """The run of parallel-safe calls from `start` that this phase allows."""
+    batch: list[tuple[str, dict[str, Any]]] = []
+    for name, args in calls[start:]:
+        if name not in PARALLEL_SAFE_TOOLS or phase_rejection(phase, name) is not None:
+            break
+        batch.append((name, args))
+    return batch
+
+
 def _summarize_tool_result(name: str, result: Any) -> str:
     """One-line human summary of a tool result for the UI timeline."""
     if not isinstance(result, dict):
@@ -352,7 +457,16 @@ class TournamentAgentService:
             )
             session.history_cleared_at = cleared_at
             session.updated_at = cleared_at
-            session.save(update_fields=["history_cleared_at", "updated_at"])
+            session.history_digest = ""
+            session.history_digest_count = 0
+            session.save(
+                update_fields=[
+                    "history_cleared_at",
+                    "updated_at",
+                    "history_digest",
+                    "history_digest_count",
+                ]
+            )
 
     def history(self, session: TournamentAgentSession) -> dict[str, Any]:
         questions_by_id = {q.id: q for q in session.questions.all()}
@@ -549,37 +663,51 @@ class TournamentAgentService:
         snapshot: TournamentSnapshot,
         phase: Phase,
     ) -> list[dict[str, Any]]:
-        turns: list[dict[str, Any]] = []
-        for m in session.messages.all():
-            if m.role == MessageRole.USER:
-                content = (m.payload or {}).get("masked_content") or scrub_user_text(m.content)
-                turns.append({"role": "user", "content": content})
-            elif m.role == MessageRole.ASSISTANT:
-                # Replay what the turn actually did, not only what it said about it.
-                # Without this the model's own "I've created pools A and B" comes back
-                # as the most recent authority on a tournament it never changed.
-                turns.append(
-                    {
-                        "role": "assistant",
-                        "content": _with_tool_evidence(m.content or "", m.payload),
-                    }
-                )
-            elif m.role == MessageRole.SYSTEM:
-                # Confirm/Reject outcomes. Delivered as a user turn because the
-                # providers behind the gateway do not all accept a system message
-                # part-way through a conversation.
-                turns.append({"role": "user", "content": m.content or ""})
+        # Only what has not been folded into the session's digest yet. Anything past
+        # the replayed window is folded now, so the next turn does not read it again.
+        unfolded = list(
+            session.messages.filter(id__gt=session.history_digest_through).order_by(
+                "created_at", "id"
+            )
+        )
+        fold_n = max(len(unfolded) - KEEP_RECENT_MESSAGES, 0)
+        if fold_n:
+            folded = unfolded[:fold_n]
+            session.history_digest = _fold_lines(
+                session.history_digest, [_model_turn(m) for m in folded]
+            )
+            session.history_digest_count += fold_n
+            session.history_digest_through = max(m.id for m in folded)
+            session.save(
+                update_fields=[
+                    "history_digest",
+                    "history_digest_count",
+                    "history_digest_through",
+                ]
+            )
+        turns = [_model_turn(m) for m in unfolded[fold_n:]]
 
         latest_user = next((t["content"] for t in reversed(turns) if t["role"] == "user"), "")
-        digest, recent = _compact_model_turns(turns)
+        digest = _render_digest(session.history_digest_count, session.history_digest)
+        recent = _trim_recent(digest, turns)
 
         # Ordered stable-first so the prefix stays cacheable: base rules and skills
         # change rarely, the state block changes every round.
-        system = build_system_prompt(session.tournament, latest_user, phase.value)
+        prefix = system_prompt_prefix(session.tournament, latest_user, phase.value)
+        system = prefix.text
         if digest:
             system = f"{system}\n\n## Earlier conversation (compacted)\n{digest}"
         system = f"{system}\n\n{render_state(snapshot, phase_line(phase))}"
-        return [{"role": "system", "content": system}, *recent]
+        return [
+            {
+                "role": "system",
+                "content": system,
+                # Read by the clients that can mark a cacheable prefix; dropped by the rest
+                "cache_prefix_chars": len(prefix.text),
+                "cache_key": prefix.cache_key,
+            },
+            *recent,
+        ]
 
     def _chat_round(
         self,
@@ -676,7 +804,9 @@ class TournamentAgentService:
         self.last_phase = phase
 
         started_turn_at = time.monotonic()
-        tokens_in = tokens_out = 0
+        tokens_in = tokens_out = tokens_in_cached = 0
+        # Shared by every round, so a read repeated later in the turn is not re-run
+        reads = ToolReadCache(session.tournament_id)
         rounds_used = 0
 
         def record_turn(outcome: str, error: str = "") -> None:
@@ -686,12 +816,15 @@ class TournamentAgentService:
                 model_id=session.model_id,
                 rounds=rounds_used,
                 tokens_in=tokens_in,
+                tokens_in_cached=tokens_in_cached,
                 tokens_out=tokens_out,
                 latency_ms=int((time.monotonic() - started_turn_at) * 1000),
                 tool_names=[e["name"] for e in turn_tool_events],
                 proposal_ids=[
                     int(e["proposal_id"]) for e in turn_tool_events if e.get("proposal_id")
                 ],
+                read_cache_hits=reads.hits,
+                read_cache_misses=reads.misses,
                 outcome=outcome,
                 error=error[:2000],
             )
@@ -723,6 +856,7 @@ class TournamentAgentService:
                 round_in, round_out = round_tokens(result)
                 tokens_in += round_in
                 tokens_out += round_out
+                tokens_in_cached += round_cached_tokens(result)
                 self.last_trace.append(
                     {
                         "round": round_i,
@@ -760,16 +894,19 @@ class TournamentAgentService:
                         session=session,
                         tournament=session.tournament,
                         assistant_message=assistant_msg,
+                        reads=reads,
                     )
                     called_names = [tc["name"] for tc in result.tool_calls]
-                    for tc in result.tool_calls:
-                        name = tc["name"]
-                        try:
-                            args = json.loads(tc["arguments"] or "{}")
-                            if not isinstance(args, dict):
-                                args = {}
-                        except json.JSONDecodeError:
-                            args = {}
+                    calls = [(tc["name"], _tool_call_args(tc)) for tc in result.tool_calls]
+                    # Each run of reads in a row is dispatched together when the loop
+                    # reaches its first call; proposals in between stay in order.
+                    prefetched: dict[int, ToolRun] = {}
+                    for call_index, tc in enumerate(result.tool_calls):
+                        name, args = calls[call_index]
+                        if call_index not in prefetched:
+                            batch = _read_batch(calls, call_index, phase)
+                            runs = dispatch_reads(ctx, batch) if len(batch) > 1 else []
+                            prefetched.update(enumerate(runs, start=call_index))
                         self.last_trace.append({"tool": name, "args_keys": list(args.keys())})
                         event: dict[str, Any] = {
                             "name": name,
@@ -806,8 +943,14 @@ class TournamentAgentService:
                                 }
                             )
                             continue
+                        run = prefetched.pop(call_index, None)
                         try:
-                            tool_result = dispatch_tool(ctx, name, args)
+                            if run is None:
+                                tool_result = dispatch_tool(ctx, name, args)
+                            elif run.error is not None:
+                                raise run.error
+                            else:
+                                tool_result = run.result
                         except AskUserPause as pause:
                             pending_question = pause.question
                             event["status"] = "question"
@@ -862,7 +1005,11 @@ class TournamentAgentService:
                             event["status"] = "error"
                             event["summary"] = str(exc)[:200]
                             self.last_trace.append({"tool": name, "error": str(exc)[:200]})
-                        event["duration_ms"] = int((time.monotonic() - started_at) * 1000)
+                        event["duration_ms"] = (
+                            run.duration_ms
+                            if run is not None
+                            else int((time.monotonic() - started_at) * 1000)
+                        )
                         if not event["summary"]:
                             if isinstance(tool_result, dict) and tool_result.get("proposal_id"):
                                 event["status"] = "proposal"
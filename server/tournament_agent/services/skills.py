@@ -97,13 +97,30 @@ def _parse(path: Path) -> Skill | None:
     return Skill(**{**known, "name": str(fields.get("name") or path.stem), "body": body.strip()})  # type: ignore[arg-type]
 
 
+# Parsed skills per directory, with the file mtimes they were parsed at
+_loaded: dict[Path, tuple[tuple[tuple[str, int], ...], list[Skill]]] = {}
+
+
 def load_skills(directory: Path | None = None) -> list[Skill]:
+    """Active skills in the directory, re-parsed only when a file there changes.
+
+    Returning the same `Skill` objects while nothing changed is what lets the agent
+    reuse the prompt prefix it rendered from them.
+    """
+    directory = directory or SKILLS_DIR
+    paths = sorted(directory.glob("*.md"))
+    stamp = tuple((path.name, path.stat().st_mtime_ns) for path in paths)
+    cached = _loaded.get(directory)
+    if cached and cached[0] == stamp:
+        return list(cached[1])
+
     skills = []
-    for path in sorted((directory or SKILLS_DIR).glob("*.md")):
+    for path in paths:
         skill = _parse(path)
         if skill and skill.status != "draft":
             skills.append(skill)
-    return skills
+    _loaded[directory] = (stamp, skills)
+    return list(skills)
 
 
 def select_skills(
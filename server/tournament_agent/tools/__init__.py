@@ -12,9 +12,16 @@ between those files should not ripple out to callers.
 from __future__ import annotations
 
 import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from typing import Any
 
-from server.tournament_agent.tools.context import ToolContext, ToolHandler
+from django.conf import settings
+from django.db import connection, connections
+
+from server.tournament_agent.tools.context import ToolContext, ToolHandler, ToolReadCache
 from server.tournament_agent.tools.definitions import TOOL_DEFINITIONS
 from server.tournament_agent.tools.interaction import AskUserPause, ask_user
 from server.tournament_agent.tools.mutations import (
@@ -122,6 +129,19 @@ READ_ONLY_TOOLS = frozenset(
     name for name in HANDLERS if not name.startswith("propose_") and name != "ask_user"
 )
 
+# Reads served from the turn's `ToolReadCache`. list_proposals is left out: it
+# reads proposal rows, which staff resolve without touching the tournament.
+CACHED_TOOLS = READ_ONLY_TOOLS - {"list_proposals"}
+
+# Reads only query, so the ones a model asks for together can run at once.
+# Proposals and ask_user stay serial: they write, or end the turn.
+PARALLEL_SAFE_TOOLS = READ_ONLY_TOOLS
+
+_read_pool = ThreadPoolExecutor(
+    max_workers=max(1, settings.TOURNAMENT_AGENT_TOOL_WORKERS),
+    thread_name_prefix="agent-read",
+)
+
 
 # The model copies keys from the last read. list_stages returns `id` not
 # `stage_id`, and the repair skill used to say `kind` instead of `stage`.
@@ -151,11 +171,59 @@ def dispatch_tool(ctx: ToolContext, name: str, arguments: dict[str, Any]) -> Any
         for key, param in inspect.signature(handler).parameters.items()
         if key != "ctx" and param.kind != inspect.Parameter.VAR_KEYWORD
     }
-    return handler(ctx, **{key: value for key, value in args.items() if key in accepted})
+    kwargs = {key: value for key, value in args.items() if key in accepted}
+    if name in CACHED_TOOLS:
+        return ctx.reads.get_or_read(name, kwargs, partial(handler, ctx, **kwargs))
+    return handler(ctx, **kwargs)
+
+
+@dataclass
+class ToolRun:
+    """What one dispatched call returned or raised, and how long it took."""
+
+    result: Any = None
+    error: Exception | None = None
+    duration_ms: int = 0
+
+
+def _timed_dispatch(ctx: ToolContext, name: str, arguments: dict[str, Any]) -> ToolRun:
+    started_at = time.monotonic()
+    try:
+        return ToolRun(
+            result=dispatch_tool(ctx, name, arguments),
+            duration_ms=int((time.monotonic() - started_at) * 1000),
+        )
+    except Exception as exc:  # — handed back to the caller's thread with the others
+        return ToolRun(error=exc, duration_ms=int((time.monotonic() - started_at) * 1000))
+
+
+def _pooled_dispatch(ctx: ToolContext, name: str, arguments: dict[str, Any]) -> ToolRun:
+    try:
+        return _timed_dispatch(ctx, name, arguments)
+    finally:
+        # Pool threads outlive the request, so nothing else would close these
+        connections.close_all()
+
+
+def dispatch_reads(ctx: ToolContext, calls: list[tuple[str, dict[str, Any]]]) -> list[ToolRun]:
+    """Run parallel-safe tool calls together, returning their runs in call order.
+
+    Each call gets its own database connection on a pool thread. Inside an atomic
+    block those connections could not see what this one has written, so the calls
+    then run here, one after another.
+    """
+    if len(calls) <= 1 or settings.TOURNAMENT_AGENT_TOOL_WORKERS <= 1 or connection.in_atomic_block:
+        return [_timed_dispatch(ctx, name, arguments) for name, arguments in calls]
+    futures = [
+        _read_pool.submit(_pooled_dispatch, ctx, name, arguments) for name, arguments in calls
+    ]
+    return [future.result() for future in futures]
 
 
 __all__ = [
+    "CACHED_TOOLS",
     "HANDLERS",
+    "PARALLEL_SAFE_TOOLS",
     "READ_ONLY_TOOLS",
     "SPIRIT_BLOCKS",
     "STAGE_FIELDS",
@@ -164,8 +232,11 @@ __all__ = [
     "AskUserPause",
     "ToolContext",
     "ToolHandler",
+    "ToolReadCache",
+    "ToolRun",
     "ask_user",
     "check_schedule_conflicts",
+    "dispatch_reads",
     "dispatch_tool",
     "find_roster_player",
     "get_match_spirit",
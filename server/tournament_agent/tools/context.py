@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
+import json
+import threading
 from collections.abc import Callable
 from typing import Any
 
 from django.utils import timezone
 
+from server.tournament.cache import get_tournament_version
 from server.tournament.models import Tournament
 from server.tournament_agent.models import (
     AgentProposal,
@@ -54,16 +57,54 @@ def _safe(result: Any) -> Any:
     return scrubbed
 
 
+class ToolReadCache:
+    """Read tool results for one agent turn, keyed by tool and arguments.
+
+    The model asks for the same stages and standings round after round of a turn.
+    Each entry is also keyed by the tournament's cache version, which
+    `server.tournament.cache` moves on whenever a write to the tournament, its
+    stages or its matches commits, so a proposal Confirmed mid-turn is seen on the
+    next read. A proposal created by this turn clears it outright.
+    """
+
+    def __init__(self, tournament_id: int) -> None:
+        self.tournament_id = tournament_id
+        self.hits = 0
+        self.misses = 0
+        self._results: dict[str, Any] = {}
+        # Reads from one round run on several threads at once
+        self._lock = threading.Lock()
+
+    def get_or_read(self, name: str, arguments: dict[str, Any], read: Callable[[], Any]) -> Any:
+        version = get_tournament_version(self.tournament_id)
+        key = json.dumps([version, name, arguments], sort_keys=True, default=str)
+        with self._lock:
+            if key in self._results:
+                self.hits += 1
+                return self._results[key]
+            self.misses += 1
+        result = read()
+        with self._lock:
+            self._results[key] = result
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+
 class ToolContext:
     def __init__(
         self,
         session: TournamentAgentSession,
         tournament: Tournament,
         assistant_message: TournamentAgentMessage | None = None,
+        reads: ToolReadCache | None = None,
     ) -> None:
         self.session = session
         self.tournament = tournament
         self.assistant_message = assistant_message
+        self.reads = reads if reads is not None else ToolReadCache(tournament.id)
 
     def create_proposal(
         self, tool_name: str, summary: str, payload: dict[str, Any]
@@ -98,6 +139,8 @@ class ToolContext:
                         status=ProposalStatus.EXPIRED, resolved_at=timezone.now()
                     )
 
+        # Proposals change what list_proposals and the stale-plan checks read
+        self.reads.clear()
         proposal = AgentProposal.objects.create(
             session=self.session,
             tool_name=tool_name,
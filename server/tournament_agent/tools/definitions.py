@@ -714,7 +714,7 @@ TOOL_DEFINITIONS: list[dict[str, Any]] = [
         "function": {
             "name": "propose_recommended_schedule",
             "description": (
-                "Run the deterministic scheduler and propose a bulk schedule (requires Confirm). "
+                "Run the scheduler and propose a bulk schedule (requires Confirm). "
                 "Places pools/Swiss first, then cross-pool, then brackets — a semi never starts "
                 "while a pool is still on. Default first pull is 07:00. Pass end_date for a "
                 "multi-day event. After it returns, call check_schedule_conflicts."
@@ -739,6 +739,19 @@ TOOL_DEFINITIONS: list[dict[str, Any]] = [
                     "lunch_start_hour": {"type": "integer"},
                     "lunch_end_hour": {"type": "integer"},
                     "field_ids": {"type": "array", "items": {"type": "integer"}},
+                    "engine": {
+                        "type": "string",
+                        "enum": ["local_search", "greedy"],
+                        "description": "local_search (default) repairs and compacts first fit "
+                        "within the time budget; greedy is plain first fit, the same every run.",
+                    },
+                    "time_budget_secs": {
+                        "type": "number",
+                        "minimum": 0,
+                        "maximum": 30,
+                        "description": "Seconds local search may spend improving. Default 5, "
+                        "at most 30.",
+                    },
                 },
                 "required": ["start_date"],
             },
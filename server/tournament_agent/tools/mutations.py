@@ -469,8 +469,14 @@ def propose_recommended_schedule(
     lunch_start_hour: int | None = 13,
     lunch_end_hour: int | None = 14,
     field_ids: list[int] | None = None,
+    engine: str | None = None,
+    time_budget_secs: float | None = None,
 ) -> dict[str, Any]:
-    from server.tournament_agent.domain.scheduler import recommend_schedule
+    from server.tournament_agent.domain.scheduler import (
+        DEFAULT_ENGINE,
+        DEFAULT_TIME_BUDGET_SECS,
+        recommend_schedule,
+    )
 
     result = recommend_schedule(
         tournament=ctx.tournament,
@@ -484,6 +490,10 @@ def propose_recommended_schedule(
         lunch_start_hour=lunch_start_hour,
         lunch_end_hour=lunch_end_hour,
         field_ids=field_ids,
+        engine=engine or DEFAULT_ENGINE,
+        time_budget_secs=(
+            DEFAULT_TIME_BUDGET_SECS if time_budget_secs is None else time_budget_secs
+        ),
     )
     assignments = result["assignments"]
     unplaced = int((result.get("meta") or {}).get("unplaced") or 0)
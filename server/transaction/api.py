@@ -252,15 +252,16 @@ def list_transactions(
 def validate_transactions(
     request: AuthenticatedHttpRequest,
     bank_statement: UploadedFile = File(...),  # noqa: B008
-) -> tuple[int, message_response] | tuple[int, dict[str, int]]:
+) -> tuple[int, message_response] | tuple[int, dict[str, Any]]:
     if not request.user.is_staff:
         return 401, {"message": "Only Admins can validate transactions"}
 
     if not bank_statement.name or not bank_statement.name.endswith(".csv"):
         return 400, {"message": "Please upload a CSV file!"}
 
-    text = bank_statement.read().decode("utf-8")
-    stats = validate_manual_transactions(io.StringIO(text))
+    # Read the upload a line at a time, rather than decoding all of it up front
+    csvfile = io.TextIOWrapper(bank_statement, encoding="utf-8", newline="")
+    stats = validate_manual_transactions(csvfile)
     return 200, stats
 
 
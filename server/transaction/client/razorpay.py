@@ -1,11 +1,11 @@
 import datetime
 import logging
 import uuid
+from collections.abc import Callable, Iterator
 from typing import Any
 
 import razorpay
 from django.conf import settings
-from django.utils.timezone import now
 
 from ..models import RazorpayTransaction
 from ..schema import RazorpayCallbackSchema
@@ -14,6 +14,8 @@ CLIENT = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_S
 
 RAZORPAY_NOTES_MAX = 512
 RAZORPAY_DESCRIPTION_MAX = 255
+# Most payments the API returns at once
+PAGE_SIZE = 100
 
 logger = logging.getLogger(__name__)
 
@@ -44,29 +46,27 @@ def create_order(
     return response
 
 
-def get_transactions() -> list[dict[str, Any]]:
-    today = now()
-    last_week = today - datetime.timedelta(days=7)
+def iter_payments(
+    since: datetime.datetime,
+    until: datetime.datetime,
+    fetch: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Payments created between the two times, read a page at a time.
 
-    page_size = 100
-    default = {
-        "from": int(last_week.timestamp()),
-        "to": int(today.timestamp()),
-        "count": page_size,
-    }
+    `fetch` is the API call, `CLIENT.payment.all` unless a stub is passed in.
+    """
+    if fetch is None:
+        fetch = CLIENT.payment.all
+    query = {"from": int(since.timestamp()), "to": int(until.timestamp()), "count": PAGE_SIZE}
 
-    transactions = []
     skip = 0
     while True:
-        query = dict(**default, skip=skip)
-        transactions_ = CLIENT.payment.all(query)
-        if transactions_["count"] == 0:
+        items = fetch({**query, "skip": skip}).get("items", [])
+        yield from items
+        # A short page is the last one, so there's no need to ask for an empty one
+        if len(items) < PAGE_SIZE:
             break
-        else:
-            transactions.extend(transactions_["items"])
-        skip += page_size
-
-    return transactions
+        skip += PAGE_SIZE
 
 
 def verify_payment(payment_info: dict[str, str]) -> bool:
@@ -114,6 +114,18 @@ class PhonePeTransaction(ExportModelOperationsMixin("phonepe_transaction"), mode
         return create_transaction_from_order_data(cls, data)
 
 
+class TrimLeadingZeros(models.Func):
+    """The text without the leading zeros bank statements pad references with.
+
+    The zero is part of the SQL, not a parameter, so a query on this matches the
+    index on it.
+    """
+
+    function = "LTRIM"
+    template = "%(function)s(%(expressions)s, '0')"
+    output_field = models.CharField()
+
+
 class ManualTransaction(ExportModelOperationsMixin("manual_transaction"), models.Model):  # type: ignore[misc]
     transaction_id = models.CharField(primary_key=True, max_length=255)
     amount = models.IntegerField()
@@ -125,9 +137,29 @@ class ManualTransaction(ExportModelOperationsMixin("manual_transaction"), models
     validated = models.BooleanField(default=False)
     validation_comment = models.TextField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Bank statements are matched to transactions however either pads its id
+            models.Index(TrimLeadingZeros("transaction_id"), name="manual_txn_reference_idx"),
+        ]
+
     def __str__(self) -> str:
         return self.transaction_id
 
     @classmethod
     def create_from_order_data(cls, data: dict[str, Any]) -> "ManualTransaction":
         return create_transaction_from_order_data(cls, data)
+
+
+class GatewaySyncCursor(ExportModelOperationsMixin("gateway_sync_cursor"), models.Model):  # type: ignore[misc]
+    """How far the last sync with a payment gateway has read its payments"""
+
+    gateway = models.CharField(
+        primary_key=True,
+        max_length=1,
+        choices=[(gateway.value, gateway.name.title()) for gateway in PaymentGateway],
+    )
+    synced_until = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{PaymentGateway(self.gateway).name.title()} synced until {self.synced_until}"
@@ -0,0 +1,317 @@
+"""Reconciling our transactions with what the payment gateways recorded.
+
+Callbacks and webhooks complete most payments as they happen, and these catch
+the ones that never arrived.
+
+Razorpay lists payments by when they were created, not when they last changed,
+so a sync reads the pages created since the last one less `SYNC_OVERLAP`, a
+week, for payments captured or refunded a while after they were made. How far
+it got is kept in a `GatewaySyncCursor`. An order can have several payments, a failed one followed
+by a captured one say, so they are bucketed by order and the payment furthest
+along decides the order's status.
+
+PhonePe has no such listing, so every pending transaction's status is asked for
+separately. Those checks run on a small thread pool behind a `RateLimiter`.
+
+Either way the changed transactions are saved with one `bulk_update`. The
+memberships, registrations and form payments that completed transactions pay
+for are applied for all of them together, in the same database transaction.
+Both take the gateway call as an argument, so tests pass a stub instead.
+"""
+
+import datetime
+import logging
+import uuid
+from collections import Counter, defaultdict
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from server.core.models import Player
+from server.lib.ratelimit import RateLimiter
+from server.membership.models import Membership, new_membership_number
+from server.tournament.models import Registration, Tournament
+
+from .client import razorpay
+from .models import GatewaySyncCursor, PaymentGateway, PhonePeTransaction, RazorpayTransaction
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+# How far back the first sync reads, and how far before the cursor the others do.
+# A payment that changes later than this after it was made is never seen again.
+FIRST_SYNC = datetime.timedelta(days=7)
+SYNC_OVERLAP = FIRST_SYNC
+PHONEPE_WORKERS = 8
+PHONEPE_CHECKS_PER_SECOND = 10
+
+RazorpayStatus = RazorpayTransaction.TransactionStatusChoices
+PhonePeStatus = PhonePeTransaction.TransactionStatusChoices
+RazorpayType = RazorpayTransaction.TransactionTypeChoices
+
+PAYMENT_STATUSES: dict[str, str] = {
+    "created": RazorpayStatus.PENDING,
+    "authorized": RazorpayStatus.PENDING,
+    "captured": RazorpayStatus.COMPLETED,
+    "failed": RazorpayStatus.FAILED,
+    "refunded": RazorpayStatus.REFUNDED,
+}
+# Of an order's payments, the one furthest along this list decides its status
+PRECEDENCE: list[str] = [
+    RazorpayStatus.FAILED,
+    RazorpayStatus.PENDING,
+    RazorpayStatus.COMPLETED,
+    RazorpayStatus.REFUNDED,
+]
+# A completed transaction can still be refunded, but never goes back to failed
+TRANSITIONS: dict[str, set[str]] = {
+    RazorpayStatus.PENDING: {
+        RazorpayStatus.COMPLETED,
+        RazorpayStatus.FAILED,
+        RazorpayStatus.REFUNDED,
+    },
+    RazorpayStatus.FAILED: {RazorpayStatus.COMPLETED, RazorpayStatus.REFUNDED},
+    RazorpayStatus.COMPLETED: {RazorpayStatus.REFUNDED},
+    RazorpayStatus.REFUNDED: set(),
+}
+
+
+@dataclass
+class SyncReport:
+    since: datetime.datetime
+    until: datetime.datetime
+    # Payments read from the gateway
+    payments: int = 0
+    # Transactions whose status changed, by their new status
+    updated: Counter[str] = field(default_factory=Counter)
+
+
+def _chunks(items: Sequence[Any]) -> list[Sequence[Any]]:
+    return [items[i : i + BATCH_SIZE] for i in range(0, len(items), BATCH_SIZE)]
+
+
+def sync_razorpay_transactions(
+    fetch: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+    until: datetime.datetime | None = None,
+    overlap: datetime.timedelta = SYNC_OVERLAP,
+    reset: bool = False,
+) -> SyncReport:
+    """Bring our Razorpay transactions up to date with the payments made since the last sync.
+
+    `reset` ignores the cursor and reads the last `FIRST_SYNC` of payments again.
+    """
+    until = until or now()
+    cursor = GatewaySyncCursor.objects.filter(gateway=PaymentGateway.RAZORPAY.value).first()
+    since = until - FIRST_SYNC if cursor is None or reset else cursor.synced_until - overlap
+    report = SyncReport(since=since, until=until)
+
+    # Order id to the status and id of its payment furthest along
+    orders: dict[str, tuple[str, str]] = {}
+    for payment in razorpay.iter_payments(since, until, fetch):
+        report.payments += 1
+        status = PAYMENT_STATUSES.get(payment.get("status", ""))
+        order_id = payment.get("order_id")
+        if status is None or not order_id:
+            continue
+        current = orders.get(order_id)
+        if current is None or PRECEDENCE.index(status) > PRECEDENCE.index(current[0]):
+            orders[order_id] = (status, payment["id"])
+
+    with transaction.atomic():
+        changed = []
+        for batch in _chunks(list(orders)):
+            for txn in RazorpayTransaction.objects.select_for_update().filter(order_id__in=batch):
+                status, payment_id = orders[txn.order_id]
+                if status not in TRANSITIONS[txn.status]:
+                    continue
+                txn.status = status
+                txn.payment_id = txn.payment_id or payment_id
+                changed.append(txn)
+                report.updated[status] += 1
+
+        RazorpayTransaction.objects.bulk_update(
+            changed, ["status", "payment_id"], batch_size=BATCH_SIZE
+        )
+        completed = [txn for txn in changed if txn.status == RazorpayStatus.COMPLETED]
+        complete_razorpay_transactions(sorted(completed, key=lambda txn: txn.payment_date))
+        GatewaySyncCursor.objects.update_or_create(
+            gateway=PaymentGateway.RAZORPAY.value, defaults={"synced_until": until}
+        )
+
+    return report
+
+
+def phonepe_status(data: dict[str, Any]) -> str | None:
+    """The status a PhonePe status check reports, if it's one of ours."""
+    code = str(data.get("code", ""))
+    prefix = "PAYMENT_"
+    if not code.startswith(prefix):
+        return None
+    status = getattr(PhonePeStatus, code[len(prefix) :], None)
+    return str(status) if status is not None else None
+
+
+def reconcile_phonepe_transactions(
+    check_status: Callable[[str], dict[str, Any]],
+    workers: int = PHONEPE_WORKERS,
+    limiter: RateLimiter | None = None,
+) -> Counter[str]:
+    """Check every pending PhonePe transaction's status, returning how many changed to each.
+
+    A transaction whose check fails stays pending for the next run.
+    """
+    pending = list(
+        PhonePeTransaction.objects.filter(status=PhonePeStatus.PENDING).values_list(
+            "transaction_id", flat=True
+        )
+    )
+
+    def check(transaction_id: uuid.UUID) -> str | None:
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return phonepe_status(check_status(str(transaction_id)))
+        except Exception:
+            logger.exception("Failed to check the status of PhonePe transaction %s", transaction_id)
+            return None
+
+    # The checks only wait on PhonePe, so the workers never touch the database
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="phonepe") as pool:
+        checked = list(zip(pending, pool.map(check, pending), strict=True))
+    settled: dict[uuid.UUID, str] = {}
+    for tid, status in checked:
+        if status is not None and status != PhonePeStatus.PENDING:
+            settled[tid] = status
+
+    updated: Counter[str] = Counter()
+    with transaction.atomic():
+        changed = []
+        for batch in _chunks(list(settled)):
+            # Still pending, so a callback that got there first isn't applied twice
+            for txn in PhonePeTransaction.objects.select_for_update().filter(
+                transaction_id__in=batch, status=PhonePeStatus.PENDING
+            ):
+                txn.status = settled[txn.transaction_id]
+                changed.append(txn)
+                updated[txn.status] += 1
+
+        PhonePeTransaction.objects.bulk_update(changed, ["status"], batch_size=BATCH_SIZE)
+        succeeded = [txn for txn in changed if txn.status == PhonePeStatus.SUCCESS]
+        activate_memberships(sorted(succeeded, key=lambda txn: txn.transaction_date))
+
+    return updated
+
+
+def complete_razorpay_transactions(transactions: Sequence[RazorpayTransaction]) -> None:
+    """Apply what completed transactions paid for, like the callback does for each one."""
+    by_type: dict[str, list[RazorpayTransaction]] = defaultdict(list)
+    for txn in transactions:
+        by_type[txn.type].append(txn)
+
+    activate_memberships(by_type[RazorpayType.ANNUAL_MEMBERSHIP])
+    register_teams(by_type[RazorpayType.TEAM_REGISTRATION])
+    register_teams(by_type[RazorpayType.PARTIAL_TEAM_REGISTRATION], partial=True)
+    register_players(by_type[RazorpayType.PLAYER_REGISTRATION])
+    if by_type[RazorpayType.FORM_PAYMENT]:
+        # Lazy import to avoid a transaction <-> forms import cycle.
+        from server.forms.utils import mark_form_response_paid
+
+        for txn in by_type[RazorpayType.FORM_PAYMENT]:
+            mark_form_response_paid(txn)
+
+
+def _players_by_transaction(
+    transactions: Sequence[RazorpayTransaction | PhonePeTransaction],
+) -> dict[Any, list[int]]:
+    # The players' reverse relation to the transactions is named after their model
+    source = str(type(transactions[0])._meta.model_name)
+    players = defaultdict(list)
+    for pk, player_id in Player.objects.filter(
+        **{f"{source}__in": [txn.pk for txn in transactions]}
+    ).values_list(source, "id"):
+        players[pk].append(player_id)
+    return players
+
+
+def activate_memberships(transactions: Sequence[RazorpayTransaction | PhonePeTransaction]) -> None:
+    """Give the transactions' players the memberships they paid for.
+
+    Does what `update_transaction_player_memberships` does, in a handful of
+    queries however many transactions there are. When a player is in more than
+    one, the last transaction wins.
+    """
+    if not transactions:
+        return
+
+    memberships: dict[int, dict[str, Any]] = {}
+    players = _players_by_transaction(transactions)
+    for txn in transactions:
+        for player_id in players[txn.pk]:
+            memberships[player_id] = {
+                "start_date": txn.start_date,
+                "end_date": txn.end_date,
+                "event_id": txn.event_id,
+                "season_id": getattr(txn, "season_id", None),
+                "is_active": True,
+            }
+
+    existing = Membership.objects.in_bulk(list(memberships), field_name="player_id")
+    to_create, to_update = [], []
+    for player_id, values in memberships.items():
+        membership = existing.get(player_id)
+        if membership is None:
+            # bulk_create skips the pre_save receiver that numbers memberships
+            membership = Membership(
+                player_id=player_id, membership_number=new_membership_number(), **values
+            )
+            to_create.append(membership)
+        else:
+            for key, value in values.items():
+                setattr(membership, key, value)
+            to_update.append(membership)
+
+    Membership.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+    Membership.objects.bulk_update(
+        to_update, ["start_date", "end_date", "event", "season", "is_active"], batch_size=BATCH_SIZE
+    )
+
+
+def register_teams(transactions: Sequence[RazorpayTransaction], partial: bool = False) -> None:
+    """Register the transactions' teams to their tournaments, fully or partially."""
+    teams = defaultdict(set)
+    for txn in transactions:
+        if txn.team_id is not None and txn.event_id is not None:
+            teams[txn.event_id].add(txn.team_id)
+    if not teams:
+        return
+
+    tournaments = Tournament.objects.in_bulk(list(teams), field_name="event_id")
+    for event_id, team_ids in teams.items():
+        tournament = tournaments.get(event_id)
+        if tournament is None:
+            continue
+        if partial:
+            tournament.partial_teams.add(*team_ids)
+        else:
+            tournament.partial_teams.remove(*team_ids)
+            # One m2m_changed, so the tournament is reseeded once for all its teams
+            tournament.teams.add(*team_ids)
+
+
+def register_players(transactions: Sequence[RazorpayTransaction]) -> None:
+    """Register the transactions' players to their events, skipping those already registered."""
+    if not transactions:
+        return
+
+    players = _players_by_transaction(transactions)
+    registrations = [
+        Registration(event_id=txn.event_id, team_id=txn.team_id, player_id=player_id)
+        for txn in transactions
+        if txn.event_id is not None and txn.team_id is not None
+        for player_id in players[txn.pk]
+    ]
+    Registration.objects.bulk_create(registrations, batch_size=BATCH_SIZE, ignore_conflicts=True)